@@ -38,6 +38,7 @@ from src.articles.models.user import User
 from src.articles.models.author import Author
 from src.articles.models.comment import Comment
 from src.articles.models.tag import Tag
+from src.articles.models.search_outbox import SearchOutbox
 
 # versioning_manager.declarative_base = Base
 
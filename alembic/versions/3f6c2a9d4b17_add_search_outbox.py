@@ -0,0 +1,48 @@
+"""Add search outbox
+
+Revision ID: 3f6c2a9d4b17
+Revises: 108779776143
+Create Date: 2026-10-17 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2a9d4b17'
+down_revision: Union[str, None] = '108779776143'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        current_step = "Creating search_outbox table"
+        op.create_table(
+            'search_outbox',
+            sa.Column('id', sa.BigInteger(), nullable=False),
+            sa.Column('article_id', sa.Integer(), nullable=False),
+            sa.Column('operation', sa.String(length=10), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'),
+                      nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        logger.info("Created search_outbox table")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        op.drop_table('search_outbox')
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
@@ -0,0 +1,69 @@
+"""Add trigram indexes
+
+Revision ID: 7c41e9b2d583
+Revises: 3f6c2a9d4b17
+Create Date: 2026-10-17 11:03:27.520913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e9b2d583'
+down_revision: Union[str, None] = '3f6c2a9d4b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        current_step = "Creating pg_trgm extension"
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        logger.info("Created pg_trgm extension")
+
+        # CREATE INDEX CONCURRENTLY does not block writes but can not run inside a transaction
+        with op.get_context().autocommit_block():
+            current_step = "Creating articles title trigram index"
+            op.create_index(
+                'ix_articles_title_lower_trgm',
+                'articles',
+                [sa.text('lower(title) gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            logger.info("Created articles title trigram index")
+
+            current_step = "Creating authors name trigram index"
+            op.create_index(
+                'ix_authors_name_lower_trgm',
+                'authors',
+                [sa.text('lower(name) gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            logger.info("Created authors name trigram index")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        # the pg_trgm extension is kept, other objects of the database may use it
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_authors_name_lower_trgm', table_name='authors', postgresql_concurrently=True,
+                          if_exists=True)
+            op.drop_index('ix_articles_title_lower_trgm', table_name='articles', postgresql_concurrently=True,
+                          if_exists=True)
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
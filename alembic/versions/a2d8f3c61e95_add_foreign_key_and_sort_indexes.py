@@ -0,0 +1,55 @@
+"""Add foreign key and sort indexes
+
+Revision ID: a2d8f3c61e95
+Revises: 7c41e9b2d583
+Create Date: 2026-10-17 11:48:05.374120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d8f3c61e95'
+down_revision: Union[str, None] = '7c41e9b2d583'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+# name, table, columns
+INDEXES = [
+    ('ix_articles_publication_date_id', 'articles', ['publication_date', 'id']),
+    ('ix_articles_owner_id', 'articles', ['owner_id']),
+    ('ix_article_authors_author_id_article_id', 'article_authors', ['author_id', 'article_id']),
+    ('ix_article_tags_tag_id_article_id', 'article_tags', ['tag_id', 'article_id']),
+    ('ix_comments_article_id_id', 'comments', ['article_id', sa.text('id DESC')]),
+    ('ix_comments_user_id', 'comments', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        # CREATE INDEX CONCURRENTLY does not block writes but can not run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                current_step = f"Creating index {name}"
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+                logger.info(f"Created index {name}")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
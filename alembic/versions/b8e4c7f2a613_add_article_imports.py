@@ -0,0 +1,63 @@
+"""Add article imports
+
+Revision ID: b8e4c7f2a613
+Revises: d5e17b3a9c42
+Create Date: 2026-10-17 15:21:07.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4c7f2a613'
+down_revision: Union[str, None] = 'd5e17b3a9c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        current_step = "Creating article_imports table"
+        op.create_table(
+            'article_imports',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('owner_id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('path', sa.String(length=1024), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('bytes_total', sa.BigInteger(), nullable=False),
+            sa.Column('bytes_read', sa.BigInteger(), nullable=False),
+            sa.Column('rows_imported', sa.Integer(), nullable=False),
+            sa.Column('rows_failed', sa.Integer(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'),
+                      nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'),
+                      nullable=False),
+            sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        logger.info("Created article_imports table")
+
+        current_step = "Creating index ix_article_imports_owner_id"
+        op.create_index('ix_article_imports_owner_id', 'article_imports', ['owner_id'])
+        logger.info("Created index ix_article_imports_owner_id")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        op.drop_index('ix_article_imports_owner_id', table_name='article_imports')
+        op.drop_table('article_imports')
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
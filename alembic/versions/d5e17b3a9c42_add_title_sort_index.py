@@ -0,0 +1,48 @@
+"""Add title sort index
+
+Revision ID: d5e17b3a9c42
+Revises: a2d8f3c61e95
+Create Date: 2026-10-17 13:02:41.518907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e17b3a9c42'
+down_revision: Union[str, None] = 'a2d8f3c61e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        # CREATE INDEX CONCURRENTLY does not block writes but can not run inside a transaction
+        with op.get_context().autocommit_block():
+            current_step = "Creating index ix_articles_title_id"
+            op.create_index(
+                'ix_articles_title_id',
+                'articles',
+                ['title', 'id'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            logger.info("Created index ix_articles_title_id")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_articles_title_id', table_name='articles', postgresql_concurrently=True, if_exists=True)
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
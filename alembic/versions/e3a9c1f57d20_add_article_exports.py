@@ -0,0 +1,84 @@
+"""Add article exports
+
+Revision ID: e3a9c1f57d20
+Revises: b8e4c7f2a613
+Create Date: 2026-10-17 18:42:51.218604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c1f57d20'
+down_revision: Union[str, None] = 'b8e4c7f2a613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        current_step = "Creating article_exports table"
+        op.create_table(
+            'article_exports',
+            sa.Column('id', sa.String(length=32), nullable=False),
+            sa.Column('owner_id', sa.Integer(), nullable=False),
+            sa.Column('key', sa.String(length=255), nullable=False),
+            sa.Column('search_params', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+            sa.Column('format', sa.String(length=20), nullable=False),
+            sa.Column('compressed', sa.Boolean(), nullable=False),
+            sa.Column('path', sa.String(length=1024), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('media_type', sa.String(length=100), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('run_id', sa.String(length=32), nullable=True),
+            sa.Column('bytes_written', sa.BigInteger(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'),
+                      nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'),
+                      nullable=False),
+            sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        logger.info("Created article_exports table")
+
+        current_step = "Creating index ix_article_exports_owner_id"
+        op.create_index('ix_article_exports_owner_id', 'article_exports', ['owner_id'])
+        logger.info("Created index ix_article_exports_owner_id")
+
+        current_step = "Creating index uq_article_exports_active_key"
+        op.create_index(
+            'uq_article_exports_active_key',
+            'article_exports',
+            ['owner_id', 'key'],
+            unique=True,
+            postgresql_where=sa.text("status IN ('pending', 'running')")
+        )
+        logger.info("Created index uq_article_exports_active_key")
+
+        current_step = "Creating index ix_article_exports_status_created_at"
+        op.create_index('ix_article_exports_status_created_at', 'article_exports', ['status', 'created_at'])
+        logger.info("Created index ix_article_exports_status_created_at")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        op.drop_index('ix_article_exports_status_created_at', table_name='article_exports')
+        op.drop_index('uq_article_exports_active_key', table_name='article_exports')
+        op.drop_index('ix_article_exports_owner_id', table_name='article_exports')
+        op.drop_table('article_exports')
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
@@ -0,0 +1,65 @@
+"""Sort titles case insensitively
+
+Revision ID: f1c7d2a48b36
+Revises: e3a9c1f57d20
+Create Date: 2026-10-17 19:27:13.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.articles.utils.logging import setup_logging
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7d2a48b36'
+down_revision: Union[str, None] = 'e3a9c1f57d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = setup_logging(__name__)
+
+
+def upgrade() -> None:
+    current_step = "Starting migration"
+    try:
+        # CREATE INDEX CONCURRENTLY does not block writes but can not run inside a transaction
+        with op.get_context().autocommit_block():
+            current_step = "Creating index ix_articles_title_lower_id"
+            op.create_index(
+                'ix_articles_title_lower_id',
+                'articles',
+                [sa.text('lower(title) COLLATE "C"'), 'id'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            logger.info("Created index ix_articles_title_lower_id")
+
+            current_step = "Dropping index ix_articles_title_id"
+            op.drop_index('ix_articles_title_id', table_name='articles', postgresql_concurrently=True, if_exists=True)
+            logger.info("Dropped index ix_articles_title_id")
+    except Exception as e:
+        logger.error(f"Error in {current_step} during migration: {str(e)}")
+        raise
+
+def downgrade() -> None:
+    try:
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_articles_title_id',
+                'articles',
+                ['title', 'id'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                'ix_articles_title_lower_id',
+                table_name='articles',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    except Exception as e:
+        logger.error(f"Error during migration: {str(e)}")
+        raise
@@ -0,0 +1,128 @@
+"""
+Articles per second of POST /articles/bulk against the per-article create loop it replaces.
+
+Usage: ENVIRONMENT=tests python -m benchmarks.bulk_ingest [--articles 5000] [--batch-sizes 100 1000]
+
+The tables are created in a scratch `bulk_ingest_benchmark` schema of the configured database, which is dropped
+at the end unless --keep is given. Every article has three authors and three tags. Both paths index into the
+in-memory search engine so that only the database round trips are compared: the loop calls ArticleService.create
+once per article, the bulk path calls ArticleService.bulk_create once per batch.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.articles.core.config.factory import get_settings
+from src.articles.db.base import Base
+from src.articles.repositories.memory_search_repository import InMemoryArticleSearchRepository
+from src.articles.schemas.article import ArticleCreate
+from src.articles.services.article import ArticleService
+
+SCHEMA = "bulk_ingest_benchmark"
+
+LINKS_PER_ARTICLE = 3
+
+
+async def prepare(engine: AsyncEngine) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await connection.run_sync(Base.metadata.create_all)
+
+        await connection.execute(text(
+            "INSERT INTO users (username, password) VALUES ('benchmark', 'benchmark')"
+        ))
+        await connection.execute(text(
+            "INSERT INTO authors (name) SELECT 'Writer ' || i FROM generate_series(1, 1000) AS i"
+        ))
+        await connection.execute(text(
+            "INSERT INTO tags (name) SELECT 'tag-' || i FROM generate_series(1, 100) AS i"
+        ))
+
+
+def generate(count: int) -> List[ArticleCreate]:
+    return [
+        ArticleCreate(
+            title=f"Article {i}",
+            abstract=f"Generated abstract number {i} about bulk ingestion",
+            publication_date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            owner_id=1,
+            author_ids=[1 + (i * 7919 + n * 331) % 1000 for n in range(LINKS_PER_ARTICLE)],
+            tag_ids=[1 + (i * 31 + n * 17) % 100 for n in range(LINKS_PER_ARTICLE)],
+        )
+        for i in range(count)
+    ]
+
+
+async def create_one_by_one(
+        session_factory: async_sessionmaker[AsyncSession],
+        search_repository: InMemoryArticleSearchRepository,
+        articles: List[ArticleCreate]
+) -> float:
+    start = time.perf_counter()
+    async with session_factory() as db, db.begin():
+        service = ArticleService(db, search_repository)
+        for article in articles:
+            await service.create(obj=article)
+    return len(articles) / (time.perf_counter() - start)
+
+
+async def create_in_bulk(
+        session_factory: async_sessionmaker[AsyncSession],
+        search_repository: InMemoryArticleSearchRepository,
+        articles: List[ArticleCreate],
+        batch_size: int
+) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(articles), batch_size):
+        async with session_factory() as db, db.begin():
+            service = ArticleService(db, search_repository)
+            await service.bulk_create(objs=articles[offset:offset + batch_size])
+    return len(articles) / (time.perf_counter() - start)
+
+
+async def run(*, articles: int, batch_sizes: List[int], keep: bool) -> None:
+    settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+    engine = create_async_engine(
+        settings.POSTGRES_URI,
+        connect_args={"options": f"-csearch_path={SCHEMA},public"},
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    search_repository = InMemoryArticleSearchRepository()
+    await search_repository.create_index()
+    try:
+        print(f"Creating the {SCHEMA} schema...")
+        await prepare(engine)
+        generated = generate(articles)
+
+        loop = await create_one_by_one(session_factory, search_repository, generated)
+        print(f"\n{'batch size':>10} {'loop articles/s':>16} {'bulk articles/s':>16} {'speedup':>8}")
+        for batch_size in batch_sizes:
+            bulk = await create_in_bulk(session_factory, search_repository, generated, batch_size)
+            print(f"{batch_size:>10} {loop:>16.0f} {bulk:>16.0f} {bulk / loop if loop else 0:>7.2f}x")
+    finally:
+        if not keep:
+            async with engine.begin() as connection:
+                await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk article ingestion against the per-article loop")
+    parser.add_argument("--articles", type=int, default=5000, help="number of articles created per path")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000], help="bulk request sizes")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark schema")
+    args = parser.parse_args()
+
+    asyncio.run(run(articles=args.articles, batch_sizes=args.batch_sizes, keep=args.keep))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Event loop latency during a burst of logins, with bcrypt run inline on the loop against the PasswordHasher pool.
+
+Usage: ENVIRONMENT=tests python -m benchmarks.login_storm [--logins 40] [--workers 4] [--executor thread]
+
+A probe task sleeps for a millisecond in a loop and records how late it wakes up, which is the delay every other
+request on the loop, e.g. a search, suffers. The logins are verified concurrently, first inline as the login
+endpoint used to, then through the pool. No database is needed.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from src.articles.auth.password_utils import PasswordHasher, get_password_hash, verify_password
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe(delays: List[float]) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def storm(logins: int, verify: Callable[[str, str], Awaitable[bool]], hashed: str) -> List[float]:
+    delays: List[float] = []
+    prober = asyncio.create_task(probe(delays))
+    await asyncio.sleep(0.01)
+    await asyncio.gather(*(verify("password", hashed) for _ in range(logins)))
+    # let the probe record the wake up it was late for
+    await asyncio.sleep(0.01)
+    prober.cancel()
+    return delays
+
+
+def percentile(values: List[float], share: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[int(share * 100) - 1] if len(values) > 1 else values[0]
+
+
+async def run(*, logins: int, workers: int, executor: str) -> None:
+    hashed = get_password_hash("password")
+    hasher = PasswordHasher(workers=workers, max_queued=logins, executor=executor)
+
+    async def inline(plain: str, hashed_password: str) -> bool:
+        return verify_password(plain, hashed_password)
+
+    print(f"{logins} concurrent logins\n\n{'path':>8} {'seconds':>8} {'p50 lag ms':>11} {'p99 lag ms':>11} {'max lag ms':>11}")
+    for name, verify in (("inline", inline), (executor, hasher.verify)):
+        started = time.perf_counter()
+        delays = await storm(logins, verify, hashed)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:>8} {elapsed:>8.2f} {percentile(delays, 0.5) * 1000:>11.2f} "
+            f"{percentile(delays, 0.99) * 1000:>11.2f} {max(delays) * 1000:>11.2f}"
+        )
+    hasher.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark event loop latency during a burst of logins")
+    parser.add_argument("--logins", type=int, default=40, help="number of concurrent logins")
+    parser.add_argument("--workers", type=int, default=4, help="size of the hashing pool")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="kind of hashing pool")
+    args = parser.parse_args()
+
+    asyncio.run(run(logins=args.logins, workers=args.workers, executor=args.executor))
+
+
+if __name__ == "__main__":
+    main()
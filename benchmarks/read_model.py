@@ -0,0 +1,144 @@
+"""
+Rows per second of the article read model against the ORM path it replaces.
+
+Usage: ENVIRONMENT=tests python -m benchmarks.read_model [--articles 100000] [--page-sizes 10 100 1000] [--pages 50]
+
+The data is generated in a scratch `read_model_benchmark` schema of the configured database, which is dropped
+at the end unless --keep is given. Every article has three authors and three tags. The ORM path selects
+the articles with two selectinload queries and validates the ORM objects into ArticleSchema through
+from_attributes, the read model path runs ArticleRepository.search_with_filters, which aggregates the authors
+and tags with json_agg in the page query.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from src.articles.core.config.factory import get_settings
+from src.articles.db.base import Base
+from src.articles.models import Article
+from src.articles.repositories.article import ArticleRepository
+from src.articles.schemas.article import ArticleSchema, ArticleSearchFilters, ArticleSortOrder
+from src.articles.schemas.base import CountMode
+
+SCHEMA = "read_model_benchmark"
+
+LINKS_PER_ARTICLE = 3
+
+
+async def prepare(engine: AsyncEngine, *, articles: int) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await connection.run_sync(Base.metadata.create_all)
+
+        await connection.execute(text(
+            "INSERT INTO users (username, password) VALUES ('benchmark', 'benchmark')"
+        ))
+        await connection.execute(text(
+            "INSERT INTO authors (name) SELECT 'Writer ' || i FROM generate_series(1, 1000) AS i"
+        ))
+        await connection.execute(text(
+            "INSERT INTO tags (name) SELECT 'tag-' || i FROM generate_series(1, 100) AS i"
+        ))
+        await connection.execute(text("""
+            INSERT INTO articles (title, abstract, publication_date, owner_id)
+            SELECT md5(i::text), md5((i * 7)::text) || ' ' || md5((i * 13)::text),
+                   timestamptz '2000-01-01' + (i % 9000) * interval '1 day', 1
+            FROM generate_series(1, :articles) AS i
+        """), {"articles": articles})
+        await connection.execute(text("""
+            INSERT INTO article_authors (article_id, author_id)
+            SELECT id, 1 + (id * 7919 + n * 331) % 1000 FROM articles, generate_series(1, :links) AS n
+        """), {"links": LINKS_PER_ARTICLE})
+        await connection.execute(text("""
+            INSERT INTO article_tags (article_id, tag_id)
+            SELECT id, 1 + (id * 31 + n * 17) % 100 FROM articles, generate_series(1, :links) AS n
+        """), {"links": LINKS_PER_ARTICLE})
+        await connection.execute(text("ANALYZE"))
+
+
+async def orm_page(db: AsyncSession, page: int, page_size: int) -> List[ArticleSchema]:
+    query = select(Article).options(
+        selectinload(Article.authors),
+        selectinload(Article.tags),
+    ).order_by(Article.id).offset((page - 1) * page_size).limit(page_size)
+    result = await db.execute(query)
+    return [ArticleSchema.model_validate(article) for article in result.scalars().all()]
+
+
+async def read_model_page(db: AsyncSession, page: int, page_size: int) -> List[ArticleSchema]:
+    items, _, _ = await ArticleRepository(db).search_with_filters(
+        search_params=ArticleSearchFilters(sort=ArticleSortOrder.OLDEST),
+        page=page,
+        page_size=page_size,
+        count_mode=CountMode.NONE,
+    )
+    return items
+
+
+async def measure(
+        session_factory: async_sessionmaker[AsyncSession],
+        read_page: Callable[[AsyncSession, int, int], Awaitable[Sequence[ArticleSchema]]],
+        *,
+        page_size: int,
+        pages: int
+) -> float:
+    """Rows per second over the first pages, every page in a new session so nothing is served from the identity map"""
+    rows = 0
+    elapsed = 0.0
+    for page in range(1, pages + 1):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            rows += len(await read_page(db, page, page_size))
+            elapsed += time.perf_counter() - start
+    return rows / elapsed if elapsed else 0.0
+
+
+async def run(*, articles: int, page_sizes: List[int], pages: int, keep: bool) -> None:
+    settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+    engine = create_async_engine(
+        settings.POSTGRES_URI,
+        connect_args={"options": f"-csearch_path={SCHEMA},public"},
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        print(f"Generating {articles} articles with {LINKS_PER_ARTICLE} authors and tags in the {SCHEMA} schema...")
+        await prepare(engine, articles=articles)
+
+        paths: Dict[str, Callable] = {"orm": orm_page, "read model": read_model_page}
+        # one warm up round so that connections and plans are cached for both paths
+        for read_page in paths.values():
+            await measure(session_factory, read_page, page_size=10, pages=1)
+
+        print(f"\n{'page size':>10} {'orm rows/s':>14} {'read model rows/s':>18} {'speedup':>8}")
+        for page_size in page_sizes:
+            orm = await measure(session_factory, orm_page, page_size=page_size, pages=pages)
+            read_model = await measure(session_factory, read_model_page, page_size=page_size, pages=pages)
+            print(f"{page_size:>10} {orm:>14.0f} {read_model:>18.0f} {read_model / orm if orm else 0:>7.2f}x")
+    finally:
+        if not keep:
+            async with engine.begin() as connection:
+                await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the article read model against the ORM path")
+    parser.add_argument("--articles", type=int, default=100_000, help="number of generated articles")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 100, 1000], help="page sizes to read")
+    parser.add_argument("--pages", type=int, default=50, help="pages read per path and page size")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark schema")
+    args = parser.parse_args()
+
+    asyncio.run(run(articles=args.articles, page_sizes=args.page_sizes, pages=args.pages, keep=args.keep))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Latency of the database search filters before and after their indexes.
+
+Usage: ENVIRONMENT=tests python -m benchmarks.search_filters [--articles 1000000] [--authors 20000] [--runs 20]
+
+The data is generated in a scratch `benchmark` schema of the configured database, which is dropped at the
+end unless --keep is given. Every filter runs through ArticleRepository.search_with_filters, first without
+the indexes and then with the indexes of the migrations, and the median latency and the plan are reported.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.articles.core.config.factory import get_settings
+from src.articles.db.base import Base
+from src.articles.models import Article
+from src.articles.repositories.article import ArticleRepository
+from src.articles.schemas.article import ArticleSearchFilters
+
+SCHEMA = "benchmark"
+
+FILTERS: Dict[str, ArticleSearchFilters] = {
+    "title": ArticleSearchFilters(title="ab1c", sort="publication_date"),
+    "author": ArticleSearchFilters(author="er 1234", sort="publication_date"),
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_articles_title_lower_trgm ON articles USING gin (lower(title) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_authors_name_lower_trgm ON authors USING gin (lower(name) gin_trgm_ops)",
+]
+
+
+async def prepare(engine: AsyncEngine, *, articles: int, authors: int) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await connection.run_sync(Base.metadata.create_all)
+        # measure the plain tables first, the indexes of the models are created again in index()
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                await connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+        await connection.execute(text(
+            "INSERT INTO users (username, password) VALUES ('benchmark', 'benchmark')"
+        ))
+        await connection.execute(text(
+            "INSERT INTO authors (name) SELECT 'Writer ' || i FROM generate_series(1, :authors) AS i"
+        ), {"authors": authors})
+        await connection.execute(text("""
+            INSERT INTO articles (title, abstract, publication_date, owner_id)
+            SELECT md5(i::text), md5((i * 7)::text) || ' ' || md5((i * 13)::text),
+                   timestamptz '2000-01-01' + (i % 9000) * interval '1 day', 1
+            FROM generate_series(1, :articles) AS i
+        """), {"articles": articles})
+        await connection.execute(text("""
+            INSERT INTO article_authors (article_id, author_id)
+            SELECT id, 1 + (id * 7919) % :authors FROM articles
+        """), {"authors": authors})
+        await connection.execute(text("ANALYZE"))
+
+
+async def index(engine: AsyncEngine, statements: List[str]) -> None:
+    async with engine.begin() as connection:
+        for statement in statements:
+            await connection.execute(text(statement))
+        await connection.execute(text("ANALYZE"))
+
+
+async def measure(session_factory: async_sessionmaker[AsyncSession], runs: int) -> Dict[str, Tuple[float, str]]:
+    """The median latency in milliseconds and the top plan node of every filter"""
+    results = {}
+    for name, search_params in FILTERS.items():
+        timings = []
+        async with session_factory() as db:
+            repository = ArticleRepository(db)
+            for _ in range(runs):
+                start = time.perf_counter()
+                await repository.search_with_filters(search_params=search_params, page=1, page_size=10)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            query = repository._apply_filters(select(Article.id), search_params)
+            compiled = query.compile(bind=db.bind, compile_kwargs={"literal_binds": True})
+            plan = (await db.execute(text(f"EXPLAIN {compiled}"))).scalars().all()
+
+        results[name] = (statistics.median(timings), "\n".join(line for line in plan if "Scan" in line))
+    return results
+
+
+def report(title: str, results: Dict[str, Tuple[float, str]]) -> None:
+    print(f"\n{title}")
+    for name, (latency, plan) in results.items():
+        print(f"  {name:<8} {latency:10.2f} ms")
+        for line in plan.splitlines():
+            print(f"           {line.strip()}")
+
+
+async def run(*, articles: int, authors: int, runs: int, keep: bool) -> None:
+    settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+    engine = create_async_engine(
+        settings.POSTGRES_URI,
+        connect_args={"options": f"-csearch_path={SCHEMA},public"},
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        print(f"Generating {articles} articles and {authors} authors in the {SCHEMA} schema...")
+        await prepare(engine, articles=articles, authors=authors)
+
+        report("Without indexes", await measure(session_factory, runs))
+        await index(engine, INDEXES)
+        report("With indexes", await measure(session_factory, runs))
+    finally:
+        if not keep:
+            async with engine.begin() as connection:
+                await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the database search filters with and without indexes")
+    parser.add_argument("--articles", type=int, default=1_000_000, help="number of generated articles")
+    parser.add_argument("--authors", type=int, default=20_000, help="number of generated authors")
+    parser.add_argument("--runs", type=int, default=20, help="executions of every filter per measurement")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark schema")
+    args = parser.parse_args()
+
+    asyncio.run(run(articles=args.articles, authors=args.authors, runs=args.runs, keep=args.keep))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,18 @@ import os
 from contextlib import asynccontextmanager
 
 import uvicorn
-from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from src.articles.api.logging_middleware import logger_middleware
 from src.articles.api.router import api_router
 from src.articles.core.config.factory import get_settings
-from src.articles.core.dependencies import get_elasticsearch_client
+from src.articles.auth.password_utils import get_password_hasher
+from src.articles.core.dependencies import elasticsearch_lifespan, services_lifespan
 from src.articles.db import AsyncSessionLocal
 from src.articles.db.init_data import init_data
 from src.articles.db.init_db import init_db
+from src.articles.services.search_index import SearchIndexService
 from src.articles.utils.logging import setup_logging
 
 logger = setup_logging(__name__)
@@ -23,31 +24,39 @@ settings = get_settings(ENVIRONMENT)
 @asynccontextmanager
 async def lifespan(application: FastAPI):
     try:
-        # Initialize database schema and tables
-        logger.info("Initializing database...")
-        await init_db()
-
-        # Initialize application data within a separate session
-        async with AsyncSessionLocal() as db:
-            logger.info("Initializing application data...")
-            await init_data(db)
-            await db.commit()
-
-        # Initialize Elasticsearch client
-        es_client: AsyncElasticsearch = get_elasticsearch_client()
-
-        logger.info("Application startup completed successfully")
-        yield
-
-        # Cleanup
-        logger.info("Shutting down application...")
-        await es_client.close()
+        # Initialize the application wide Elasticsearch client, closed when the context exits,
+        # and the caches, indexing and background services, stopped before the client is closed
+        async with elasticsearch_lifespan(application), services_lifespan(application):
+            # Initialize database schema and tables
+            logger.info("Initializing database...")
+            await init_db()
+
+            # Initialize application data within a separate session
+            async with AsyncSessionLocal() as db:
+                logger.info("Initializing application data...")
+                await init_data(db, application.state.search_repository)
+                await db.commit()
+
+                if settings.SEARCH_ENGINE == "memory":
+                    # The in-memory search engine starts empty, load every article into it
+                    logger.info("Loading articles into the in-memory search engine...")
+                    await SearchIndexService(db, application.state.search_repository).reindex(
+                        chunk_size=settings.SEARCH_REINDEX_CHUNK_SIZE,
+                        concurrency=1,
+                    )
+
+            logger.info("Application startup completed successfully")
+            yield
+
+            # Cleanup
+            logger.info("Shutting down application...")
 
     except Exception as e:
         logger.error(f"Application startup failed: {str(e)}")
         # Re-raise the exception to ensure FastAPI knows startup failed
         raise
     finally:
+        get_password_hasher().shutdown()
         logger.info("Cleanup completed")
 
 
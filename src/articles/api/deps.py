@@ -1,11 +1,34 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi.params import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.articles.auth.deps import get_current_user
+from src.articles.auth.deps import get_current_principal, get_current_user
+from src.articles.auth.principal import Principal
+from src.articles.core.dependencies import (
+    get_search_repository,
+    get_indexer,
+    get_search_cache,
+    get_article_importer,
+    get_article_exporter,
+    get_entity_cache,
+)
 from src.articles.db.session import get_db
 from src.articles.models import User
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.services.article_export import ArticleExportService
+from src.articles.services.article_import import ArticleImportService
+from src.articles.services.entity_cache import EntityCache as EntityCacheService
+from src.articles.services.search_cache import SearchResultCache
+from src.articles.services.search_outbox import ArticleIndexer
 
 DbSession = Annotated[AsyncSession, Depends(get_db)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
+# the id and username of the user, cached, for handlers that do not need the User row
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+SearchRepository = Annotated[ArticleSearchRepository, Depends(get_search_repository)]
+Indexer = Annotated[ArticleIndexer, Depends(get_indexer)]
+SearchCache = Annotated[Optional[SearchResultCache], Depends(get_search_cache)]
+EntityCache = Annotated[Optional[EntityCacheService], Depends(get_entity_cache)]
+ArticleImporter = Annotated[ArticleImportService, Depends(get_article_importer)]
+ArticleExporter = Annotated[ArticleExportService, Depends(get_article_exporter)]
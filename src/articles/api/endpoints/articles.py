@@ -1,15 +1,32 @@
-import pandas as pd
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
-from typing import Any
+from fastapi import APIRouter, File, Query, UploadFile
+from starlette.responses import FileResponse, StreamingResponse
 
-from fastapi import APIRouter, Query
-from starlette.responses import StreamingResponse
-
-from src.articles.api.deps import DbSession, CurrentUser
-from src.articles.core.dependencies import get_elasticsearch_client
-from src.articles.repositories.search_repository import ArticleSearchRepository
-from src.articles.schemas.article import ArticleSchema, ArticleCreate, ArticleUpdate, ArticleSearchFilters
-from src.articles.schemas.base import PaginationSchema
+from src.articles.api.deps import (
+    DbSession,
+    CurrentPrincipal,
+    SearchRepository,
+    Indexer,
+    SearchCache,
+    EntityCache,
+    ArticleImporter,
+    ArticleExporter,
+)
+from src.articles.db import AsyncSessionLocal
+from src.articles.schemas.article import (
+    ArticleSchema,
+    ArticleCreate,
+    ArticleUpdate,
+    ArticleSearchFilters,
+    ArticleBulkCreate,
+    ArticleBulkResult,
+    ExportFormat,
+)
+from src.articles.schemas.article_export import ArticleExportSchema
+from src.articles.schemas.article_import import ArticleImportSchema
+from src.articles.schemas.base import CountMode, PaginationSchema
 from src.articles.services.article import ArticleService
 from src.articles.utils.decorators import endpoint_decorator
 
@@ -23,9 +40,17 @@ article_router = APIRouter()
     status_code=201,
     description="Create a new article"
 )
-async def create_article(*, db: DbSession, article: ArticleCreate, current_user: CurrentUser) -> Any:
-    search_repository = ArticleSearchRepository(get_elasticsearch_client())
-    article_service = ArticleService(db, search_repository)
+async def create_article(
+        *,
+        db: DbSession,
+        search_repository: SearchRepository,
+        indexer: Indexer,
+        search_cache: SearchCache,
+        article: ArticleCreate,
+        current_user: CurrentPrincipal,
+        refresh: bool = Query(False, description="Wait until the change is visible to searches"),
+) -> Any:
+    article_service = ArticleService(db, search_repository, indexer, search_cache)
     article_in = ArticleCreate(
         title=article.title,
         abstract=article.abstract,
@@ -34,32 +59,118 @@ async def create_article(*, db: DbSession, article: ArticleCreate, current_user:
         tag_ids=article.tag_ids,
         owner_id=current_user.id,
     )
-    article = await article_service.create(obj=article_in)
+    article = await article_service.create(obj=article_in, refresh=refresh)
     return article
 
 
+@article_router.post("/bulk", response_model=ArticleBulkResult)
+@endpoint_decorator(
+    summary="Create many articles",
+    response_model=ArticleBulkResult,
+    description="Create many articles with a single request. Every item is reported as created or failed, "
+                "items referencing missing authors or tags fail without failing the others."
+)
+async def bulk_create_articles(
+        *,
+        db: DbSession,
+        search_repository: SearchRepository,
+        indexer: Indexer,
+        search_cache: SearchCache,
+        articles: ArticleBulkCreate,
+        current_user: CurrentPrincipal,
+        refresh: bool = Query(False, description="Wait until the articles are visible to searches"),
+) -> Any:
+    article_service = ArticleService(db, search_repository, indexer, search_cache)
+    articles_in = [article.model_copy(update={"owner_id": current_user.id}) for article in articles.items]
+    return await article_service.bulk_create(objs=articles_in, refresh=refresh)
+
+
+@article_router.post("/import", response_model=ArticleImportSchema, status_code=202)
+@endpoint_decorator(
+    summary="Import articles from a CSV file",
+    response_model=ArticleImportSchema,
+    status_code=202,
+    description="Upload a CSV file in the layout of the CSV export. The articles are imported in the background, "
+                "the returned import reports the progress at /articles/import/{import_id}."
+)
+async def import_articles(
+        *,
+        importer: ArticleImporter,
+        current_user: CurrentPrincipal,
+        file: UploadFile = File(..., description="CSV file in the layout of the CSV export"),
+) -> Any:
+    article_import = await importer.create_import(
+        owner_id=current_user.id,
+        filename=file.filename or "articles.csv",
+        source=file.file,
+    )
+    importer.start(article_import.id)
+    return article_import
+
+
+@article_router.get("/import/{import_id}", response_model=ArticleImportSchema)
+@endpoint_decorator(summary="Get the progress of an article import", response_model=ArticleImportSchema)
+async def get_article_import(*, importer: ArticleImporter, current_user: CurrentPrincipal, import_id: int) -> Any:
+    return await importer.get_import(import_id=import_id, user_id=current_user.id)
+
+
+@article_router.post("/import/{import_id}/resume", response_model=ArticleImportSchema, status_code=202)
+@endpoint_decorator(
+    summary="Resume an article import",
+    response_model=ArticleImportSchema,
+    status_code=202,
+    description="Continue a failed or interrupted import right after the last imported chunk"
+)
+async def resume_article_import(*, importer: ArticleImporter, current_user: CurrentPrincipal, import_id: int) -> Any:
+    return await importer.resume(import_id=import_id, user_id=current_user.id)
+
+
 @article_router.get("/get/{article_id}", response_model=ArticleSchema)
 @endpoint_decorator(summary="Get an article by ID", response_model=ArticleSchema)
-async def get_article(*, db: DbSession, article_id: int) -> Any:
-    search_repository = ArticleSearchRepository(get_elasticsearch_client())
-    article_service = ArticleService(db, search_repository)
+async def get_article(
+        *,
+        db: DbSession,
+        search_repository: SearchRepository,
+        entity_cache: EntityCache,
+        article_id: int
+) -> Any:
+    article_service = ArticleService(db, search_repository, entity_cache=entity_cache)
     return await article_service.get_by_id(article_id)
 
 
 @article_router.put("/{article_id}", response_model=ArticleSchema)
 @endpoint_decorator(summary="Update an article", response_model=ArticleSchema)
-async def update_article(*, db: DbSession, article_id: int, article: ArticleUpdate, current_user: CurrentUser) -> Any:
-    search_repository = ArticleSearchRepository(get_elasticsearch_client())
-    article_service = ArticleService(db, search_repository)
-    return await article_service.update(obj_id=article_id, obj=article, user_id=current_user.id)
+async def update_article(
+        *,
+        db: DbSession,
+        search_repository: SearchRepository,
+        indexer: Indexer,
+        search_cache: SearchCache,
+        entity_cache: EntityCache,
+        article_id: int,
+        article: ArticleUpdate,
+        current_user: CurrentPrincipal,
+        refresh: bool = Query(False, description="Wait until the change is visible to searches"),
+) -> Any:
+    article_service = ArticleService(db, search_repository, indexer, search_cache, entity_cache)
+    return await article_service.update(obj_id=article_id, obj=article, user_id=current_user.id, refresh=refresh)
 
 
 @article_router.delete("/{article_id}", response_model=ArticleSchema)
 @endpoint_decorator(summary="Delete an article", response_model=ArticleSchema)
-async def delete_article(*, db: DbSession, article_id: int, current_user: CurrentUser) -> Any:
-    search_repository = ArticleSearchRepository(get_elasticsearch_client())
-    article_service = ArticleService(db, search_repository)
-    return await article_service.delete(obj_id=article_id, user_id=current_user.id)
+async def delete_article(
+        *,
+        db: DbSession,
+        search_repository: SearchRepository,
+        indexer: Indexer,
+        search_cache: SearchCache,
+        entity_cache: EntityCache,
+        article_id: int,
+        current_user: CurrentPrincipal,
+        refresh: bool = Query(False, description="Wait until the change is visible to searches"),
+) -> Any:
+    article_service = ArticleService(db, search_repository, indexer, search_cache, entity_cache)
+    return await article_service.delete(obj_id=article_id, user_id=current_user.id, refresh=refresh)
 
 
 @article_router.post("/search", response_model=PaginationSchema[ArticleSchema])
@@ -71,38 +182,105 @@ async def delete_article(*, db: DbSession, article_id: int, current_user: Curren
 async def search_articles(
         *,
         db: DbSession,
+        search_repository: SearchRepository,
+        search_cache: SearchCache,
         search_params: ArticleSearchFilters,
         page: int = Query(1, ge=1, description="Page number"),
         page_size: int = Query(10, ge=1, le=100, description="Page size"),
+        cursor: Optional[str] = Query(
+            None,
+            description="Cursor pagination: '*' for the first page, then the next_cursor of the previous page. "
+                        "The page parameter is ignored in this mode and deep pages cost as much as the first."
+        ),
+        count: CountMode = Query(
+            CountMode.EXACT,
+            description="How the results are counted: exact, estimate or none to only report has_next"
+        ),
 ) -> Any:
-    search_repository = ArticleSearchRepository(get_elasticsearch_client())
-    article_service = ArticleService(db, search_repository)
+    article_service = ArticleService(db, search_repository, search_cache=search_cache)
     return await article_service.search(
         search_params=search_params,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        count_mode=count,
     )
 
-@article_router.post("/export-csv")
+@article_router.post("/export")
+@article_router.post("/export-csv", include_in_schema=False)
 @endpoint_decorator(
-    summary="Export search results as CSV",
-    description="Export all articles matching the search criteria as a CSV file"
+    summary="Export search results",
+    description="Export all articles matching the search criteria as CSV, NDJSON, Parquet or Arrow IPC"
 )
-async def export_articles_csv(
+async def export_articles(
         *,
-        db: DbSession,
+        search_repository: SearchRepository,
         search_params: ArticleSearchFilters,
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="Format of the export"),
 ) -> StreamingResponse:
-    search_repository = ArticleSearchRepository(get_elasticsearch_client())
-    article_service = ArticleService(db, search_repository)
+    encoder = ArticleService.get_export_encoder(export_format)
 
-    csv_file = await article_service.export_search_to_csv(search_params=search_params)
+    async def export() -> AsyncIterator[bytes]:
+        # the body is streamed after the endpoint returned, so the export reads with its own session
+        # that lives as long as the response instead of the session of the request
+        async with AsyncSessionLocal() as db:
+            article_service = ArticleService(db, search_repository)
+            async for chunk in article_service.export_search(search_params=search_params, encoder=encoder):
+                yield chunk
 
+    filename = f"articles_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{encoder.extension}"
     return StreamingResponse(
-        iter([csv_file.getvalue()]),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename=articles_export_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        }
+        export(),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@article_router.post("/exports", response_model=ArticleExportSchema, status_code=202)
+@endpoint_decorator(
+    summary="Start an export job",
+    response_model=ArticleExportSchema,
+    status_code=202,
+    responses={429: {"description": "Too Many Queued Exports"}},
+    description="Export the articles matching the search criteria in the background. The returned job reports "
+                "its status at /articles/exports/{export_id}, the file is downloaded from "
+                "/articles/exports/{export_id}/download once it completed, by the user who started it. Identical "
+                "requests of a user share one job."
+)
+async def create_article_export(
+        *,
+        exporter: ArticleExporter,
+        current_user: CurrentPrincipal,
+        search_params: ArticleSearchFilters,
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="Format of the export"),
+        compress: bool = Query(False, alias="gzip", description="Gzip the exported file"),
+) -> Any:
+    return await exporter.submit(
+        owner_id=current_user.id,
+        search_params=search_params,
+        export_format=export_format,
+        compressed=compress
     )
 
+
+@article_router.get("/exports/{export_id}", response_model=ArticleExportSchema)
+@endpoint_decorator(summary="Get the status of an export job", response_model=ArticleExportSchema)
+async def get_article_export(*, exporter: ArticleExporter, current_user: CurrentPrincipal, export_id: str) -> Any:
+    return await exporter.get_job(job_id=export_id, user_id=current_user.id)
+
+
+@article_router.get("/exports/{export_id}/download")
+@endpoint_decorator(
+    summary="Download the file of an export job",
+    responses={409: {"description": "Export Not Ready"}},
+    description="Supports range requests. The file is sent from the disk, without copies through the application "
+                "when the server supports the ASGI path send extension."
+)
+async def download_article_export(
+        *,
+        exporter: ArticleExporter,
+        current_user: CurrentPrincipal,
+        export_id: str
+) -> FileResponse:
+    job = await exporter.get_artifact(job_id=export_id, user_id=current_user.id)
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
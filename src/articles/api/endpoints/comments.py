@@ -1,10 +1,10 @@
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, Query
 
-from src.articles.api.deps import DbSession, CurrentUser
-from src.articles.schemas.base import PaginationSchema
-from src.articles.schemas.comment import Comment, CommentCreate, CommentUpdate
+from src.articles.api.deps import DbSession, CurrentPrincipal, EntityCache
+from src.articles.schemas.base import CountMode, PaginationSchema
+from src.articles.schemas.comment import Comment, CommentCreate, CommentUpdate, CommentSortOrder
 from src.articles.services.comment import CommentService
 from src.articles.utils.decorators import endpoint_decorator
 
@@ -18,7 +18,7 @@ comments_router = APIRouter()
     response_model=Comment,
     description="Create a new comment on an article",
 )
-async def create_comment(*, db: DbSession, comment_in: CommentCreate, current_user: CurrentUser) -> Any:
+async def create_comment(*, db: DbSession, comment_in: CommentCreate, current_user: CurrentPrincipal) -> Any:
     comment_service = CommentService(db)
     comment_in = CommentCreate(
         content=comment_in.content,
@@ -31,22 +31,35 @@ async def create_comment(*, db: DbSession, comment_in: CommentCreate, current_us
 
 @comments_router.get("/{comment_id}", response_model=Comment)
 @endpoint_decorator(summary="Get a comment on an article", response_model=Comment)
-async def get_comment(*, db: DbSession, comment_id: int) -> Any:
-    comment_service = CommentService(db)
+async def get_comment(*, db: DbSession, entity_cache: EntityCache, comment_id: int) -> Any:
+    comment_service = CommentService(db, entity_cache)
     return await comment_service.get_by_id(comment_id)
 
 
 @comments_router.put("/{comment_id}", response_model=Comment)
 @endpoint_decorator(summary="Update a comment on an article", response_model=Comment)
-async def update_comment(*, db: DbSession, comment_id: int, comment_in: CommentUpdate, current_user: CurrentUser) -> Any:
-    comment_service = CommentService(db)
+async def update_comment(
+        *,
+        db: DbSession,
+        entity_cache: EntityCache,
+        comment_id: int,
+        comment_in: CommentUpdate,
+        current_user: CurrentPrincipal
+) -> Any:
+    comment_service = CommentService(db, entity_cache)
     return await comment_service.update(obj_id=comment_id, obj=comment_in, user_id=current_user.id)
 
 
 @comments_router.delete("/{comment_id}", response_model=Comment)
 @endpoint_decorator(summary="Delete a comment on an article", response_model=Comment)
-async def delete_comment(*, db: DbSession, comment_id: int, current_user: CurrentUser) -> Any:
-    comment_service = CommentService(db)
+async def delete_comment(
+        *,
+        db: DbSession,
+        entity_cache: EntityCache,
+        comment_id: int,
+        current_user: CurrentPrincipal
+) -> Any:
+    comment_service = CommentService(db, entity_cache)
     return await comment_service.delete(obj_id=comment_id, user_id=current_user.id)
 
 
@@ -57,12 +70,25 @@ async def get_article_comments(
     db: DbSession,
     article_id: int,
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=100, description="Number of items per page")
+    page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    sort: CommentSortOrder = Query(CommentSortOrder.NEWEST, description="Order of the comments"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor pagination: '*' for the first page, then the next_cursor of the previous page. "
+                    "The page parameter is ignored in this mode and deep pages cost as much as the first."
+    ),
+    count: CountMode = Query(
+        CountMode.EXACT,
+        description="How the comments are counted: exact, estimate from the planner or none to only report has_next"
+    ),
 ) -> Any:
     comment_service = CommentService(db)
     return await comment_service.get_paginated_by_article(
         article_id=article_id,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        sort=sort,
+        cursor=cursor,
+        count_mode=count,
     )
 
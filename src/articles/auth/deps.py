@@ -1,12 +1,11 @@
 from typing import Optional
 
 from fastapi import Header, HTTPException, Depends
-from jose import JWTError
 from sqlalchemy.orm import Session
 
-from src.articles.auth.jwt_utils import verify_token
+from src.articles.auth.principal import Principal, get_principal_cache, get_token_cache
 from src.articles.core.error_messages import ErrorMessages
-from src.articles.db import get_db
+from src.articles.db import AsyncSessionLocal, get_db
 from src.articles.models import User
 from src.articles.services.user import UserService
 
@@ -25,16 +24,19 @@ async def get_token_from_header(authorization: Optional[str] = Header(None)) ->
         raise HTTPException(status_code=401, detail=ErrorMessages.NOT_AUTHORIZED.value)
 
 
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(get_token_from_header)) -> User:
-    """This function returns the user of the JWT token"""
+async def get_token_user_id(token: str = Depends(get_token_from_header)) -> int:
+    """
+    This function returns the user id of a verified JWT token, the signature is checked once per token.
+    It is async so that the token cache, which is not thread safe, is only used from the event loop.
+    """
     try:
-        payload = verify_token(token)
-        user_id: int = payload.sub
-        if user_id is None:
-            raise HTTPException(status_code=401, detail=ErrorMessages.NOT_AUTHORIZED.value)
-    except (JWTError, ValueError) as e:
+        return get_token_cache().verify(token)
+    except ValueError:
         raise HTTPException(status_code=401, detail=ErrorMessages.NOT_AUTHORIZED.value)
 
+
+async def get_current_user(db: Session = Depends(get_db), user_id: int = Depends(get_token_user_id)) -> User:
+    """This function returns the user of the JWT token"""
     user_service = UserService(db)
     user = await user_service.get_by_id(user_id)
     if user is None:
@@ -43,3 +45,18 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(g
     return user
 
 
+async def get_current_principal(user_id: int = Depends(get_token_user_id)) -> Principal:
+    """
+    This function returns the principal of the JWT token, from the principal cache when it is there,
+    so most requests neither load the user nor use a database connection. A session of its own is
+    opened only to load the user on a miss, the request session is not needed for it.
+    """
+    principal_cache = get_principal_cache()
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            user = await get_current_user(db, user_id)
+        principal = Principal(id=user.id, username=user.username)
+        principal_cache.set(principal)
+
+    return principal
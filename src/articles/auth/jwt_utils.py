@@ -37,7 +37,7 @@ def verify_token(token: str) -> TokenPayload:
             token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM], issuer=settings.JWT_ISSUER
         )
 
-        token_data = TokenPayload(sub=int(payload["sub"]))
+        token_data = TokenPayload(sub=int(payload["sub"]), exp=payload.get("exp"))
         return token_data
     except (JWTError, ValidationError) as e:
         raise ValueError(f"Invalid token: {str(e)}")
@@ -1,14 +1,245 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
+from src.articles.core.config.factory import get_settings
+from src.articles.core.error_messages import ErrorMessages
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using bcrypt, blocking, use PasswordHasher from async code"""
     return password_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hashed password"""
+    """Verify a password against a hashed password, blocking, use PasswordHasher from async code"""
     return password_context.verify(plain_password, hashed_password)
 
+
+def _timed(function: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Run a function in the pool and measure it there, the queueing time is what is left of the round trip"""
+    started = time.perf_counter()
+    return function(*args), time.perf_counter() - started
+
+
+@dataclass
+class PasswordHashStats:
+    hashes: int = 0
+    verifications: int = 0
+    # calls turned away because the pool and its queue were full
+    rejected: int = 0
+    hash_seconds_total: float = 0.0
+    wait_seconds_total: float = 0.0
+    max_hash_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def calls(self) -> int:
+        return self.hashes + self.verifications
+
+    @property
+    def average_hash_seconds(self) -> float:
+        return self.hash_seconds_total / self.calls if self.calls else 0.0
+
+    @property
+    def average_wait_seconds(self) -> float:
+        return self.wait_seconds_total / self.calls if self.calls else 0.0
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a pool of threads or processes so that a hash never blocks the event loop. bcrypt releases
+    the GIL, so threads hash in parallel with the loop. At most `workers` hashes run at once and `max_queued`
+    more may wait for a worker, further calls fail right away with a 429 instead of queueing without bound.
+    """
+
+    def __init__(self, *, workers: int = 4, max_queued: int = 64, executor: str = "thread"):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.executor_type = executor
+        self.stats = PasswordHashStats()
+        # admission of the running and the waiting calls, acquired without blocking
+        self._slots = threading.BoundedSemaphore(workers + max_queued)
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """The pool, started on first use"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the pool, it is started again by the next call, and log the stats of the calls"""
+        if self.stats.calls or self.stats.rejected:
+            logger.info(
+                f"Password hashing ran {self.stats.hashes} hashes and {self.stats.verifications} verifications, "
+                f"rejected {self.stats.rejected}, average hash {self.stats.average_hash_seconds:.3f}s "
+                f"(max {self.stats.max_hash_seconds:.3f}s), average wait {self.stats.average_wait_seconds:.3f}s "
+                f"(max {self.stats.max_wait_seconds:.3f}s)"
+            )
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        """
+        hash a password
+        :param password: the plain password
+        :return: the bcrypt hash
+        """
+        return await self._run("hashes", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        verify a password against its hash
+        :param plain_password: the plain password
+        :param hashed_password: the bcrypt hash
+        :return: whether the password matches
+        """
+        return await self._run("verifications", verify_password, plain_password, hashed_password)
+
+    async def _run(self, counter: str, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a call in the pool once it was admitted, it is counted under the counter only then"""
+        if not self._slots.acquire(blocking=False):
+            self.stats.rejected += 1
+            logger.warning("Password hashing pool is full, rejecting the request")
+            raise HTTPException(
+                status_code=429,
+                detail=ErrorMessages.PASSWORD_HASHING_BUSY.value,
+                headers={"Retry-After": "1"},
+            )
+        setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+        started = time.perf_counter()
+        try:
+            job = self.executor.submit(_timed, function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the job itself is done, not the request awaiting it, a request cancelled
+        # by a disconnect leaves its job running in the pool and counted against the bound
+        job.add_done_callback(lambda _: self._slots.release())
+        result, hash_seconds = await asyncio.wrap_future(job)
+
+        wait_seconds = max(time.perf_counter() - started - hash_seconds, 0.0)
+        self.stats.hash_seconds_total += hash_seconds
+        self.stats.wait_seconds_total += wait_seconds
+        self.stats.max_hash_seconds = max(self.stats.max_hash_seconds, hash_seconds)
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, wait_seconds)
+        return result
+
+
+class LoginThrottle:
+    """
+    Limits the login attempts per username. A username gets `max_attempts` attempts, after that it is
+    locked until no attempt was made for `window` seconds, so guessing one password can not keep the
+    hashing pool busy. At most `max_usernames` usernames are tracked, when they are all tracked the least
+    recently tried username that is not locked makes room, so attempts on other usernames unlock a username
+    only once every tracked username is locked, and then the least recently tried lock goes first. A username
+    that was not tried is never refused.
+    Not thread safe, it is meant to be used from the event loop only.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_attempts: int = 10,
+            window: float = 60.0,
+            max_usernames: int = 10000,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_usernames = max_usernames
+        self.throttled = 0
+        self._clock = clock
+        # the attempts and the time of the last attempt of the usernames that are not locked, and the time of
+        # the last attempt of the locked ones, both ordered by the last attempt
+        self._attempts: OrderedDict[str, Tuple[int, float]] = OrderedDict()
+        self._locked: OrderedDict[str, float] = OrderedDict()
+
+    def attempt(self, username: str) -> None:
+        """
+        count a login attempt of a username
+        :param username: the username
+        :raises HTTPException: 429 when the username ran out of attempts
+        """
+        now = self._clock()
+        self._expire(now)
+        if username in self._locked:
+            # every attempt on a locked username extends its lock
+            self._locked[username] = now
+            self._locked.move_to_end(username)
+            self._throttle()
+
+        attempts, _ = self._attempts.pop(username, (0, now))
+        if not attempts and len(self._attempts) + len(self._locked) >= self.max_usernames:
+            if self._attempts:
+                self._attempts.popitem(last=False)
+            else:
+                logger.warning("Every tracked username is locked, dropping the least recently tried lock")
+                self._locked.popitem(last=False)
+
+        attempts += 1
+        if attempts >= self.max_attempts:
+            self._locked[username] = now
+        else:
+            self._attempts[username] = (attempts, now)
+
+    def succeeded(self, username: str) -> None:
+        """A successful login gives the username its attempts back"""
+        self._attempts.pop(username, None)
+        self._locked.pop(username, None)
+
+    def _expire(self, now: float) -> None:
+        """Forget the usernames without an attempt for the window, the oldest attempts come first"""
+        while self._attempts and now - next(iter(self._attempts.values()))[1] >= self.window:
+            self._attempts.popitem(last=False)
+        while self._locked and now - next(iter(self._locked.values())) >= self.window:
+            self._locked.popitem(last=False)
+
+    def _throttle(self) -> None:
+        self.throttled += 1
+        raise HTTPException(
+            status_code=429,
+            detail=ErrorMessages.LOGIN_THROTTLED.value,
+            headers={"Retry-After": str(int(self.window))},
+        )
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    """The password hasher shared by the whole process"""
+    return PasswordHasher(
+        workers=settings.PASSWORD_HASH_WORKERS,
+        max_queued=settings.PASSWORD_HASH_MAX_QUEUED,
+        executor=settings.PASSWORD_HASH_EXECUTOR,
+    )
+
+
+@lru_cache()
+def get_login_throttle() -> LoginThrottle:
+    """The login throttle shared by the whole process"""
+    return LoginThrottle(
+        max_attempts=settings.LOGIN_MAX_ATTEMPTS,
+        window=settings.LOGIN_ATTEMPT_WINDOW,
+        max_usernames=settings.LOGIN_THROTTLE_MAX_USERNAMES,
+    )
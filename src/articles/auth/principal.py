@@ -0,0 +1,104 @@
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.articles.auth.jwt_utils import verify_token
+from src.articles.core.config.factory import get_settings
+from src.articles.utils.cache import CacheStats, TTLCache
+
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user of a request, without the ORM object and its session"""
+    id: int
+    username: str
+
+
+class TokenCache:
+    """
+    Caches the user id of verified tokens by the hash of the token, so the signature is checked once
+    per token. An entry expires with its token, a token is never accepted past its exp claim.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self._user_ids: TTLCache[bytes, int] = TTLCache(max_size=max_size, ttl=0)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._user_ids.stats
+
+    def verify(self, token: str) -> int:
+        """
+        the user id of a token, verified on the first use of the token
+        :param token: the JWT access token
+        :return: the id of the user of the token
+        :raises ValueError: when the token is invalid or expired
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        user_id = self._user_ids.get(key)
+        if user_id is not None:
+            return user_id
+
+        payload = verify_token(token)
+        if payload.exp is not None:
+            remaining = payload.exp - time.time()
+            if remaining > 0:
+                self._user_ids.set(key, payload.sub, ttl=remaining)
+        return payload.sub
+
+
+class PrincipalCache:
+    """
+    Caches the principal of a user by id for a short time. Changing or deleting a user invalidates it
+    right away, the time to live bounds how long a change made by another process goes unnoticed.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self._principals: TTLCache[int, Principal] = TTLCache(max_size=max_size, ttl=ttl)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._principals.stats
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        return self._principals.get(user_id)
+
+    def set(self, principal: Principal) -> None:
+        self._principals.set(principal.id, principal)
+
+    def invalidate(self, user_id: int, db: Optional[AsyncSession] = None) -> None:
+        """
+        Forget the principal of a user. With a session it is forgotten again when its transaction commits,
+        so a request that read the user before the commit can not cache the old row.
+        """
+        self._principals.delete(user_id)
+        sync_session = getattr(db, "sync_session", None)
+        if isinstance(sync_session, Session):
+            event.listen(
+                sync_session, "after_commit", lambda session: self._principals.delete(user_id), once=True
+            )
+
+    def clear(self) -> None:
+        """Forget every principal"""
+        self._principals.clear()
+
+
+@lru_cache()
+def get_token_cache() -> TokenCache:
+    """The verified token cache shared by the whole process"""
+    return TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
+
+
+@lru_cache()
+def get_principal_cache() -> PrincipalCache:
+    """The principal cache shared by the whole process"""
+    return PrincipalCache(max_size=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -8,6 +10,7 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: int
+    exp: Optional[int] = None
 
 
 class LoginCredentials(BaseModel):
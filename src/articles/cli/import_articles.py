@@ -0,0 +1,85 @@
+"""
+Import articles from a CSV file in the layout of the CSV export.
+
+Usage: python -m src.articles.cli.import_articles FILE --owner-id ID [--chunk-size 1000]
+       python -m src.articles.cli.import_articles --resume IMPORT_ID
+
+The file is imported in place, chunk by chunk, and the progress is recorded like for uploads, so it can be
+followed at /articles/import/{import_id}. An interrupted or failed import continues with --resume.
+"""
+import argparse
+import asyncio
+import os
+from typing import Optional
+
+from src.articles.core.dependencies import (
+    create_elasticsearch_client,
+    create_search_repository,
+    get_and_cache_settings,
+)
+from src.articles.db import AsyncSessionLocal
+from src.articles.services.article_import import ArticleImportService
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+
+async def import_articles(
+        *,
+        path: Optional[str],
+        owner_id: Optional[int],
+        resume: Optional[int],
+        chunk_size: int
+) -> None:
+    es_client = create_elasticsearch_client()
+    try:
+        importer = ArticleImportService(
+            AsyncSessionLocal,
+            create_search_repository(es_client),
+            chunk_size=chunk_size,
+            stale_after=get_and_cache_settings().ARTICLE_IMPORT_STALE_AFTER,
+        )
+        import_id = resume
+        if import_id is None:
+            article_import = await importer.register_file(
+                owner_id=owner_id,
+                filename=os.path.basename(path),
+                path=os.path.abspath(path),
+            )
+            import_id = article_import.id
+            logger.info(f"Created import {import_id} of {path}")
+        await importer.run(import_id)
+    finally:
+        await es_client.close()
+
+
+def main() -> None:
+    settings = get_and_cache_settings()
+
+    parser = argparse.ArgumentParser(description="Import articles from a CSV file in the layout of the CSV export")
+    parser.add_argument("file", nargs="?", help="the CSV file to import")
+    parser.add_argument("--owner-id", type=int, help="the user that owns the imported articles")
+    parser.add_argument("--resume", type=int, metavar="IMPORT_ID", help="continue an import from its checkpoint")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.ARTICLE_IMPORT_CHUNK_SIZE,
+        help="rows per transaction and per bulk request",
+    )
+    args = parser.parse_args()
+    if args.resume is None and (args.file is None or args.owner_id is None):
+        parser.error("a file and --owner-id are required unless --resume is given")
+
+    try:
+        asyncio.run(import_articles(
+            path=args.file,
+            owner_id=args.owner_id,
+            resume=args.resume,
+            chunk_size=args.chunk_size,
+        ))
+    except KeyboardInterrupt:
+        logger.info("Import stopped, continue it with --resume")
+
+
+if __name__ == "__main__":
+    main()
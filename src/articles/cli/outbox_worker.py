@@ -0,0 +1,61 @@
+"""
+Send the search outbox to elasticsearch in a separate process.
+
+Usage: python -m src.articles.cli.outbox_worker [--batch-size 500] [--poll-interval 1.0]
+
+Set SEARCH_SYNC_MODE=outbox so the application writes to the outbox, and SEARCH_OUTBOX_IN_APP_WORKER=false
+to leave the draining to these processes. Any number of them can run next to each other.
+"""
+import argparse
+import asyncio
+
+from src.articles.core.dependencies import create_elasticsearch_client, get_and_cache_settings
+from src.articles.db import AsyncSessionLocal
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.services.search_outbox import SearchOutboxWorker
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+
+async def run_worker(*, batch_size: int, poll_interval: float) -> None:
+    es_client = create_elasticsearch_client()
+    try:
+        worker = SearchOutboxWorker(
+            AsyncSessionLocal,
+            ArticleSearchRepository(es_client),
+            batch_size=batch_size,
+            poll_interval=poll_interval,
+        )
+        logger.info("Search outbox worker started")
+        await worker.run()
+    finally:
+        await es_client.close()
+
+
+def main() -> None:
+    settings = get_and_cache_settings()
+
+    parser = argparse.ArgumentParser(description="Send the search outbox to elasticsearch")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.SEARCH_OUTBOX_BATCH_SIZE,
+        help="outbox entries claimed per transaction and per bulk request",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=settings.SEARCH_OUTBOX_POLL_INTERVAL,
+        help="seconds to wait when the outbox is empty",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_worker(batch_size=args.batch_size, poll_interval=args.poll_interval))
+    except KeyboardInterrupt:
+        logger.info("Search outbox worker stopped")
+
+
+if __name__ == "__main__":
+    main()
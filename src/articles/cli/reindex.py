@@ -0,0 +1,74 @@
+"""
+Rebuild the articles search index from the database.
+
+Usage: python -m src.articles.cli.reindex [--rebuild | --rollback] [--chunk-size 1000] [--concurrency 4]
+
+Without flags the articles are loaded into the live index, --rebuild fills a new versioned index
+and swaps the search aliases to it, --rollback points the aliases back to the previous version.
+"""
+import argparse
+import asyncio
+from typing import Optional
+
+from src.articles.core.dependencies import create_elasticsearch_client, get_and_cache_settings
+from src.articles.db import AsyncSessionLocal
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.services.search_index import SearchIndexService
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+
+async def reindex(*, mode: Optional[str], chunk_size: int, concurrency: int) -> None:
+    es_client = create_elasticsearch_client()
+    try:
+        async with AsyncSessionLocal() as db:
+            search_index_service = SearchIndexService(db, ArticleSearchRepository(es_client))
+            if mode == "rollback":
+                await search_index_service.rollback()
+            elif mode == "rebuild":
+                await search_index_service.rebuild(chunk_size=chunk_size, concurrency=concurrency)
+            else:
+                await search_index_service.reindex(chunk_size=chunk_size, concurrency=concurrency)
+    finally:
+        await es_client.close()
+
+
+def main() -> None:
+    settings = get_and_cache_settings()
+
+    parser = argparse.ArgumentParser(description="Rebuild the articles search index from the database")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--rebuild",
+        dest="mode",
+        action="store_const",
+        const="rebuild",
+        help="build a new versioned index and swap the search aliases to it without downtime",
+    )
+    mode.add_argument(
+        "--rollback",
+        dest="mode",
+        action="store_const",
+        const="rollback",
+        help="point the search aliases back to the previous versioned index",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.SEARCH_REINDEX_CHUNK_SIZE,
+        help="articles per database fetch and per bulk request",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.SEARCH_REINDEX_CONCURRENCY,
+        help="maximum number of bulk requests in flight",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(reindex(mode=args.mode, chunk_size=args.chunk_size, concurrency=args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -27,11 +27,106 @@ class BaseConfig(BaseSettings):
     JWT_ALGORITHM: str = 'HS256'
     JWT_EXPIRATION_MINUTES: int = 60
 
+    # Authentication Caches, verified tokens are kept until they expire, principals for the ttl in seconds
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: float = 30.0
+
+    # Password Hashing, bcrypt runs in a 'thread' or 'process' pool, calls beyond the queue are answered with a 429
+    PASSWORD_HASH_EXECUTOR: str = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUED: int = 64
+
+    # Login Throttling, attempts per username until it is locked for the window in seconds, at the maximum of
+    # tracked usernames the unlocked ones make room first, the least recently tried lock when all are locked
+    LOGIN_MAX_ATTEMPTS: int = 10
+    LOGIN_ATTEMPT_WINDOW: float = 60.0
+    LOGIN_THROTTLE_MAX_USERNAMES: int = 10000
+
     # Elasticsearch
     ELASTICSEARCH_HOST: str = 'http://localhost:9200'
     ELASTICSEARCH_USER: str | None = None
     ELASTICSEARCH_PASSWORD: str | None = None
     ELASTICSEARCH_VERIFY_CERTS: bool = False
 
+    # Search Engine, 'elasticsearch' or 'memory' for the in-process engine used without elasticsearch
+    SEARCH_ENGINE: str = 'elasticsearch'
+
+    # Elasticsearch Connection Pool
+    ELASTICSEARCH_CONNECTIONS_PER_NODE: int = 10
+    ELASTICSEARCH_HTTP_COMPRESS: bool = True
+    ELASTICSEARCH_REQUEST_TIMEOUT: float = 10.0
+    ELASTICSEARCH_MAX_RETRIES: int = 3
+
+    # Search Pagination, offset pages of abstract searches must end within the index.max_result_window of
+    # elasticsearch, deeper pages are read with the cursor
+    SEARCH_PIT_KEEP_ALIVE: str = '1m'
+    SEARCH_MAX_RESULT_WINDOW: int = 10000
+
+    # Pagination, the largest total reported by the 'estimate' count mode
+    PAGINATION_ESTIMATE_CAP: int = 10000
+
+    # Bulk Ingestion, the most articles accepted by a single POST /articles/bulk
+    ARTICLE_BULK_MAX_ITEMS: int = 1000
+
+    # CSV Import, the uploads are kept in the directory until their import completed
+    ARTICLE_IMPORT_DIRECTORY: str = 'imports'
+    ARTICLE_IMPORT_CHUNK_SIZE: int = 1000
+    # a running import whose checkpoint did not move for this many seconds is taken over by the next resume
+    ARTICLE_IMPORT_STALE_AFTER: float = 600.0
+
+    # Article Export, rows per database round trip, the Parquet and Arrow exports write one row group per round trip
+    ARTICLE_EXPORT_CHUNK_SIZE: int = 1000
+    ARTICLE_EXPORT_ROW_GROUP_SIZE: int = 10000
+
+    # Export Jobs, recorded in the database and run by a pool of workers in every process into the export
+    # directory, which all the processes must share, and kept for the retention in seconds
+    ARTICLE_EXPORT_DIRECTORY: str = 'exports'
+    ARTICLE_EXPORT_WORKERS: int = 2
+    ARTICLE_EXPORT_MAX_QUEUED: int = 100
+    ARTICLE_EXPORT_RETENTION: float = 3600.0
+    ARTICLE_EXPORT_POLL_INTERVAL: float = 1.0
+    # a running export whose progress did not move for this many seconds is taken over by another worker
+    ARTICLE_EXPORT_STALE_AFTER: float = 300.0
+
+    # Search Result Cache
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_MAX_SIZE: int = 1000
+    SEARCH_CACHE_TTL: float = 30.0
+
+    # Entity Cache, articles and comments by id, in process bounded by the bytes of the cached
+    # schemas, and in a shared store reached by all the workers: 'none' or 'memory' for the in process stand-in
+    ENTITY_CACHE_ENABLED: bool = True
+    ENTITY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    ENTITY_CACHE_TTL: float = 60.0
+    ENTITY_CACHE_SHARED: str = 'none'
+    ENTITY_CACHE_SHARED_TTL: float = 300.0
+
+    # Cache Invalidation, writes are sent to the other workers with NOTIFY on this channel, each worker
+    # LISTENs on one connection and flushes its caches when it reconnects or misses notifications
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = 'cache_invalidation'
+    CACHE_INVALIDATION_RECONNECT_INTERVAL: float = 1.0
+    CACHE_INVALIDATION_MAX_RECONNECT_INTERVAL: float = 30.0
+    CACHE_INVALIDATION_GAP_TIMEOUT: float = 5.0
+    CACHE_INVALIDATION_KEEPALIVE_INTERVAL: float = 10.0
+
+    # Search Indexing Queue
+    SEARCH_INDEX_BATCH_SIZE: int = 500
+    SEARCH_INDEX_FLUSH_INTERVAL: float = 1.0
+    SEARCH_INDEX_MAX_RETRIES: int = 5
+    SEARCH_INDEX_RETRY_BACKOFF: float = 0.5
+    SEARCH_INDEX_QUEUE_SIZE: int = 10000
+
+    # Search Outbox, 'queue' indexes article writes in process, 'outbox' through the search_outbox table
+    SEARCH_SYNC_MODE: str = 'queue'
+    SEARCH_OUTBOX_BATCH_SIZE: int = 500
+    SEARCH_OUTBOX_POLL_INTERVAL: float = 1.0
+    SEARCH_OUTBOX_IN_APP_WORKER: bool = True
+
+    # Search Reindexing
+    SEARCH_REINDEX_CHUNK_SIZE: int = 1000
+    SEARCH_REINDEX_CONCURRENCY: int = 4
+
     class Config:
         env_file = '.env'
\ No newline at end of file
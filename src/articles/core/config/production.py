@@ -10,5 +10,6 @@ class ProductionConfig(BaseConfig):
     DB_MAX_OVERFLOW: int = 200
     DB_ECHO: bool = False
     ELASTICSEARCH_VERIFY_CERTS: bool = True
+    ELASTICSEARCH_CONNECTIONS_PER_NODE: int = 50
 
 
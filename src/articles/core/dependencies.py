@@ -1,12 +1,33 @@
 import os
+from contextlib import asynccontextmanager
 from functools import lru_cache
+from typing import AsyncIterator, Callable, Optional
 
 from elasticsearch import AsyncElasticsearch
-from fastapi import Depends
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # from src.articles.core.config import Settings, settings
+from src.articles.auth.principal import get_principal_cache
 from src.articles.core.config.base import BaseConfig
 from src.articles.core.config.factory import get_settings
+from src.articles.db.session import AsyncSessionLocal, get_db
+from src.articles.repositories.memory_search_repository import InMemoryArticleSearchRepository
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.services.article_export import ArticleExportService
+from src.articles.services.article_import import ArticleImportService
+from src.articles.services.cache_invalidation import (
+    CacheInvalidationListener,
+    get_invalidation_publisher,
+    listen_dsn,
+)
+from src.articles.services.entity_cache import EntityCache, InMemorySharedEntityCache
+from src.articles.services.index_queue import ArticleIndexQueue
+from src.articles.services.search_cache import SearchResultCache
+from src.articles.services.search_outbox import ArticleIndexer, SearchOutboxIndexer, SearchOutboxWorker
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
 
 
 @lru_cache()
@@ -15,19 +36,278 @@ def get_and_cache_settings() -> BaseConfig:
     # return Settings()
 
 
-def get_elasticsearch_client(settings_: BaseConfig | None = None) -> AsyncElasticsearch:
+def create_elasticsearch_client(settings_: BaseConfig | None = None) -> AsyncElasticsearch:
+    """
+    build a pooled elasticsearch client, this should happen once per application and not per request
+    :param settings_: the settings to use, defaults to the cached settings of the current environment
+    :return: the elasticsearch client
+    """
     configured_settings = settings_ or get_and_cache_settings()
 
+    # the aiohttp node of elastic-transport keeps the connections of its pool alive between requests
     return AsyncElasticsearch(
         hosts=[configured_settings.ELASTICSEARCH_HOST],
         verify_certs=configured_settings.ELASTICSEARCH_VERIFY_CERTS,
         basic_auth=(
             configured_settings.ELASTICSEARCH_USER,
             configured_settings.ELASTICSEARCH_PASSWORD
-        ) if configured_settings.ELASTICSEARCH_USER else None
+        ) if configured_settings.ELASTICSEARCH_USER else None,
+        node_class="aiohttp",
+        connections_per_node=configured_settings.ELASTICSEARCH_CONNECTIONS_PER_NODE,
+        http_compress=configured_settings.ELASTICSEARCH_HTTP_COMPRESS,
+        request_timeout=configured_settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+        max_retries=configured_settings.ELASTICSEARCH_MAX_RETRIES,
+        retry_on_timeout=True,
+    )
+
+
+def create_search_repository(
+        es_client: AsyncElasticsearch,
+        settings_: BaseConfig | None = None
+) -> ArticleSearchRepository:
+    """build the search repository of the configured search engine"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    if configured_settings.SEARCH_ENGINE == "memory":
+        return InMemoryArticleSearchRepository()
+    return ArticleSearchRepository(es_client)
+
+
+def create_search_cache(settings_: BaseConfig | None = None) -> Optional[SearchResultCache]:
+    """build the search result cache of the application, None when it is disabled"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    if not configured_settings.SEARCH_CACHE_ENABLED:
+        return None
+    return SearchResultCache(
+        max_size=configured_settings.SEARCH_CACHE_MAX_SIZE,
+        ttl=configured_settings.SEARCH_CACHE_TTL,
+    )
+
+
+def create_entity_cache(settings_: BaseConfig | None = None) -> Optional[EntityCache]:
+    """build the entity cache of the application and its configured shared tier, None when it is disabled"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    if not configured_settings.ENTITY_CACHE_ENABLED:
+        return None
+    shared = InMemorySharedEntityCache() if configured_settings.ENTITY_CACHE_SHARED == "memory" else None
+    return EntityCache(
+        max_bytes=configured_settings.ENTITY_CACHE_MAX_BYTES,
+        ttl=configured_settings.ENTITY_CACHE_TTL,
+        shared=shared,
+        shared_ttl=configured_settings.ENTITY_CACHE_SHARED_TTL,
+    )
+
+
+def create_cache_invalidation_listener(
+        entity_cache: Optional[EntityCache],
+        search_cache: Optional[SearchResultCache],
+        settings_: BaseConfig | None = None
+) -> Optional[CacheInvalidationListener]:
+    """build the listener that evicts the writes of the other workers from the caches, None when it is disabled"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    if not configured_settings.CACHE_INVALIDATION_ENABLED:
+        return None
+    return CacheInvalidationListener(
+        listen_dsn(configured_settings.POSTGRES_URI),
+        get_invalidation_publisher(),
+        entity_cache=entity_cache,
+        search_cache=search_cache,
+        principal_cache=get_principal_cache(),
+        session_factory=AsyncSessionLocal,
+        reconnect_interval=configured_settings.CACHE_INVALIDATION_RECONNECT_INTERVAL,
+        max_reconnect_interval=configured_settings.CACHE_INVALIDATION_MAX_RECONNECT_INTERVAL,
+        gap_timeout=configured_settings.CACHE_INVALIDATION_GAP_TIMEOUT,
+        keepalive_interval=configured_settings.CACHE_INVALIDATION_KEEPALIVE_INTERVAL,
+    )
+
+
+def create_index_queue(
+        search_repository: ArticleSearchRepository,
+        settings_: BaseConfig | None = None,
+        on_written: Optional[Callable[[], None]] = None
+) -> ArticleIndexQueue:
+    """build the write-behind indexing queue of the application"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    return ArticleIndexQueue(
+        search_repository,
+        batch_size=configured_settings.SEARCH_INDEX_BATCH_SIZE,
+        flush_interval=configured_settings.SEARCH_INDEX_FLUSH_INTERVAL,
+        max_retries=configured_settings.SEARCH_INDEX_MAX_RETRIES,
+        retry_backoff=configured_settings.SEARCH_INDEX_RETRY_BACKOFF,
+        max_queue_size=configured_settings.SEARCH_INDEX_QUEUE_SIZE,
+        on_written=on_written,
+    )
+
+
+def create_outbox_worker(
+        search_repository: ArticleSearchRepository,
+        settings_: BaseConfig | None = None,
+        on_written: Optional[Callable[[], None]] = None
+) -> SearchOutboxWorker:
+    """build a worker that sends the search outbox to the search index"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    return SearchOutboxWorker(
+        AsyncSessionLocal,
+        search_repository,
+        batch_size=configured_settings.SEARCH_OUTBOX_BATCH_SIZE,
+        poll_interval=configured_settings.SEARCH_OUTBOX_POLL_INTERVAL,
+        on_written=on_written,
     )
 
 
-def get_elasticsearch_client_dependency(settings_: BaseConfig = Depends(get_settings)) -> AsyncElasticsearch:
-    return get_elasticsearch_client(settings_)
+def create_article_importer(
+        search_repository: ArticleSearchRepository,
+        index_queue: Optional[ArticleIndexQueue] = None,
+        settings_: BaseConfig | None = None,
+        on_written: Optional[Callable[[], None]] = None
+) -> ArticleImportService:
+    """build the service that runs the CSV imports of articles"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    return ArticleImportService(
+        AsyncSessionLocal,
+        search_repository,
+        index_queue=index_queue,
+        chunk_size=configured_settings.ARTICLE_IMPORT_CHUNK_SIZE,
+        stale_after=configured_settings.ARTICLE_IMPORT_STALE_AFTER,
+        on_written=on_written,
+    )
+
+
+def create_article_exporter(
+        search_repository: ArticleSearchRepository,
+        settings_: BaseConfig | None = None
+) -> ArticleExportService:
+    """build the service that runs the export jobs of articles"""
+    configured_settings = settings_ or get_and_cache_settings()
+
+    return ArticleExportService(
+        AsyncSessionLocal,
+        search_repository,
+        directory=configured_settings.ARTICLE_EXPORT_DIRECTORY,
+        workers=configured_settings.ARTICLE_EXPORT_WORKERS,
+        max_queued=configured_settings.ARTICLE_EXPORT_MAX_QUEUED,
+        retention=configured_settings.ARTICLE_EXPORT_RETENTION,
+        poll_interval=configured_settings.ARTICLE_EXPORT_POLL_INTERVAL,
+        stale_after=configured_settings.ARTICLE_EXPORT_STALE_AFTER,
+    )
+
+
+@asynccontextmanager
+async def elasticsearch_lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """
+    Owns the application wide elasticsearch client and the search repository, stored on app.state,
+    the client is closed when the context exits
+    """
+    es_client = create_elasticsearch_client()
+    application.state.es_client = es_client
+    application.state.search_repository = create_search_repository(es_client)
+    try:
+        yield
+    finally:
+        logger.info("Closing Elasticsearch client...")
+        await es_client.close()
+
+
+@asynccontextmanager
+async def services_lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """
+    Owns the search result cache, entity cache, cache invalidation listener, indexing queue, outbox worker,
+    article importer and article exporter, stored on app.state. Entered within elasticsearch_lifespan, whose
+    search repository they use. At shutdown the running imports are stopped at their checkpoint, the export
+    jobs are cancelled and the queued writes are sent, before the elasticsearch client is closed.
+    """
+    settings = get_and_cache_settings()
+    search_repository = application.state.search_repository
+    search_cache = create_search_cache()
+    application.state.search_cache = search_cache
+    entity_cache = create_entity_cache()
+    application.state.entity_cache = entity_cache
+    cache_invalidation = create_cache_invalidation_listener(entity_cache, search_cache)
+    application.state.cache_invalidation = cache_invalidation
+
+    # cached search pages are outdated as soon as the index changed, in this worker and in the others
+    def on_written() -> None:
+        if search_cache:
+            search_cache.invalidate()
+        if cache_invalidation:
+            cache_invalidation.search_changed()
+
+    index_queue = create_index_queue(search_repository, on_written=on_written)
+    application.state.index_queue = index_queue
+    outbox_worker = None
+    if settings.SEARCH_SYNC_MODE == "outbox" and settings.SEARCH_OUTBOX_IN_APP_WORKER:
+        outbox_worker = create_outbox_worker(search_repository, on_written=on_written)
+    application.state.outbox_worker = outbox_worker
+    article_importer = create_article_importer(search_repository, index_queue, on_written=on_written)
+    application.state.article_importer = article_importer
+    article_exporter = create_article_exporter(search_repository)
+    application.state.article_exporter = article_exporter
+    try:
+        if cache_invalidation:
+            await cache_invalidation.start()
+        await index_queue.start()
+        if outbox_worker:
+            await outbox_worker.start()
+        await article_exporter.start()
+        yield
+    finally:
+        logger.info("Stopping the running article imports...")
+        await article_importer.stop()
+        logger.info("Stopping the article export workers...")
+        await article_exporter.stop()
+        if outbox_worker:
+            logger.info("Stopping the search outbox worker...")
+            await outbox_worker.stop()
+        logger.info("Flushing the search indexing queue...")
+        await index_queue.stop()
+        if cache_invalidation:
+            logger.info("Stopping the cache invalidation listener...")
+            await cache_invalidation.stop()
+
+
+def get_elasticsearch_client(request: Request) -> AsyncElasticsearch:
+    """Return the elasticsearch client owned by the application lifespan"""
+    return request.app.state.es_client
+
+
+def get_index_queue(request: Request) -> ArticleIndexQueue:
+    """Return the indexing queue owned by the application lifespan"""
+    return request.app.state.index_queue
+
+
+def get_search_cache(request: Request) -> Optional[SearchResultCache]:
+    """Return the search result cache owned by the application lifespan, None when it is disabled"""
+    return request.app.state.search_cache
+
+
+def get_entity_cache(request: Request) -> Optional[EntityCache]:
+    """Return the entity cache owned by the application lifespan, None when it is disabled"""
+    return request.app.state.entity_cache
+
+
+def get_article_importer(request: Request) -> ArticleImportService:
+    """Return the article importer owned by the application lifespan"""
+    return request.app.state.article_importer
+
+
+def get_article_exporter(request: Request) -> ArticleExportService:
+    """Return the article exporter owned by the application lifespan"""
+    return request.app.state.article_exporter
+
+
+def get_indexer(request: Request, db: AsyncSession = Depends(get_db)) -> ArticleIndexer:
+    """Return how article writes reach the search index, the outbox shares the session of the request"""
+    if get_and_cache_settings().SEARCH_SYNC_MODE == "outbox":
+        return SearchOutboxIndexer(db)
+    return get_index_queue(request)
+
 
+def get_search_repository(request: Request) -> ArticleSearchRepository:
+    """Return the search repository owned by the application lifespan"""
+    return request.app.state.search_repository
@@ -7,3 +7,14 @@ class ErrorMessages(Enum):
     USERNAME_ALREADY_EXISTS = "Username Already Exists"
     INVALID_ACCESS_TOKEN = "Invalid Access Token"
     NOT_AUTHORIZED = "Not Authorized"
+    INVALID_CURSOR = "Invalid Cursor"
+    CURSOR_EXPIRED = "Cursor Expired"
+    PAGE_TOO_DEEP = "Page Too Deep, Use Cursor Pagination"
+    ARTICLE_NOT_INDEXED = "Article Created But Not Indexed"
+    IMPORT_ALREADY_COMPLETED = "Import Already Completed"
+    IMPORT_ALREADY_RUNNING = "Import Already Running"
+    EXPORT_FORMAT_UNAVAILABLE = "Export Format Unavailable, pyarrow Is Not Installed"
+    EXPORT_QUEUE_FULL = "Too Many Queued Exports"
+    EXPORT_NOT_READY = "Export Not Ready"
+    PASSWORD_HASHING_BUSY = "Too Many Logins In Progress"
+    LOGIN_THROTTLED = "Too Many Login Attempts"
@@ -0,0 +1,22 @@
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def copy_records(db: AsyncSession, table: Table, columns: Sequence[str], records: Iterable[Sequence[Any]]) -> None:
+    """
+    Load rows with COPY ... FROM STDIN on the connection of the session, so inside its transaction.
+    Needs the psycopg driver, nothing is returned so generated values have to be known beforehand.
+    :param db: the session
+    :param table: the target table
+    :param columns: the columns of the records, in their order
+    :param records: the values of every row
+    """
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(f'COPY "{table.name}" ({column_list}) FROM STDIN') as copy:
+            for record in records:
+                await copy.write_row(record)
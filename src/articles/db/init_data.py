@@ -4,7 +4,6 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.articles.auth.password_utils import get_password_hash
-from src.articles.core.dependencies import get_elasticsearch_client
 from src.articles.models import Author, Tag, User, Article
 from src.articles.repositories import ArticleSearchRepository
 from src.articles.utils.logging import setup_logging
@@ -142,8 +141,7 @@ async def init_articles(
 
     await db.commit()
 
-    for article in created_articles:
-        await search_repository.index_article(article)
+    await search_repository.bulk_index(created_articles)
 
     logger.info("Sample articles initialized")
 
@@ -175,12 +173,10 @@ async def init_users(db: AsyncSession) -> list[User]:
     return created_users
 
 
-async def init_data(db: AsyncSession) -> None:
+async def init_data(db: AsyncSession, search_repository: ArticleSearchRepository) -> None:
     """Initialize default data"""
     try:
-        # Initialize search repository
-        search_repository = ArticleSearchRepository(get_elasticsearch_client())
-
+        # Initialize search index
         await search_repository.create_index()
 
         # Initialize in order and keep references
@@ -1,9 +1,12 @@
 from .user import User
 from .article import Article
+from .article_export import ArticleExport
+from .article_import import ArticleImport
 from .author import Author
 from .comment import Comment
+from .search_outbox import SearchOutbox
 from .tag import Tag
 
 
-__all__ = ["User", "Article", "Author", "Comment", "Tag"]
+__all__ = ["User", "Article", "ArticleExport", "ArticleImport", "Author", "Comment", "SearchOutbox", "Tag"]
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import String, Text, DateTime, Table, Column, ForeignKey, Integer
+from sqlalchemy import String, Text, DateTime, Table, Column, ForeignKey, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.articles.db.base import Base
@@ -10,26 +10,37 @@ from src.articles.models.base import BaseModel
 article_authors = Table(
     'article_authors',
     Base.metadata,
-    Column("article_id", Integer, ForeignKey("articles.id", ondelete="CASCADE")),
-    Column("author_id", Integer, ForeignKey("authors.id", ondelete="CASCADE")),
+    Column("article_id", Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True),
+    Column("author_id", Integer, ForeignKey("authors.id", ondelete="CASCADE"), primary_key=True),
+    # the primary key starts with article_id, this one serves the joins and cascades from the authors
+    Index("ix_article_authors_author_id_article_id", "author_id", "article_id"),
 )
 
 article_tags = Table(
     'article_tags',
     Base.metadata,
-    Column("article_id", Integer, ForeignKey("articles.id", ondelete="CASCADE")),
-    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE")),
+    Column("article_id", Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_article_tags_tag_id_article_id", "tag_id", "article_id"),
 )
 
 
 class Article(BaseModel):
     __tablename__ = 'articles'
+    __table_args__ = (
+        # backs the case insensitive substring filter on the title
+        Index('ix_articles_title_lower_trgm', text('lower(title) gin_trgm_ops'), postgresql_using='gin'),
+        # backs the publication year range and the publication date sort with its id tiebreaker
+        Index('ix_articles_publication_date_id', 'publication_date', 'id'),
+        # backs the case insensitive title sort and its keyset pagination
+        Index('ix_articles_title_lower_id', text('lower(title) COLLATE "C"'), 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     abstract: Mapped[str] = mapped_column(Text, nullable=False)
     publication_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
 
     owner: Mapped["User"] = relationship(back_populates="articles")
     authors: Mapped[List["Author"]] = relationship(
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.articles.models.base import BaseModel
+
+
+class ArticleExport(BaseModel):
+    """
+    An export job of articles, run by a worker of any process into the shared export directory. The request key
+    is unique among the active jobs of a user, so identical requests share one job whichever worker they reach.
+    """
+    __tablename__ = 'article_exports'
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    # the predicate of the unique index of the active requests, repeated verbatim by the inserts that rely on it
+    ACTIVE_CONDITION = "status IN ('pending', 'running')"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    search_params: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    format: Mapped[str] = mapped_column(String(20), nullable=False)
+    compressed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    media_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=STATUS_PENDING)
+    # the run that owns a running job, a job taken over from a crashed process gets a new one
+    run_id: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    bytes_written: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            'uq_article_exports_active_key',
+            'owner_id',
+            'key',
+            unique=True,
+            postgresql_where=text(ACTIVE_CONDITION),
+        ),
+        Index('ix_article_exports_status_created_at', 'status', 'created_at'),
+    )
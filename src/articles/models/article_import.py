@@ -0,0 +1,29 @@
+from typing import Optional
+
+from sqlalchemy import BigInteger, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.articles.models.base import BaseModel
+
+
+class ArticleImport(BaseModel):
+    """A CSV import of articles, bytes_read is the checkpoint the import resumes from"""
+    __tablename__ = 'article_imports'
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    # stopped with the process that ran it, resumed like a failed import
+    STATUS_INTERRUPTED = "interrupted"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=STATUS_PENDING)
+    bytes_total: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    bytes_read: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rows_imported: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rows_failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
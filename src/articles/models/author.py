@@ -1,6 +1,6 @@
 from typing import List
 
-from sqlalchemy import String
+from sqlalchemy import String, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.articles.models.base import BaseModel
@@ -8,6 +8,10 @@ from src.articles.models.base import BaseModel
 
 class Author(BaseModel):
     __tablename__ = 'authors'
+    __table_args__ = (
+        # backs the case insensitive substring filter on the author name
+        Index('ix_authors_name_lower_trgm', text('lower(name) gin_trgm_ops'), postgresql_using='gin'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
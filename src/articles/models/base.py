@@ -8,6 +8,9 @@ from src.articles.db.base import Base
 
 class BaseModel(Base):
     __abstract__ = True
+    # the server generated timestamps come back with RETURNING in the INSERT or UPDATE itself,
+    # so a flushed object needs no refresh() round trip
+    __mapper_args__ = {"eager_defaults": True}
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
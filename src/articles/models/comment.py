@@ -1,4 +1,4 @@
-from sqlalchemy import Text, ForeignKey
+from sqlalchemy import Text, ForeignKey, Index, desc
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.articles.models.base import BaseModel
@@ -6,11 +6,15 @@ from src.articles.models.base import BaseModel
 
 class Comment(BaseModel):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # the comment pages of an article are ordered by id descending
+        Index('ix_comments_article_id_id', 'article_id', desc('id')),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     article_id: Mapped[int] = mapped_column(ForeignKey('articles.id', ondelete='CASCADE'))
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), index=True)
 
     article: Mapped["Article"] = relationship(back_populates="comments")
     user: Mapped["User"] = relationship(back_populates="comments")
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.articles.db.base import Base
+
+
+class SearchOutbox(Base):
+    """Pending search index changes, written in the same transaction as the article change"""
+    __tablename__ = 'search_outbox'
+
+    OPERATION_INDEX = "index"
+    OPERATION_DELETE = "delete"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    article_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    operation: Mapped[str] = mapped_column(String(10), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text('CURRENT_TIMESTAMP'),
+        nullable=False,
+    )
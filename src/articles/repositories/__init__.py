@@ -1,6 +1,9 @@
 from .article import ArticleRepository
+from .article_export import ArticleExportRepository
 from .author import AuthorRepository
 from .comment import CommentRepository
+from .memory_search_repository import InMemoryArticleSearchRepository
+from .search_outbox import SearchOutboxRepository
 from .search_repository import ArticleSearchRepository
 from .tag import TagRepository
 from .user import UserRepository
@@ -8,9 +11,12 @@ from .user import UserRepository
 
 __all__ = [
     "ArticleRepository",
+    "ArticleExportRepository",
     "AuthorRepository",
     "CommentRepository",
     "ArticleSearchRepository",
+    "InMemoryArticleSearchRepository",
+    "SearchOutboxRepository",
     "TagRepository",
     "UserRepository"
 ]
@@ -1,13 +1,39 @@
-from typing import List, Optional, Union, Dict, Any, Tuple
+from datetime import datetime, timezone
+from typing import List, Optional, Union, Dict, Any, Tuple, AsyncIterator, Sequence, Set, Mapping, Type
 
-from sqlalchemy import select, func, extract
+from sqlalchemy import (
+    select,
+    any_,
+    insert,
+    update,
+    delete,
+    func,
+    literal,
+    literal_column,
+    tuple_,
+    Column,
+    Integer,
+    Select,
+    String,
+    Table,
+    ColumnElement,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.articles.models import Author
-from src.articles.models.article import Article
+from src.articles.db.copy import copy_records
+from src.articles.models import Author, Tag
+from src.articles.models.article import Article, article_authors, article_tags
 from src.articles.repositories.base import BaseRepository
-from src.articles.schemas.article import ArticleCreate, ArticleUpdate, ArticleSearchFilters
+from src.articles.schemas.article import (
+    ArticleCreate,
+    ArticleUpdate,
+    ArticleSchema,
+    ArticleSearchFilters,
+    ArticleSortOrder,
+)
+from src.articles.schemas.base import CountMode
 from src.articles.utils.decorators import log_database_operations
 
 
@@ -29,144 +55,531 @@ class ArticleRepository(BaseRepository[Article, ArticleCreate, ArticleUpdate]):
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    @log_database_operations
+    async def get_by_ids(self, obj_ids: Sequence[int]) -> List[Article]:
+        """
+        get the articles with the given ids, in the order of the ids
+        :param obj_ids: the article ids to get
+        :return: the found articles ordered like the given ids
+        """
+        if not obj_ids:
+            return []
+
+        query = select(self.model).options(
+            selectinload(self.model.authors),
+            selectinload(self.model.tags),
+        ).where(self.model.id.in_(obj_ids))
+        result = await self.db.execute(query)
+        articles_by_id = {article.id: article for article in result.scalars().all()}
+        return [articles_by_id[obj_id] for obj_id in obj_ids if obj_id in articles_by_id]
+
     @log_database_operations
     async def create_with_relationships(
             self,
             *,
             obj_in_data: dict,
-            authors: List["Author"],
-            tags: List["Tag"]
-    ) -> Article:
+            authors: Sequence["Author"],
+            tags: Sequence["Tag"]
+    ) -> ArticleSchema:
         """
-        create an article with relationships with authors and tags
+        create an article with relationships with authors and tags, the article is inserted with RETURNING
+        and the links with one multi-row insert per association, nothing is selected again
         :param obj_in_data: the article data to be created
         :param authors: the authors associated with the article
         :param tags: the tags associated with the article
         :return: the created article
         """
-        db_obj = self.model(**obj_in_data)
+        result = await self.db.execute(
+            insert(self.model).values(**obj_in_data).returning(*self._read_columns().selected_columns)
+        )
+        row = result.mappings().one()
 
-        db_obj.authors = authors
-        db_obj.tags = tags
+        await self._insert_links(article_authors, "author_id", row["id"], [author.id for author in authors])
+        await self._insert_links(article_tags, "tag_id", row["id"], [tag.id for tag in tags])
 
-        self.db.add(db_obj)
-        await self.db.flush()
+        return ArticleSchema.model_validate({**row, "authors": authors, "tags": tags})
 
-        query = select(self.model).options(
-            selectinload(self.model.authors),
-            selectinload(self.model.tags),
-        ).where(self.model.id == db_obj.id)
+    @log_database_operations
+    async def bulk_create_with_relationships(
+            self,
+            items: Sequence[Tuple[dict, Sequence["Author"], Sequence["Tag"]]]
+    ) -> List[ArticleSchema]:
+        """
+        create many articles with their authors and tags, the articles are inserted with one executemany
+        INSERT ... RETURNING and the links with one executemany insert per association
+        :param items: the article data with the authors and the tags of each article
+        :return: the created articles in the order of the items
+        """
+        if not items:
+            return []
 
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        result = await self.db.execute(
+            insert(self.model).returning(
+                *self._read_columns().selected_columns, sort_by_parameter_order=True
+            ),
+            [obj_in_data for obj_in_data, _, _ in items],
+        )
+        rows = result.mappings().all()
+
+        author_links = [
+            {"article_id": row["id"], "author_id": author.id}
+            for row, (_, authors, _) in zip(rows, items) for author in authors
+        ]
+        tag_links = [
+            {"article_id": row["id"], "tag_id": tag.id}
+            for row, (_, _, tags) in zip(rows, items) for tag in tags
+        ]
+        if author_links:
+            await self.db.execute(insert(article_authors), author_links)
+        if tag_links:
+            await self.db.execute(insert(article_tags), tag_links)
+
+        return [
+            ArticleSchema.model_validate({**row, "authors": authors, "tags": tags})
+            for row, (_, authors, tags) in zip(rows, items)
+        ]
+
+    @log_database_operations
+    async def copy_with_relationships(self, items: Sequence[Tuple[dict, Sequence[int], Sequence[int]]]) -> List[int]:
+        """
+        load many articles and their links with COPY, the fastest way in but without RETURNING,
+        so the ids are taken from the sequence of the articles table beforehand
+        :param items: the article data with the author ids and the tag ids of each article
+        :return: the ids of the created articles in the order of the items
+        """
+        if not items:
+            return []
+
+        result = await self.db.execute(
+            select(func.nextval(func.pg_get_serial_sequence(self.model.__tablename__, "id")))
+            .select_from(func.generate_series(1, len(items)))
+        )
+        article_ids = list(result.scalars().all())
+
+        await copy_records(
+            self.db,
+            self.model.__table__,
+            ["id", "title", "abstract", "publication_date", "owner_id"],
+            (
+                (article_id, data["title"], data["abstract"], data["publication_date"], data["owner_id"])
+                for article_id, (data, _, _) in zip(article_ids, items)
+            ),
+        )
+        await copy_records(
+            self.db,
+            article_authors,
+            ["article_id", "author_id"],
+            ((article_id, author_id) for article_id, (_, author_ids, _) in zip(article_ids, items)
+             for author_id in author_ids),
+        )
+        await copy_records(
+            self.db,
+            article_tags,
+            ["article_id", "tag_id"],
+            ((article_id, tag_id) for article_id, (_, _, tag_ids) in zip(article_ids, items) for tag_id in tag_ids),
+        )
+        return article_ids
 
     @log_database_operations
-    async def update(self, *, db_obj: Article, obj_in: Union[ArticleUpdate, Dict[str, Any]]) -> Article:
+    async def update_with_relationships(
+            self,
+            *,
+            article: ArticleSchema,
+            obj_in_data: Dict[str, Any],
+            authors: Optional[Sequence["Author"]] = None,
+            tags: Optional[Sequence["Tag"]] = None
+    ) -> ArticleSchema:
         """
-        update an article from the database
-        :param db_obj: the article as it currently is in the database
-        :param obj_in: the updated article data
+        update an article with UPDATE ... RETURNING and replace the links of the given relationships
+        :param article: the article as it currently is in the database
+        :param obj_in_data: the updated article columns
+        :param authors: the new authors of the article, None keeps the current ones
+        :param tags: the new tags of the article, None keeps the current ones
         :return: the updated article
         """
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.model_dump(exclude_unset=True)
+        updated = dict(article)
+        if obj_in_data:
+            result = await self.db.execute(
+                update(self.model)
+                .where(self.model.id == article.id)
+                .values(**obj_in_data)
+                .returning(*self._read_columns().selected_columns)
+            )
+            updated.update(result.mappings().one())
 
-        for field in update_data:
-            if field not in ["authors", "tags"] and hasattr(db_obj, field):
-                setattr(db_obj, field, update_data[field])
+        if authors is not None:
+            await self._replace_links(article_authors, "author_id", article.id, [author.id for author in authors])
+            updated["authors"] = authors
+        if tags is not None:
+            await self._replace_links(article_tags, "tag_id", article.id, [tag.id for tag in tags])
+            updated["tags"] = tags
 
-        self.db.add(db_obj)
-        await self.db.flush()
+        return ArticleSchema.model_validate(updated)
 
-        query = select(self.model).options(
-            selectinload(self.model.authors),
-            selectinload(self.model.tags),
-        ).where(self.model.id == db_obj.id)
+    async def _insert_links(self, link_table: Table, link_column: str, article_id: int, ids: Sequence[int]) -> None:
+        """link an article to authors or tags with a single multi-row insert"""
+        if ids:
+            await self.db.execute(
+                insert(link_table).values([{"article_id": article_id, link_column: link_id} for link_id in ids])
+            )
 
-        result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+    async def _replace_links(self, link_table: Table, link_column: str, article_id: int, ids: Sequence[int]) -> None:
+        """replace the authors or tags linked to an article"""
+        await self.db.execute(delete(link_table).where(link_table.c.article_id == article_id))
+        await self._insert_links(link_table, link_column, article_id, ids)
 
     @log_database_operations
     async def search_with_filters(
             self,
             *,
             search_params: ArticleSearchFilters,
-            elastic_ids: Optional[List[int]] = None,
             page: int = 1,
-            page_size: int = 10
-    ) -> Tuple[List[Article], int]:
+            page_size: int = 10,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[ArticleSchema], Optional[int], bool]:
         """
-        search the article with the given filters
+        search the article with the given filters, the abstract text search is not handled by the database
         :param search_params: the filters to search for
-        :param elastic_ids: the ids found in the text search in elasticsearch
         :param page: the page number of the result
         :param page_size: the size of the page of the result
-        :return: a tuple of a list of found articles and the page number
+        :param count_mode: how the matching articles are counted
+        :return: a tuple of the found articles, the total or None and whether a next page exists
         """
-        query = select(self.model).options(
-            selectinload(self.model.authors),
-            selectinload(self.model.tags),
+        query = self._apply_filters(self._read_columns(), search_params)
+        query = self._apply_sort(query, search_params.sort)
+
+        items, total, has_next = await self._fetch_page(
+            query,
+            page=page,
+            page_size=page_size,
+            count_mode=count_mode,
+            read_model=lambda page_query: self._read_model_query(page_query, search_params.sort),
         )
+        return self._to_schemas(items), total, has_next
 
-        if elastic_ids is not None:
-            query = query.filter(self.model.id.in_(elastic_ids))
+    @log_database_operations
+    async def search_after(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page_size: int = 10,
+            after: Optional[Tuple[Any, ...]] = None,
+            count_mode: CountMode = CountMode.NONE
+    ) -> Tuple[List[ArticleSchema], Optional[int], bool]:
+        """
+        keyset paginated search, the page starts right after the sort key of the last article of the previous
+        page instead of skipping rows with an offset, so a deep page costs as much as the first one
+        :param search_params: the filters and the sort order to search for
+        :param page_size: the size of the page
+        :param after: the sort key of the last article of the previous page, see parse_keyset, None for the first page
+        :param count_mode: how the articles after the sort key are counted, usually only on the first page
+        :return: a tuple of the articles of the page, the total or None and whether a next page exists
+        """
+        query = self._apply_filters(self._read_columns(), search_params)
+        if after is not None:
+            query = query.filter(self._keyset_predicate(search_params.sort, after))
+        query = self._apply_sort(query, search_params.sort)
 
-        if search_params.title:
-            query = query.filter(func.lower(self.model.title).contains(search_params.title.lower()))
+        items, total, has_next = await self._fetch_page(
+            query,
+            page=1,
+            page_size=page_size,
+            count_mode=count_mode,
+            read_model=lambda page_query: self._read_model_query(page_query, search_params.sort),
+        )
+        return self._to_schemas(items), total, has_next
 
-        if search_params.publication_year:
-            query = query.filter(extract('year', self.model.publication_date) == search_params.publication_year)
+    @staticmethod
+    def keyset_values(article: Union[Article, ArticleSchema], sort: ArticleSortOrder) -> List[Any]:
+        """
+        the json serializable sort key of an article, stored in the cursor of the next page
+        :param article: the last article of a page
+        :param sort: the sort order of the page
+        :return: the values of the sort columns, the id last
+        """
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            return [article.publication_date.isoformat(), article.id]
+        if sort == ArticleSortOrder.TITLE:
+            return [article.title.lower(), article.id]
+        return [article.id]
 
-        if search_params.author:
-            query = query.join(self.model.authors).filter(
-                func.lower(Author.name).contains(search_params.author.lower())
-            )
+    @staticmethod
+    def parse_keyset(sort: ArticleSortOrder, values: Sequence[Any]) -> Tuple[Any, ...]:
+        """
+        the sort key of the values returned by keyset_values, ValueError or TypeError if they do not fit the sort
+        :param sort: the sort order of the page
+        :param values: the values stored in the cursor
+        :return: the typed sort key
+        """
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            publication_date, article_id = values
+            return datetime.fromisoformat(publication_date), int(article_id)
+        if sort == ArticleSortOrder.TITLE:
+            title, article_id = values
+            if not isinstance(title, str):
+                raise TypeError("title must be a string")
+            return title, int(article_id)
+        (article_id,) = values
+        return (int(article_id),)
+
+    def _keyset_predicate(self, sort: ArticleSortOrder, after: Tuple[Any, ...]) -> ColumnElement[bool]:
+        """
+        the rows after the sort key in the order of _apply_sort, as a row value comparison that the
+        index of the sort columns can start its scan from
+        """
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            return tuple_(self.model.publication_date, self.model.id) < tuple_(*after)
+        if sort == ArticleSortOrder.TITLE:
+            return tuple_(self._title_sort_key(self.model.title), self.model.id) > tuple_(*after)
+        if sort == ArticleSortOrder.NEWEST:
+            return self.model.id < after[0]
+        return self.model.id > after[0]
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
+    async def stream_export_rows(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            elastic_ids: Optional[Sequence[int]] = None,
+            chunk_size: int = 1000
+    ) -> AsyncIterator[List[Tuple]]:
+        """
+        stream the matching articles as export rows through a server side cursor. The rows are plain tuples
+        in the order of EXPORT_FIELDS, the ids and names of the authors and tags are aggregated into arrays by
+        the database so no ORM objects or schemas are built.
+        :param search_params: the filters to search for
+        :param elastic_ids: the ids of the text search hits, in the requested sort as elasticsearch ordered them
+        :param chunk_size: the number of rows fetched per round trip
+        :return: an async iterator of row chunks
+        """
+        query = select(
+            self.model.id,
+            self.model.title,
+            self.model.abstract,
+            self.model.publication_date,
+            self._aggregated(Author.id, article_authors, article_authors.c.author_id, Integer),
+            self._aggregated(Author.name, article_authors, article_authors.c.author_id, String),
+            self._aggregated(Tag.id, article_tags, article_tags.c.tag_id, Integer),
+            self._aggregated(Tag.name, article_tags, article_tags.c.tag_id, String),
+            self.model.owner_id,
+        )
+        if elastic_ids is not None:
+            query = query.where(self.model.id == any_(literal(list(elastic_ids), ARRAY(Integer))))
+        query = self._apply_filters(query, search_params)
+        # the hits of a text search keep the order of elasticsearch, which sorted all the batches of the export,
+        # sorting each batch again in the database would only order the rows within it
+        sort = ArticleSortOrder.RELEVANCE if elastic_ids is not None else search_params.sort
+        query = self._apply_sort(query, sort, elastic_ids=elastic_ids)
 
+        result = await self.db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield [tuple(row) for row in partition]
 
-        query = query.offset((page - 1) * page_size).limit(page_size)
-        result = await self.db.execute(query)
-        items = result.scalars().all()
+    def _aggregated(self, column: Column, link_table: Table, link_column: Column, item_type: Type):
+        """array of a column of the authors or tags linked to an article ordered by their id, {} when there are none"""
+        model = column.class_
+        return (
+            select(func.coalesce(
+                func.array_agg(aggregate_order_by(column, model.id)),
+                literal_column("'{}'"),
+                type_=ARRAY(item_type),
+            ))
+            .select_from(link_table.join(model, model.id == link_column))
+            .where(link_table.c.article_id == self.model.id)
+            .scalar_subquery()
+        )
 
-        return items, total
+    @log_database_operations
+    async def get_read_model(self, obj_id: int) -> Optional[ArticleSchema]:
+        """
+        get an article with its authors and tags in a single statement, without loading ORM objects
+        :param obj_id: the article id to get
+        :return: the found article or None
+        """
+        articles = await self.get_read_models([obj_id])
+        return articles[0] if articles else None
 
     @log_database_operations
-    async def get_all_with_filters(
+    async def get_read_models(self, obj_ids: Sequence[int]) -> List[ArticleSchema]:
+        """
+        get the articles with the given ids with their authors and tags in a single statement
+        :param obj_ids: the article ids to get
+        :return: the found articles ordered like the given ids
+        """
+        if not obj_ids:
+            return []
+
+        query = self._read_columns().where(self.model.id.in_(obj_ids))
+        result = await self.db.execute(self._read_model_query(query, ArticleSortOrder.RELEVANCE, elastic_ids=obj_ids))
+        return self._to_schemas(result.mappings().all())
+
+    def _read_columns(self) -> Select:
+        """the article columns of the read model, the authors and tags are added by _read_model_query"""
+        return select(
+            self.model.id,
+            self.model.title,
+            self.model.abstract,
+            self.model.publication_date,
+            self.model.owner_id,
+        )
+
+    def _read_model_query(
             self,
-            *,
-            search_params: ArticleSearchFilters,
-            elastic_ids: Optional[List[int]]
-    ) -> List[Article]:
+            query: Select,
+            sort: ArticleSortOrder,
+            elastic_ids: Optional[Sequence[int]] = None
+    ) -> Select:
         """
-        get all articles based on the given filters
-        :param search_params: the filters to search for
-        :param elastic_ids: the elasticsearch ids found in the text search in elasticsearch
-        :return: the list of articles
+        add the authors and tags of every article as json arrays to a query of the read columns. The query is
+        wrapped as a subquery so that a page is limited first and only its rows are aggregated, the
+        order is applied again on the few rows of the page.
+        :param query: the filtered, ordered and limited query of the read columns
+        :param sort: the sort order of the query
+        :param elastic_ids: the ids of the text search hits, ordered by relevance
+        :return: the query of the read model rows
         """
-        query = select(self.model).options(
-            selectinload(self.model.authors),
-            selectinload(self.model.tags),
+        page = query.subquery("page")
+        authors = self._json_array(Author, article_authors, article_authors.c.author_id, page.c.id)
+        tags = self._json_array(Tag, article_tags, article_tags.c.tag_id, page.c.id)
+
+        read_query = select(page, authors.label("authors"), tags.label("tags"))
+        return self._apply_sort(read_query, sort, elastic_ids=elastic_ids, columns=page.c)
+
+    @staticmethod
+    def _json_array(model: Type, link_table: Table, link_column: Column, article_id: ColumnElement[int]):
+        """json array of the ids and names of the authors or tags linked to an article, [] when there are none"""
+        return (
+            select(func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object(literal_column("'id'"), model.id, literal_column("'name'"), model.name),
+                    model.id,
+                )),
+                literal_column("'[]'::json"),
+                type_=JSON,
+            ))
+            .select_from(link_table.join(model, model.id == link_column))
+            .where(link_table.c.article_id == article_id)
+            .scalar_subquery()
         )
 
-        if elastic_ids is not None:
-            query = query.filter(self.model.id.in_(elastic_ids))
+    @staticmethod
+    def _to_schemas(rows: Sequence[Mapping[str, Any]]) -> List[ArticleSchema]:
+        """validate the read model rows straight into the response schema"""
+        return [ArticleSchema.model_validate(dict(row)) for row in rows]
 
+    def _apply_filters(self, query: Select, search_params: ArticleSearchFilters) -> Select:
+        """
+        filter the query by the title, publication year and author of the search parameters
+        :param query: the query to filter
+        :param search_params: the filters to search for
+        :return: the filtered query
+        """
         if search_params.title:
-            query = query.filter(func.lower(self.model.title).contains(search_params.title.lower()))
+            query = query.filter(self._contains_ignore_case(self.model.title, search_params.title))
 
         if search_params.publication_year:
-            query = query.filter(extract('year', self.model.publication_date) == search_params.publication_year)
+            # a half open range instead of extract('year', ...) so that the publication date index is used
+            year_start, next_year_start = self._year_range(search_params.publication_year)
+            query = query.filter(
+                self.model.publication_date >= year_start,
+                self.model.publication_date < next_year_start,
+            )
 
         if search_params.author:
-            query = query.join(self.model.authors).filter(
-                func.lower(Author.name).contains(search_params.author.lower())
+            # a semi join, an article with several matching authors is found once
+            query = query.filter(self.model.authors.any(self._contains_ignore_case(Author.name, search_params.author)))
+
+        return query
+
+    @staticmethod
+    def _year_range(year: int) -> Tuple[datetime, datetime]:
+        """the first moment of the year and of the next year in UTC, like the range filter of the search index"""
+        return datetime(year, 1, 1, tzinfo=timezone.utc), datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+
+    @staticmethod
+    def _contains_ignore_case(column: ColumnElement[str], value: str) -> ColumnElement[bool]:
+        """
+        lower(column) LIKE '%value%', the expression of the pg_trgm GIN indexes on lower(title) and
+        lower(authors.name). The pattern is an ordinary bound parameter, a trigram index can serve a LIKE
+        whatever its pattern, so prepared statements and their generic plans keep using it.
+        :param column: the text column to search in
+        :param value: the text to find anywhere in the column, LIKE wildcards in it are matched literally
+        :return: the filter condition
+        """
+        escaped = value.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return func.lower(column).like(f"%{escaped}%", escape="\\")
+
+    @staticmethod
+    def _title_sort_key(title: ColumnElement[str]) -> ColumnElement[str]:
+        """
+        the title as the title sort orders it, lowercased like the normalized title.keyword elasticsearch sorts
+        on and compared by code point with the C collation as elasticsearch compares keywords, so both backends
+        and the cursors agree. The expression of the ix_articles_title_lower_id index
+        """
+        return func.lower(title).collate("C")
+
+    def _apply_sort(
+            self,
+            query: Select,
+            sort: ArticleSortOrder,
+            elastic_ids: Optional[Sequence[int]] = None,
+            columns: Optional[Any] = None
+    ) -> Select:
+        """
+        order the query by the requested sort with the id as tiebreaker so that pages are stable
+        :param query: the query to order
+        :param sort: the requested sort
+        :param elastic_ids: the ids of the text search hits, ordered by relevance
+        :param columns: the columns to order by, the article table by default or those of a subquery
+        :return: the ordered query
+        """
+        columns = self.model if columns is None else columns
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            return query.order_by(columns.publication_date.desc(), columns.id.desc())
+        if sort == ArticleSortOrder.TITLE:
+            return query.order_by(self._title_sort_key(columns.title), columns.id)
+        if sort == ArticleSortOrder.NEWEST:
+            return query.order_by(columns.id.desc())
+        if sort == ArticleSortOrder.OLDEST:
+            return query.order_by(columns.id)
+        if elastic_ids is not None:
+            # keep the relevance order of the search hits
+            return query.order_by(
+                func.array_position(literal(list(elastic_ids), ARRAY(Integer)), columns.id),
+                columns.id
             )
+        return query.order_by(columns.id)
 
-        result = await self.db.execute(query)
-        return result.scalars().all()
+    async def stream_in_chunks(
+            self,
+            *,
+            chunk_size: int = 1000,
+            updated_since: Optional[datetime] = None
+    ) -> AsyncIterator[Sequence[Article]]:
+        """
+        stream all the articles with their authors and tags through a server side cursor
+        :param chunk_size: the number of articles fetched per round trip
+        :param updated_since: only stream the articles created or updated after this moment
+        :return: an async iterator of article chunks
+        """
+        query = select(self.model).options(
+            selectinload(self.model.authors),
+            selectinload(self.model.tags),
+        ).order_by(self.model.id).execution_options(yield_per=chunk_size)
+
+        if updated_since is not None:
+            query = query.filter(self.model.updated_at >= updated_since)
 
+        result = await self.db.stream(query)
+        async for partition in result.scalars().partitions():
+            yield partition
+
+    @log_database_operations
+    async def get_existing_ids(self, ids: Sequence[int]) -> Set[int]:
+        """
+        get which of the given article ids still exist in the database
+        :param ids: the article ids to check
+        :return: the set of the existing ids
+        """
+        query = select(self.model.id).where(self.model.id.in_(ids))
+        result = await self.db.execute(query)
+        return set(result.scalars().all())
@@ -0,0 +1,197 @@
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.articles.models.article_export import ArticleExport
+from src.articles.utils.decorators import log_database_operations
+
+
+class ArticleExportRepository:
+    def __init__(self, db: AsyncSession):
+        self.model = ArticleExport
+        self.db = db
+
+    @log_database_operations
+    async def create_or_get_active(
+            self,
+            *,
+            job_id: str,
+            owner_id: int,
+            key: str,
+            search_params: Dict[str, Any],
+            export_format: str,
+            compressed: bool,
+            path: str,
+            filename: str,
+            media_type: str
+    ) -> Optional[ArticleExport]:
+        """
+        record a pending export, or get the pending or running export of the same request of the user. The
+        insert skips the row when the unique index of the active requests already holds the key, whichever
+        process inserted it
+        :param job_id: the id of the new export
+        :param owner_id: the user asking for the export
+        :param key: the format, the compression and the fingerprint of the filters
+        :param search_params: the filters to search for
+        :param export_format: the format of the export
+        :param compressed: gzip the artifact
+        :param path: where the artifact is written in the shared export directory
+        :param filename: the name the artifact is downloaded as
+        :param media_type: the media type the artifact is downloaded as
+        :return: the new or the active export, None when the active export finished in between
+        """
+        active = self.model.status.in_([self.model.STATUS_PENDING, self.model.STATUS_RUNNING])
+        result = await self.db.execute(
+            insert(self.model)
+            .values(
+                id=job_id,
+                owner_id=owner_id,
+                key=key,
+                search_params=search_params,
+                format=export_format,
+                compressed=compressed,
+                path=path,
+                filename=filename,
+                media_type=media_type,
+                status=self.model.STATUS_PENDING,
+                bytes_written=0,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[self.model.owner_id, self.model.key],
+                index_where=text(self.model.ACTIVE_CONDITION),
+            )
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        created = result.scalar_one_or_none()
+        if created is not None:
+            return created
+
+        result = await self.db.execute(
+            select(self.model).where(self.model.owner_id == owner_id, self.model.key == key, active)
+        )
+        return result.scalar_one_or_none()
+
+    @log_database_operations
+    async def get_by_id(self, job_id: str) -> Optional[ArticleExport]:
+        """
+        get an export by its id
+        :param job_id: the id of the export
+        :return: the export or None if not found
+        """
+        return await self.db.get(self.model, job_id)
+
+    @log_database_operations
+    async def count_pending(self) -> int:
+        """
+        count the exports waiting for a worker, in all the processes
+        :return: the number of pending exports
+        """
+        result = await self.db.execute(
+            select(func.count()).select_from(self.model).where(self.model.status == self.model.STATUS_PENDING)
+        )
+        return result.scalar_one()
+
+    @log_database_operations
+    async def claim_next(self, *, run_id: str, stale_after: float) -> Optional[ArticleExport]:
+        """
+        mark the oldest pending export as running under a new run. Rows locked by the workers of other processes
+        are skipped, and a running export whose progress did not move for stale_after seconds is taken over, the
+        process running it is assumed gone
+        :param run_id: the id of the run, only this run may report the progress and the end of the export
+        :param stale_after: seconds without progress after which a running export is taken over
+        :return: the claimed export, None when there is nothing to run
+        """
+        next_id = (
+            select(self.model.id)
+            .where(
+                or_(
+                    self.model.status == self.model.STATUS_PENDING,
+                    and_(
+                        self.model.status == self.model.STATUS_RUNNING,
+                        self.model.updated_at < func.now() - timedelta(seconds=stale_after),
+                    ),
+                )
+            )
+            .order_by(self.model.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(self.model)
+            .where(self.model.id == next_id)
+            .values(status=self.model.STATUS_RUNNING, run_id=run_id, bytes_written=0, error=None)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    @log_database_operations
+    async def save_progress(self, *, job_id: str, run_id: str, bytes_written: int) -> bool:
+        """
+        report the progress of a running export, which also shows it is not stale
+        :param job_id: the id of the export
+        :param run_id: the run writing the export
+        :param bytes_written: the bytes written so far
+        :return: whether the run still owns the export, False when another process took it over
+        """
+        result = await self.db.execute(
+            update(self.model)
+            .where(
+                self.model.id == job_id,
+                self.model.run_id == run_id,
+                self.model.status == self.model.STATUS_RUNNING,
+            )
+            .values(bytes_written=bytes_written)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @log_database_operations
+    async def finish(
+            self,
+            *,
+            job_id: str,
+            run_id: str,
+            status: str,
+            bytes_written: int,
+            error: Optional[str] = None
+    ) -> bool:
+        """
+        end a running export
+        :param job_id: the id of the export
+        :param run_id: the run writing the export
+        :param status: ArticleExport.STATUS_COMPLETED or ArticleExport.STATUS_FAILED
+        :param bytes_written: the size of the artifact
+        :param error: why the export failed
+        :return: whether the run still owned the export, False when another process took it over
+        """
+        result = await self.db.execute(
+            update(self.model)
+            .where(
+                self.model.id == job_id,
+                self.model.run_id == run_id,
+                self.model.status == self.model.STATUS_RUNNING,
+            )
+            .values(status=status, bytes_written=bytes_written, error=error, finished_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @log_database_operations
+    async def delete_expired(self, *, retention: float) -> List[str]:
+        """
+        remove the exports that finished longer than the retention ago
+        :param retention: seconds a finished export is kept
+        :return: the paths of the artifacts of the removed exports
+        """
+        result = await self.db.execute(
+            delete(self.model)
+            .where(self.model.finished_at < func.now() - timedelta(seconds=retention))
+            .returning(self.model.path)
+        )
+        return list(result.scalars().all())
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.articles.models.article_import import ArticleImport
+from src.articles.utils.decorators import log_database_operations
+
+
+class ArticleImportRepository:
+    def __init__(self, db: AsyncSession):
+        self.model = ArticleImport
+        self.db = db
+
+    @log_database_operations
+    async def create(self, *, owner_id: int, filename: str, path: str, bytes_total: int) -> ArticleImport:
+        """
+        record a new pending import
+        :param owner_id: the user importing the articles, the owner of the imported articles
+        :param filename: the name of the uploaded file
+        :param path: where the file is stored until the import is completed
+        :param bytes_total: the size of the file
+        :return: the created import
+        """
+        article_import = self.model(
+            owner_id=owner_id,
+            filename=filename,
+            path=path,
+            bytes_total=bytes_total,
+            status=self.model.STATUS_PENDING,
+            bytes_read=0,
+            rows_imported=0,
+            rows_failed=0,
+        )
+        self.db.add(article_import)
+        await self.db.flush()
+        return article_import
+
+    @log_database_operations
+    async def get_by_id(self, import_id: int) -> Optional[ArticleImport]:
+        """
+        get an import by its id
+        :param import_id: the id of the import
+        :return: the import or None if not found
+        """
+        return await self.db.get(self.model, import_id)
+
+    @log_database_operations
+    async def claim(self, *, import_id: int, stale_after: float) -> Optional[ArticleImport]:
+        """
+        mark an import as running in a single statement, so only one process runs it. A running import whose
+        checkpoint did not move for stale_after seconds is taken over, the process running it is assumed gone
+        :param import_id: the id of the import
+        :param stale_after: seconds without a checkpoint after which a running import is taken over
+        :return: the claimed import, None when it is missing, completed or running elsewhere
+        """
+        result = await self.db.execute(
+            update(self.model)
+            .where(
+                self.model.id == import_id,
+                or_(
+                    self.model.status.in_([
+                        self.model.STATUS_PENDING,
+                        self.model.STATUS_FAILED,
+                        self.model.STATUS_INTERRUPTED,
+                    ]),
+                    and_(
+                        self.model.status == self.model.STATUS_RUNNING,
+                        self.model.updated_at < func.now() - timedelta(seconds=stale_after),
+                    ),
+                ),
+            )
+            .values(status=self.model.STATUS_RUNNING, error=None)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none()
+
+    @log_database_operations
+    async def save_checkpoint(
+            self,
+            *,
+            import_id: int,
+            expected_bytes_read: int,
+            bytes_read: int,
+            rows_imported: int,
+            rows_failed: int
+    ) -> bool:
+        """
+        move the checkpoint of a running import past a chunk, in the transaction that wrote the chunk. The
+        checkpoint only moves from where the chunk was read, so of two processes writing the same chunk one fails
+        :param import_id: the id of the import
+        :param expected_bytes_read: the offset in the file the chunk was read from
+        :param bytes_read: the offset in the file after the chunk
+        :param rows_imported: the rows of the chunk that were imported
+        :param rows_failed: the rows of the chunk that were skipped
+        :return: whether the checkpoint moved, False when another process moved it first
+        """
+        result = await self.db.execute(
+            update(self.model)
+            .where(
+                self.model.id == import_id,
+                self.model.status == self.model.STATUS_RUNNING,
+                self.model.bytes_read == expected_bytes_read,
+            )
+            .values(
+                bytes_read=bytes_read,
+                rows_imported=self.model.rows_imported + rows_imported,
+                rows_failed=self.model.rows_failed + rows_failed,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @log_database_operations
+    async def set_status(
+            self,
+            *,
+            import_id: int,
+            status: str,
+            error: Optional[str] = None,
+            from_status: Optional[str] = None
+    ) -> None:
+        """
+        change the status of an import
+        :param import_id: the id of the import
+        :param status: one of the ArticleImport.STATUS_* values
+        :param error: why the import failed
+        :param from_status: only change the status when the import is in this status
+        """
+        statement = update(self.model).where(self.model.id == import_id)
+        if from_status is not None:
+            statement = statement.where(self.model.status == from_status)
+        await self.db.execute(statement.values(status=status, error=error))
@@ -1,10 +1,14 @@
-from typing import TypeVar, Generic, Type, Optional, Any, Dict
+import json
+from typing import TypeVar, Generic, Type, Optional, Any, Dict, List, Tuple, Callable, Sequence
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import select, func, text, any_, bindparam, Integer, Select, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.articles.db.base import Base
+from src.articles.db.explain import Explain
+from src.articles.schemas.base import CountMode
 from src.articles.utils.decorators import log_database_operations
 
 ModelType = TypeVar('ModelType', bound=Base)
@@ -39,7 +43,6 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj = self.model(**obj_in_data)
         self.db.add(db_obj)
         await self.db.flush()
-        await self.db.refresh(db_obj)
         return db_obj
 
     @log_database_operations
@@ -50,7 +53,6 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         :param obj_in: the new object data that will be used to update the object
         :return: the updated object
         """
-        obj_data = db_obj.to_dict()
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -62,9 +64,23 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         self.db.add(db_obj)
         await self.db.flush()
-        await self.db.refresh(db_obj)
         return db_obj
 
+    @log_database_operations
+    async def get_by_ids(self, obj_ids: Sequence[int]) -> List[ModelType]:
+        """
+        get the database objects with the given ids in a single query
+        :param obj_ids: the ids of the objects
+        :return: the found objects ordered like the given ids, missing ids are left out
+        """
+        if not obj_ids:
+            return []
+
+        query = select(self.model).where(self.model.id == any_(bindparam("obj_ids", list(obj_ids), ARRAY(Integer))))
+        result = await self.db.execute(query)
+        objects_by_id = {obj.id: obj for obj in result.scalars().all()}
+        return [objects_by_id[obj_id] for obj_id in obj_ids if obj_id in objects_by_id]
+
     @log_database_operations
     async def delete(self, *, obj_id: int) -> ModelType:
         """
@@ -89,3 +105,117 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def _fetch_page(
+            self,
+            query: Select,
+            *,
+            page: int,
+            page_size: int,
+            count_mode: CountMode = CountMode.EXACT,
+            read_model: Optional[Callable[[Select], Select]] = None
+    ) -> Tuple[List[Any], Optional[int], bool]:
+        """
+        run an ordered query for a page of the model and count the rows of the query as the count mode asks,
+        exact counts with count(*) over () in the page query itself instead of a second query over the
+        whole result, the other modes fetch one extra row to know whether a next page exists
+        :param query: the filtered and ordered query of the model
+        :param page: the page number
+        :param page_size: the size of the page
+        :param count_mode: exact, estimate from the query plan or none
+        :param read_model: wraps the limited page query into the statement that is run, its rows are then
+            returned as mappings instead of model instances
+        :return: the items of the page, the total or None and whether a next page exists
+        """
+        offset = (page - 1) * page_size
+
+        page_query = query
+        if count_mode == CountMode.EXACT:
+            page_query = page_query.add_columns(func.count().over().label("total_count"))
+        page_query = page_query.offset(offset).limit(page_size if count_mode == CountMode.EXACT else page_size + 1)
+
+        result = await self.db.execute(read_model(page_query) if read_model else page_query)
+        rows = result.all()
+        items = [row._mapping if read_model else row[0] for row in rows]
+
+        if count_mode == CountMode.EXACT:
+            if rows:
+                total = rows[0].total_count
+            elif offset:
+                # a page past the end has no row to carry the count
+                total = await self._count(query)
+            else:
+                total = 0
+            return items, total, offset + len(items) < total
+
+        has_next = len(items) > page_size
+        items = items[:page_size]
+
+        total = await self._estimate_count(query) if count_mode == CountMode.ESTIMATE else None
+        return items, total, has_next
+
+    async def _count(self, query: Select) -> int:
+        """the exact number of rows of a query"""
+        result = await self.db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+        return result.scalar_one()
+
+    async def _estimate_count(self, query: Select) -> int:
+        """
+        the number of rows of a query as estimated by the planner, the statistics of the table
+        when the query is not filtered, nothing is counted
+        """
+        if query.whereclause is None:
+            result = await self.db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)"),
+                {"table_name": self.model.__tablename__},
+            )
+            # reltuples is -1 for a table that was never vacuumed or analyzed
+            return max(result.scalar_one_or_none() or 0, 0)
+
+        result = await self.db.execute(Explain(query.order_by(None)))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+
+class NamedRepository(BaseRepository[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """Repository of models identified by a name column, like the authors and the tags"""
+
+    @log_database_operations
+    async def get_or_create_by_names(self, names: Sequence[str]) -> Dict[str, int]:
+        """
+        get the ids of the objects with the given names, creating the missing ones with a single insert
+        :param names: the names of the objects
+        :return: the id of every name, the oldest object when several share a name
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        ids_by_name = await self._ids_by_names(names)
+        missing = [name for name in names if name not in ids_by_name]
+        if missing:
+            # rows that a concurrent insert created in the meantime are skipped and read back below
+            result = await self.db.execute(
+                pg_insert(self.model)
+                .values([{"name": name} for name in missing])
+                .on_conflict_do_nothing()
+                .returning(self.model.id, self.model.name)
+            )
+            ids_by_name.update({name: obj_id for obj_id, name in result.all()})
+
+            missing = [name for name in missing if name not in ids_by_name]
+            if missing:
+                ids_by_name.update(await self._ids_by_names(missing))
+        return ids_by_name
+
+    async def _ids_by_names(self, names: Sequence[str]) -> Dict[str, int]:
+        query = (
+            select(self.model.id, self.model.name)
+            .where(self.model.name == any_(bindparam("names", list(names), ARRAY(String))))
+            .order_by(self.model.id.desc())
+        )
+        result = await self.db.execute(query)
+        # ordered newest first so the oldest object of a name is the one kept
+        return {name: obj_id for obj_id, name in result.all()}
@@ -1,11 +1,12 @@
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import select, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.articles.models.comment import Comment
 from src.articles.repositories.base import BaseRepository
-from src.articles.schemas.comment import CommentCreate, CommentUpdate
+from src.articles.schemas.base import CountMode
+from src.articles.schemas.comment import CommentCreate, CommentUpdate, CommentSortOrder
 
 
 class CommentRepository(BaseRepository[Comment, CommentCreate, CommentUpdate]):
@@ -17,31 +18,37 @@ class CommentRepository(BaseRepository[Comment, CommentCreate, CommentUpdate]):
             *,
             article_id: int,
             page: int = 1,
-            page_size: int = 10
-    ) -> Tuple[List[Comment], int]:
-        """Get paginated comments by article."""
-        offset = (page - 1) * page_size
-
-        query = (
-            select(self.model)
-            .where(self.model.article_id == article_id)
-            .order_by(self.model.id.desc())
-            .offset(offset)
-            .limit(page_size)
-        )
-
-        result = await self.db.execute(query)
-        comments = result.scalars().all()
-
-        count_query = (
-            select(func.count())
-            .select_from(self.model)
-            .where(self.model.article_id == article_id)
-        )
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar()
-
-        return comments, total
-
-
-
+            page_size: int = 10,
+            sort: CommentSortOrder = CommentSortOrder.NEWEST,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[Comment], Optional[int], bool]:
+        """Get paginated comments by article, with the total or None and whether a next page exists."""
+        query = self._by_article(article_id, sort)
+        return await self._fetch_page(query, page=page, page_size=page_size, count_mode=count_mode)
+
+    async def get_page_after(
+            self,
+            *,
+            article_id: int,
+            page_size: int = 10,
+            sort: CommentSortOrder = CommentSortOrder.NEWEST,
+            after_id: Optional[int] = None,
+            count_mode: CountMode = CountMode.NONE
+    ) -> Tuple[List[Comment], Optional[int], bool]:
+        """
+        Get a page of comments of an article starting after the last comment of the previous page,
+        the (article_id, id) index is scanned from that comment on so every page costs the same.
+        """
+        query = self._by_article(article_id, sort)
+        if after_id is not None:
+            if sort == CommentSortOrder.NEWEST:
+                query = query.where(self.model.id < after_id)
+            else:
+                query = query.where(self.model.id > after_id)
+
+        return await self._fetch_page(query, page=1, page_size=page_size, count_mode=count_mode)
+
+    def _by_article(self, article_id: int, sort: CommentSortOrder) -> Select:
+        """The comments of an article in the requested order, with the id as sort key."""
+        order = self.model.id.desc() if sort == CommentSortOrder.NEWEST else self.model.id.asc()
+        return select(self.model).where(self.model.article_id == article_id).order_by(order)
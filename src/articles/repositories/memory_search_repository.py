@@ -0,0 +1,442 @@
+import re
+import time
+import uuid
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from math import log
+from typing import AsyncIterator, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from elastic_transport import ApiResponseMeta, HttpHeaders, NodeConfig
+from elasticsearch import NotFoundError
+
+from src.articles.models import Article
+from src.articles.repositories.search_repository import ESTIMATE_TRACK_TOTAL_HITS, ArticleSearchRepository
+from src.articles.schemas.article import ArticleSearchFilters, ArticleSortOrder
+from src.articles.schemas.base import CountMode
+from src.articles.utils.text_analysis import analyze, auto_fuzziness, edit_distance
+
+# the BM25 parameters elasticsearch uses by default
+BM25_K1 = 1.2
+BM25_B = 0.75
+# like the match query of elasticsearch, a fuzzy term expands to at most this many index terms
+MAX_EXPANSIONS = 50
+MINIMUM_SHOULD_MATCH = 0.7
+# deleted documents stay in the postings until they outnumber the live ones
+COMPACTION_MIN_DELETED = 1000
+
+_KEEP_ALIVE_PATTERN = re.compile(r"^(\d+)(ms|s|m|h|d)$")
+_KEEP_ALIVE_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class _InvertedIndex:
+    """
+    A physical in-memory index. Documents get a dense ordinal and the postings of every abstract term
+    are two parallel arrays of ordinals and term frequencies. Updates and deletes only mark the old
+    ordinal as deleted, the postings are rebuilt once the deleted ordinals outnumber the live ones.
+    """
+
+    def __init__(self):
+        self.documents: Dict[int, dict] = {}
+        self.ordinals: Dict[int, int] = {}
+        self.ordinal_ids = array("q")
+        self.lengths = array("I")
+        self.live = bytearray()
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self.total_length = 0
+        self.refresh_interval: Optional[str] = None
+        # the external versions of the written articles, kept for the deleted ones as well
+        self.versions: Dict[int, int] = {}
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.ordinals)
+
+    @property
+    def average_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 0.0
+
+    def add(self, article_id: int, document: dict) -> None:
+        self.remove(article_id)
+
+        ordinal = len(self.ordinal_ids)
+        terms = analyze(document.get("abstract") or "")
+        frequencies: Dict[str, int] = defaultdict(int)
+        for term in terms:
+            frequencies[term] += 1
+
+        for term, frequency in frequencies.items():
+            if term not in self.postings:
+                self.postings[term] = (array("I"), array("I"))
+                for trigram in _trigrams(term):
+                    self.trigrams[trigram].add(term)
+            term_ordinals, term_frequencies = self.postings[term]
+            term_ordinals.append(ordinal)
+            term_frequencies.append(frequency)
+
+        self.documents[article_id] = document
+        self.ordinals[article_id] = ordinal
+        self.ordinal_ids.append(article_id)
+        self.lengths.append(len(terms))
+        self.live.append(1)
+        self.total_length += len(terms)
+
+    def remove(self, article_id: int) -> None:
+        ordinal = self.ordinals.pop(article_id, None)
+        if ordinal is None:
+            return
+
+        del self.documents[article_id]
+        self.live[ordinal] = 0
+        self.total_length -= self.lengths[ordinal]
+
+        deleted = len(self.live) - self.doc_count
+        if deleted >= COMPACTION_MIN_DELETED and deleted > self.doc_count:
+            self._compact()
+
+    def postings_of(self, term: str) -> Iterator[Tuple[int, int]]:
+        """The live ordinals containing the term with the frequency of the term"""
+        term_ordinals, term_frequencies = self.postings.get(term, ((), ()))
+        for ordinal, frequency in zip(term_ordinals, term_frequencies):
+            if self.live[ordinal]:
+                yield ordinal, frequency
+
+    def fuzzy_terms(self, term: str) -> List[Tuple[str, float]]:
+        """
+        The index terms within the AUTO edit distance of the term with their boost. The candidates share at
+        least one trigram with the term and are verified with the bounded edit distance.
+        """
+        max_distance = auto_fuzziness(term)
+        if max_distance == 0:
+            return [(term, 1.0)] if term in self.postings else []
+
+        candidates = set()
+        for trigram in _trigrams(term):
+            candidates.update(self.trigrams.get(trigram, ()))
+        candidates.add(term)
+
+        matches = []
+        for candidate in candidates:
+            if candidate not in self.postings:
+                continue
+            distance = edit_distance(term, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+
+        matches.sort()
+        return [
+            (candidate, 1.0 - distance / min(len(term), len(candidate)))
+            for distance, candidate in matches[:MAX_EXPANSIONS]
+        ]
+
+    def _compact(self) -> None:
+        documents = self.documents
+        refresh_interval = self.refresh_interval
+        versions = self.versions
+        self.__init__()
+        self.refresh_interval = refresh_interval
+        self.versions = versions
+        for article_id, document in documents.items():
+            self.add(article_id, document)
+
+
+class InMemoryArticleSearchRepository(ArticleSearchRepository):
+    """
+    Pure python search engine behind the ArticleSearchRepository interface, for tests, development and
+    load tests without elasticsearch. It mirrors the elasticsearch setup: versioned indices behind the read
+    and write aliases, the custom_analyzer chain on the abstract, BM25 scoring, AUTO fuzziness with the
+    70% minimum_should_match and the same filters and sort orders. Writes are visible immediately and
+    points in time are not isolated from them.
+    """
+
+    def __init__(self, index_prefix: str = "articles"):
+        super().__init__(es_client=None, index_prefix=index_prefix)
+        self.indices: Dict[str, _InvertedIndex] = {}
+        self.aliases: Dict[str, str] = {}
+        self._points_in_time: Dict[str, float] = {}
+
+    async def create_index(self) -> None:
+        if self.read_alias in self.aliases:
+            return
+        index_name = await self.create_versioned_index()
+        self.aliases[self.read_alias] = index_name
+        self.aliases[self.write_alias] = index_name
+
+    async def create_versioned_index(self) -> str:
+        versions = await self.list_versions()
+        index_name = f"{self.index_prefix}_v{(versions[-1] if versions else 0) + 1}"
+        self.indices[index_name] = _InvertedIndex()
+        return index_name
+
+    async def list_versions(self) -> List[int]:
+        pattern = re.compile(rf"^{re.escape(self.index_prefix)}_v(\d+)$")
+        return sorted(int(match.group(1)) for match in (pattern.match(name) for name in self.indices) if match)
+
+    async def get_alias_target(self, alias: str) -> Optional[str]:
+        return self.aliases.get(alias)
+
+    async def swap_aliases(self, index_name: str) -> Optional[str]:
+        previous_index = self.aliases.get(self.read_alias)
+        self.aliases[self.read_alias] = index_name
+        self.aliases[self.write_alias] = index_name
+        return previous_index
+
+    async def index_article(self, article: Article, refresh: bool = False) -> None:
+        (await self._write_index()).add(article.id, self.build_document(article))
+
+    async def delete_article(self, article_id: int, refresh: bool = False) -> None:
+        (await self._write_index()).remove(article_id)
+
+    async def bulk_write(
+            self,
+            actions: Sequence[Tuple[int, Optional[dict]]],
+            refresh: bool = False,
+            index: Optional[str] = None,
+            versions: Optional[Mapping[int, int]] = None
+    ) -> List[dict]:
+        target = await self._write_index(index)
+        errors = []
+        for article_id, document in actions:
+            if versions is not None:
+                if versions[article_id] <= target.versions.get(article_id, 0):
+                    errors.append({
+                        "_id": str(article_id),
+                        "status": 409,
+                        "error": {"type": "version_conflict_engine_exception"},
+                    })
+                    continue
+                target.versions[article_id] = versions[article_id]
+            if document is None:
+                target.remove(article_id)
+            else:
+                target.add(article_id, document)
+        return errors
+
+    async def scan_ids(self, *, index: Optional[str] = None, batch_size: int = 5000) -> AsyncIterator[List[int]]:
+        target = self._read_index(index)
+        article_ids = sorted(target.ordinals) if target else []
+        for start in range(0, len(article_ids), batch_size):
+            yield article_ids[start:start + batch_size]
+
+    async def get_refresh_interval(self, index: Optional[str] = None) -> str | None:
+        return (await self._write_index(index)).refresh_interval
+
+    async def set_refresh_interval(self, refresh_interval: str | None, index: Optional[str] = None) -> None:
+        (await self._write_index(index)).refresh_interval = refresh_interval
+
+    async def refresh(self, index: Optional[str] = None) -> None:
+        """Writes are searchable right away"""
+
+    async def search_articles(
+            self,
+            query: str,
+            fuzzy: bool = True,
+            min_score: float = 0.5,
+            size: int = 20
+    ) -> List[int]:
+        hits = self._search(ArticleSearchFilters(abstract_search=query), fuzzy=fuzzy, min_score=min_score)
+        return [article_id for _, article_id in hits[:size]]
+
+    async def search_with_filters(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            fuzzy: bool = True,
+            min_score: float = 0.5,
+            page: int = 1,
+            page_size: int = 10,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[int], Optional[int], bool]:
+        hits = self._search(search_params, fuzzy=fuzzy, min_score=min_score)
+        start = (page - 1) * page_size
+        total = _counted_hits(len(hits), count_mode)
+        return [article_id for _, article_id in hits[start:start + page_size]], total, start + page_size < len(hits)
+
+    async def search_after_page(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page_size: int = 10,
+            pit_id: Optional[str] = None,
+            search_after: Optional[list] = None,
+            keep_alive: str = "1m",
+            fuzzy: bool = True,
+            min_score: float = 0.5,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[int], Optional[int], str, Optional[list]]:
+        now = time.monotonic()
+        if pit_id is None:
+            pit_id = uuid.uuid4().hex
+        elif self._points_in_time.get(pit_id, 0) < now:
+            self._points_in_time.pop(pit_id, None)
+            raise _not_found(f"No search context found for id [{pit_id}]")
+        self._points_in_time[pit_id] = now + _keep_alive_seconds(keep_alive)
+
+        hits = self._search(search_params, fuzzy=fuzzy, min_score=min_score)
+        total = _counted_hits(len(hits), count_mode) if search_after is None else None
+        if search_after is not None:
+            after = self._sort_key(search_params.sort, search_after)
+            hits = [hit for hit in hits if self._sort_key(search_params.sort, hit[0]) > after]
+
+        page = hits[:page_size]
+        return [article_id for _, article_id in page], total, pit_id, page[-1][0] if page else None
+
+    async def close_point_in_time(self, pit_id: str) -> None:
+        self._points_in_time.pop(pit_id, None)
+
+    async def verify_article_indexed(self, article_id: int) -> dict | None:
+        index = self._read_index(self.write_alias)
+        return index.documents.get(article_id) if index else None
+
+    def _search(self, search_params: ArticleSearchFilters, fuzzy: bool, min_score: float) -> List[Tuple[list, int]]:
+        """The sort values and article ids of all the hits in the order of search_params.sort"""
+        index = self._read_index()
+        if index is None:
+            return []
+
+        if search_params.abstract_search:
+            scores = self._score(index, search_params.abstract_search, fuzzy=fuzzy, min_score=min_score)
+        else:
+            scores = {ordinal: 1.0 for ordinal in index.ordinals.values()}
+
+        hits = []
+        for ordinal, score in scores.items():
+            article_id = index.ordinal_ids[ordinal]
+            document = index.documents[article_id]
+            if self._matches_filters(document, search_params):
+                hits.append((self._sort_values(search_params.sort, document, score), article_id))
+
+        hits.sort(key=lambda hit: self._sort_key(search_params.sort, hit[0]))
+        return hits
+
+    @staticmethod
+    def _score(index: _InvertedIndex, text: str, fuzzy: bool, min_score: float) -> Dict[int, float]:
+        """
+        BM25 scores of the live ordinals matching at least 70% of the analyzed terms of the text. A term
+        matches through its best scoring fuzzy expansion, expansions are weighted by their edit distance.
+        """
+        query_terms = analyze(text)
+        if not query_terms or not index.doc_count:
+            return {}
+
+        required = max(1, int(len(query_terms) * MINIMUM_SHOULD_MATCH))
+        average_length = index.average_length or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        matched_terms: Dict[int, int] = defaultdict(int)
+
+        for query_term in query_terms:
+            expansions = index.fuzzy_terms(query_term) if fuzzy else [(query_term, 1.0)]
+            term_scores: Dict[int, float] = {}
+            for term, boost in expansions:
+                postings = list(index.postings_of(term))
+                if not postings:
+                    continue
+                idf = log(1 + (index.doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for ordinal, frequency in postings:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * index.lengths[ordinal] / average_length)
+                    score = boost * idf * frequency / (frequency + norm)
+                    if score > term_scores.get(ordinal, 0.0):
+                        term_scores[ordinal] = score
+
+            for ordinal, score in term_scores.items():
+                scores[ordinal] += score
+                matched_terms[ordinal] += 1
+
+        return {
+            ordinal: score for ordinal, score in scores.items()
+            if matched_terms[ordinal] >= required and score >= min_score
+        }
+
+    @staticmethod
+    def _matches_filters(document: dict, search_params: ArticleSearchFilters) -> bool:
+        """The same conditions as the filter context of the elasticsearch query"""
+        if search_params.title and search_params.title.lower() not in document["title"].lower():
+            return False
+
+        if search_params.publication_year:
+            if _as_datetime(document["publication_date"]).year != search_params.publication_year:
+                return False
+
+        if search_params.author:
+            author = search_params.author.lower()
+            if not any(author in name.lower() for name in document["author_names"]):
+                return False
+
+        return True
+
+    @staticmethod
+    def _sort_values(sort: ArticleSortOrder, document: dict, score: float) -> list:
+        """The sort values elasticsearch returns for a hit, used as search_after of the next page"""
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            return [int(_as_datetime(document["publication_date"]).timestamp() * 1000), document["id"]]
+        if sort == ArticleSortOrder.TITLE:
+            return [document["title"].lower(), document["id"]]
+        if sort in (ArticleSortOrder.NEWEST, ArticleSortOrder.OLDEST):
+            return [document["id"]]
+        return [score, document["id"]]
+
+    @staticmethod
+    def _sort_key(sort: ArticleSortOrder, sort_values: list) -> tuple:
+        """An ascending sort key of the sort values of a hit, following ArticleSearchRepository._build_sort"""
+        first, article_id = sort_values[0], sort_values[-1]
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            return -first, -article_id
+        if sort == ArticleSortOrder.TITLE:
+            return first, article_id
+        if sort == ArticleSortOrder.NEWEST:
+            return (-article_id,)
+        if sort == ArticleSortOrder.OLDEST:
+            return (article_id,)
+        return -first, article_id
+
+    def _read_index(self, name: Optional[str] = None) -> Optional[_InvertedIndex]:
+        name = name or self.read_alias
+        return self.indices.get(self.aliases.get(name, name))
+
+    async def _write_index(self, name: Optional[str] = None) -> _InvertedIndex:
+        """The index behind the name, by default the write alias, created on the first write like elasticsearch"""
+        index = self._read_index(name or self.write_alias)
+        if index is None:
+            await self.create_index()
+            index = self._read_index(name or self.write_alias)
+        if index is None:
+            raise _not_found(f"no such index [{name}]")
+        return index
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"$${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _counted_hits(hits: int, count_mode: CountMode) -> Optional[int]:
+    """The total hits elasticsearch reports in the given count mode"""
+    if count_mode == CountMode.NONE:
+        return None
+    if count_mode == CountMode.ESTIMATE:
+        return min(hits, ESTIMATE_TRACK_TOTAL_HITS)
+    return hits
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def _keep_alive_seconds(keep_alive: str) -> float:
+    match = _KEEP_ALIVE_PATTERN.match(keep_alive)
+    if not match:
+        raise ValueError(f"Invalid keep alive {keep_alive}")
+    return int(match.group(1)) * _KEEP_ALIVE_UNITS[match.group(2)]
+
+
+def _not_found(message: str) -> NotFoundError:
+    """The error elasticsearch answers with, so callers handle both engines the same way"""
+    meta = ApiResponseMeta(
+        status=404,
+        http_version="1.1",
+        headers=HttpHeaders(),
+        duration=0.0,
+        node=NodeConfig("http", "localhost", 9200),
+    )
+    return NotFoundError(message, meta, {"error": {"reason": message}})
@@ -0,0 +1,71 @@
+from typing import List, Sequence
+
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.articles.models.search_outbox import SearchOutbox
+from src.articles.utils.decorators import log_database_operations
+
+
+class SearchOutboxRepository:
+    def __init__(self, db: AsyncSession):
+        self.model = SearchOutbox
+        self.db = db
+
+    @log_database_operations
+    async def add(self, *, article_id: int, operation: str) -> None:
+        """
+        record a pending search index change in the current transaction
+        :param article_id: the id of the changed article
+        :param operation: SearchOutbox.OPERATION_INDEX or SearchOutbox.OPERATION_DELETE
+        """
+        self.db.add(self.model(article_id=article_id, operation=operation))
+        await self.db.flush()
+
+    @log_database_operations
+    async def add_many(self, *, article_ids: Sequence[int], operation: str) -> None:
+        """
+        record the same pending search index change of many articles with a single insert
+        :param article_ids: the ids of the changed articles
+        :param operation: SearchOutbox.OPERATION_INDEX or SearchOutbox.OPERATION_DELETE
+        """
+        if article_ids:
+            await self.db.execute(
+                insert(self.model),
+                [{"article_id": article_id, "operation": operation} for article_id in article_ids],
+            )
+
+    @log_database_operations
+    async def claim_batch(self, limit: int) -> List[SearchOutbox]:
+        """
+        lock the oldest pending entries, rows locked by other workers are skipped so that several
+        workers can drain the outbox without sending the same changes
+        :param limit: the maximum number of entries to claim
+        :return: the claimed entries, locked until the transaction ends
+        """
+        query = (
+            select(self.model)
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    @log_database_operations
+    async def delete_entries(self, entry_ids: Sequence[int]) -> None:
+        """
+        remove the entries that were sent to the search index
+        :param entry_ids: the ids of the sent entries
+        """
+        if entry_ids:
+            await self.db.execute(delete(self.model).where(self.model.id.in_(entry_ids)))
+
+    @log_database_operations
+    async def count_pending(self) -> int:
+        """
+        count the entries not yet sent to the search index
+        :return: the number of pending entries
+        """
+        result = await self.db.execute(select(func.count()).select_from(self.model))
+        return result.scalar_one()
@@ -1,21 +1,32 @@
-from typing import List
+import re
+from typing import Dict, List, Mapping, Sequence, Tuple, Optional, AsyncIterator, Union
 
-from elasticsearch import AsyncElasticsearch
+from elasticsearch import AsyncElasticsearch, NotFoundError
 
 from src.articles.models import Article
+from src.articles.schemas.article import ArticleSearchFilters, ArticleSortOrder
+from src.articles.schemas.base import CountMode
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# the hits are counted exactly up to this number with CountMode.ESTIMATE, the default of elasticsearch
+ESTIMATE_TRACK_TOTAL_HITS = 10000
 
 
 class ArticleSearchRepository:
-    def __init__(self, es_client: AsyncElasticsearch):
+    def __init__(self, es_client: AsyncElasticsearch, index_prefix: str = "articles"):
         self.es_client = es_client
-        self.index_name = "articles"
+        self.index_prefix = index_prefix
+        # searches go through the read alias and index/delete requests through the write alias,
+        # both point to one of the versioned physical indices (articles_v1, articles_v2, ...)
+        self.read_alias = f"{index_prefix}_read"
+        self.write_alias = f"{index_prefix}_write"
 
-    async def create_index(self) -> None:
-        """Creates an Elasticsearch index with appropriate mappings for article search"""
-        if await self.es_client.indices.exists(index=self.index_name):
-            return
-
-        mapping = {
+    @staticmethod
+    def index_definition() -> dict:
+        """The settings and mappings of the physical article indices"""
+        return {
             "settings": {
                 "analysis": {
                     "analyzer": {
@@ -24,34 +35,286 @@ class ArticleSearchRepository:
                             "tokenizer": "standard",
                             "filter": ["lowercase", "stop", "snowball"]
                         }
+                    },
+                    "normalizer": {
+                        "lowercase_normalizer": {
+                            "type": "custom",
+                            "filter": ["lowercase"]
+                        }
                     }
                 }
             },
             "mappings": {
                 "properties": {
                     "id": {"type": "integer"},
+                    "title": {
+                        "type": "text",
+                        "analyzer": "custom_analyzer",
+                        "fields": {
+                            "keyword": {"type": "keyword", "normalizer": "lowercase_normalizer"}
+                        }
+                    },
                     "abstract": {
                         "type": "text",
                         "analyzer": "custom_analyzer"
-                    }
+                    },
+                    "publication_date": {"type": "date"},
+                    "owner_id": {"type": "integer"},
+                    "author_ids": {"type": "integer"},
+                    "author_names": {
+                        "type": "text",
+                        "fields": {
+                            "keyword": {"type": "keyword", "normalizer": "lowercase_normalizer"}
+                        }
+                    },
+                    "tag_ids": {"type": "integer"},
+                    "tag_names": {"type": "keyword"}
                 }
             }
         }
 
-        await self.es_client.indices.create(index=self.index_name, body=mapping)
+    async def create_index(self) -> None:
+        """
+        Creates the first versioned index behind the read and write aliases if there is none yet. The concrete
+        index named like the prefix, used before the indices were versioned, is copied into it with a reindex
+        and removed in the same request that adds the aliases. Writes that reach the old index while it is copied
+        are not carried over, a reindex from the database catches them up.
+        """
+        if await self.es_client.indices.exists_alias(name=self.read_alias):
+            return
+
+        legacy_index = await self.get_legacy_index()
+        index_name = await self.create_versioned_index()
+        actions = [
+            {"add": {"index": index_name, "alias": self.read_alias}},
+            {"add": {"index": index_name, "alias": self.write_alias, "is_write_index": True}},
+        ]
+        if legacy_index:
+            logger.info(f"Migrating the legacy index {legacy_index} into {index_name}")
+            await self.es_client.reindex(
+                source={"index": legacy_index},
+                dest={"index": index_name},
+                wait_for_completion=True,
+                refresh=True,
+            )
+            actions.append({"remove_index": {"index": legacy_index}})
 
-    async def index_article(self, article: Article) -> None:
-        """Index an article"""
-        document = {
+        try:
+            await self.es_client.indices.update_aliases(actions=actions)
+        except NotFoundError:
+            # another process migrated the legacy index first, its index is the one behind the aliases
+            await self.es_client.indices.delete(index=index_name)
+            if not await self.es_client.indices.exists_alias(name=self.read_alias):
+                raise
+
+    async def get_legacy_index(self) -> Optional[str]:
+        """Returns the name of the unversioned index of the prefix if it exists as a concrete index"""
+        if await self.es_client.indices.exists_alias(name=self.index_prefix):
+            return None
+        if await self.es_client.indices.exists(index=self.index_prefix):
+            return self.index_prefix
+        return None
+
+    async def create_versioned_index(self) -> str:
+        """Creates the next versioned physical index without any aliases and returns its name"""
+        versions = await self.list_versions()
+        index_name = f"{self.index_prefix}_v{(versions[-1] if versions else 0) + 1}"
+        await self.es_client.indices.create(index=index_name, body=self.index_definition())
+        return index_name
+
+    async def list_versions(self) -> List[int]:
+        """Returns the versions of the existing physical indices in ascending order"""
+        response = await self.es_client.indices.get(index=f"{self.index_prefix}_v*", allow_no_indices=True)
+        pattern = re.compile(rf"^{re.escape(self.index_prefix)}_v(\d+)$")
+        return sorted(
+            int(match.group(1)) for match in (pattern.match(name) for name in response.keys()) if match
+        )
+
+    async def get_alias_target(self, alias: str) -> Optional[str]:
+        """Returns the physical index an alias points to or None if the alias does not exist"""
+        try:
+            response = await self.es_client.indices.get_alias(name=alias)
+        except NotFoundError:
+            return None
+        return next(iter(response.keys()), None)
+
+    async def swap_aliases(self, index_name: str) -> Optional[str]:
+        """
+        Atomically points both the read and the write alias to the given index.
+        The previous index is left untouched so that it can be used for a rollback.
+        Returns the name of the previous index.
+        """
+        previous_index = await self.get_alias_target(self.read_alias)
+        actions = []
+        if previous_index:
+            actions.append({"remove": {"index": previous_index, "alias": self.read_alias}})
+            actions.append({"remove": {"index": previous_index, "alias": self.write_alias}})
+        actions.append({"add": {"index": index_name, "alias": self.read_alias}})
+        actions.append({"add": {"index": index_name, "alias": self.write_alias, "is_write_index": True}})
+
+        await self.es_client.indices.update_aliases(actions=actions)
+        return previous_index
+
+    @staticmethod
+    def build_document(article: Article) -> dict:
+        """Build the search document of an article, the authors and tags need to be loaded"""
+        return {
             "id": article.id,
-            "abstract": article.abstract
+            "title": article.title,
+            "abstract": article.abstract,
+            "publication_date": article.publication_date,
+            "owner_id": article.owner_id,
+            "author_ids": [author.id for author in article.authors],
+            "author_names": [author.name for author in article.authors],
+            "tag_ids": [tag.id for tag in article.tags],
+            "tag_names": [tag.name for tag in article.tags],
         }
 
-        await self.es_client.index(index=self.index_name, id=str(article.id), document=document)
+    async def index_article(self, article: Article, refresh: bool = False) -> None:
+        """Index an article, refresh waits until the change is visible to searches"""
+        document = self.build_document(article)
+
+        await self.es_client.index(
+            index=self.write_alias,
+            id=str(article.id),
+            document=document,
+            refresh="wait_for" if refresh else False
+        )
+
+    async def index_articles(
+            self,
+            articles: Sequence[Article],
+            refresh: bool = False,
+            wait: bool = False
+    ) -> Dict[int, str]:
+        """
+        Index many articles with a single bulk request, refresh waits until they are visible to searches
+        :param articles: the articles with their authors and tags loaded
+        :param refresh: wait until the articles are visible to searches
+        :param wait: accepted like the other indexers, the request is always waited for
+        :return: the error of every article elasticsearch rejected
+        """
+        _, errors = await self.bulk_index(articles, refresh=refresh)
+        failed = {}
+        for error in errors:
+            logger.error(f"Failed to index article {error.get('_id')}: {error.get('error')}")
+            failed[int(error["_id"])] = self.describe_error(error)
+        return failed
+
+    @staticmethod
+    def describe_error(error: dict) -> str:
+        """The reason of a failed bulk item, as reported by elasticsearch"""
+        reason = error.get("error")
+        if isinstance(reason, dict):
+            return str(reason.get("reason") or reason.get("type"))
+        return str(reason)
+
+    async def delete_article(self, article_id: int, refresh: bool = False) -> None:
+        """Removes an article from the index, refresh waits until the change is visible to searches"""
+        try:
+            await self.es_client.delete(
+                index=self.write_alias,
+                id=str(article_id),
+                refresh="wait_for" if refresh else False
+            )
+        except NotFoundError:
+            pass
+
+    async def bulk_write(
+            self,
+            actions: Sequence[Tuple[int, Optional[dict]]],
+            refresh: bool = False,
+            index: Optional[str] = None,
+            versions: Optional[Mapping[int, int]] = None
+    ) -> List[dict]:
+        """
+        Index and delete many articles with a single bulk request, by default through the write alias.
+        :param actions: pairs of article id and search document, a None document deletes the article
+        :param refresh: wait until the changes are visible to searches
+        :param index: the index to write to
+        :param versions: external versions of the articles, a write whose version is not above the version
+        the index holds is refused with a 409 version conflict instead of replacing a newer document
+        :return: the results of the items that failed, each with the _id, the status and the error
+        """
+        if not actions:
+            return []
+
+        operations = []
+        for article_id, document in actions:
+            metadata = {"_index": index or self.write_alias, "_id": str(article_id)}
+            if versions is not None:
+                metadata.update(version=versions[article_id], version_type="external")
+            if document is None:
+                operations.append({"delete": metadata})
+            else:
+                operations.append({"index": metadata})
+                operations.append(document)
 
-    async def delete_article(self, article_id: int) -> None:
-        """Removes an article from the index"""
-        await self.es_client.delete(index=self.index_name, id=str(article_id))
+        response = await self.es_client.bulk(operations=operations, refresh="wait_for" if refresh else False)
+        if not response["errors"]:
+            return []
+
+        results = (next(iter(item.values())) for item in response["items"])
+        return [result for result in results if "error" in result]
+
+    async def bulk_index(
+            self,
+            articles: Sequence[Article],
+            refresh: bool = False,
+            index: Optional[str] = None
+    ) -> Tuple[int, List[dict]]:
+        """
+        Index many articles with a single bulk request, by default into the write alias.
+        Returns the number of indexed articles and the errors of the items that failed.
+        """
+        errors = await self.bulk_write(
+            [(article.id, self.build_document(article)) for article in articles],
+            refresh=refresh,
+            index=index
+        )
+        return len(articles) - len(errors), errors
+
+    async def bulk_delete(self, article_ids: Sequence[int], index: Optional[str] = None) -> None:
+        """Removes many articles from the index with a single bulk request, by default from the write alias"""
+        await self.bulk_write([(article_id, None) for article_id in article_ids], index=index)
+
+    async def scan_ids(self, *, index: Optional[str] = None, batch_size: int = 5000) -> AsyncIterator[List[int]]:
+        """Yields the ids of all the indexed articles in ascending order and in batches"""
+        search_after = None
+        while True:
+            response = await self.es_client.search(
+                index=index or self.read_alias,
+                query={"match_all": {}},
+                sort=[{"id": "asc"}],
+                size=batch_size,
+                search_after=search_after,
+                _source=False,
+            )
+            hits = response["hits"]["hits"]
+            if not hits:
+                return
+            yield [int(hit["sort"][0]) for hit in hits]
+            search_after = hits[-1]["sort"]
+
+    async def get_refresh_interval(self, index: Optional[str] = None) -> str | None:
+        """Returns the refresh interval explicitly set on the index or None when the default is used"""
+        response = await self.es_client.indices.get_settings(
+            index=index or self.write_alias,
+            name="index.refresh_interval"
+        )
+        index_settings = next(iter(response.values()), {}).get("settings", {})
+        return index_settings.get("index", {}).get("refresh_interval")
+
+    async def set_refresh_interval(self, refresh_interval: str | None, index: Optional[str] = None) -> None:
+        """Sets the refresh interval of the index, None restores the elasticsearch default"""
+        await self.es_client.indices.put_settings(
+            index=index or self.write_alias,
+            settings={"index": {"refresh_interval": refresh_interval}}
+        )
+
+    async def refresh(self, index: Optional[str] = None) -> None:
+        """Makes all the operations performed on the index available for search"""
+        await self.es_client.indices.refresh(index=index or self.write_alias)
 
     async def search_articles(
             self,
@@ -81,7 +344,7 @@ class ArticleSearchRepository:
         }
 
         response = await self.es_client.search(
-            index=self.index_name,
+            index=self.read_alias,
             query=search_query,
             size=size,
             min_score=min_score,
@@ -90,6 +353,189 @@ class ArticleSearchRepository:
 
         return [int(hit["_source"]["id"]) for hit in response["hits"]["hits"]]
 
+    async def search_with_filters(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            fuzzy: bool = True,
+            min_score: float = 0.5,
+            page: int = 1,
+            page_size: int = 10,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[int], Optional[int], bool]:
+        """
+        Searches for articles with a single query, the text search is scored and all the
+        other filters run in filter context where elasticsearch caches them.
+        One hit more than the page is fetched to know whether a next page exists.
+        Returns the article IDs of the requested page in the requested order, the total number
+        of hits or None with CountMode.NONE and whether a next page exists.
+        """
+        response = await self.es_client.search(
+            index=self.read_alias,
+            query=self._build_query(search_params, fuzzy=fuzzy),
+            sort=self._build_sort(search_params.sort),
+            from_=(page - 1) * page_size,
+            size=page_size + 1,
+            min_score=min_score if search_params.abstract_search else None,
+            track_scores=bool(search_params.abstract_search),
+            track_total_hits=self._track_total_hits(count_mode),
+            _source=False,
+        )
+
+        article_ids = [int(hit["_id"]) for hit in response["hits"]["hits"]]
+        total = response["hits"]["total"]["value"] if count_mode != CountMode.NONE else None
+        return article_ids[:page_size], total, len(article_ids) > page_size
+
+    async def search_after_page(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page_size: int = 10,
+            pit_id: Optional[str] = None,
+            search_after: Optional[list] = None,
+            keep_alive: str = "1m",
+            fuzzy: bool = True,
+            min_score: float = 0.5,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[int], Optional[int], str, Optional[list]]:
+        """
+        Fetches the page following search_after from a point in time, so that every page costs
+        the same as the first one. A point in time is opened when pit_id is not given and the hits
+        are only counted on that first page, as the count mode asks.
+        Returns the article IDs of the page, the total hits or None, the point in time id to use
+        for the next page and the sort values of the last hit.
+        """
+        if pit_id is None:
+            response = await self.es_client.open_point_in_time(index=self.read_alias, keep_alive=keep_alive)
+            pit_id = response["id"]
+
+        response = await self.es_client.search(
+            pit={"id": pit_id, "keep_alive": keep_alive},
+            query=self._build_query(search_params, fuzzy=fuzzy),
+            sort=self._build_sort(search_params.sort),
+            search_after=search_after,
+            size=page_size,
+            min_score=min_score if search_params.abstract_search else None,
+            track_scores=bool(search_params.abstract_search),
+            track_total_hits=self._track_total_hits(count_mode) if search_after is None else False,
+            _source=False,
+        )
+
+        hits = response["hits"]["hits"]
+        counted = search_after is None and count_mode != CountMode.NONE
+        total = response["hits"]["total"]["value"] if counted else None
+        return [int(hit["_id"]) for hit in hits], total, response["pit_id"], hits[-1]["sort"] if hits else None
+
+    async def scan_matching_ids(
+            self,
+            search_params: ArticleSearchFilters,
+            *,
+            batch_size: int = 1000,
+            keep_alive: str = "1m",
+            fuzzy: bool = True
+    ) -> AsyncIterator[List[int]]:
+        """
+        Yields the ids of all the articles matching the filters in batches and in the order of the search,
+        paging through a point in time so that there is no cap on the number of hits
+        """
+        pit_id = None
+        search_after = None
+        try:
+            while True:
+                article_ids, _, pit_id, search_after = await self.search_after_page(
+                    search_params=search_params,
+                    page_size=batch_size,
+                    pit_id=pit_id,
+                    search_after=search_after,
+                    keep_alive=keep_alive,
+                    fuzzy=fuzzy,
+                    count_mode=CountMode.NONE,
+                )
+                if article_ids:
+                    yield article_ids
+                if len(article_ids) < batch_size:
+                    return
+        finally:
+            if pit_id is not None:
+                await self.close_point_in_time(pit_id)
+
+    async def close_point_in_time(self, pit_id: str) -> None:
+        """Releases the resources of a point in time before it expires"""
+        try:
+            await self.es_client.close_point_in_time(id=pit_id)
+        except NotFoundError:
+            pass
+
+    @classmethod
+    def _build_query(cls, search_params: ArticleSearchFilters, fuzzy: bool = True) -> dict:
+        """Build the bool query of the given filters"""
+        must = []
+        filters = []
+
+        if search_params.abstract_search:
+            must.append({
+                "match": {
+                    "abstract": {
+                        "query": search_params.abstract_search,
+                        "fuzziness": "AUTO" if fuzzy else 0,
+                        "minimum_should_match": "70%"
+                    }
+                }
+            })
+
+        if search_params.title:
+            filters.append({"wildcard": {"title.keyword": {"value": cls._contains_pattern(search_params.title)}}})
+
+        if search_params.publication_year:
+            filters.append({
+                "range": {
+                    "publication_date": {
+                        "gte": f"{search_params.publication_year:04d}-01-01",
+                        "lt": f"{search_params.publication_year + 1:04d}-01-01"
+                    }
+                }
+            })
+
+        if search_params.author:
+            filters.append({
+                "wildcard": {"author_names.keyword": {"value": cls._contains_pattern(search_params.author)}}
+            })
+
+        return {
+            "bool": {
+                "must": must or [{"match_all": {}}],
+                "filter": filters
+            }
+        }
+
+    @staticmethod
+    def _track_total_hits(count_mode: CountMode) -> Union[bool, int]:
+        """How many hits elasticsearch counts in the given count mode"""
+        if count_mode == CountMode.EXACT:
+            return True
+        if count_mode == CountMode.ESTIMATE:
+            return ESTIMATE_TRACK_TOTAL_HITS
+        return False
+
+    @staticmethod
+    def _build_sort(sort: ArticleSortOrder) -> List[dict]:
+        """Build the sort of the given order, ties are broken by id so that pages are stable between calls"""
+        if sort == ArticleSortOrder.PUBLICATION_DATE:
+            return [{"publication_date": {"order": "desc"}}, {"id": {"order": "desc"}}]
+        if sort == ArticleSortOrder.TITLE:
+            return [{"title.keyword": {"order": "asc"}}, {"id": {"order": "asc"}}]
+        if sort == ArticleSortOrder.NEWEST:
+            return [{"id": {"order": "desc"}}]
+        if sort == ArticleSortOrder.OLDEST:
+            return [{"id": {"order": "asc"}}]
+        return [{"_score": {"order": "desc"}}, {"id": {"order": "asc"}}]
+
+    @staticmethod
+    def _contains_pattern(value: str) -> str:
+        """Case insensitive wildcard pattern matching the value anywhere in a keyword"""
+        escaped = re.sub(r"([\\*?])", r"\\\1", value.lower())
+        return f"*{escaped}*"
+
     async def verify_article_indexed(self, article_id: int) -> dict | None:
         """
         Retrieves an indexed article directly from Elasticsearch.
@@ -97,11 +543,10 @@ class ArticleSearchRepository:
         """
         try:
             result = await self.es_client.get(
-                index=self.index_name,
+                index=self.write_alias,
                 id=str(article_id)
             )
             return result['_source']
         except Exception as e:
             print(f"Error retrieving article {article_id}: {str(e)}")
             return None
-
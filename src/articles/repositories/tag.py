@@ -1,10 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.articles.models.tag import Tag
-from src.articles.repositories.base import BaseRepository
+from src.articles.repositories.base import NamedRepository
 from src.articles.schemas.tag import TagCreate, TagUpdate
 
 
-class TagRepository(BaseRepository[Tag, TagCreate, TagUpdate]):
+class TagRepository(NamedRepository[Tag, TagCreate, TagUpdate]):
     def __init__(self, db: AsyncSession):
         super().__init__(Tag, db)
@@ -1,4 +1,4 @@
-from .article import ArticleSchema, ArticleCreate, ArticleUpdate, ArticleSearchFilters
+from .article import ArticleSchema, ArticleCreate, ArticleUpdate, ArticleSearchFilters, ArticleSortOrder
 from .author import Author, AuthorCreate, AuthorUpdate
 from .tag import Tag, TagCreate, TagUpdate
 from .user import UserSchema, UserCreate, UserUpdate
@@ -6,7 +6,7 @@ from .comment import Comment, CommentCreate, CommentUpdate
 
 
 __all__ = [
-    "ArticleSchema", "ArticleCreate", "ArticleUpdate", "ArticleSearchFilters",
+    "ArticleSchema", "ArticleCreate", "ArticleUpdate", "ArticleSearchFilters", "ArticleSortOrder",
     "Author", "AuthorCreate", "AuthorUpdate",
     "Tag", "TagCreate", "TagUpdate",
     "UserSchema", "UserCreate", "UserUpdate",
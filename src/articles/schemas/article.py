@@ -1,12 +1,16 @@
+import os
 from datetime import datetime
+from enum import Enum
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from src.articles.core.config.factory import get_settings
 from src.articles.schemas.author import Author
 from src.articles.schemas.base import BaseSchema
 from src.articles.schemas.tag import Tag
 
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
 
 class ArticleBase(BaseSchema):
     title: str
@@ -35,9 +39,43 @@ class ArticleSchema(ArticleBase):
     owner_id: int
 
 
+class ArticleBulkCreate(BaseModel):
+    items: List[ArticleCreate] = Field(..., min_length=1, max_length=settings.ARTICLE_BULK_MAX_ITEMS)
+
+
+class ArticleBulkItemResult(BaseModel):
+    index: int
+    article: Optional[ArticleSchema] = None
+    error: Optional[str] = None
+
+
+class ArticleBulkResult(BaseModel):
+    created: int
+    failed: int
+    # created articles elasticsearch rejected, their items carry both the article and the error
+    not_indexed: int = 0
+    items: List[ArticleBulkItemResult]
+
+
+class ArticleSortOrder(str, Enum):
+    RELEVANCE = "relevance"
+    NEWEST = "newest"
+    OLDEST = "oldest"
+    PUBLICATION_DATE = "publication_date"
+    TITLE = "title"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
 class ArticleSearchFilters(BaseModel):
     title: Optional[str] = None
-    publication_year: Optional[int] = None
+    publication_year: Optional[int] = Field(None, ge=1, le=9998)
     author: Optional[str] = None
     abstract_search: Optional[str] = None
+    sort: ArticleSortOrder = ArticleSortOrder.RELEVANCE
 
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
+from src.articles.schemas.article import ExportFormat
+from src.articles.schemas.base import BaseSchema
+
+
+class ArticleExportSchema(BaseSchema):
+    id: str
+    format: ExportFormat
+    compressed: bool
+    status: str
+    bytes_written: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
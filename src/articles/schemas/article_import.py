@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import computed_field
+
+from src.articles.schemas.base import BaseSchema
+
+
+class ArticleImportSchema(BaseSchema):
+    id: int
+    filename: str
+    status: str
+    bytes_total: int
+    bytes_read: int
+    rows_imported: int
+    rows_failed: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        """the share of the file that was imported, from 0 to 1"""
+        return round(self.bytes_read / self.bytes_total, 4) if self.bytes_total else 1.0
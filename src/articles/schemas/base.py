@@ -1,5 +1,7 @@
 from datetime import datetime
-from typing import List
+from enum import Enum
+from math import ceil
+from typing import List, Optional, Sequence
 
 from pydantic import BaseModel, ConfigDict
 from typing_extensions import Generic, TypeVar
@@ -16,10 +18,63 @@ class BaseSchema(BaseModel):
     )
 
 
+class CountMode(str, Enum):
+    """How the total of a paginated result is counted"""
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
 class PaginationSchema(BaseSchema, Generic[T]):
     model_config = ConfigDict(from_attributes=True)
 
     items: List[T]
     current_page: int
-    total_pages: int
-    total_items: int
+    total_pages: Optional[int] = None
+    total_items: Optional[int] = None
+    has_next: Optional[bool] = None
+    count_mode: CountMode = CountMode.EXACT
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_page(
+            cls,
+            *,
+            items: Sequence,
+            current_page: int,
+            page_size: int,
+            total_items: Optional[int],
+            has_next: bool,
+            count_mode: CountMode,
+            estimate_cap: Optional[int] = None,
+            next_cursor: Optional[str] = None
+    ) -> "PaginationSchema":
+        """
+        build a page from the counts of the given count mode, the totals stay empty with CountMode.NONE
+        :param items: the items of the page
+        :param current_page: the page number
+        :param page_size: the size of the pages
+        :param total_items: the counted or estimated total, None when not counted
+        :param has_next: whether a page follows this one
+        :param count_mode: the count mode that produced total_items
+        :param estimate_cap: the maximum estimated total, estimates are never below the items seen so far
+        :param next_cursor: the cursor of the next page in cursor mode
+        :return: the pagination schema
+        """
+        if count_mode == CountMode.NONE:
+            total_items = None
+        elif count_mode == CountMode.ESTIMATE and total_items is not None:
+            if estimate_cap is not None:
+                total_items = min(total_items, estimate_cap)
+            seen = (current_page - 1) * page_size + len(items) + (1 if has_next else 0)
+            total_items = max(total_items, seen)
+
+        return cls(
+            items=items,
+            current_page=current_page,
+            total_pages=None if total_items is None else ceil(total_items / page_size),
+            total_items=total_items,
+            has_next=has_next,
+            count_mode=count_mode,
+            next_cursor=next_cursor,
+        )
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel
@@ -21,3 +22,8 @@ class CommentUpdate(BaseModel):
 class Comment(CommentBase):
     id: int
     user_id: int
+
+
+class CommentSortOrder(str, Enum):
+    NEWEST = "newest"
+    OLDEST = "oldest"
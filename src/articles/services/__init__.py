@@ -1,9 +1,12 @@
 from .article import ArticleService
 from .author import AuthorService
 from .comment import CommentService
+from .search_index import SearchIndexService
 from .tag import TagService
 from .user import UserService
 
 
-__all__ = ["ArticleService", "AuthorService", "CommentService", "TagService", "UserService"]
+__all__ = [
+    "ArticleService", "AuthorService", "CommentService", "SearchIndexService", "TagService", "UserService"
+]
 
@@ -1,13 +1,12 @@
-import pandas as pd
+import os
 
-from io import BytesIO
-from math import ceil
-from typing import List
+from typing import AsyncIterator, List, Optional, Sequence
 
+from elasticsearch import NotFoundError
 from fastapi import HTTPException
-from sqlalchemy import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.articles.core.config.factory import get_settings
 from src.articles.core.error_messages import ErrorMessages
 from src.articles.models.article import Article
 from src.articles.repositories.article import ArticleRepository
@@ -15,29 +14,75 @@ from src.articles.repositories.author import AuthorRepository
 from src.articles.repositories.base import BaseRepository
 from src.articles.repositories.search_repository import ArticleSearchRepository
 from src.articles.repositories.tag import TagRepository
-from src.articles.schemas.article import ArticleCreate, ArticleUpdate, ArticleSearchFilters, ArticleSchema
-from src.articles.schemas.base import PaginationSchema
+from src.articles.schemas.article import (
+    ArticleBulkItemResult,
+    ArticleBulkResult,
+    ArticleCreate,
+    ArticleUpdate,
+    ArticleSearchFilters,
+    ArticleSchema,
+    ExportFormat,
+)
+from src.articles.schemas.base import CountMode, PaginationSchema
 from src.articles.services.base import BaseService, ModelType
+from src.articles.services.cache_invalidation import get_invalidation_publisher
+from src.articles.services.entity_cache import EntityCache
+from src.articles.services.search_cache import SearchResultCache
+from src.articles.services.search_outbox import ArticleIndexer, SearchOutboxIndexer
+from src.articles.utils.article_export import CsvExportEncoder, ExportEncoder, create_encoder
+from src.articles.utils.cursor import START_CURSOR, decode_cursor, encode_cursor, fingerprint
 from src.articles.utils.logging import setup_logging
 
 logger = setup_logging(__name__)
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
 
 
 class ArticleService(BaseService[Article, ArticleCreate, ArticleUpdate, ArticleRepository]):
     owner_field = "owner_id"
-
-    def __init__(self, db: AsyncSession, search_repository: ArticleSearchRepository):
-        super().__init__(ArticleRepository, db)
+    cache_entity = "articles"
+    read_schema = ArticleSchema
+
+    def __init__(
+            self,
+            db: AsyncSession,
+            search_repository: ArticleSearchRepository,
+            indexer: Optional[ArticleIndexer] = None,
+            search_cache: Optional[SearchResultCache] = None,
+            entity_cache: Optional[EntityCache] = None
+    ):
+        super().__init__(ArticleRepository, db, entity_cache)
         self.search_repository = search_repository
+        # writes are indexed through the queue or the outbox when given, else synchronously
+        self.indexer = indexer or search_repository
+        self.search_cache = search_cache
         self.author_repository = AuthorRepository(db)
         self.tag_repository = TagRepository(db)
 
-    async def create(self, *, obj: ArticleCreate) -> Article:
+    async def get_by_id(self, obj_id: int) -> ArticleSchema:
+        """
+        get an article with its authors and tags, read in a single statement without ORM objects,
+        through the entity cache when the service has one
+        :param obj_id: the article id
+        :return: the article
+        """
+        if self.entity_cache is not None:
+            article = await self.entity_cache.get_or_load(
+                self.cache_entity, obj_id, ArticleSchema, lambda: self.repository.get_read_model(obj_id)
+            )
+        else:
+            article = await self.repository.get_read_model(obj_id)
+        if not article:
+            raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
+        return article
+
+    async def create(self, *, obj: ArticleCreate, refresh: bool = False) -> ArticleSchema:
         """
-        create a new article
+        create a new article, the authors and tags are validated with one query each
         :param obj: the article to be created
+        :param refresh: wait until the article is visible to searches, it is committed first
         :return: the created article
         """
+        after_commit = self._refreshes_after_commit(refresh)
         async with self.db.begin_nested():
             authors = await self._get_authors_by_ids(obj.author_ids)
             tags = await self._get_tags_by_ids(obj.tag_ids)
@@ -48,121 +93,437 @@ class ArticleService(BaseService[Article, ArticleCreate, ArticleUpdate, ArticleR
                 authors=authors,
                 tags=tags,
             )
-            await self.search_repository.index_article(article)
-            indexed_doc = await self.search_repository.verify_article_indexed(article.id)
-            if indexed_doc:
-                logger.info(f"Article {article.id} was indexed")
-            else:
-                logger.info(f"Article {article.id} was not indexed")
-
-            return article
+            if not after_commit:
+                await self.indexer.index_article(article, refresh=refresh)
+            # the other workers drop their cached search pages once the article is committed
+            get_invalidation_publisher().publish(self.db, self.cache_entity, article.id)
+
+        if after_commit:
+            await self.db.commit()
+            await self.indexer.index_article(article, refresh=True)
+        self._invalidate_search_cache()
+        return article
+
+    async def bulk_create(self, *, objs: Sequence[ArticleCreate], refresh: bool = False) -> ArticleBulkResult:
+        """
+        create many articles at once, the authors and tags of all the articles are validated with one
+        query each, the valid articles are inserted together and indexed with one bulk request.
+        Articles referencing missing authors or tags are reported as failed, the others are still created.
+        Created articles elasticsearch rejected are reported with the article and the indexing error.
+        :param objs: the articles to be created, at most ARTICLE_BULK_MAX_ITEMS as validated by ArticleBulkCreate
+        :param refresh: wait until the articles are visible to searches, they are committed first
+        :return: the result of every item, in the order of the given articles
+        """
+        authors = await self.author_repository.get_by_ids(list(dict.fromkeys(
+            author_id for obj in objs for author_id in obj.author_ids
+        )))
+        tags = await self.tag_repository.get_by_ids(list(dict.fromkeys(
+            tag_id for obj in objs for tag_id in obj.tag_ids
+        )))
+        authors_by_id = {author.id: author for author in authors}
+        tags_by_id = {tag.id: tag for tag in tags}
+
+        results = [ArticleBulkItemResult(index=index) for index in range(len(objs))]
+        valid = []
+        for result, obj in zip(results, objs):
+            missing_authors = [author_id for author_id in obj.author_ids if author_id not in authors_by_id]
+            missing_tags = [tag_id for tag_id in obj.tag_ids if tag_id not in tags_by_id]
+            if missing_authors or missing_tags:
+                result.error = self._missing_references_error(missing_authors, missing_tags)
+                continue
 
+            article_data = obj.model_dump(exclude={"author_ids", "tag_ids"})
+            article_authors = [authors_by_id[author_id] for author_id in dict.fromkeys(obj.author_ids)]
+            article_tags = [tags_by_id[tag_id] for tag_id in dict.fromkeys(obj.tag_ids)]
+            valid.append((result, (article_data, article_authors, article_tags)))
+
+        index_errors = {}
+        if valid:
+            after_commit = self._refreshes_after_commit(refresh)
+            async with self.db.begin_nested():
+                articles = await self.repository.bulk_create_with_relationships([item for _, item in valid])
+                # waits for the bulk request even through the queue, so rejected documents can be reported
+                if not after_commit:
+                    index_errors = await self.indexer.index_articles(articles, refresh=refresh, wait=True)
+                for article in articles:
+                    get_invalidation_publisher().publish(self.db, self.cache_entity, article.id)
+
+            if after_commit:
+                await self.db.commit()
+                index_errors = await self.indexer.index_articles(articles, refresh=True, wait=True)
+            self._invalidate_search_cache()
+            for (result, _), article in zip(valid, articles):
+                result.article = article
+                if article.id in index_errors:
+                    result.error = f"{ErrorMessages.ARTICLE_NOT_INDEXED.value}: {index_errors[article.id]}"
+
+        created = len(valid)
+        return ArticleBulkResult(
+            created=created,
+            failed=len(objs) - created,
+            not_indexed=len(index_errors),
+            items=results
+        )
 
-    async def update(self, *, obj_id: int, obj: ArticleUpdate, user_id: int) -> Article:
+    async def update(self, *, obj_id: int, obj: ArticleUpdate, user_id: int, refresh: bool = False) -> ArticleSchema:
         """
         update an article
         :param obj_id: the article id
         :param obj: the payload containing the updated data
         :param user_id: the user attempting to update the article
+        :param refresh: wait until the changes are visible to searches, they are committed first
         :return: the updated article
         """
+        after_commit = self._refreshes_after_commit(refresh)
         async with self.db.begin_nested():
-            article = await self.repository.get_by_id(obj_id)
+            article = await self.repository.get_read_model(obj_id)
             if not article:
                 raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
 
             await self._check_ownership(db_obj=article, user_id=user_id)
 
-            if obj.author_ids is not None:
-                article.authors = await self._get_authors_by_ids(obj.author_ids)
-
-            if obj.tag_ids is not None:
-                article.tags = await self._get_tags_by_ids(obj.tag_ids)
+            authors = await self._get_authors_by_ids(obj.author_ids) if obj.author_ids is not None else None
+            tags = await self._get_tags_by_ids(obj.tag_ids) if obj.tag_ids is not None else None
 
             updated_data = obj.model_dump(exclude={"author_ids", "tag_ids"}, exclude_unset=True)
 
-            return await self.repository.update(db_obj=article, obj_in=updated_data)
+            updated_article = await self.repository.update_with_relationships(
+                article=article,
+                obj_in_data=updated_data,
+                authors=authors,
+                tags=tags,
+            )
+            if not after_commit:
+                await self.indexer.index_article(updated_article, refresh=refresh)
+            await self._invalidate_cached(obj_id)
+
+        if after_commit:
+            await self.db.commit()
+            await self.indexer.index_article(updated_article, refresh=True)
+        self._invalidate_search_cache()
+        return updated_article
 
-    async def search(self, *, search_params: ArticleSearchFilters, page: int = 1, page_size: int = 10) -> PaginationSchema[ArticleSchema]:
+    async def delete(self, *, obj_id: int, user_id: int, refresh: bool = False) -> Article:
+        """
+        delete an article
+        :param obj_id: the article id
+        :param user_id: the user attempting to delete the article
+        :param refresh: wait until the article is removed from the search results, the removal is committed first
+        :return: the deleted article
+        """
+        article = await super().delete(obj_id=obj_id, user_id=user_id)
+        if self._refreshes_after_commit(refresh):
+            await self.db.commit()
+        await self.indexer.delete_article(obj_id, refresh=refresh)
+        self._invalidate_search_cache()
+        return article
+
+    def _refreshes_after_commit(self, refresh: bool) -> bool:
+        """
+        whether a write is sent to the index once the request transaction committed, which is the case when it
+        waits for the refresh, so no transaction and connection is held open while elasticsearch refreshes.
+        The outbox records the write in the transaction itself and can not refresh.
+        :param refresh: whether the write waits until it is visible to searches
+        """
+        return refresh and not isinstance(self.indexer, SearchOutboxIndexer)
+
+    async def search(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page: int = 1,
+            page_size: int = 10,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> PaginationSchema[ArticleSchema]:
         """
         Dynamic search based on parameters against the articles stored in the database.
+        Abstract text searches are answered together with all the other filters by a single
+        elasticsearch query, only the articles of the requested page are then loaded from the database.
         :param search_params: pydantic object containing the parameters to search for.
         :param page: the page number
         :param page_size: the items per page
+        :param cursor: the next_cursor of the previous page or "*" to start, the page is then ignored
+        :param count_mode: exact, estimate or none to only report whether a next page exists
         :return: a paginated result of items
         """
-        elastic_ids = None
-        if search_params.abstract_search:
-            elastic_ids = await self.search_repository.search_articles(
-                query=search_params.abstract_search,
-                fuzzy=True,
-                size=1000
+        if search_params.abstract_search and cursor:
+            return await self._search_after(
+                search_params=search_params, page_size=page_size, cursor=cursor, count_mode=count_mode
+            )
+        if cursor:
+            return await self._keyset_page(
+                search_params=search_params, page_size=page_size, cursor=cursor, count_mode=count_mode
+            )
+
+        if self.search_cache is None:
+            return await self._search_page(
+                search_params=search_params, page=page, page_size=page_size, count_mode=count_mode
             )
 
+        cached_page = self.search_cache.get(
+            search_params=search_params, page=page, page_size=page_size, count_mode=count_mode
+        )
+        if cached_page is not None:
+            return cached_page
 
-        items, total_items = await self.repository.search_with_filters(
+        generation = self.search_cache.generation
+        result = PaginationSchema[ArticleSchema].model_validate(
+            await self._search_page(search_params=search_params, page=page, page_size=page_size, count_mode=count_mode)
+        )
+        self.search_cache.set(
             search_params=search_params,
-            elastic_ids=elastic_ids,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            count_mode=count_mode,
+            result=result,
+            generation=generation,
         )
+        return result
+
+    async def _search_page(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page: int,
+            page_size: int,
+            count_mode: CountMode
+    ) -> PaginationSchema[ArticleSchema]:
+        """Offset paginated search, in elasticsearch for abstract searches and in the database otherwise"""
+        if search_params.abstract_search:
+            # the page and the hit fetched to know whether a next page exists, elasticsearch refuses to page past
+            # its result window
+            if page * page_size + 1 > settings.SEARCH_MAX_RESULT_WINDOW:
+                raise HTTPException(status_code=400, detail=ErrorMessages.PAGE_TOO_DEEP.value)
+            article_ids, total_items, has_next = await self.search_repository.search_with_filters(
+                search_params=search_params,
+                fuzzy=True,
+                page=page,
+                page_size=page_size,
+                count_mode=count_mode
+            )
+            items = await self.repository.get_read_models(article_ids)
+        else:
+            items, total_items, has_next = await self.repository.search_with_filters(
+                search_params=search_params,
+                page=page,
+                page_size=page_size,
+                count_mode=count_mode
+            )
 
-        total_pages = ceil(total_items / page_size)
-        return PaginationSchema(
+        return PaginationSchema.from_page(
             items=items,
             current_page=page,
-            total_pages=total_pages,
+            page_size=page_size,
             total_items=total_items,
+            has_next=has_next,
+            count_mode=count_mode,
+            estimate_cap=settings.PAGINATION_ESTIMATE_CAP,
         )
 
-    async def export_search_to_csv(self, *, search_params: ArticleSearchFilters) -> BytesIO:
-        """Export search results to a CSV file."""
-        elastic_ids = None
-        if search_params.abstract_search:
-            elastic_ids = await self.search_repository.search_articles(
-                query=search_params.abstract_search,
-                fuzzy=True,
-                size=1000
+    async def _search_after(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page_size: int,
+            cursor: str,
+            count_mode: CountMode
+    ) -> PaginationSchema[ArticleSchema]:
+        """
+        Abstract search paginated with an elasticsearch point in time, the cursor carries the point in time,
+        the sort values of the last hit, the page number and the total hits counted on the first page.
+        """
+        state = self._decode_search_cursor(cursor, search_params, count_mode)
+
+        try:
+            article_ids, total, pit_id, last_sort = await self.search_repository.search_after_page(
+                search_params=search_params,
+                page_size=page_size,
+                pit_id=state.get("pit"),
+                search_after=state.get("after"),
+                keep_alive=settings.SEARCH_PIT_KEEP_ALIVE,
+                count_mode=count_mode,
             )
+        except NotFoundError:
+            raise HTTPException(status_code=410, detail=ErrorMessages.CURSOR_EXPIRED.value)
 
-        articles = await self.repository.get_all_with_filters(
-            search_params=search_params,
-            elastic_ids=elastic_ids
+        total_items = state.get("total", total)
+        current_page = state.get("page", 0) + 1
+
+        # without an exact total a full page is assumed to have a next one
+        has_next = len(article_ids) == page_size and (
+            count_mode != CountMode.EXACT or current_page * page_size < total_items
         )
+        next_cursor = None
+        if has_next:
+            next_cursor = encode_cursor({
+                "pit": pit_id,
+                "after": last_sort,
+                "page": current_page,
+                "total": total_items,
+                "count": count_mode.value,
+                "filters": fingerprint(search_params),
+            })
+        else:
+            await self.search_repository.close_point_in_time(pit_id)
 
-        # Convert articles to a list of dictionaries for pandas
-        articles_data = []
-        for article in articles:
-            articles_data.append({
-                'ID': article.id,
-                'Title': article.title,
-                'Abstract': article.abstract,
-                'Publication Date': article.publication_date.strftime('%Y-%m-%d'),
-                'Authors': ', '.join(author.name for author in article.authors),
-                'Tags': ', '.join(tag.name for tag in article.tags),
-                'Owner ID': article.owner_id
+        items = await self.repository.get_read_models(article_ids)
+        return PaginationSchema.from_page(
+            items=items,
+            current_page=current_page,
+            page_size=page_size,
+            total_items=total_items,
+            has_next=has_next,
+            count_mode=count_mode,
+            estimate_cap=settings.PAGINATION_ESTIMATE_CAP,
+            next_cursor=next_cursor,
+        )
+
+    async def _keyset_page(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page_size: int,
+            cursor: str,
+            count_mode: CountMode
+    ) -> PaginationSchema[ArticleSchema]:
+        """
+        Database search paginated by the sort key of the last article, the cursor carries that key, the page
+        number and the total counted on the first page, so every following page is a single index range scan.
+        """
+        state = self._decode_search_cursor(cursor, search_params, count_mode)
+
+        after = None
+        if state:
+            try:
+                after = ArticleRepository.parse_keyset(search_params.sort, state.get("after"))
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail=ErrorMessages.INVALID_CURSOR.value)
+
+        items, total, has_next = await self.repository.search_after(
+            search_params=search_params,
+            page_size=page_size,
+            after=after,
+            count_mode=CountMode.NONE if state else count_mode,
+        )
+        total_items = state.get("total") if state else total
+        current_page = state.get("page", 0) + 1
+
+        next_cursor = None
+        if has_next:
+            next_cursor = encode_cursor({
+                "after": ArticleRepository.keyset_values(items[-1], search_params.sort),
+                "page": current_page,
+                "total": total_items,
+                "count": count_mode.value,
+                "filters": fingerprint(search_params),
             })
 
-        # Create DataFrame
-        df = pd.DataFrame(articles_data)
+        return PaginationSchema.from_page(
+            items=items,
+            current_page=current_page,
+            page_size=page_size,
+            total_items=total_items,
+            has_next=has_next,
+            count_mode=count_mode,
+            estimate_cap=settings.PAGINATION_ESTIMATE_CAP,
+            next_cursor=next_cursor,
+        )
 
-        # Create BytesIO object to store CSV
-        output = BytesIO()
-        df.to_csv(output, index=False, encoding='utf-8-sig')  # utf-8-sig for Excel compatibility
-        output.seek(0)  # Reset buffer position to beginning
+    @staticmethod
+    def _decode_search_cursor(cursor: str, search_params: ArticleSearchFilters, count_mode: CountMode) -> dict:
+        """The state of a search cursor, rejected when it was created for other filters or another count mode"""
+        state = {} if cursor == START_CURSOR else decode_cursor(cursor)
+        if state and (state.get("filters") != fingerprint(search_params) or state.get("count") != count_mode.value):
+            raise HTTPException(status_code=400, detail=ErrorMessages.INVALID_CURSOR.value)
+        return state
+
+    def _invalidate_search_cache(self) -> None:
+        """Article writes make every cached search page outdated"""
+        if self.search_cache is not None:
+            self.search_cache.invalidate(self.db)
+
+    @staticmethod
+    def get_export_encoder(export_format: ExportFormat) -> ExportEncoder:
+        """
+        The encoder of an export format, checked before the export starts streaming
+        :param export_format: the format of the export
+        :return: a new encoder
+        """
+        encoder = create_encoder(export_format)
+        if encoder is None:
+            raise HTTPException(status_code=400, detail=ErrorMessages.EXPORT_FORMAT_UNAVAILABLE.value)
+        return encoder
+
+    async def export_search(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            encoder: ExportEncoder,
+            chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Export the search results, encoded and yielded chunk by chunk while the rows are streamed
+        from the database, so the memory used does not grow with the size of the export.
+        The ids of abstract text searches are gathered from elasticsearch through a point in time, already in the
+        requested sort over the whole export, and their rows keep that order.
+        :param search_params: the filters to search for
+        :param encoder: the encoder of the export format
+        :param chunk_size: the number of articles per database round trip and per encoded chunk,
+        by default a row group for the columnar formats
+        :return: an async iterator of the encoded export
+        """
+        if chunk_size is None:
+            chunk_size = (
+                settings.ARTICLE_EXPORT_ROW_GROUP_SIZE if encoder.columnar else settings.ARTICLE_EXPORT_CHUNK_SIZE
+            )
 
-        return output
+        yield encoder.start()
+
+        if not search_params.abstract_search:
+            async for rows in self.repository.stream_export_rows(search_params=search_params, chunk_size=chunk_size):
+                yield encoder.encode(rows)
+        else:
+            async for elastic_ids in self.search_repository.scan_matching_ids(search_params, batch_size=chunk_size):
+                async for rows in self.repository.stream_export_rows(
+                        search_params=search_params,
+                        elastic_ids=elastic_ids,
+                        chunk_size=chunk_size
+                ):
+                    yield encoder.encode(rows)
+
+        # only the columnar formats have a footer or an end of stream marker
+        end = encoder.finish()
+        if end:
+            yield end
+
+    def export_search_to_csv(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            chunk_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Export the search results as CSV, see export_search"""
+        return self.export_search(search_params=search_params, encoder=CsvExportEncoder(), chunk_size=chunk_size)
 
     async def _get_entities_by_ids(self, *, ids: Sequence[int], base_repository: BaseRepository) -> List[ModelType]:
-        """Helper method to fetch multiple entities by ids and validate that they exist"""
-        entities = []
-        for entity_id in ids:
-            entity = await base_repository.get_by_id(entity_id)
-            if not entity:
-                raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
-            entities.append(entity)
+        """Helper method to fetch multiple entities by ids with one query and validate that they all exist"""
+        unique_ids = list(dict.fromkeys(ids))
+        entities = await base_repository.get_by_ids(unique_ids)
+        if len(entities) != len(unique_ids):
+            raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
         return entities
 
+    @staticmethod
+    def _missing_references_error(missing_authors: Sequence[int], missing_tags: Sequence[int]) -> str:
+        """The error of a bulk item referencing authors or tags that do not exist"""
+        errors = []
+        if missing_authors:
+            errors.append(f"authors {missing_authors} not found")
+        if missing_tags:
+            errors.append(f"tags {missing_tags} not found")
+        return f"{ErrorMessages.NOT_FOUND.value}: {', '.join(errors)}"
+
     async def _get_authors_by_ids(self, author_ids: Sequence[int]) -> List[ModelType]:
         """Helper method to fetch authors by their ids"""
         return await self._get_entities_by_ids(ids=author_ids, base_repository=self.author_repository)
@@ -0,0 +1,289 @@
+import asyncio
+import gzip
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import BinaryIO, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.articles.core.error_messages import ErrorMessages
+from src.articles.models.article_export import ArticleExport
+from src.articles.repositories.article_export import ArticleExportRepository
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.schemas.article import ArticleSearchFilters, ExportFormat
+from src.articles.services.article import ArticleService
+from src.articles.utils.cursor import fingerprint
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# the idle workers remove the expired exports no more often than this many seconds
+PRUNE_INTERVAL = 60.0
+
+
+class ExportTakenOver(Exception):
+    """Another process took over an export whose progress looked stale, this process stops writing it"""
+
+
+class ArticleExportService:
+    """
+    Runs article exports as background jobs recorded in the article_exports table. Every process runs a bounded
+    pool of workers that claim the pending jobs of all the processes, locked rows are skipped, so no more than
+    `workers` exports per process hold a database connection at once whatever the number of requests, and any
+    process answers for any job. Each job writes its artifact, gzip compressed when asked, to the export
+    directory shared by the processes, where it is downloaded from until the retention passed. Identical
+    requests of a user share the job that is still pending or running, whichever process received them, and a
+    running job whose progress did not move for `stale_after` seconds is taken over, its process is assumed gone.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            search_repository: ArticleSearchRepository,
+            *,
+            directory: str = "exports",
+            workers: int = 2,
+            max_queued: int = 100,
+            retention: float = 3600.0,
+            poll_interval: float = 1.0,
+            stale_after: float = 300.0,
+            progress_interval: float = 5.0
+    ):
+        self.session_factory = session_factory
+        self.search_repository = search_repository
+        self.directory = directory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        # the idle workers look for the jobs submitted to other processes this often
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        # a running job reports its progress this often, which keeps it from being taken over
+        self.progress_interval = progress_interval
+        # set by submit() so the workers of this process start on a new job without waiting for the poll
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._pruned: Optional[float] = None
+
+    async def start(self) -> None:
+        """Start the workers, files outlived by the retention in an earlier run are removed first"""
+        if self._workers:
+            return
+        await asyncio.to_thread(self._remove_expired_files)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers, the running exports fail and their partial files are removed"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+            self,
+            *,
+            owner_id: int,
+            search_params: ArticleSearchFilters,
+            export_format: ExportFormat,
+            compressed: bool = False
+    ) -> ArticleExport:
+        """
+        record a pending export, or join the pending or running export of the same request
+        :param owner_id: the user asking for the export, only the owner may see and download it
+        :param search_params: the filters to search for
+        :param export_format: the format of the export
+        :param compressed: gzip the artifact
+        :return: the job of the export
+        """
+        key = f"{export_format.value}:{int(compressed)}:{fingerprint(search_params)}"
+        # rejects formats that can not be written before anything is recorded
+        encoder = ArticleService.get_export_encoder(export_format)
+        extension = f"{encoder.extension}.gz" if compressed else encoder.extension
+
+        job = None
+        while job is None:
+            job_id = uuid.uuid4().hex
+            async with self.session_factory() as db:
+                async with db.begin():
+                    repository = ArticleExportRepository(db)
+                    # counted over all the processes, concurrent requests may pass the limit by a few jobs
+                    if await repository.count_pending() >= self.max_queued:
+                        raise HTTPException(status_code=429, detail=ErrorMessages.EXPORT_QUEUE_FULL.value)
+                    # None when the active job of the request finished in between, the next pass records a new one
+                    job = await repository.create_or_get_active(
+                        job_id=job_id,
+                        owner_id=owner_id,
+                        key=key,
+                        search_params=search_params.model_dump(mode="json"),
+                        export_format=export_format.value,
+                        compressed=compressed,
+                        path=os.path.join(self.directory, f"{job_id}.{extension}"),
+                        filename=f"articles_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                        media_type="application/gzip" if compressed else encoder.media_type,
+                    )
+        self._wakeup.set()
+        return job
+
+    async def get_job(self, *, job_id: str, user_id: int) -> ArticleExport:
+        """
+        get an export job of a user
+        :param job_id: the id of the job
+        :param user_id: the user asking for the job, only the owner may see it
+        :return: the job
+        """
+        async with self.session_factory() as db:
+            job = await ArticleExportRepository(db).get_by_id(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
+        if job.owner_id != user_id:
+            raise HTTPException(status_code=403, detail=ErrorMessages.NOT_AUTHORIZED.value)
+        return job
+
+    async def get_artifact(self, *, job_id: str, user_id: int) -> ArticleExport:
+        """
+        get an export job of a user whose artifact can be downloaded
+        :param job_id: the id of the job
+        :param user_id: the user asking for the job, only the owner may download it
+        :return: the completed job
+        """
+        job = await self.get_job(job_id=job_id, user_id=user_id)
+        if job.status != ArticleExport.STATUS_COMPLETED:
+            raise HTTPException(status_code=409, detail=ErrorMessages.EXPORT_NOT_READY.value)
+        # removed by the retention, or written to a directory this process does not share
+        if not await asyncio.to_thread(os.path.isfile, job.path):
+            raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
+        return job
+
+    async def claim(self) -> Optional[ArticleExport]:
+        """
+        take the oldest pending job of any process, or a running job whose process is gone
+        :return: the job, now running under a new run id, None when there is nothing to run
+        """
+        async with self.session_factory() as db:
+            async with db.begin():
+                return await ArticleExportRepository(db).claim_next(
+                    run_id=uuid.uuid4().hex,
+                    stale_after=self.stale_after,
+                )
+
+    async def _work(self) -> None:
+        while True:
+            # cleared before claiming, a job submitted while claiming wakes the wait below
+            self._wakeup.clear()
+            try:
+                job = await self.claim()
+            except Exception as e:
+                logger.error(f"Could not claim an export: {str(e)}")
+                job = None
+            if job is not None:
+                await self.run(job)
+                continue
+
+            await self._prune()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, job: ArticleExport) -> None:
+        """
+        Write the artifact of a claimed job, into a partial file of the run that is renamed once it is complete
+        :param job: the job, as returned by claim()
+        """
+        partial_path = f"{job.path}.{job.run_id}.part"
+        bytes_written = 0
+        logger.info(f"Running export {job.id} as {job.format}")
+        try:
+            file = await asyncio.to_thread(self._open, partial_path, job.compressed)
+            try:
+                reported = time.monotonic()
+                async with self.session_factory() as db:
+                    article_service = ArticleService(db, self.search_repository)
+                    async for chunk in article_service.export_search(
+                            search_params=ArticleSearchFilters.model_validate(job.search_params),
+                            encoder=ArticleService.get_export_encoder(ExportFormat(job.format))
+                    ):
+                        # gzip compresses in the writing thread, off the event loop
+                        await asyncio.to_thread(file.write, chunk)
+                        bytes_written += len(chunk)
+                        if time.monotonic() - reported >= self.progress_interval:
+                            reported = time.monotonic()
+                            await self._save_progress(job, bytes_written)
+            finally:
+                await asyncio.to_thread(file.close)
+            await asyncio.to_thread(os.replace, partial_path, job.path)
+            bytes_written = await asyncio.to_thread(os.path.getsize, job.path)
+            if await self._finish(job, ArticleExport.STATUS_COMPLETED, bytes_written):
+                logger.info(f"Export {job.id} completed with {bytes_written} bytes")
+            else:
+                logger.warning(f"Export {job.id} was taken over by another process while it completed")
+        except ExportTakenOver:
+            await asyncio.to_thread(self._remove, partial_path)
+            logger.warning(f"Export {job.id} was taken over by another process")
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            await asyncio.to_thread(self._remove, partial_path)
+            # recorded even when cancelled by stop()
+            await asyncio.shield(self._finish(job, ArticleExport.STATUS_FAILED, bytes_written, error))
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Export {job.id} failed: {error}")
+
+    async def _save_progress(self, job: ArticleExport, bytes_written: int) -> None:
+        async with self.session_factory() as db:
+            async with db.begin():
+                owned = await ArticleExportRepository(db).save_progress(
+                    job_id=job.id,
+                    run_id=job.run_id,
+                    bytes_written=bytes_written,
+                )
+        if not owned:
+            raise ExportTakenOver(job.id)
+
+    async def _finish(self, job: ArticleExport, status: str, bytes_written: int, error: Optional[str] = None) -> bool:
+        async with self.session_factory() as db:
+            async with db.begin():
+                return await ArticleExportRepository(db).finish(
+                    job_id=job.id,
+                    run_id=job.run_id,
+                    status=status,
+                    bytes_written=bytes_written,
+                    error=error,
+                )
+
+    async def _prune(self) -> None:
+        """Remove the jobs outlived by the retention and their artifacts, at most every PRUNE_INTERVAL seconds"""
+        if self._pruned is not None and time.monotonic() - self._pruned < PRUNE_INTERVAL:
+            return
+        self._pruned = time.monotonic()
+        try:
+            async with self.session_factory() as db:
+                async with db.begin():
+                    paths = await ArticleExportRepository(db).delete_expired(retention=self.retention)
+        except Exception as e:
+            logger.error(f"Could not remove the expired exports: {str(e)}")
+            return
+        for path in paths:
+            await asyncio.to_thread(self._remove, path)
+
+    def _remove_expired_files(self) -> None:
+        """Remove the artifacts and the partial files of crashed runs that are older than the retention"""
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and time.time() - entry.stat().st_mtime > self.retention:
+                self._remove(entry.path)
+
+    def _open(self, path: str, compressed: bool) -> BinaryIO:
+        os.makedirs(self.directory, exist_ok=True)
+        return gzip.open(path, "wb") if compressed else open(path, "wb")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
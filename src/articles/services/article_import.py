@@ -0,0 +1,312 @@
+import asyncio
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.articles.core.config.factory import get_settings
+from src.articles.core.error_messages import ErrorMessages
+from src.articles.models.article_import import ArticleImport
+from src.articles.repositories.article import ArticleRepository
+from src.articles.repositories.article_import import ArticleImportRepository
+from src.articles.repositories.author import AuthorRepository
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.repositories.tag import TagRepository
+from src.articles.schemas.article import ArticleSchema
+from src.articles.services.index_queue import ArticleIndexQueue
+from src.articles.services.search_outbox import SearchOutboxIndexer
+from src.articles.utils.article_csv import ArticleCsvRow, parse_row, read_rows
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+
+# uploads are copied to the import directory in blocks of this many bytes
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class ImportTakenOver(Exception):
+    """Another process moved the checkpoint of an import, this process stops importing it"""
+
+
+class ArticleImportService:
+    """
+    Imports articles from CSV files in the layout of the CSV export. The file is read in chunks of rows
+    starting at the checkpoint of the import, each chunk is written with COPY in its own transaction
+    together with the new checkpoint. A stopped or failed import resumes right after the last written
+    chunk, and no more than one chunk is held in memory whatever the size of the file. An import is claimed
+    in the database before it runs and its checkpoint only moves from where the chunk was read, so two
+    processes never import the same chunk.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            search_repository: ArticleSearchRepository,
+            *,
+            index_queue: Optional[ArticleIndexQueue] = None,
+            chunk_size: int = 1000,
+            stale_after: float = 600.0,
+            on_written: Optional[Callable[[], None]] = None
+    ):
+        self.session_factory = session_factory
+        self.search_repository = search_repository
+        # the imported articles are indexed through the queue when given, else with one bulk request per chunk
+        self.index_queue = index_queue
+        self.chunk_size = chunk_size
+        self.stale_after = stale_after
+        # called after every imported chunk, e.g. to invalidate cached search results
+        self.on_written = on_written
+        self._running: Dict[int, asyncio.Task] = {}
+
+    async def create_import(self, *, owner_id: int, filename: str, source: BinaryIO) -> ArticleImport:
+        """
+        store an uploaded file in the import directory and record a pending import of it
+        :param owner_id: the user importing the articles
+        :param filename: the name of the uploaded file
+        :param source: the uploaded file, copied in blocks so it is never read into memory
+        :return: the pending import
+        """
+        path = os.path.join(settings.ARTICLE_IMPORT_DIRECTORY, f"{uuid.uuid4().hex}.csv")
+        bytes_total = await asyncio.to_thread(self._store, source, path)
+        return await self.register_file(owner_id=owner_id, filename=filename, path=path, bytes_total=bytes_total)
+
+    async def register_file(
+            self,
+            *,
+            owner_id: int,
+            filename: str,
+            path: str,
+            bytes_total: Optional[int] = None
+    ) -> ArticleImport:
+        """
+        record a pending import of a file that is already on disk
+        :param owner_id: the user importing the articles
+        :param filename: the name shown in the status of the import
+        :param path: the path of the file
+        :param bytes_total: the size of the file, read from the disk when not given
+        :return: the pending import
+        """
+        if bytes_total is None:
+            bytes_total = os.path.getsize(path)
+        async with self.session_factory() as db:
+            async with db.begin():
+                return await ArticleImportRepository(db).create(
+                    owner_id=owner_id,
+                    filename=filename,
+                    path=path,
+                    bytes_total=bytes_total,
+                )
+
+    async def get_import(self, *, import_id: int, user_id: int) -> ArticleImport:
+        """
+        get an import of a user
+        :param import_id: the id of the import
+        :param user_id: the user asking for the import, only the owner may see it
+        :return: the import
+        """
+        async with self.session_factory() as db:
+            article_import = await ArticleImportRepository(db).get_by_id(import_id)
+        if not article_import:
+            raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
+        if article_import.owner_id != user_id:
+            raise HTTPException(status_code=403, detail=ErrorMessages.NOT_AUTHORIZED.value)
+        return article_import
+
+    async def resume(self, *, import_id: int, user_id: int) -> ArticleImport:
+        """
+        continue a failed or interrupted import of a user from its checkpoint
+        :param import_id: the id of the import
+        :param user_id: the user resuming the import, only the owner may resume it
+        :return: the import as it was before resuming
+        """
+        article_import = await self.get_import(import_id=import_id, user_id=user_id)
+        if article_import.status == ArticleImport.STATUS_COMPLETED:
+            raise HTTPException(status_code=400, detail=ErrorMessages.IMPORT_ALREADY_COMPLETED.value)
+        claimed = await self._claim(import_id)
+        if claimed is None:
+            raise HTTPException(status_code=409, detail=ErrorMessages.IMPORT_ALREADY_RUNNING.value)
+        self.start(import_id, claimed)
+        return article_import
+
+    def start(self, import_id: int, article_import: Optional[ArticleImport] = None) -> None:
+        """
+        Run an import in a background task, unless it is already running in this process
+        :param import_id: the id of the import
+        :param article_import: the import when it was claimed already
+        """
+        task = self._running.get(import_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self.run(import_id, article_import))
+            self._running[import_id] = task
+            task.add_done_callback(lambda _: self._running.pop(import_id, None))
+
+    async def stop(self) -> None:
+        """
+        Cancel the running imports, the chunks in flight are rolled back and the imports are marked
+        as interrupted, to be imported again on resume
+        """
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, import_id: int, article_import: Optional[ArticleImport] = None) -> None:
+        """
+        Import a file from the checkpoint of its import until the end of the file
+        :param import_id: the id of the import
+        :param article_import: the import when it was claimed already, else it is claimed first
+        """
+        if article_import is None:
+            article_import = await self._claim(import_id)
+            if article_import is None:
+                logger.info(f"Import {import_id} is missing, completed or running in another process")
+                return
+
+        offset = article_import.bytes_read
+        logger.info(f"Importing articles of import {import_id} from byte {offset}")
+        try:
+            while True:
+                rows, next_offset = await asyncio.to_thread(read_rows, article_import.path, offset, self.chunk_size)
+                if not rows:
+                    break
+                await self._import_chunk(article_import, rows, offset, next_offset)
+                offset = next_offset
+        except ImportTakenOver:
+            logger.warning(f"Import {import_id} was taken over by another process at byte {offset}")
+            return
+        except asyncio.CancelledError:
+            logger.info(f"Import {import_id} stopped at byte {offset}")
+            # shielded, the import is marked even though its task is being cancelled
+            await asyncio.shield(self._set_status(import_id, ArticleImport.STATUS_INTERRUPTED))
+            raise
+        except Exception as e:
+            logger.error(f"Import {import_id} failed at byte {offset}: {str(e)}")
+            await self._set_status(import_id, ArticleImport.STATUS_FAILED, error=str(e))
+            return
+
+        await self._set_status(import_id, ArticleImport.STATUS_COMPLETED)
+        logger.info(f"Import {import_id} completed")
+        # uploaded copies are removed, files imported in place from the command line are left alone
+        if os.path.dirname(os.path.abspath(article_import.path)) == os.path.abspath(settings.ARTICLE_IMPORT_DIRECTORY):
+            await asyncio.to_thread(os.remove, article_import.path)
+
+    async def _import_chunk(
+            self,
+            article_import: ArticleImport,
+            rows: List[List[str]],
+            offset: int,
+            next_offset: int
+    ) -> None:
+        """
+        Write one chunk of rows and move the checkpoint past it in the same transaction. Without the queue or the
+        outbox the chunk is indexed before the checkpoint moves, a chunk that could not be indexed is rolled
+        back and imported again on resume.
+        """
+        parsed: List[ArticleCsvRow] = []
+        failed = 0
+        for row in rows:
+            try:
+                parsed.append(parse_row(row))
+            except ValueError as e:
+                failed += 1
+                logger.warning(f"Skipped a row of import {article_import.id}: {str(e)}")
+
+        outbox_mode = settings.SEARCH_SYNC_MODE == "outbox"
+        index_now = not outbox_mode and self.index_queue is None
+        article_ids: List[int] = []
+        try:
+            async with self.session_factory() as db:
+                async with db.begin():
+                    author_ids = await AuthorRepository(db).get_or_create_by_names(
+                        [name for row in parsed for name in row.author_names]
+                    )
+                    tag_ids = await TagRepository(db).get_or_create_by_names(
+                        [name for row in parsed for name in row.tag_names]
+                    )
+                    article_ids = await ArticleRepository(db).copy_with_relationships([
+                        (
+                            {
+                                "title": row.title,
+                                "abstract": row.abstract,
+                                "publication_date": row.publication_date,
+                                "owner_id": article_import.owner_id,
+                            },
+                            [author_ids[name] for name in row.author_names],
+                            [tag_ids[name] for name in row.tag_names],
+                        )
+                        for row in parsed
+                    ])
+
+                    articles = [
+                        ArticleSchema(
+                            id=article_id,
+                            title=row.title,
+                            abstract=row.abstract,
+                            publication_date=row.publication_date,
+                            owner_id=article_import.owner_id,
+                            authors=[{"id": author_ids[name], "name": name} for name in row.author_names],
+                            tags=[{"id": tag_ids[name], "name": name} for name in row.tag_names],
+                        )
+                        for article_id, row in zip(article_ids, parsed)
+                    ]
+                    if outbox_mode:
+                        await SearchOutboxIndexer(db).index_articles(articles)
+                    elif index_now:
+                        _, errors = await self.search_repository.bulk_index(articles)
+                        if errors:
+                            raise RuntimeError(f"{len(errors)} articles of the chunk could not be indexed")
+
+                    moved = await ArticleImportRepository(db).save_checkpoint(
+                        import_id=article_import.id,
+                        expected_bytes_read=offset,
+                        bytes_read=next_offset,
+                        rows_imported=len(parsed),
+                        rows_failed=failed,
+                    )
+                    if not moved:
+                        raise ImportTakenOver()
+        except BaseException:
+            if index_now and article_ids:
+                await asyncio.shield(self._unindex(article_ids))
+            raise
+
+        # the queue sends the chunk once it is committed, so the index can not get ahead of the database
+        if self.index_queue is not None and not outbox_mode:
+            await self.index_queue.index_articles(articles)
+        if self.on_written is not None:
+            self.on_written()
+
+    async def _unindex(self, article_ids: List[int]) -> None:
+        """Remove the documents of a rolled back chunk, they are indexed again when the chunk is imported again"""
+        try:
+            await self.search_repository.bulk_delete(article_ids)
+        except Exception as e:
+            logger.error(f"Could not remove {len(article_ids)} rolled back articles from the index: {str(e)}")
+
+    async def _claim(self, import_id: int) -> Optional[ArticleImport]:
+        async with self.session_factory() as db:
+            async with db.begin():
+                return await ArticleImportRepository(db).claim(import_id=import_id, stale_after=self.stale_after)
+
+    async def _set_status(self, import_id: int, status: str, error: Optional[str] = None) -> None:
+        """End a run of an import, unless another process took it over"""
+        async with self.session_factory() as db:
+            async with db.begin():
+                await ArticleImportRepository(db).set_status(
+                    import_id=import_id,
+                    status=status,
+                    error=error,
+                    from_status=ArticleImport.STATUS_RUNNING,
+                )
+
+    @staticmethod
+    def _store(source: BinaryIO, path: str) -> int:
+        """Copy an upload to the disk block by block, returns its size"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as destination:
+            shutil.copyfileobj(source, destination, COPY_BLOCK_SIZE)
+            return destination.tell()
@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic, Type, Optional, Literal
+from typing import TypeVar, Generic, Type, Optional, Literal, Union
 
 from fastapi import HTTPException
 from pydantic import BaseModel
@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.articles.core.error_messages import ErrorMessages
 from src.articles.db.base import Base
 from src.articles.repositories.base import BaseRepository
+from src.articles.services.cache_invalidation import get_invalidation_publisher
+from src.articles.services.entity_cache import EntityCache
 
 ModelType = TypeVar('ModelType', bound=Base)
 CreateSchemaType = TypeVar('CreateSchemaType', bound=BaseModel)
@@ -16,18 +18,32 @@ RepositoryType = TypeVar('RepositoryType', bound=BaseRepository)
 
 class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, RepositoryType]):
     owner_field: Optional[Literal["owner_id", "user_id"]] = None
+    # the entity cache holds the objects as this schema under this name, they are not cached when None,
+    # writes are sent under this name to the caches of the other workers
+    cache_entity: Optional[str] = None
+    read_schema: Optional[Type[BaseModel]] = None
 
-    def __init__(self, repository: Type[RepositoryType], db: AsyncSession):
+    def __init__(self, repository: Type[RepositoryType], db: AsyncSession, entity_cache: Optional[EntityCache] = None):
         self.repository = repository(db)
         self.db = db
+        self.entity_cache = entity_cache
 
-    async def get_by_id(self, obj_id: int) -> Optional[ModelType]:
+    async def get_by_id(self, obj_id: int) -> Union[ModelType, BaseModel]:
         """
-        find an object by its id
+        find an object by its id, as the read schema when the service has one, through the entity cache when
+        the service has one as well, else as the model
         :param obj_id: the id of the object in question
-        :return: the object or None
+        :return: the object, always as the read schema of the service when it has one
         """
-        obj = await self.repository.get_by_id(obj_id)
+        if self.read_schema is None:
+            obj = await self.repository.get_by_id(obj_id)
+        elif self.entity_cache is not None and self.cache_entity is not None:
+            obj = await self.entity_cache.get_or_load(
+                self.cache_entity, obj_id, self.read_schema, lambda: self.repository.get_by_id(obj_id)
+            )
+        else:
+            db_obj = await self.repository.get_by_id(obj_id)
+            obj = self.read_schema.model_validate(db_obj) if db_obj else None
         if not obj:
             raise HTTPException(status_code=404, detail=ErrorMessages.NOT_FOUND.value)
         return obj
@@ -54,7 +70,9 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Reposit
             if self.owner_field:
                 await self._check_ownership(db_obj=db_obj, user_id=user_id)
 
-            return await self.repository.update(db_obj=db_obj, obj_in=obj)
+            updated = await self.repository.update(db_obj=db_obj, obj_in=obj)
+            await self._invalidate_cached(obj_id)
+            return updated
 
     async def delete(self, *, obj_id: int, user_id: int) -> ModelType:
         """
@@ -68,7 +86,20 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Reposit
             if self.owner_field:
                 await self._check_ownership(db_obj=db_obj, user_id=user_id)
 
-            return await self.repository.delete(obj_id=obj_id)
+            deleted = await self.repository.delete(obj_id=obj_id)
+            await self._invalidate_cached(obj_id)
+            return deleted
+
+    async def _invalidate_cached(self, obj_id: int) -> None:
+        """
+        Remove a changed object from the entity cache, now and when the transaction commits,
+        and from the caches of the other workers once it committed
+        """
+        if self.cache_entity is None:
+            return
+        get_invalidation_publisher().publish(self.db, self.cache_entity, obj_id)
+        if self.entity_cache is not None:
+            await self.entity_cache.invalidate(self.cache_entity, obj_id, self.db)
 
     async def _check_ownership(self, *, db_obj: ModelType, user_id: int) -> None:
         """Check whether the owner of the object is in fact the user attempting to perform the operation"""
@@ -0,0 +1,323 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import Select, event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from src.articles.auth.principal import PrincipalCache
+from src.articles.core.config.factory import get_settings
+from src.articles.services.entity_cache import EntityCache
+from src.articles.services.search_cache import SearchResultCache
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
+
+# the changes of a transaction not sent yet, in the info of its session
+_PENDING_KEYS = "cache_invalidation_keys"
+# a notification is at most 8000 bytes, the keys of a transaction are sent in as many as needed
+MAX_KEYS_PER_NOTIFICATION = 200
+# the key sent when the search index changed outside of a request transaction
+SEARCH_ENTITY = "search"
+
+InvalidationKey = Tuple[str, Any]
+
+
+@dataclass
+class CacheInvalidationStats:
+    published: int = 0
+    received: int = 0
+    evicted: int = 0
+    # notifications of other workers that never arrived
+    gaps: int = 0
+    flushes: int = 0
+    reconnects: int = 0
+    last_flush_reason: Optional[str] = None
+
+
+class CacheInvalidationPublisher:
+    """
+    Sends the entities changed by a transaction to the other workers with NOTIFY. The notifications are sent
+    right before the transaction commits, as part of it, and postgres delivers them only once it committed,
+    so a rolled back write never evicts anything. Every notification carries the id of this process and the
+    next number of its sequence, a listener that sees a number skipped knows it missed a notification.
+    """
+
+    def __init__(self, *, channel: str = "cache_invalidation", enabled: bool = True):
+        self.channel = channel
+        self.enabled = enabled
+        self.origin = uuid.uuid4().hex
+        self.stats = CacheInvalidationStats()
+        self._sequence = itertools.count(1)
+
+    def publish(self, db: AsyncSession, entity: str, obj_id: Any) -> None:
+        """
+        Send a changed entity to the other workers when the transaction of the session commits
+        :param db: the session of the write
+        :param entity: the kind of entity, the table of its model
+        :param obj_id: the id of the entity
+        """
+        sync_session = getattr(db, "sync_session", None)
+        if not self.enabled or not isinstance(sync_session, Session):
+            return
+
+        keys = sync_session.info.get(_PENDING_KEYS)
+        if keys is None:
+            # a dict keeps the order of the writes and sends every key once
+            keys = sync_session.info[_PENDING_KEYS] = {}
+            event.listen(sync_session, "before_commit", self._send_pending)
+        keys[(entity, obj_id)] = None
+
+    def statements(self, keys: Iterable[InvalidationKey]) -> List[Select]:
+        """
+        the statements that notify the other workers of changed entities, numbered in the order they are built
+        :param keys: the kind and the id of every changed entity
+        :return: one pg_notify select per notification
+        """
+        keys = list(keys)
+        statements = []
+        for start in range(0, len(keys), MAX_KEYS_PER_NOTIFICATION):
+            payload = json.dumps({
+                "origin": self.origin,
+                "sequence": next(self._sequence),
+                "keys": keys[start:start + MAX_KEYS_PER_NOTIFICATION],
+            }, separators=(",", ":"))
+            statements.append(select(func.pg_notify(self.channel, payload)))
+        self.stats.published += len(statements)
+        return statements
+
+    def _send_pending(self, session: Session) -> None:
+        # a released savepoint commits too, the changes are sent with the transaction itself
+        if session.in_nested_transaction():
+            return
+        keys = session.info.get(_PENDING_KEYS)
+        if not keys or session.get_bind().dialect.name != "postgresql":
+            return
+
+        for statement in self.statements(list(keys)):
+            session.execute(statement)
+        keys.clear()
+
+
+@dataclass
+class _Sender:
+    """The sequence of notifications seen from one process"""
+    highest: int
+    # the skipped numbers and when they were noticed, notifications of concurrent transactions may arrive out of order
+    missing: Dict[int, float] = field(default_factory=dict)
+
+
+class CacheInvalidationListener:
+    """
+    Keeps one LISTEN connection per worker and evicts the entities changed by the other workers from the caches
+    of this worker. Notifications sent while the connection is down are lost, so the local caches are flushed
+    on every connect, and a number missing from the sequence of a sender for `gap_timeout` seconds flushes them
+    as well. A lost connection is opened again with a growing delay, up to `max_reconnect_interval` seconds.
+    """
+
+    MAX_MISSING = 1000
+
+    def __init__(
+            self,
+            dsn: str,
+            publisher: CacheInvalidationPublisher,
+            *,
+            entity_cache: Optional[EntityCache] = None,
+            search_cache: Optional[SearchResultCache] = None,
+            principal_cache: Optional[PrincipalCache] = None,
+            session_factory: Optional[async_sessionmaker[AsyncSession]] = None,
+            reconnect_interval: float = 1.0,
+            max_reconnect_interval: float = 30.0,
+            gap_timeout: float = 5.0,
+            keepalive_interval: float = 10.0,
+            connect: Optional[Callable[[], Awaitable[psycopg.AsyncConnection]]] = None
+    ):
+        self.publisher = publisher
+        self.entity_cache = entity_cache
+        self.search_cache = search_cache
+        self.principal_cache = principal_cache
+        # sends the notifications that are not part of a request transaction
+        self.session_factory = session_factory
+        self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        self.gap_timeout = gap_timeout
+        self.keepalive_interval = keepalive_interval
+        self.connect = connect or (lambda: psycopg.AsyncConnection.connect(dsn, autocommit=True))
+        self.stats = CacheInvalidationStats()
+        self.connected = False
+        self._senders: Dict[str, _Sender] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Start listening in a background task"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        for task in list(self._pending):
+            task.cancel()
+
+    async def run(self) -> None:
+        """Listen until cancelled, connecting again whenever the connection is lost"""
+        delay = self.reconnect_interval
+        while True:
+            try:
+                connection = await self.connect()
+            except Exception as e:
+                logger.warning(f"Could not connect for cache invalidations, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_interval)
+                continue
+
+            delay = self.reconnect_interval
+            try:
+                await connection.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.publisher.channel)))
+                self.connected = True
+                # anything committed from now on is delivered, anything before may have been missed
+                self.flush("connected")
+                await self._listen(connection)
+            except Exception as e:
+                self.stats.reconnects += 1
+                logger.warning(f"Lost the cache invalidation connection: {str(e)}")
+            finally:
+                self.connected = False
+                await connection.close()
+            await asyncio.sleep(delay)
+
+    async def _listen(self, connection: psycopg.AsyncConnection) -> None:
+        while True:
+            async for notification in connection.notifies(timeout=self.keepalive_interval):
+                self.handle(notification.payload)
+            self.check_gaps()
+            # a connection dropped without a reset looks idle, a query finds out
+            await connection.execute("SELECT 1")
+
+    def handle(self, payload: str) -> None:
+        """
+        evict the entities of a notification from the local caches
+        :param payload: the payload sent by a CacheInvalidationPublisher
+        """
+        try:
+            message = json.loads(payload)
+            origin = str(message["origin"])
+            sequence = int(message["sequence"])
+            keys = [(str(entity), obj_id) for entity, obj_id in message["keys"]]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Unreadable cache invalidation: {str(e)}")
+            self.flush("unreadable notification")
+            return
+
+        self.stats.received += 1
+        # the writes of this worker evicted its caches already
+        if origin == self.publisher.origin:
+            return
+        for entity, obj_id in keys:
+            self.evict(entity, obj_id)
+        self._track(origin, sequence)
+        self.check_gaps()
+
+    def evict(self, entity: str, obj_id: Any) -> None:
+        """Remove an entity changed by another worker from the caches of this worker"""
+        self.stats.evicted += 1
+        if self.entity_cache is not None and entity != SEARCH_ENTITY:
+            self.entity_cache.discard(entity, obj_id)
+        if self.principal_cache is not None and entity == "users":
+            self.principal_cache.invalidate(obj_id)
+        if self.search_cache is not None and entity in ("articles", SEARCH_ENTITY):
+            self.search_cache.invalidate()
+
+    def flush(self, reason: str) -> None:
+        """Empty the local caches, when it is unknown what changed"""
+        self.stats.flushes += 1
+        self.stats.last_flush_reason = reason
+        for sender in self._senders.values():
+            sender.missing.clear()
+        if self.entity_cache is not None:
+            self.entity_cache.clear_local()
+        if self.search_cache is not None:
+            self.search_cache.invalidate()
+        if self.principal_cache is not None:
+            self.principal_cache.clear()
+        logger.info(f"Flushed the local caches: {reason}")
+
+    def check_gaps(self) -> None:
+        """Flush when a notification of another worker is missing for longer than the gap timeout"""
+        noticed_before = time.monotonic() - self.gap_timeout
+        if any(noticed <= noticed_before for sender in self._senders.values() for noticed in sender.missing.values()):
+            self.stats.gaps += 1
+            self.flush("missed notifications")
+
+    def search_changed(self) -> None:
+        """
+        Tell the other workers that the search index changed. Writes indexed after their commit, by the queue
+        or the outbox, change the search results later than their notification.
+        """
+        if not self.connected or self.session_factory is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._send([(SEARCH_ENTITY, None)]))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, keys: List[InvalidationKey]) -> None:
+        try:
+            async with self.session_factory() as db:
+                for statement in self.publisher.statements(keys):
+                    await db.execute(statement)
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Could not send a cache invalidation: {str(e)}")
+
+    def _track(self, origin: str, sequence: int) -> None:
+        sender = self._senders.get(origin)
+        if sender is None:
+            # the earlier notifications of a new sender were covered by the flush on connect
+            self._senders[origin] = _Sender(highest=sequence)
+            return
+
+        if sequence in sender.missing:
+            del sender.missing[sequence]
+        elif sequence > sender.highest:
+            skipped = sequence - sender.highest - 1
+            if skipped + len(sender.missing) > self.MAX_MISSING:
+                self.stats.gaps += 1
+                self.flush("missed notifications")
+            else:
+                noticed = time.monotonic()
+                for missing in range(sender.highest + 1, sequence):
+                    sender.missing[missing] = noticed
+            sender.highest = sequence
+
+
+def listen_dsn(uri: str) -> str:
+    """The libpq connection string of an SQLAlchemy database URI"""
+    return make_url(uri).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+@lru_cache()
+def get_invalidation_publisher() -> CacheInvalidationPublisher:
+    """The cache invalidation publisher shared by the whole process"""
+    return CacheInvalidationPublisher(
+        channel=settings.CACHE_INVALIDATION_CHANNEL,
+        enabled=settings.CACHE_INVALIDATION_ENABLED,
+    )
@@ -1,42 +1,121 @@
+import os
+from typing import Optional
+
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.articles.core.config.factory import get_settings
+from src.articles.core.error_messages import ErrorMessages
 from src.articles.models.comment import Comment
 from src.articles.repositories.comment import CommentRepository
-from src.articles.schemas.base import PaginationSchema
+from src.articles.schemas.base import CountMode, PaginationSchema
 from src.articles.schemas.comment import Comment as CommentSchema
-from src.articles.schemas.comment import CommentCreate, CommentUpdate
+from src.articles.schemas.comment import CommentCreate, CommentUpdate, CommentSortOrder
 from src.articles.services.base import BaseService
+from src.articles.services.entity_cache import EntityCache
+from src.articles.utils.cursor import START_CURSOR, decode_cursor, encode_cursor
+
+settings = get_settings(os.getenv("ENVIRONMENT", "development"))
 
 
 class CommentService(BaseService[Comment, CommentCreate, CommentUpdate, CommentRepository]):
     owner_field = "user_id"
+    cache_entity = "comments"
+    read_schema = CommentSchema
 
-    def __init__(self, db: AsyncSession):
-        super().__init__(CommentRepository, db)
+    def __init__(self, db: AsyncSession, entity_cache: Optional[EntityCache] = None):
+        super().__init__(CommentRepository, db, entity_cache)
 
     async def get_paginated_by_article(
             self,
             *,
             article_id: int,
             page: int = 1,
-            page_size: int = 10
+            page_size: int = 10,
+            sort: CommentSortOrder = CommentSortOrder.NEWEST,
+            cursor: Optional[str] = None,
+            count_mode: CountMode = CountMode.EXACT
     ) -> PaginationSchema[CommentSchema]:
         """
         get all comments by article id paginated
         :param article_id: the article id
         :param page: the page number
         :param page_size: the size of the page
+        :param sort: the order of the comments
+        :param cursor: the next_cursor of the previous page or "*" to start, the page is then ignored
+        :param count_mode: exact, estimate or none to only report whether a next page exists
         :return: the pagination schema with the comments
         """
-        comments, total_count = await self.repository.get_paginated_by_article(
-            article_id=article_id, page=page, page_size=page_size
-        )
+        if cursor:
+            return await self._get_page_after(
+                article_id=article_id, page_size=page_size, sort=sort, cursor=cursor, count_mode=count_mode
+            )
 
-        total_pages = (total_count + page_size - 1) // page_size
+        comments, total_count, has_next = await self.repository.get_paginated_by_article(
+            article_id=article_id, page=page, page_size=page_size, sort=sort, count_mode=count_mode
+        )
 
-        return PaginationSchema(
+        return PaginationSchema.from_page(
             items=comments,
             current_page=page,
-            total_pages=total_pages,
-            total_items=total_count
+            page_size=page_size,
+            total_items=total_count,
+            has_next=has_next,
+            count_mode=count_mode,
+            estimate_cap=settings.PAGINATION_ESTIMATE_CAP,
+        )
+
+    async def _get_page_after(
+            self,
+            *,
+            article_id: int,
+            page_size: int,
+            sort: CommentSortOrder,
+            cursor: str,
+            count_mode: CountMode
+    ) -> PaginationSchema[CommentSchema]:
+        """
+        Comments paginated by the id of the last comment of the previous page, the cursor carries that id,
+        the page number and the total counted on the first page.
+        """
+        state = {} if cursor == START_CURSOR else decode_cursor(cursor)
+        if state and (
+                state.get("article") != article_id
+                or state.get("sort") != sort.value
+                or state.get("count") != count_mode.value
+                or not isinstance(state.get("after"), int)
+        ):
+            raise HTTPException(status_code=400, detail=ErrorMessages.INVALID_CURSOR.value)
+
+        comments, total_count, has_next = await self.repository.get_page_after(
+            article_id=article_id,
+            page_size=page_size,
+            sort=sort,
+            after_id=state.get("after"),
+            count_mode=CountMode.NONE if state else count_mode,
+        )
+        if state:
+            total_count = state.get("total")
+        current_page = state.get("page", 0) + 1
+
+        next_cursor = None
+        if has_next:
+            next_cursor = encode_cursor({
+                "after": comments[-1].id,
+                "page": current_page,
+                "total": total_count,
+                "article": article_id,
+                "sort": sort.value,
+                "count": count_mode.value,
+            })
+
+        return PaginationSchema.from_page(
+            items=comments,
+            current_page=current_page,
+            page_size=page_size,
+            total_items=total_count,
+            has_next=has_next,
+            count_mode=count_mode,
+            estimate_cap=settings.PAGINATION_ESTIMATE_CAP,
+            next_cursor=next_cursor,
         )
@@ -0,0 +1,257 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.articles.utils.cache import ByteSizeLRUCache, TTLCache
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+SchemaType = TypeVar('SchemaType', bound=BaseModel)
+
+
+class SharedEntityCache(ABC):
+    """
+    The shared tier of the entity cache, a store reached by every worker such as redis or memcached.
+    The values are the serialized schemas of the entities. Errors of the store are logged and the read
+    falls through to the database, so an outage of the store slows reads down but never fails them.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """the value stored under the key, None when it is missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """store a value under the key for ttl seconds"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """remove the value stored under the key"""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """remove every value"""
+
+
+class InMemorySharedEntityCache(SharedEntityCache):
+    """Stand-in for a shared store, kept in process, for tests and development without one"""
+
+    def __init__(self, max_size: int = 100000):
+        self._values: TTLCache[str, bytes] = TTLCache(max_size=max_size, ttl=0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._values.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._values.delete(key)
+
+    async def clear(self) -> None:
+        self._values.clear()
+
+
+@dataclass
+class EntityCacheStats:
+    local_hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    # reads that waited for the load of another read of the same entity instead of loading it again
+    coalesced: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return (self.local_hits + self.shared_hits) / lookups if lookups else 0.0
+
+
+class _Load:
+    __slots__ = ("future", "stale")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        # set when the entity was invalidated during the load, the loaded value is then not cached
+        self.stale = False
+
+
+class EntityCache:
+    """
+    Read-through cache of entities by id, in two tiers. The first tier is an LRU in process, bounded by the
+    size of the serialized schemas it holds, the optional second tier is shared by the workers. Only one read
+    per entity loads it from the database at a time, concurrent reads of the same entity wait for that load.
+    Writes invalidate the entity right away and again when their transaction commits, so a read that loaded
+    the entity before the commit can not cache it for longer than the load.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_bytes: int = 64 * 1024 * 1024,
+            ttl: float = 60.0,
+            shared: Optional[SharedEntityCache] = None,
+            shared_ttl: float = 300.0
+    ):
+        self.local: ByteSizeLRUCache[str] = ByteSizeLRUCache(max_bytes=max_bytes, ttl=ttl)
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.stats: Dict[str, EntityCacheStats] = defaultdict(EntityCacheStats)
+        self._loads: Dict[str, _Load] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(entity: str, obj_id: Any) -> str:
+        return f"{entity}:{obj_id}"
+
+    async def get_or_load(
+            self,
+            entity: str,
+            obj_id: Any,
+            schema: Type[SchemaType],
+            load: Callable[[], Awaitable[Any]]
+    ) -> Optional[SchemaType]:
+        """
+        get an entity from the cache, loading and caching it on a miss
+        :param entity: the kind of entity, the table of its model
+        :param obj_id: the id of the entity
+        :param schema: the schema the entity is read as
+        :param load: loads the entity from the database, returns None when it does not exist
+        :return: the entity or None when it does not exist, missing entities are not cached
+        """
+        key = self.key(entity, obj_id)
+        stats = self.stats[entity]
+        data = self.local.get(key)
+        if data is not None:
+            stats.local_hits += 1
+            return schema.model_validate_json(data)
+
+        while key in self._loads:
+            in_flight = self._loads[key]
+            stats.coalesced += 1
+            try:
+                data = await asyncio.shield(in_flight.future)
+            except asyncio.CancelledError:
+                if not in_flight.future.cancelled():
+                    raise
+                # the read that was loading was cancelled, the next one loads
+                continue
+            return schema.model_validate_json(data) if data is not None else None
+
+        in_flight = _Load(asyncio.get_running_loop().create_future())
+        self._loads[key] = in_flight
+        try:
+            data = await self._get_shared(key)
+            if data is not None:
+                stats.shared_hits += 1
+            else:
+                stats.misses += 1
+                obj = await load()
+                data = schema.model_validate(obj).model_dump_json().encode() if obj is not None else None
+                if data is not None and not in_flight.stale:
+                    await self._set_shared(key, data)
+            if data is not None and not in_flight.stale:
+                self.local.set(key, data)
+            in_flight.future.set_result(data)
+        except asyncio.CancelledError:
+            in_flight.future.cancel()
+            raise
+        except Exception as e:
+            in_flight.future.set_exception(e)
+            # the waiting reads get the error, without them it must not be reported as never retrieved
+            in_flight.future.exception()
+            raise
+        finally:
+            if self._loads.get(key) is in_flight:
+                del self._loads[key]
+
+        return schema.model_validate_json(data) if data is not None else None
+
+    async def invalidate(self, entity: str, obj_id: Any, db: Optional[AsyncSession] = None) -> None:
+        """
+        Remove an entity from both tiers. With a session it is removed again when its transaction commits.
+        :param entity: the kind of entity, the table of its model
+        :param obj_id: the id of the entity
+        :param db: the session of the write
+        """
+        key = self.key(entity, obj_id)
+        self.stats[entity].invalidations += 1
+        self._evict_local(key)
+        await self._delete_shared(key)
+
+        sync_session = getattr(db, "sync_session", None)
+        if isinstance(sync_session, Session):
+            event.listen(sync_session, "after_commit", lambda session: self._evict(key), once=True)
+
+    def discard(self, entity: str, obj_id: Any) -> None:
+        """
+        Remove an entity from this worker only, for writes of other workers, which removed it from the shared tier
+        :param entity: the kind of entity, the table of its model
+        :param obj_id: the id of the entity
+        """
+        self.stats[entity].invalidations += 1
+        self._evict_local(self.key(entity, obj_id))
+
+    def clear_local(self) -> None:
+        """Remove every entity from this worker, the shared tier is kept"""
+        self.local.clear()
+        for in_flight in self._loads.values():
+            in_flight.stale = True
+        self._loads.clear()
+
+    async def clear(self) -> None:
+        """Remove every entity from both tiers"""
+        self.clear_local()
+        if self.shared is not None:
+            try:
+                await self.shared.clear()
+            except Exception as e:
+                logger.warning(f"Could not clear the shared entity cache: {str(e)}")
+
+    def _evict(self, key: str) -> None:
+        """Remove an entity from both tiers from synchronous code, the shared tier in a background task"""
+        self._evict_local(key)
+        if self.shared is not None:
+            task = asyncio.get_running_loop().create_task(self._delete_shared(key))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def _evict_local(self, key: str) -> None:
+        self.local.delete(key)
+        # reads from now on load again instead of waiting for a load that may have read the old row
+        in_flight = self._loads.pop(key, None)
+        if in_flight is not None:
+            in_flight.stale = True
+
+    async def _get_shared(self, key: str) -> Optional[bytes]:
+        if self.shared is None:
+            return None
+        try:
+            return await self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Could not read {key} from the shared entity cache: {str(e)}")
+            return None
+
+    async def _set_shared(self, key: str, data: bytes) -> None:
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(key, data, self.shared_ttl)
+        except Exception as e:
+            logger.warning(f"Could not write {key} to the shared entity cache: {str(e)}")
+
+    async def _delete_shared(self, key: str) -> None:
+        if self.shared is None:
+            return
+        try:
+            await self.shared.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not delete {key} from the shared entity cache: {str(e)}")
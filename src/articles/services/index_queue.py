@@ -0,0 +1,239 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Sequence
+
+from elastic_transport import TransportError
+from elasticsearch import ApiError
+
+from src.articles.models.article import Article
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# bulk item statuses worth another attempt, everything else is a permanent failure of the document
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class _IndexOperation:
+    __slots__ = ("article_id", "document", "refresh", "done", "flush")
+
+    def __init__(
+            self,
+            article_id: int,
+            document: Optional[dict],
+            refresh: bool,
+            done: Optional[asyncio.Future],
+            flush: bool = False
+    ):
+        self.article_id = article_id
+        self.document = document
+        self.refresh = refresh
+        # resolved with the error of the write once it was sent, None when it succeeded
+        self.done = done
+        # the batch is sent right away instead of after the flush interval, always when refreshing
+        self.flush = flush or refresh
+
+
+class ArticleIndexQueue:
+    """
+    Write-behind indexing of articles. Writes are queued in process and a background task sends them
+    to elasticsearch with bulk requests, flushed when the batch is full or the flush interval passed.
+    Failed requests are retried with exponential backoff. The queue is bounded, when it is full
+    the writers wait for room instead of dropping documents.
+    """
+
+    def __init__(
+            self,
+            search_repository: ArticleSearchRepository,
+            *,
+            batch_size: int = 500,
+            flush_interval: float = 1.0,
+            max_retries: int = 5,
+            retry_backoff: float = 0.5,
+            max_queue_size: int = 10000,
+            on_written: Optional[Callable[[], None]] = None
+    ):
+        self.search_repository = search_repository
+        # called after every bulk request, e.g. to invalidate cached search results
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: asyncio.Queue[_IndexOperation] = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: Optional[asyncio.Task] = None
+        # wakes the worker when a flush is requested, the count keeps the batches urgent until every flush returned
+        self._flush_requested = asyncio.Event()
+        self._flushers = 0
+
+    async def start(self) -> None:
+        """Start the background task that sends the queued writes"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Send everything still queued and stop the background task"""
+        if self._worker is None:
+            return
+        await self.flush()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def flush(self) -> None:
+        """Send the queued writes without waiting for the flush interval and wait until they were sent"""
+        self._flushers += 1
+        self._flush_requested.set()
+        try:
+            await self._queue.join()
+        finally:
+            self._flushers -= 1
+
+    async def index_article(self, article: Article, refresh: bool = False) -> None:
+        """
+        Queue an article for indexing, the document is built right away so no ORM state is kept around
+        :param article: the article with its authors and tags loaded
+        :param refresh: wait until the article was indexed and is visible to searches
+        """
+        await self._enqueue(article.id, ArticleSearchRepository.build_document(article), refresh)
+
+    async def index_articles(
+            self,
+            articles: Sequence[Article],
+            refresh: bool = False,
+            wait: bool = False
+    ) -> Dict[int, str]:
+        """
+        Queue many articles for indexing, they are sent with as few bulk requests as the batch size allows
+        :param articles: the articles with their authors and tags loaded
+        :param refresh: wait until all the articles were indexed and are visible to searches
+        :param wait: wait until all the articles were sent, without a refresh
+        :return: the error of every article elasticsearch rejected, only known when waiting or refreshing
+        """
+        loop = asyncio.get_running_loop()
+        waiting = []
+        for position, article in enumerate(articles):
+            # only the last write asks for a refresh, it flushes its batch and the refresh covers the earlier ones
+            last = position == len(articles) - 1
+            done = loop.create_future() if refresh or wait else None
+            await self._queue.put(_IndexOperation(
+                article.id,
+                ArticleSearchRepository.build_document(article),
+                refresh and last,
+                done,
+                flush=wait and last,
+            ))
+            if done is not None:
+                waiting.append((article.id, done))
+
+        errors = {}
+        for article_id, done in waiting:
+            error = await done
+            if error is not None:
+                errors[article_id] = error
+        return errors
+
+    async def delete_article(self, article_id: int, refresh: bool = False) -> None:
+        """
+        Queue the removal of an article from the index
+        :param article_id: the id of the article
+        :param refresh: wait until the article was removed from the search results
+        """
+        await self._enqueue(article_id, None, refresh)
+
+    async def _enqueue(self, article_id: int, document: Optional[dict], refresh: bool) -> None:
+        done = asyncio.get_running_loop().create_future() if refresh else None
+        await self._queue.put(_IndexOperation(article_id, document, refresh, done))
+        if done is not None:
+            await done
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # cleared before draining, a flush requested while this batch is collected or written is not lost
+            self._flush_requested.clear()
+            deadline = loop.time() + self.flush_interval
+            # a caller waiting for its write to be visible flushes the batch right away
+            while len(batch) < self.batch_size and not batch[-1].flush:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0 or self._flushers or self._flush_requested.is_set():
+                    break
+                operation = await self._next_operation(timeout)
+                if operation is None:
+                    break
+                batch.append(operation)
+
+            errors: Dict[int, str] = {}
+            try:
+                errors = await self._write(batch)
+            except Exception as e:
+                logger.error(f"Unexpected error while indexing {len(batch)} articles: {str(e)}")
+                errors = {operation.article_id: str(e) for operation in batch}
+            finally:
+                if self.on_written is not None:
+                    self.on_written()
+                for operation in batch:
+                    if operation.done is not None and not operation.done.done():
+                        operation.done.set_result(errors.get(operation.article_id))
+                    self._queue.task_done()
+
+    async def _next_operation(self, timeout: float) -> Optional[_IndexOperation]:
+        """Wait for the next queued write until the timeout passes or a flush is requested"""
+        get = asyncio.ensure_future(self._queue.get())
+        flush_requested = asyncio.ensure_future(self._flush_requested.wait())
+        try:
+            await asyncio.wait({get, flush_requested}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            flush_requested.cancel()
+            if not get.done():
+                get.cancel()
+        return get.result() if get.done() and not get.cancelled() else None
+
+    async def _write(self, batch: List[_IndexOperation]) -> Dict[int, str]:
+        """
+        Send a batch with a bulk request, retrying the failed items with exponential backoff
+        :return: the error of every article that could not be written
+        """
+        # only the latest write of an article matters
+        latest: Dict[int, _IndexOperation] = {operation.article_id: operation for operation in batch}
+        pending = list(latest.values())
+        refresh = any(operation.refresh for operation in batch)
+        failed: Dict[int, str] = {}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                errors = await self.search_repository.bulk_write(
+                    [(operation.article_id, operation.document) for operation in pending],
+                    refresh=refresh,
+                )
+            except (ApiError, TransportError) as e:
+                logger.warning(f"Indexing of {len(pending)} articles failed (attempt {attempt + 1}): {str(e)}")
+            else:
+                retryable_ids = set()
+                for error in errors:
+                    if error.get("status") in RETRYABLE_STATUSES:
+                        retryable_ids.add(int(error["_id"]))
+                    else:
+                        logger.error(f"Failed to index article {error.get('_id')}: {error.get('error')}")
+                        failed[int(error["_id"])] = ArticleSearchRepository.describe_error(error)
+                pending = [operation for operation in pending if operation.article_id in retryable_ids]
+
+            if not pending:
+                return failed
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+        logger.error(
+            f"Gave up indexing articles {[operation.article_id for operation in pending]} "
+            f"after {self.max_retries + 1} attempts"
+        )
+        for operation in pending:
+            failed[operation.article_id] = f"not indexed after {self.max_retries + 1} attempts"
+        return failed
@@ -0,0 +1,92 @@
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.articles.schemas.article import ArticleSchema, ArticleSearchFilters
+from src.articles.schemas.base import CountMode, PaginationSchema
+from src.articles.utils.cache import CacheStats, TTLCache
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+SearchPage = PaginationSchema[ArticleSchema]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class SearchResultCache:
+    """
+    Caches search result pages per normalized filters, page, page size and count mode. Every key includes the
+    generation of the article data, article writes bump the generation so that the pages cached
+    before the write are never served again and age out of the LRU.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 30.0):
+        self.generation = 0
+        self._pages: TTLCache[Tuple, SearchPage] = TTLCache(max_size=max_size, ttl=ttl)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._pages.stats
+
+    def get(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page: int,
+            page_size: int,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> Optional[SearchPage]:
+        return self._pages.get(self._key(self.generation, search_params, page, page_size, count_mode))
+
+    def set(
+            self,
+            *,
+            search_params: ArticleSearchFilters,
+            page: int,
+            page_size: int,
+            result: SearchPage,
+            generation: int,
+            count_mode: CountMode = CountMode.EXACT
+    ) -> None:
+        """
+        Cache a page under the generation that was current when the search started, a page searched
+        while an article was written is stored under an outdated generation and never served.
+        """
+        self._pages.set(self._key(generation, search_params, page, page_size, count_mode), result)
+
+    def invalidate(self, db: Optional[AsyncSession] = None) -> None:
+        """
+        Start a new generation. With a session the generation is bumped again when its transaction
+        commits, so a search that read the data before the commit can not cache it under the new one.
+        """
+        self.generation += 1
+        sync_session = getattr(db, "sync_session", None)
+        if isinstance(sync_session, Session):
+            event.listen(sync_session, "after_commit", self._bump_generation, once=True)
+
+    def _bump_generation(self, session: Session) -> None:
+        self.generation += 1
+
+    @staticmethod
+    def _key(
+            generation: int,
+            search_params: ArticleSearchFilters,
+            page: int,
+            page_size: int,
+            count_mode: CountMode
+    ) -> Tuple:
+        """
+        Both backends match the text filters case insensitively and the abstract search is tokenized,
+        so the case of the filters and the whitespace of the abstract search are normalized
+        """
+        normalized = search_params.model_copy(update={
+            "title": search_params.title.lower() if search_params.title else None,
+            "author": search_params.author.lower() if search_params.author else None,
+            "abstract_search": _WHITESPACE.sub(" ", search_params.abstract_search.strip().lower())
+            if search_params.abstract_search else None,
+        })
+        return generation, normalized.model_dump_json(exclude_none=True), page, page_size, count_mode
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import Set, AsyncIterator, Sequence, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.articles.models.article import Article
+from src.articles.repositories.article import ArticleRepository
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# writes whose transaction started shortly before the rebuild began carry an older updated_at,
+# so the catch up looks a bit further back than the rebuild start
+CATCH_UP_MARGIN = timedelta(minutes=1)
+
+
+@dataclass
+class ReindexStats:
+    indexed: int = 0
+    failed: int = 0
+    deleted: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def docs_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.indexed / elapsed if elapsed > 0 else 0.0
+
+
+class SearchIndexService:
+    def __init__(self, db: AsyncSession, search_repository: ArticleSearchRepository):
+        self.db = db
+        self.search_repository = search_repository
+        self.article_repository = ArticleRepository(db)
+
+    async def reindex(self, *, chunk_size: int = 1000, concurrency: int = 4) -> ReindexStats:
+        """
+        Stream every article out of the database and load it into the live index with bulk requests.
+        Index refreshes are disabled during the load and the previous refresh interval is restored afterwards.
+        :param chunk_size: the number of articles per database round trip and per bulk request
+        :param concurrency: the maximum number of bulk requests in flight
+        :return: the statistics of the reindex
+        """
+        stats = ReindexStats()
+        await self.search_repository.create_index()
+        index_name = await self.search_repository.get_alias_target(self.search_repository.write_alias)
+
+        await self._bulk_load(
+            self.article_repository.stream_in_chunks(chunk_size=chunk_size),
+            index_name=index_name,
+            concurrency=concurrency,
+            stats=stats,
+        )
+
+        self._report("Reindex completed", stats)
+        return stats
+
+    async def rebuild(self, *, chunk_size: int = 1000, concurrency: int = 4) -> ReindexStats:
+        """
+        Build a new versioned index while the current one keeps serving searches and writes, then swap
+        the read and write aliases to it atomically. The previous index is kept for a rollback.
+        1. bulk load a snapshot of all the articles into the new index
+        2. catch up on the articles written during the load, while the aliases still point to the old index
+        3. swap the aliases
+        4. catch up on the articles written between the first catch up and the swap, then remove
+           the articles that were deleted while the new index was built
+        :param chunk_size: the number of articles per database round trip and per bulk request
+        :param concurrency: the maximum number of bulk requests in flight
+        :return: the statistics of the rebuild
+        """
+        stats = ReindexStats()
+        await self.search_repository.create_index()
+        index_name = await self.search_repository.create_versioned_index()
+        logger.info(f"Rebuilding the search index into {index_name}")
+
+        load_started_at = datetime.now(timezone.utc) - CATCH_UP_MARGIN
+        await self._bulk_load(
+            self.article_repository.stream_in_chunks(chunk_size=chunk_size),
+            index_name=index_name,
+            concurrency=concurrency,
+            stats=stats,
+        )
+
+        catch_up_started_at = datetime.now(timezone.utc) - CATCH_UP_MARGIN
+        await self._catch_up(
+            index_name=index_name, since=load_started_at, chunk_size=chunk_size, concurrency=concurrency, stats=stats
+        )
+
+        previous_index = await self.search_repository.swap_aliases(index_name)
+        logger.info(f"Search aliases moved from {previous_index} to {index_name}")
+
+        await self._catch_up(
+            index_name=index_name, since=catch_up_started_at, chunk_size=chunk_size, concurrency=concurrency, stats=stats
+        )
+        await self._remove_deleted(index_name=index_name, stats=stats)
+
+        self._report("Rebuild completed", stats)
+        return stats
+
+    async def rollback(self) -> Optional[str]:
+        """
+        Point the search aliases back to the previous versioned index.
+        Writes made after the rebuild only exist in the newer index, so a rebuild should follow once fixed.
+        :return: the name of the index the aliases point to after the rollback or None if there is none
+        """
+        current_index = await self.search_repository.get_alias_target(self.search_repository.read_alias)
+        versions = await self.search_repository.list_versions()
+        current_version = int(current_index.rsplit("_v", 1)[1]) if current_index else None
+        previous_versions = [version for version in versions if current_version and version < current_version]
+        if not previous_versions:
+            logger.info("There is no previous search index to roll back to")
+            return None
+
+        previous_index = f"{self.search_repository.index_prefix}_v{previous_versions[-1]}"
+        await self.search_repository.swap_aliases(previous_index)
+        logger.info(f"Search aliases rolled back from {current_index} to {previous_index}")
+        return previous_index
+
+    async def _bulk_load(
+            self,
+            chunks: AsyncIterator[Sequence[Article]],
+            *,
+            index_name: str,
+            concurrency: int,
+            stats: ReindexStats
+    ) -> None:
+        """Send the article chunks to the index with bounded concurrency and refreshes disabled"""
+        previous_refresh_interval = await self.search_repository.get_refresh_interval(index=index_name)
+        await self.search_repository.set_refresh_interval("-1", index=index_name)
+
+        pending: Set[asyncio.Task] = set()
+        try:
+            async for chunk in chunks:
+                # wait for a slot before reading more rows so memory stays bounded by the concurrency
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    self._collect(done, stats)
+                pending.add(asyncio.create_task(self.search_repository.bulk_index(chunk, index=index_name)))
+
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                self._collect(done, stats)
+        finally:
+            for task in pending:
+                task.cancel()
+            await self.search_repository.set_refresh_interval(previous_refresh_interval, index=index_name)
+            await self.search_repository.refresh(index=index_name)
+
+    async def _catch_up(
+            self,
+            *,
+            index_name: str,
+            since: datetime,
+            chunk_size: int,
+            concurrency: int,
+            stats: ReindexStats
+    ) -> None:
+        """Index again the articles created or updated since the given moment"""
+        await self._bulk_load(
+            self.article_repository.stream_in_chunks(chunk_size=chunk_size, updated_since=since),
+            index_name=index_name,
+            concurrency=concurrency,
+            stats=stats,
+        )
+
+    async def _remove_deleted(self, *, index_name: str, stats: ReindexStats) -> None:
+        """Remove from the index the articles that no longer exist in the database"""
+        async for indexed_ids in self.search_repository.scan_ids(index=index_name):
+            existing_ids = await self.article_repository.get_existing_ids(indexed_ids)
+            deleted_ids = [article_id for article_id in indexed_ids if article_id not in existing_ids]
+            await self.search_repository.bulk_delete(deleted_ids, index=index_name)
+            stats.deleted += len(deleted_ids)
+
+        await self.search_repository.refresh(index=index_name)
+
+    @staticmethod
+    def _collect(done: Set[asyncio.Task], stats: ReindexStats) -> None:
+        """Add the results of the finished bulk requests to the statistics and report the progress"""
+        for task in done:
+            indexed, errors = task.result()
+            stats.indexed += indexed
+            stats.failed += len(errors)
+            for error in errors[:3]:
+                logger.error(f"Failed to index article {error.get('_id')}: {error.get('error')}")
+
+        SearchIndexService._report("Reindex progress", stats)
+
+    @staticmethod
+    def _report(message: str, stats: ReindexStats) -> None:
+        logger.info(
+            f"{message} | Indexed: {stats.indexed} | Failed: {stats.failed} | Deleted: {stats.deleted} | "
+            f"Duration: {stats.elapsed_seconds:.2f}s | Throughput: {stats.docs_per_second:.0f} docs/s"
+        )
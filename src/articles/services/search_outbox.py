@@ -0,0 +1,182 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.articles.models.article import Article
+from src.articles.models.search_outbox import SearchOutbox
+from src.articles.repositories.article import ArticleRepository
+from src.articles.repositories.search_outbox import SearchOutboxRepository
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.services.index_queue import ArticleIndexQueue, RETRYABLE_STATUSES
+from src.articles.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# the bulk item status of a write whose external version is not above the version of the indexed document
+VERSION_CONFLICT_STATUS = 409
+
+
+class SearchOutboxIndexer:
+    """
+    Records article changes in the search outbox of the request transaction instead of sending them
+    to elasticsearch, so a rolled back change never reaches the index and a committed one is never lost.
+    The changes are sent by the SearchOutboxWorker after the commit, so refresh can not be honoured.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.outbox_repository = SearchOutboxRepository(db)
+
+    async def index_article(self, article: Article, refresh: bool = False) -> None:
+        await self.outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+
+    async def index_articles(
+            self,
+            articles: Sequence[Article],
+            refresh: bool = False,
+            wait: bool = False
+    ) -> Dict[int, str]:
+        await self.outbox_repository.add_many(
+            article_ids=[article.id for article in articles], operation=SearchOutbox.OPERATION_INDEX
+        )
+        # the entries stay in the outbox until elasticsearch took them, none is lost to report
+        return {}
+
+    async def delete_article(self, article_id: int, refresh: bool = False) -> None:
+        await self.outbox_repository.add(article_id=article_id, operation=SearchOutbox.OPERATION_DELETE)
+
+
+# the ways article writes reach the search index, all with index_article, index_articles and delete_article
+ArticleIndexer = Union[ArticleIndexQueue, SearchOutboxIndexer]
+
+
+@dataclass
+class OutboxStats:
+    batches: int = 0
+    sent: int = 0
+    failed: int = 0
+    last_batch_at: Optional[datetime] = None
+    # seconds between the oldest change of the last batch being committed and being sent
+    lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+
+
+class SearchOutboxWorker:
+    """
+    Drains the search outbox in batches. Each batch is claimed with FOR UPDATE SKIP LOCKED, so several
+    workers, in the application or in separate processes, share the work without sending a change twice.
+    The entries are removed in the same transaction once elasticsearch accepted them, a failed request
+    leaves them in place for the next attempt. Workers may still claim different entries of one article,
+    every document is written with the id of its latest entry as external version, so a batch holding an
+    older state of the article can not overwrite the document a later entry wrote.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            search_repository: ArticleSearchRepository,
+            *,
+            batch_size: int = 500,
+            poll_interval: float = 1.0,
+            on_written: Optional[Callable[[], None]] = None
+    ):
+        self.session_factory = session_factory
+        self.search_repository = search_repository
+        # called after every sent batch, e.g. to invalidate cached search results
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stats = OutboxStats()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start draining the outbox in a background task"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the background task, a batch in flight is rolled back and picked up again later"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def run(self) -> None:
+        """Drain the outbox until cancelled, polling when it is empty"""
+        while True:
+            try:
+                sent = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Search outbox batch failed: {str(e)}")
+                sent = 0
+
+            if sent < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def process_batch(self) -> int:
+        """
+        Send one batch of outbox entries to elasticsearch
+        :return: the number of claimed entries
+        """
+        async with self.session_factory() as db:
+            async with db.begin():
+                outbox_repository = SearchOutboxRepository(db)
+                entries = await outbox_repository.claim_batch(self.batch_size)
+                if not entries:
+                    return 0
+
+                actions = await self._build_actions(db, entries)
+                # the entries are ordered, the last one of an article is its latest
+                versions = {entry.article_id: entry.id for entry in entries}
+                errors = await self.search_repository.bulk_write(actions, versions=versions)
+
+                # a version conflict means a later entry of the article was already written, nothing is lost
+                errors = [error for error in errors if error.get("status") != VERSION_CONFLICT_STATUS]
+                retryable_ids = set()
+                for error in errors:
+                    if error.get("status") in RETRYABLE_STATUSES:
+                        retryable_ids.add(int(error["_id"]))
+                    else:
+                        logger.error(f"Failed to index article {error.get('_id')}: {error.get('error')}")
+
+                await outbox_repository.delete_entries(
+                    [entry.id for entry in entries if entry.article_id not in retryable_ids]
+                )
+
+        self._record(entries, failed=len(errors))
+        if self.on_written is not None:
+            self.on_written()
+        return len(entries)
+
+    @staticmethod
+    async def _build_actions(db: AsyncSession, entries: List[SearchOutbox]) -> List[Tuple[int, Optional[dict]]]:
+        """The entries are ordered, only the latest change of an article is sent, with its current state"""
+        latest: Dict[int, str] = {entry.article_id: entry.operation for entry in entries}
+        index_ids = [article_id for article_id, operation in latest.items()
+                     if operation == SearchOutbox.OPERATION_INDEX]
+        articles = {article.id: article for article in await ArticleRepository(db).get_by_ids(index_ids)}
+
+        # an article deleted after it was queued for indexing is removed from the index as well
+        return [
+            (article_id, ArticleSearchRepository.build_document(articles[article_id]) if article_id in articles else None)
+            for article_id in latest
+        ]
+
+    def _record(self, entries: List[SearchOutbox], failed: int) -> None:
+        now = datetime.now(timezone.utc)
+        lag_seconds = max((now - min(entry.created_at for entry in entries)).total_seconds(), 0.0)
+
+        self.stats.batches += 1
+        self.stats.sent += len(entries) - failed
+        self.stats.failed += failed
+        self.stats.last_batch_at = now
+        self.stats.lag_seconds = lag_seconds
+        self.stats.max_lag_seconds = max(self.stats.max_lag_seconds, lag_seconds)
+
+        logger.info(f"Sent {len(entries)} search outbox entries, {failed} failed, lag {lag_seconds:.3f}s")
@@ -1,7 +1,10 @@
+from typing import Optional
+
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.articles.auth.password_utils import get_password_hash, verify_password
+from src.articles.auth.password_utils import LoginThrottle, PasswordHasher, get_login_throttle, get_password_hasher
+from src.articles.auth.principal import get_principal_cache
 from src.articles.core.error_messages import ErrorMessages
 from src.articles.models.user import User
 from src.articles.repositories.user import UserRepository
@@ -10,8 +13,19 @@ from src.articles.services.base import BaseService
 
 
 class UserService(BaseService[User, UserCreate, UserUpdate, UserRepository]):
-    def __init__(self, db: AsyncSession):
+    # users are not kept in the entity cache, their writes still evict the principals of the other workers
+    cache_entity = "users"
+
+    def __init__(
+            self,
+            db: AsyncSession,
+            password_hasher: Optional[PasswordHasher] = None,
+            login_throttle: Optional[LoginThrottle] = None
+    ):
         super().__init__(UserRepository, db)
+        # bcrypt runs in the pool of the hasher, never on the event loop
+        self.password_hasher = password_hasher or get_password_hasher()
+        self.login_throttle = login_throttle or get_login_throttle()
 
     async def create(self, *, obj: UserCreate) -> UserSchema:
         """
@@ -24,19 +38,42 @@ class UserService(BaseService[User, UserCreate, UserUpdate, UserRepository]):
             if existing_user:
                 raise HTTPException(status_code=400, detail=ErrorMessages.USERNAME_ALREADY_EXISTS.value)
 
-            hashed_password = get_password_hash(obj.password)
+            hashed_password = await self.password_hasher.hash(obj.password)
             user_data = UserCreate(username=obj.username, password=hashed_password)
 
             created_user = await self.repository.create_user(obj_in=user_data)
             return UserSchema.model_validate(created_user)
 
+    async def update(self, *, obj_id: int, obj: UserUpdate, user_id: int) -> User:
+        """
+        update a user, the cached principal of the user is invalidated
+        :param obj_id: the id of the user
+        :param obj: the changes of the user
+        :param user_id: the id of the user attempting to update the user
+        :return: the updated user
+        """
+        user = await super().update(obj_id=obj_id, obj=obj, user_id=user_id)
+        get_principal_cache().invalidate(obj_id, self.db)
+        return user
+
+    async def delete(self, *, obj_id: int, user_id: int) -> User:
+        """
+        delete a user, the cached principal of the user is invalidated so its tokens stop working
+        :param obj_id: the id of the user
+        :param user_id: the id of the user attempting to delete the user
+        :return: the deleted user
+        """
+        user = await super().delete(obj_id=obj_id, user_id=user_id)
+        get_principal_cache().invalidate(obj_id, self.db)
+        return user
+
     async def authenticate(self, *, username: str, password: str) -> User | None:
-        """Authenticate a user by username and password."""
+        """Authenticate a user by username and password, the attempts per username are throttled."""
+        self.login_throttle.attempt(username)
         user = await self.repository.get_by_username(username=username)
         if not user:
             return None
-        if not verify_password(password, user.password):
+        if not await self.password_hasher.verify(password, user.password):
             return None
+        self.login_throttle.succeeded(username)
         return user
-
-
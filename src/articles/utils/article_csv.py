@@ -0,0 +1,125 @@
+"""
+The CSV layout of the article exports, read back by the CSV import. Exports are encoded chunk by chunk
+as they are streamed. Files are read from a byte offset in chunks of rows, so an import can be resumed
+where it stopped and never holds more than one chunk.
+"""
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, List, Sequence, Tuple
+
+ARTICLE_CSV_COLUMNS = ['ID', 'Title', 'Abstract', 'Publication Date', 'Authors', 'Tags', 'Owner ID']
+# the authors and tags of an article share one column each
+NAME_SEPARATOR = ', '
+DATE_FORMAT = '%Y-%m-%d'
+
+
+@dataclass
+class ArticleCsvRow:
+    title: str
+    abstract: str
+    publication_date: datetime
+    author_names: List[str]
+    tag_names: List[str]
+
+
+class _OffsetLines:
+    """The decoded lines of a binary file, remembering the byte offset after the last line handed out"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.offset = file.tell()
+        self._at_start = self.offset == 0
+
+    def __iter__(self) -> "_OffsetLines":
+        return self
+
+    def __next__(self) -> str:
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self.offset = self.file.tell()
+        text = line.decode('utf-8')
+        if self._at_start:
+            # the exports start with a byte order mark for Excel
+            self._at_start = False
+            text = text.removeprefix('\ufeff')
+        return text
+
+
+def encode_header() -> bytes:
+    """The start of an export, with a byte order mark so that Excel reads the file as utf-8"""
+    return encode_rows([ARTICLE_CSV_COLUMNS], prefix='\ufeff')
+
+
+def encode_rows(rows: Sequence[Sequence[Any]], prefix: str = '') -> bytes:
+    """
+    Encode a chunk of export rows, the publication dates are written as dates
+    :param rows: the id, title, abstract, publication date, author names, tag names and owner id of the articles
+    :param prefix: text written before the rows
+    :return: the utf-8 encoded CSV lines of the rows
+    """
+    buffer = io.StringIO()
+    buffer.write(prefix)
+    writer = csv.writer(buffer, lineterminator='\n')
+    for row in rows:
+        writer.writerow([value.strftime(DATE_FORMAT) if isinstance(value, datetime) else value for value in row])
+    return buffer.getvalue().encode('utf-8')
+
+
+def read_rows(path: str, offset: int, limit: int) -> Tuple[List[List[str]], int]:
+    """
+    Read the next rows of an article CSV file, blocking, so run it in a thread from async code
+    :param path: the path of the file
+    :param offset: the byte offset to start at, 0 for the start of the file where the header is checked
+    :param limit: the maximum number of rows to read
+    :return: the rows and the byte offset right after the last one, where the next read starts
+    """
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        lines = _OffsetLines(file)
+        # the csv reader only pulls the lines of the record it returns, so the offset stays on a record boundary
+        reader = csv.reader(lines)
+        if offset == 0:
+            header = next(reader, None)
+            if header is not None and header != ARTICLE_CSV_COLUMNS:
+                raise ValueError(f"Unexpected CSV header {header}, expected {ARTICLE_CSV_COLUMNS}")
+
+        rows = []
+        while len(rows) < limit:
+            row = next(reader, None)
+            if row is None:
+                break
+            if row:
+                rows.append(row)
+        return rows, lines.offset
+
+
+def parse_row(row: List[str]) -> ArticleCsvRow:
+    """
+    Parse a row in the export layout, the ID and Owner ID columns are ignored since the imported
+    articles get new ids and belong to the importing user
+    :param row: the values of the row
+    :return: the parsed row
+    :raises ValueError: when the row is malformed
+    """
+    if len(row) != len(ARTICLE_CSV_COLUMNS):
+        raise ValueError(f"Expected {len(ARTICLE_CSV_COLUMNS)} columns, got {len(row)}")
+
+    _, title, abstract, publication_date, authors, tags, _ = row
+    if not title.strip():
+        raise ValueError("The title is empty")
+
+    return ArticleCsvRow(
+        title=title,
+        abstract=abstract,
+        publication_date=datetime.strptime(publication_date, DATE_FORMAT).replace(tzinfo=timezone.utc),
+        author_names=split_names(authors),
+        tag_names=split_names(tags),
+    )
+
+
+def split_names(value: str) -> List[str]:
+    """The distinct names of an Authors or Tags column, in their order"""
+    return list(dict.fromkeys(name.strip() for name in value.split(NAME_SEPARATOR) if name.strip()))
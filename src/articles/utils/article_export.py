@@ -0,0 +1,212 @@
+"""
+The encoders of the article export formats. Each encoder turns the chunks of export rows streamed from the
+database into bytes as they arrive: CSV and NDJSON line by line, Parquet with one row group per chunk and
+Arrow with one record batch per chunk of an IPC stream, so no format holds more than one chunk in memory.
+Parquet and Arrow need the optional pyarrow package.
+"""
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Type
+
+from src.articles.schemas.article import ExportFormat
+from src.articles.utils.article_csv import NAME_SEPARATOR, encode_header, encode_rows
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# the values of an export row, in the order of the columns selected by ArticleRepository.stream_export_rows
+EXPORT_FIELDS = (
+    'id',
+    'title',
+    'abstract',
+    'publication_date',
+    'author_ids',
+    'author_names',
+    'tag_ids',
+    'tag_names',
+    'owner_id',
+)
+
+
+class ExportEncoder(ABC):
+    """Encodes an export, start() once, encode() for every chunk of rows and finish() once at the end"""
+    media_type: str
+    extension: str
+    # columnar formats are written in larger chunks, each chunk is a row group
+    columnar = False
+
+    def start(self) -> bytes:
+        return b''
+
+    @abstractmethod
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        """the bytes of a chunk of export rows"""
+
+    def finish(self) -> bytes:
+        return b''
+
+
+class CsvExportEncoder(ExportEncoder):
+    """The CSV layout read back by the import, the names of the authors and tags are joined into one column each"""
+    media_type = 'text/csv'
+    extension = 'csv'
+
+    def start(self) -> bytes:
+        return encode_header()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return encode_rows([
+            (
+                article_id,
+                title,
+                abstract,
+                publication_date,
+                NAME_SEPARATOR.join(author_names),
+                NAME_SEPARATOR.join(tag_names),
+                owner_id,
+            )
+            for article_id, title, abstract, publication_date, _, author_names, _, tag_names, owner_id in rows
+        ])
+
+
+class NdjsonExportEncoder(ExportEncoder):
+    """One JSON object per line, the publication dates in ISO 8601 and the ids and names as arrays"""
+    media_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False, default=self._default) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+    @staticmethod
+    def _default(value: Any) -> str:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class _DrainedSink:
+    """A write only file that keeps what was written until it is drained, pyarrow writes into it"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class _ArrowExportEncoder(ExportEncoder):
+    """Builds a record batch of every chunk of rows and hands it to the writer of the format"""
+    columnar = True
+
+    def __init__(self):
+        self.schema = pyarrow.schema([
+            ('id', pyarrow.int64()),
+            ('title', pyarrow.string()),
+            ('abstract', pyarrow.string()),
+            ('publication_date', pyarrow.timestamp('us', tz='UTC')),
+            ('author_ids', pyarrow.list_(pyarrow.int64())),
+            ('author_names', pyarrow.list_(pyarrow.string())),
+            ('tag_ids', pyarrow.list_(pyarrow.int64())),
+            ('tag_names', pyarrow.list_(pyarrow.string())),
+            ('owner_id', pyarrow.int64()),
+        ])
+        self.sink = _DrainedSink()
+        self.writer = self._open_writer()
+
+    @abstractmethod
+    def _open_writer(self):
+        """the pyarrow writer of the format, writing into the sink"""
+
+    def _write(self, batch) -> None:
+        self.writer.write_batch(batch)
+
+    def start(self) -> bytes:
+        return self.sink.drain()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        if not rows:
+            return b''
+        columns = list(zip(*rows))
+        self._write(pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+class ParquetExportEncoder(_ArrowExportEncoder):
+    media_type = 'application/vnd.apache.parquet'
+    extension = 'parquet'
+
+    def _open_writer(self):
+        return pyarrow.parquet.ParquetWriter(self.sink, self.schema)
+
+    def _write(self, batch) -> None:
+        # the footer with the row group offsets is written by finish(), the row groups go out as they are written
+        self.writer.write_batch(batch, row_group_size=batch.num_rows)
+
+
+class ArrowExportEncoder(_ArrowExportEncoder):
+    """The Arrow IPC streaming format, which unlike the file format needs no footer to be read"""
+    media_type = 'application/vnd.apache.arrow.stream'
+    extension = 'arrows'
+
+    def _open_writer(self):
+        return pyarrow.ipc.new_stream(self.sink, self.schema)
+
+
+EXPORT_ENCODERS: Dict[ExportFormat, Type[ExportEncoder]] = {
+    ExportFormat.CSV: CsvExportEncoder,
+    ExportFormat.NDJSON: NdjsonExportEncoder,
+    ExportFormat.PARQUET: ParquetExportEncoder,
+    ExportFormat.ARROW: ArrowExportEncoder,
+}
+
+
+def create_encoder(export_format: ExportFormat) -> Optional[ExportEncoder]:
+    """
+    The encoder of an export format
+    :param export_format: the format of the export
+    :return: a new encoder, None when the format needs pyarrow and it is not installed
+    """
+    encoder_class = EXPORT_ENCODERS[export_format]
+    if issubclass(encoder_class, _ArrowExportEncoder) and pyarrow is None:
+        return None
+    return encoder_class()
+
@@ -0,0 +1,37 @@
+import base64
+import hashlib
+import json
+from typing import Any, Dict
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from src.articles.core.error_messages import ErrorMessages
+
+# the value clients send to start a cursor paginated listing
+START_CURSOR = "*"
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Encode the pagination state into an opaque url safe cursor"""
+    payload = json.dumps(state, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor created by encode_cursor, malformed cursors are rejected with a 400"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(payload)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=ErrorMessages.INVALID_CURSOR.value)
+
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=400, detail=ErrorMessages.INVALID_CURSOR.value)
+    return state
+
+
+def fingerprint(params: BaseModel) -> str:
+    """Short stable hash of the parameters a cursor was created for"""
+    payload = params.model_dump_json(exclude_none=True).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
@@ -0,0 +1,192 @@
+"""
+Python version of the custom_analyzer of the article indices: standard tokenizer, lowercase, english stop
+words and the english (porter) snowball stemmer, plus the edit distance used for AUTO fuzziness.
+"""
+import re
+from typing import List, Tuple
+
+# the default stop words of the elasticsearch stop filter (_english_)
+ENGLISH_STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is", "it", "no", "not",
+    "of", "on", "or", "such", "that", "the", "their", "then", "there", "these", "they", "this", "to", "was",
+    "will", "with",
+})
+
+MAX_TOKEN_LENGTH = 255
+
+_TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)*")
+
+_STEP2_SUFFIXES: Tuple[Tuple[str, str], ...] = (
+    ("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"), ("izer", "ize"),
+    ("bli", "ble"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous"), ("ization", "ize"),
+    ("ation", "ate"), ("ator", "ate"), ("alism", "al"), ("iveness", "ive"), ("fulness", "ful"),
+    ("ousness", "ous"), ("aliti", "al"), ("iviti", "ive"), ("biliti", "ble"), ("logi", "log"),
+)
+_STEP3_SUFFIXES: Tuple[Tuple[str, str], ...] = (
+    ("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"), ("ical", "ic"), ("ful", ""), ("ness", ""),
+)
+_STEP4_SUFFIXES: Tuple[str, ...] = (
+    "al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement", "ment", "ent", "ion", "ou", "ism", "ate",
+    "iti", "ous", "ive", "ize",
+)
+
+
+def analyze(text: str) -> List[str]:
+    """Split a text into the terms that the custom_analyzer of the article indices would produce"""
+    terms = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()[:MAX_TOKEN_LENGTH]
+        if token not in ENGLISH_STOP_WORDS:
+            terms.append(stem(token))
+    return terms
+
+
+def auto_fuzziness(term: str) -> int:
+    """The maximum edit distance of the elasticsearch AUTO fuzziness for a term"""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+def edit_distance(first: str, second: str, max_distance: int) -> int:
+    """
+    Levenshtein distance counting adjacent transpositions as one edit, like the fuzzy queries of elasticsearch.
+    Returns max_distance + 1 as soon as the distance is known to be larger than max_distance.
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+
+    previous_previous: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def stem(word: str) -> str:
+    """Reduce an english word to its stem with the porter algorithm"""
+    if len(word) <= 2 or not word.isalpha():
+        return word
+
+    word = _step1a(word)
+    word = _step1b(word)
+    word = _step1c(word)
+    word = _replace_suffix(word, _STEP2_SUFFIXES, min_measure=1)
+    word = _replace_suffix(word, _STEP3_SUFFIXES, min_measure=1)
+    word = _step4(word)
+    word = _step5(word)
+    return word
+
+
+def _is_consonant(word: str, i: int) -> bool:
+    if word[i] in "aeiou":
+        return False
+    if word[i] == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem_: str) -> int:
+    """The number of vowel-consonant sequences of a stem, the m of the porter algorithm"""
+    measure = 0
+    previous_is_vowel = False
+    for i in range(len(stem_)):
+        is_vowel = not _is_consonant(stem_, i)
+        if previous_is_vowel and not is_vowel:
+            measure += 1
+        previous_is_vowel = is_vowel
+    return measure
+
+
+def _has_vowel(stem_: str) -> bool:
+    return any(not _is_consonant(stem_, i) for i in range(len(stem_)))
+
+
+def _ends_with_double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _ends_with_cvc(word: str) -> bool:
+    """consonant-vowel-consonant where the last consonant is not w, x or y"""
+    return (
+        len(word) >= 3
+        and _is_consonant(word, len(word) - 3)
+        and not _is_consonant(word, len(word) - 2)
+        and _is_consonant(word, len(word) - 1)
+        and word[-1] not in "wxy"
+    )
+
+
+def _step1a(word: str) -> str:
+    if word.endswith("sses") or word.endswith("ies"):
+        return word[:-2]
+    if word.endswith("ss"):
+        return word
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _step1b(word: str) -> str:
+    if word.endswith("eed"):
+        return word[:-1] if _measure(word[:-3]) > 0 else word
+
+    for suffix in ("ed", "ing"):
+        if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+            word = word[:-len(suffix)]
+            if word.endswith(("at", "bl", "iz")):
+                return word + "e"
+            if _ends_with_double_consonant(word) and word[-1] not in "lsz":
+                return word[:-1]
+            if _measure(word) == 1 and _ends_with_cvc(word):
+                return word + "e"
+            return word
+    return word
+
+
+def _step1c(word: str) -> str:
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        return word[:-1] + "i"
+    return word
+
+
+def _replace_suffix(word: str, suffixes: Tuple[Tuple[str, str], ...], min_measure: int) -> str:
+    """Only the first matching suffix is considered, the replacement needs a stem with the minimum measure"""
+    for suffix, replacement in suffixes:
+        if word.endswith(suffix):
+            stem_ = word[:-len(suffix)]
+            return stem_ + replacement if _measure(stem_) >= min_measure else word
+    return word
+
+
+def _step4(word: str) -> str:
+    matches = [suffix for suffix in _STEP4_SUFFIXES if word.endswith(suffix)]
+    if not matches:
+        return word
+
+    suffix = max(matches, key=len)
+    stem_ = word[:-len(suffix)]
+    if suffix == "ion" and not stem_.endswith(("s", "t")):
+        return word
+    return stem_ if _measure(stem_) > 1 else word
+
+
+def _step5(word: str) -> str:
+    if word.endswith("e"):
+        stem_ = word[:-1]
+        measure = _measure(stem_)
+        if measure > 1 or (measure == 1 and not _ends_with_cvc(stem_)):
+            word = stem_
+    if word.endswith("ll") and _measure(word) > 1:
+        word = word[:-1]
+    return word
@@ -1,13 +1,20 @@
-from datetime import datetime, timezone
-from typing import Optional, List, Tuple, Any, Dict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Optional, List, Tuple, Any, Dict, Mapping, Sequence
 from unittest.mock import MagicMock
 
+from elasticsearch import NotFoundError
 from pydantic import BaseModel
 
 from src.articles.models.article import Article
+from src.articles.models.article_export import ArticleExport
+from src.articles.models.article_import import ArticleImport
 from src.articles.models.author import Author
+from src.articles.models.comment import Comment
+from src.articles.models.search_outbox import SearchOutbox
 from src.articles.models.tag import Tag
 from src.articles.models.user import User
+from src.articles.repositories.search_repository import ArticleSearchRepository
 
 class MockBaseRepository:
     def __init__(self):
@@ -17,6 +24,9 @@ class MockBaseRepository:
     async def get_by_id(self, id: int) -> Optional[Any]:
         return self.data.get(id)
 
+    async def get_by_ids(self, obj_ids: Sequence[int]) -> List[Any]:
+        return [self.data[obj_id] for obj_id in obj_ids if obj_id in self.data]
+
     async def create(self, obj_in: Any) -> Any:
         model = self._create_model(obj_in)
         self.data[model.id] = model
@@ -68,10 +78,93 @@ class MockArticleRepository(MockBaseRepository):
         self.data[article.id] = article
         return article
 
-    async def search_with_filters(self, search_params: Any, elastic_ids: Optional[List[str]],
-                                page: int, page_size: int) -> Tuple[List[Article], int]:
+    async def bulk_create_with_relationships(self, items: List[Tuple[dict, List[Author], List[Tag]]]) -> List[Article]:
+        return [
+            await self.create_with_relationships(obj_in_data=obj_in_data, authors=authors, tags=tags)
+            for obj_in_data, authors, tags in items
+        ]
+
+    async def copy_with_relationships(self, items: List[Tuple[dict, List[int], List[int]]]) -> List[int]:
+        return [
+            (await self.create_with_relationships(obj_in_data=obj_in_data, authors=[], tags=[])).id
+            for obj_in_data, _, _ in items
+        ]
+
+    async def update_with_relationships(
+            self,
+            article: Article,
+            obj_in_data: dict,
+            authors: Optional[List[Author]] = None,
+            tags: Optional[List[Tag]] = None
+    ) -> Article:
+        if authors is not None:
+            article.authors = authors
+        if tags is not None:
+            article.tags = tags
+        return await self.update(article, obj_in_data)
+
+    async def stream_in_chunks(self, chunk_size: int = 1000, updated_since: Optional[datetime] = None):
+        items = [
+            item for item in self.data.values() if updated_since is None or item.updated_at >= updated_since
+        ]
+        for start in range(0, len(items), chunk_size):
+            yield items[start:start + chunk_size]
+
+    async def stream_export_rows(
+            self, search_params: Any, elastic_ids: Optional[List[int]] = None, chunk_size: int = 1000
+    ):
+        articles = [
+            article for article in self.data.values()
+            if (elastic_ids is None or article.id in elastic_ids)
+            and (not search_params.title or search_params.title.lower() in article.title.lower())
+        ]
+        for start in range(0, len(articles), chunk_size):
+            yield [
+                (
+                    article.id,
+                    article.title,
+                    article.abstract,
+                    article.publication_date,
+                    [author.id for author in article.authors],
+                    [author.name for author in article.authors],
+                    [tag.id for tag in article.tags],
+                    [tag.name for tag in article.tags],
+                    article.owner_id,
+                )
+                for article in articles[start:start + chunk_size]
+            ]
+
+    async def get_existing_ids(self, ids: List[int]) -> set:
+        return {obj_id for obj_id in ids if obj_id in self.data}
+
+    async def get_by_ids(self, obj_ids: List[int]) -> List[Article]:
+        return [self.data[obj_id] for obj_id in obj_ids if obj_id in self.data]
+
+    async def get_read_model(self, obj_id: int) -> Optional[Article]:
+        return self.data.get(obj_id)
+
+    async def get_read_models(self, obj_ids: List[int]) -> List[Article]:
+        return [self.data[obj_id] for obj_id in obj_ids if obj_id in self.data]
+
+    async def search_with_filters(
+            self, search_params: Any, page: int, page_size: int, count_mode: str = "exact"
+    ) -> Tuple[List[Article], Optional[int], bool]:
         items = list(self.data.values())
-        return items, len(items)
+        start = (page - 1) * page_size
+        total = None if count_mode == "none" else len(items)
+        return items[start:start + page_size], total, start + page_size < len(items)
+
+    async def search_after(
+            self, search_params: Any, page_size: int, after: Optional[tuple] = None, count_mode: str = "none"
+    ) -> Tuple[List[Article], Optional[int], bool]:
+        items = sorted(self.data.values(), key=lambda item: item.id, reverse=search_params.sort == "newest")
+        total = None if count_mode == "none" else len(items)
+        if after is not None:
+            if search_params.sort == "newest":
+                items = [item for item in items if item.id < after[-1]]
+            else:
+                items = [item for item in items if item.id > after[-1]]
+        return items[:page_size], total, len(items) > page_size
 
     def _create_model(self, obj_in: Any) -> Article:
         data = self._get_data_dict(obj_in)
@@ -83,6 +176,38 @@ class MockArticleRepository(MockBaseRepository):
         )
 
 
+class MockCommentRepository(MockBaseRepository):
+    async def get_page_after(
+            self,
+            article_id: int,
+            page_size: int,
+            sort: str = "newest",
+            after_id: Optional[int] = None,
+            count_mode: str = "none"
+    ) -> Tuple[List[Comment], Optional[int], bool]:
+        comments = sorted(
+            (comment for comment in self.data.values() if comment.article_id == article_id),
+            key=lambda comment: comment.id,
+            reverse=sort == "newest",
+        )
+        total = None if count_mode == "none" else len(comments)
+        if after_id is not None:
+            comments = [
+                comment for comment in comments
+                if (comment.id < after_id if sort == "newest" else comment.id > after_id)
+            ]
+        return comments[:page_size], total, len(comments) > page_size
+
+    def _create_model(self, obj_in: Any) -> Comment:
+        data = self._get_data_dict(obj_in)
+        return Comment(
+            id=self._get_next_id(),
+            created_at=datetime.now(timezone.utc),
+            updated_at=datetime.now(timezone.utc),
+            **data
+        )
+
+
 class MockUserRepository(MockBaseRepository):
     async def get_by_username(self, username: str) -> Optional[User]:
         for user in self.data.values():
@@ -110,6 +235,13 @@ class MockAuthorRepository(MockBaseRepository):
                 return author
         return None
 
+    async def get_or_create_by_names(self, names: Sequence[str]) -> Dict[str, int]:
+        ids_by_name = {}
+        for name in dict.fromkeys(names):
+            existing = await self.get_by_name(name)
+            ids_by_name[name] = existing.id if existing else (await self.create({"name": name})).id
+        return ids_by_name
+
     def _create_model(self, obj_in: Any) -> Author:
         data = self._get_data_dict(obj_in)
         return Author(
@@ -127,6 +259,13 @@ class MockTagRepository(MockBaseRepository):
                 return tag
         return None
 
+    async def get_or_create_by_names(self, names: Sequence[str]) -> Dict[str, int]:
+        ids_by_name = {}
+        for name in dict.fromkeys(names):
+            existing = await self.get_by_name(name)
+            ids_by_name[name] = existing.id if existing else (await self.create({"name": name})).id
+        return ids_by_name
+
     def _create_model(self, obj_in: Any) -> Tag:
         data = self._get_data_dict(obj_in)
         return Tag(
@@ -137,10 +276,372 @@ class MockTagRepository(MockBaseRepository):
         )
 
 
+class MockSearchOutboxRepository:
+    def __init__(self):
+        self.entries = {}
+        self.current_id = 1
+
+    async def add(self, article_id: int, operation: str) -> None:
+        entry = SearchOutbox(
+            id=self.current_id,
+            article_id=article_id,
+            operation=operation,
+            created_at=datetime.now(timezone.utc),
+        )
+        self.entries[entry.id] = entry
+        self.current_id += 1
+
+    async def add_many(self, article_ids: Sequence[int], operation: str) -> None:
+        for article_id in article_ids:
+            await self.add(article_id, operation)
+
+    async def claim_batch(self, limit: int) -> List[SearchOutbox]:
+        return [self.entries[entry_id] for entry_id in sorted(self.entries)[:limit]]
+
+    async def delete_entries(self, entry_ids: Sequence[int]) -> None:
+        for entry_id in entry_ids:
+            self.entries.pop(entry_id, None)
+
+    async def count_pending(self) -> int:
+        return len(self.entries)
+
+
+class MockArticleImportRepository:
+    def __init__(self):
+        self.imports = {}
+        self.current_id = 1
+
+    async def create(self, owner_id: int, filename: str, path: str, bytes_total: int) -> ArticleImport:
+        article_import = ArticleImport(
+            id=self.current_id,
+            owner_id=owner_id,
+            filename=filename,
+            path=path,
+            status=ArticleImport.STATUS_PENDING,
+            bytes_total=bytes_total,
+            bytes_read=0,
+            rows_imported=0,
+            rows_failed=0,
+            created_at=datetime.now(timezone.utc),
+            updated_at=datetime.now(timezone.utc),
+        )
+        self.imports[article_import.id] = article_import
+        self.current_id += 1
+        return article_import
+
+    async def get_by_id(self, import_id: int) -> Optional[ArticleImport]:
+        return self.imports.get(import_id)
+
+    async def claim(self, import_id: int, stale_after: float) -> Optional[ArticleImport]:
+        article_import = self.imports.get(import_id)
+        if article_import is None or article_import.status in (
+                ArticleImport.STATUS_RUNNING, ArticleImport.STATUS_COMPLETED
+        ):
+            return None
+        article_import.status = ArticleImport.STATUS_RUNNING
+        article_import.error = None
+        return article_import
+
+    async def save_checkpoint(
+            self, import_id: int, expected_bytes_read: int, bytes_read: int, rows_imported: int, rows_failed: int
+    ) -> bool:
+        article_import = self.imports[import_id]
+        if article_import.status != ArticleImport.STATUS_RUNNING or article_import.bytes_read != expected_bytes_read:
+            return False
+        article_import.bytes_read = bytes_read
+        article_import.rows_imported += rows_imported
+        article_import.rows_failed += rows_failed
+        return True
+
+    async def set_status(
+            self, import_id: int, status: str, error: Optional[str] = None, from_status: Optional[str] = None
+    ) -> None:
+        if from_status is not None and self.imports[import_id].status != from_status:
+            return
+        self.imports[import_id].status = status
+        self.imports[import_id].error = error
+
+
+class MockArticleExportRepository:
+    """Holds the export jobs the way the article_exports table does, shared by every service given the instance"""
+    def __init__(self):
+        self.exports = {}
+
+    async def create_or_get_active(
+            self,
+            job_id: str,
+            owner_id: int,
+            key: str,
+            search_params: Dict[str, Any],
+            export_format: str,
+            compressed: bool,
+            path: str,
+            filename: str,
+            media_type: str
+    ) -> Optional[ArticleExport]:
+        for export in self.exports.values():
+            if export.owner_id == owner_id and export.key == key and export.status in (
+                    ArticleExport.STATUS_PENDING, ArticleExport.STATUS_RUNNING
+            ):
+                return export
+        export = ArticleExport(
+            id=job_id,
+            owner_id=owner_id,
+            key=key,
+            search_params=search_params,
+            format=export_format,
+            compressed=compressed,
+            path=path,
+            filename=filename,
+            media_type=media_type,
+            status=ArticleExport.STATUS_PENDING,
+            bytes_written=0,
+            created_at=datetime.now(timezone.utc),
+            updated_at=datetime.now(timezone.utc),
+        )
+        self.exports[job_id] = export
+        return export
+
+    async def get_by_id(self, job_id: str) -> Optional[ArticleExport]:
+        return self.exports.get(job_id)
+
+    async def count_pending(self) -> int:
+        return sum(export.status == ArticleExport.STATUS_PENDING for export in self.exports.values())
+
+    async def claim_next(self, run_id: str, stale_after: float) -> Optional[ArticleExport]:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        for export in sorted(self.exports.values(), key=lambda export: export.created_at):
+            if export.status == ArticleExport.STATUS_PENDING or (
+                    export.status == ArticleExport.STATUS_RUNNING and export.updated_at < stale_before
+            ):
+                export.status = ArticleExport.STATUS_RUNNING
+                export.run_id = run_id
+                export.bytes_written = 0
+                export.error = None
+                export.updated_at = datetime.now(timezone.utc)
+                return export
+        return None
+
+    async def save_progress(self, job_id: str, run_id: str, bytes_written: int) -> bool:
+        export = self.exports[job_id]
+        if export.run_id != run_id or export.status != ArticleExport.STATUS_RUNNING:
+            return False
+        export.bytes_written = bytes_written
+        export.updated_at = datetime.now(timezone.utc)
+        return True
+
+    async def finish(
+            self, job_id: str, run_id: str, status: str, bytes_written: int, error: Optional[str] = None
+    ) -> bool:
+        export = self.exports[job_id]
+        if export.run_id != run_id or export.status != ArticleExport.STATUS_RUNNING:
+            return False
+        export.status = status
+        export.bytes_written = bytes_written
+        export.error = error
+        export.finished_at = datetime.now(timezone.utc)
+        return True
+
+    async def delete_expired(self, retention: float) -> List[str]:
+        expired_before = datetime.now(timezone.utc) - timedelta(seconds=retention)
+        expired = [
+            export for export in self.exports.values()
+            if export.finished_at is not None and export.finished_at < expired_before
+        ]
+        for export in expired:
+            del self.exports[export.id]
+        return [export.path for export in expired]
+
+
+class MockSession:
+    """Stands in for an AsyncSession used as `async with session_factory() as db, db.begin()`"""
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def begin(self):
+        return self
+
+
+class MockListenConnection:
+    """Stands in for the LISTEN connection of the cache invalidation listener, lost after its notifications"""
+    def __init__(self, payloads: Sequence[str] = ()):
+        self.payloads = list(payloads)
+        self.executed = []
+        self.closed = False
+
+    async def execute(self, query: Any, *args: Any) -> None:
+        self.executed.append(query)
+
+    async def notifies(self, *, timeout: Optional[float] = None, stop_after: Optional[int] = None):
+        for payload in self.payloads:
+            yield SimpleNamespace(payload=payload)
+        raise ConnectionError("server closed the connection unexpectedly")
+
+    async def close(self) -> None:
+        self.closed = True
+
+
 class MockArticleSearchRepository:
-    async def index_article(self, article: Article) -> dict:
+    def __init__(self):
+        self.index_prefix = "articles"
+        self.read_alias = "articles_read"
+        self.write_alias = "articles_write"
+        self.indices = {}
+        self.aliases = {}
+        self.refresh_interval = None
+        self.refresh_intervals = []
+        self.versions = {}
+        self.bulk_sizes = []
+        self.open_pits = set()
+
+    @property
+    def documents(self) -> dict:
+        return self.indices.get(self.aliases.get(self.write_alias), {})
+
+    async def create_index(self) -> None:
+        if self.read_alias in self.aliases:
+            return
+        index_name = await self.create_versioned_index()
+        self.aliases[self.read_alias] = index_name
+        self.aliases[self.write_alias] = index_name
+
+    async def create_versioned_index(self) -> str:
+        versions = await self.list_versions()
+        index_name = f"{self.index_prefix}_v{(versions[-1] if versions else 0) + 1}"
+        self.indices[index_name] = {}
+        return index_name
+
+    async def list_versions(self) -> List[int]:
+        return sorted(int(name.rsplit("_v", 1)[1]) for name in self.indices)
+
+    async def get_alias_target(self, alias: str) -> Optional[str]:
+        return self.aliases.get(alias)
+
+    async def swap_aliases(self, index_name: str) -> Optional[str]:
+        previous_index = self.aliases.get(self.read_alias)
+        self.aliases[self.read_alias] = index_name
+        self.aliases[self.write_alias] = index_name
+        return previous_index
+
+    async def bulk_index(
+            self, articles: List[Article], refresh: bool = False, index: Optional[str] = None
+    ) -> Tuple[int, List[dict]]:
+        self.bulk_sizes.append(len(articles))
+        documents = self.indices[self.aliases.get(index, index) or self.aliases[self.write_alias]]
+        for article in articles:
+            documents[article.id] = ArticleSearchRepository.build_document(article)
+        return len(articles), []
+
+    async def bulk_delete(self, article_ids: List[int], index: Optional[str] = None) -> None:
+        documents = self.indices[self.aliases.get(index, index) or self.aliases[self.write_alias]]
+        for article_id in article_ids:
+            documents.pop(article_id, None)
+
+    async def scan_ids(self, index: Optional[str] = None, batch_size: int = 5000):
+        documents = self.indices[self.aliases.get(index, index) or self.aliases[self.read_alias]]
+        ids = sorted(documents)
+        for start in range(0, len(ids), batch_size):
+            yield ids[start:start + batch_size]
+
+    async def get_refresh_interval(self, index: Optional[str] = None) -> Optional[str]:
+        return self.refresh_interval
+
+    async def set_refresh_interval(self, refresh_interval: Optional[str], index: Optional[str] = None) -> None:
+        self.refresh_intervals.append(refresh_interval)
+        self.refresh_interval = refresh_interval
+
+    async def refresh(self, index: Optional[str] = None) -> None:
+        pass
+
+    async def index_article(self, article: Article, refresh: bool = False) -> dict:
+        if self.write_alias in self.aliases:
+            self.documents[article.id] = ArticleSearchRepository.build_document(article)
         return {"_id": str(article.id), "result": "created"}
 
+    async def index_articles(
+            self, articles: List[Article], refresh: bool = False, wait: bool = False
+    ) -> Dict[int, str]:
+        errors = await self.bulk_write(
+            [(article.id, ArticleSearchRepository.build_document(article)) for article in articles], refresh=refresh
+        )
+        return {int(error["_id"]): ArticleSearchRepository.describe_error(error) for error in errors}
+
+    async def delete_article(self, article_id: int, refresh: bool = False) -> None:
+        if self.write_alias in self.aliases:
+            self.documents.pop(article_id, None)
+
+    async def bulk_write(
+            self,
+            actions: Sequence[Tuple[int, Optional[dict]]],
+            refresh: bool = False,
+            index: Optional[str] = None,
+            versions: Optional[Mapping[int, int]] = None
+    ) -> List[dict]:
+        self.bulk_sizes.append(len(actions))
+        target = self.indices.setdefault(index or self.aliases.get(self.write_alias, "articles_v1"), {})
+        errors = []
+        for article_id, document in actions:
+            if versions is not None:
+                if versions[article_id] <= self.versions.get(article_id, 0):
+                    errors.append({"_id": str(article_id), "status": 409, "error": "version_conflict_engine_exception"})
+                    continue
+                self.versions[article_id] = versions[article_id]
+            if document is None:
+                target.pop(article_id, None)
+            else:
+                target[article_id] = document
+        return errors
+
+    async def search_with_filters(
+            self, search_params: Any, fuzzy: bool = True, page: int = 1, page_size: int = 10, count_mode: str = "exact"
+    ) -> Tuple[List[int], Optional[int], bool]:
+        ids = self._matching_ids(search_params)
+        start = (page - 1) * page_size
+        total = None if count_mode == "none" else len(ids)
+        return ids[start:start + page_size], total, start + page_size < len(ids)
+
+    async def search_after_page(
+            self,
+            search_params: Any,
+            page_size: int = 10,
+            pit_id: Optional[str] = None,
+            search_after: Optional[list] = None,
+            keep_alive: str = "1m",
+            fuzzy: bool = True,
+            min_score: float = 0.5,
+            count_mode: str = "exact"
+    ) -> Tuple[List[int], Optional[int], str, Optional[list]]:
+        if pit_id is None:
+            pit_id = f"pit-{len(self.open_pits) + 1}"
+            self.open_pits.add(pit_id)
+        elif pit_id not in self.open_pits:
+            raise NotFoundError("No search context found", MagicMock(status=404), {})
+
+        ids = self._matching_ids(search_params)
+        if search_after is not None:
+            ids = [article_id for article_id in ids if article_id > search_after[0]]
+        page_ids = ids[:page_size]
+        total = len(ids) if search_after is None and count_mode != "none" else None
+        return page_ids, total, pit_id, [page_ids[-1]] if page_ids else None
+
+    async def scan_matching_ids(self, search_params: Any, batch_size: int = 1000, **kwargs):
+        ids = self._matching_ids(search_params)
+        for start in range(0, len(ids), batch_size):
+            yield ids[start:start + batch_size]
+
+    async def close_point_in_time(self, pit_id: str) -> None:
+        self.open_pits.discard(pit_id)
+
+    def _matching_ids(self, search_params: Any) -> List[int]:
+        words = search_params.abstract_search.lower().split()
+        return [
+            article_id for article_id, document in sorted(self.documents.items())
+            if any(word in document["abstract"].lower() for word in words)
+        ]
+
     async def verify_article_indexed(self, article_id: int) -> bool:
         return True
 
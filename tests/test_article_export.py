@@ -0,0 +1,205 @@
+import asyncio
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from src.articles.models.article_export import ArticleExport
+from src.articles.schemas.article import ArticleSearchFilters, ExportFormat
+from src.articles.services import article, article_export
+from src.articles.services.article_export import ArticleExportService
+from tests.mocks import MockArticleExportRepository, MockArticleRepository, MockArticleSearchRepository, MockSession
+
+
+@pytest_asyncio.fixture
+async def article_repository(monkeypatch):
+    repository = MockArticleRepository()
+    for i in range(3):
+        await repository.create_with_relationships(
+            obj_in_data={
+                "title": f"Python {i}",
+                "abstract": f"Python abstract number {i}",
+                "publication_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+                "owner_id": 1,
+            },
+            authors=[],
+            tags=[]
+        )
+    monkeypatch.setattr(article, "ArticleRepository", lambda db: repository)
+    return repository
+
+
+@pytest.fixture
+def export_repository(monkeypatch):
+    repository = MockArticleExportRepository()
+    monkeypatch.setattr(article_export, "ArticleExportRepository", lambda db: repository)
+    return repository
+
+
+@pytest.fixture
+def exporter(article_repository, export_repository, tmp_path):
+    return ArticleExportService(MockSession, MockArticleSearchRepository(), directory=str(tmp_path), max_queued=3)
+
+
+@pytest.fixture
+def other_process(article_repository, export_repository, tmp_path):
+    """The exporter of another worker process, sharing the table and the export directory"""
+    return ArticleExportService(
+        MockSession,
+        MockArticleSearchRepository(),
+        directory=str(tmp_path),
+        max_queued=3,
+        poll_interval=0.01
+    )
+
+
+async def submit(exporter, owner_id=1, export_format=ExportFormat.CSV, compressed=False, **filters):
+    return await exporter.submit(
+        owner_id=owner_id,
+        search_params=ArticleSearchFilters(**filters),
+        export_format=export_format,
+        compressed=compressed
+    )
+
+
+@pytest.mark.asyncio
+class TestArticleExportService:
+    async def test_identical_requests_share_the_active_job_across_processes(self, exporter, other_process):
+        # Act
+        first = await submit(exporter, title="Python")
+        second = await submit(other_process, title="Python")
+        compressed = await submit(exporter, title="Python", compressed=True)
+        other_user = await submit(exporter, owner_id=2, title="Python")
+
+        # Assert
+        assert second.id == first.id
+        assert compressed.id != first.id
+        assert other_user.id != first.id
+
+    async def test_completed_jobs_are_not_shared(self, exporter):
+        # Arrange
+        first = await submit(exporter, export_format=ExportFormat.NDJSON)
+        await exporter.run(await exporter.claim())
+
+        # Act
+        second = await submit(exporter, export_format=ExportFormat.NDJSON)
+
+        # Assert
+        assert second.id != first.id
+
+    async def test_run_writes_the_compressed_artifact(self, exporter, other_process, tmp_path):
+        # Arrange
+        job = await submit(exporter, compressed=True)
+
+        # Act
+        await exporter.run(await exporter.claim())
+
+        # Assert
+        downloaded = await other_process.get_artifact(job_id=job.id, user_id=1)
+        assert downloaded.filename.endswith(".csv.gz")
+        assert downloaded.bytes_written == os.path.getsize(job.path)
+        with gzip.open(downloaded.path, "rt", encoding="utf-8-sig") as file:
+            lines = file.read().splitlines()
+        assert lines[0].startswith("ID,Title")
+        assert len(lines) == 4
+        assert os.listdir(tmp_path) == [os.path.basename(job.path)]
+
+    async def test_failed_export_leaves_no_file(self, exporter, article_repository, monkeypatch, tmp_path):
+        # Arrange
+        async def broken_stream(**kwargs):
+            yield []
+            raise RuntimeError("connection lost")
+
+        monkeypatch.setattr(article_repository, "stream_export_rows", broken_stream)
+        job = await submit(exporter)
+
+        # Act
+        await exporter.run(await exporter.claim())
+
+        # Assert
+        assert (job.status, job.error) == (ArticleExport.STATUS_FAILED, "connection lost")
+        assert os.listdir(tmp_path) == []
+        with pytest.raises(HTTPException) as exc_info:
+            await exporter.get_artifact(job_id=job.id, user_id=1)
+        assert exc_info.value.status_code == 409
+
+    async def test_full_queue_is_rejected(self, exporter, other_process):
+        # Arrange
+        await submit(exporter, title="a")
+        await submit(other_process, title="b")
+        await submit(exporter, owner_id=2, title="c")
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await submit(exporter, title="d")
+        assert exc_info.value.status_code == 429
+
+    async def test_only_the_owner_sees_the_job(self, exporter):
+        # Arrange
+        job = await submit(exporter)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await exporter.get_job(job_id=job.id, user_id=2)
+        assert exc_info.value.status_code == 403
+        with pytest.raises(HTTPException) as exc_info:
+            await exporter.get_job(job_id="missing", user_id=1)
+        assert exc_info.value.status_code == 404
+
+    async def test_workers_run_the_jobs_submitted_to_other_processes(self, exporter, other_process):
+        # Arrange
+        await other_process.start()
+        jobs = [await submit(exporter, export_format=ExportFormat.NDJSON, title=title) for title in ("Python 0", "Python 1")]
+
+        # Act
+        async def completed():
+            while any(job.status != ArticleExport.STATUS_COMPLETED for job in jobs):
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(completed(), timeout=5)
+        await other_process.stop()
+
+        # Assert
+        assert [job.bytes_written > 0 for job in jobs] == [True, True]
+
+    async def test_a_stale_job_is_taken_over(self, exporter, other_process, tmp_path):
+        # Arrange
+        job = await submit(exporter)
+        claimed = await exporter.claim()
+        # the job as the stalled process still sees it, the shared row moves on without it
+        stalled = SimpleNamespace(**{
+            name: getattr(claimed, name) for name in ("id", "run_id", "path", "format", "compressed", "search_params")
+        })
+        job.updated_at -= timedelta(seconds=exporter.stale_after + 1)
+        taken_over = await other_process.claim()
+        exporter.progress_interval = 0
+
+        # Act
+        await exporter.run(stalled)
+        await other_process.run(taken_over)
+
+        # Assert
+        assert taken_over.id == job.id
+        assert job.run_id != stalled.run_id
+        assert job.status == ArticleExport.STATUS_COMPLETED
+        assert os.listdir(tmp_path) == [os.path.basename(job.path)]
+
+    async def test_expired_jobs_are_removed(self, exporter):
+        # Arrange
+        job = await submit(exporter)
+        await exporter.run(await exporter.claim())
+        exporter.retention = 0
+        job.finished_at -= timedelta(seconds=1)
+
+        # Act
+        await exporter._prune()
+
+        # Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await exporter.get_job(job_id=job.id, user_id=1)
+        assert exc_info.value.status_code == 404
+        assert not os.path.exists(job.path)
@@ -0,0 +1,245 @@
+import asyncio
+import csv
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from src.articles.models.article_import import ArticleImport
+from src.articles.services import article_import
+from src.articles.services.article_import import ArticleImportService
+from src.articles.utils.article_csv import ARTICLE_CSV_COLUMNS, parse_row, read_rows
+from tests.mocks import (
+    MockArticleImportRepository,
+    MockArticleRepository,
+    MockArticleSearchRepository,
+    MockAuthorRepository,
+    MockSession,
+    MockTagRepository,
+)
+
+
+def write_csv(path, rows) -> str:
+    with open(path, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file)
+        writer.writerow(ARTICLE_CSV_COLUMNS)
+        writer.writerows(rows)
+    return str(path)
+
+
+def article_row(i: int, authors: str = "Guido, Barry", tags: str = "python"):
+    return [str(i), f"Article {i}", f"Abstract {i}", "2024-05-01", authors, tags, "1"]
+
+
+@pytest.fixture
+def repositories():
+    return {
+        "imports": MockArticleImportRepository(),
+        "articles": MockArticleRepository(),
+        "authors": MockAuthorRepository(),
+        "tags": MockTagRepository(),
+    }
+
+
+@pytest_asyncio.fixture
+async def importer(monkeypatch, repositories):
+    monkeypatch.setattr(article_import, "ArticleImportRepository", lambda db: repositories["imports"])
+    monkeypatch.setattr(article_import, "ArticleRepository", lambda db: repositories["articles"])
+    monkeypatch.setattr(article_import, "AuthorRepository", lambda db: repositories["authors"])
+    monkeypatch.setattr(article_import, "TagRepository", lambda db: repositories["tags"])
+
+    search_repository = MockArticleSearchRepository()
+    await search_repository.create_index()
+    return ArticleImportService(MockSession, search_repository, chunk_size=2)
+
+
+class TestArticleCsv:
+    def test_rows_are_read_in_chunks_from_the_returned_offset(self, tmp_path):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [article_row(i) for i in range(5)])
+
+        # Act
+        first, offset = read_rows(path, 0, 2)
+        second, offset = read_rows(path, offset, 2)
+        third, offset = read_rows(path, offset, 2)
+        rest, end = read_rows(path, offset, 2)
+
+        # Assert
+        assert [row[1] for row in first + second + third] == [f"Article {i}" for i in range(5)]
+        assert (rest, end) == ([], offset)
+
+    def test_quoted_line_breaks_stay_in_their_row(self, tmp_path):
+        # Arrange
+        multiline = article_row(1)
+        multiline[2] = "First line\nsecond line, with a comma"
+        path = write_csv(tmp_path / "articles.csv", [multiline, article_row(2)])
+
+        # Act
+        first, offset = read_rows(path, 0, 1)
+        second, _ = read_rows(path, offset, 1)
+
+        # Assert
+        assert first[0][2] == "First line\nsecond line, with a comma"
+        assert second[0][1] == "Article 2"
+
+    def test_other_layouts_are_rejected(self, tmp_path):
+        # Arrange
+        path = tmp_path / "articles.csv"
+        path.write_text("title,abstract\nA,B\n")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            read_rows(str(path), 0, 10)
+
+    def test_parse_row_splits_names_and_ignores_the_ids(self):
+        # Act
+        row = parse_row(article_row(7, authors="Guido, Barry, Guido", tags=""))
+
+        # Assert
+        assert row.title == "Article 7"
+        assert row.author_names == ["Guido", "Barry"]
+        assert row.tag_names == []
+        assert row.publication_date.year == 2024
+
+
+@pytest.mark.asyncio
+class TestArticleImportService:
+    async def test_import_creates_articles_names_and_checkpoint(self, importer, repositories, tmp_path):
+        # Arrange
+        rows = [article_row(i) for i in range(4)] + [["5", "Article 5", "Abstract", "not a date", "", "", "1"]]
+        path = write_csv(tmp_path / "articles.csv", rows)
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+
+        # Act
+        await importer.run(created.id)
+
+        # Assert
+        result = repositories["imports"].imports[created.id]
+        assert result.status == ArticleImport.STATUS_COMPLETED
+        assert (result.rows_imported, result.rows_failed) == (4, 1)
+        assert result.bytes_read == result.bytes_total
+        assert sorted(author.name for author in repositories["authors"].data.values()) == ["Barry", "Guido"]
+        assert len(importer.search_repository.documents) == 4
+        assert all(article.owner_id == 1 for article in repositories["articles"].data.values())
+
+    async def test_failed_import_resumes_after_the_last_chunk(self, importer, repositories, tmp_path, monkeypatch):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [article_row(i) for i in range(6)])
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+        copy = repositories["articles"].copy_with_relationships
+        calls = []
+
+        async def fail_on_second_chunk(items):
+            calls.append(len(items))
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return await copy(items)
+
+        monkeypatch.setattr(repositories["articles"], "copy_with_relationships", fail_on_second_chunk)
+
+        # Act
+        await importer.run(created.id)
+        failed = (repositories["imports"].imports[created.id].status, len(repositories["articles"].data))
+        await importer.run(created.id)
+
+        # Assert
+        assert failed == (ArticleImport.STATUS_FAILED, 2)
+        assert repositories["imports"].imports[created.id].status == ArticleImport.STATUS_COMPLETED
+        assert sorted(article.title for article in repositories["articles"].data.values()) == [
+            f"Article {i}" for i in range(6)
+        ]
+
+    async def test_only_the_owner_sees_an_import(self, importer, tmp_path):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [])
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await importer.get_import(import_id=created.id, user_id=2)
+        assert exc_info.value.status_code == 403
+
+    async def test_an_import_runs_in_one_process_only(self, importer, repositories, tmp_path):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [article_row(i) for i in range(2)])
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+        repositories["imports"].imports[created.id].status = ArticleImport.STATUS_RUNNING
+
+        # Act
+        await importer.run(created.id)
+
+        # Assert
+        assert repositories["articles"].data == {}
+        with pytest.raises(HTTPException) as exc_info:
+            await importer.resume(import_id=created.id, user_id=1)
+        assert exc_info.value.status_code == 409
+
+    async def test_a_taken_over_import_stops_without_moving_the_checkpoint(
+            self, importer, repositories, tmp_path, monkeypatch
+    ):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [article_row(i) for i in range(4)])
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+        copy = repositories["articles"].copy_with_relationships
+
+        async def moved_by_another_process(items):
+            repositories["imports"].imports[created.id].bytes_read += 1
+            return await copy(items)
+
+        monkeypatch.setattr(repositories["articles"], "copy_with_relationships", moved_by_another_process)
+
+        # Act
+        await importer.run(created.id)
+
+        # Assert
+        result = repositories["imports"].imports[created.id]
+        assert (result.status, result.rows_imported) == (ArticleImport.STATUS_RUNNING, 0)
+        assert importer.search_repository.documents == {}
+
+    async def test_a_chunk_that_could_not_be_indexed_is_imported_again(
+            self, importer, repositories, tmp_path, monkeypatch
+    ):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [article_row(i) for i in range(2)])
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+        bulk_index = importer.search_repository.bulk_index
+        calls = []
+
+        async def fail_once(articles, refresh=False, index=None):
+            calls.append(len(articles))
+            indexed, errors = await bulk_index(articles, refresh=refresh, index=index)
+            return (0, [{"_id": "1", "error": "rejected"}]) if len(calls) == 1 else (indexed, errors)
+
+        monkeypatch.setattr(importer.search_repository, "bulk_index", fail_once)
+
+        # Act
+        await importer.run(created.id)
+        failed = repositories["imports"].imports[created.id]
+        failed_state = (failed.status, failed.bytes_read, len(importer.search_repository.documents))
+        await importer.resume(import_id=created.id, user_id=1)
+        await asyncio.gather(*importer._running.values())
+
+        # Assert
+        assert failed_state == (ArticleImport.STATUS_FAILED, 0, 0)
+        assert repositories["imports"].imports[created.id].status == ArticleImport.STATUS_COMPLETED
+        assert len(importer.search_repository.documents) == 2
+
+    async def test_a_stopped_import_is_marked_as_interrupted(self, importer, repositories, tmp_path, monkeypatch):
+        # Arrange
+        path = write_csv(tmp_path / "articles.csv", [article_row(i) for i in range(4)])
+        created = await importer.register_file(owner_id=1, filename="articles.csv", path=path)
+        started = asyncio.Event()
+
+        async def never_returns(items):
+            started.set()
+            await asyncio.Event().wait()
+
+        monkeypatch.setattr(repositories["articles"], "copy_with_relationships", never_returns)
+        importer.start(created.id)
+        await started.wait()
+
+        # Act
+        await importer.stop()
+
+        # Assert
+        assert repositories["imports"].imports[created.id].status == ArticleImport.STATUS_INTERRUPTED
@@ -0,0 +1,353 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from src.articles.db.explain import Explain
+from src.articles.models import Author, Tag
+from src.articles.models.article import Article
+from src.articles.repositories.article import ArticleRepository
+from src.articles.schemas.article import ArticleSearchFilters, ArticleSortOrder
+from src.articles.schemas.base import CountMode
+
+
+@pytest.fixture
+def article_repository():
+    return ArticleRepository(MagicMock())
+
+
+def read_model_row(article_id: int) -> MagicMock:
+    return MagicMock(_mapping={
+        "id": article_id,
+        "title": f"Article {article_id}",
+        "abstract": "Abstract",
+        "publication_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+        "owner_id": 1,
+        "authors": [{"id": 1, "name": "Guido"}],
+        "tags": [{"id": 1, "name": "python"}],
+    })
+
+
+async def aiter_of(items):
+    for item in items:
+        yield item
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def compile_filters(repository: ArticleRepository, search_params: ArticleSearchFilters):
+    query = repository._apply_filters(select(Article.id), search_params)
+    return query.compile(dialect=postgresql.psycopg.dialect())
+
+
+class TestArticleRepositoryFilters:
+    def test_title_filter_matches_the_trigram_index_expression(self, article_repository):
+        # Act
+        compiled = compile_filters(article_repository, ArticleSearchFilters(title="Python"))
+
+        # Assert
+        assert "lower(articles.title) LIKE %(lower_1)s::VARCHAR ESCAPE '\\'" in str(compiled)
+        assert compiled.params["lower_1"] == "%python%"
+
+    def test_author_filter_is_a_semi_join_on_the_trigram_index_expression(self, article_repository):
+        # Act
+        compiled = compile_filters(article_repository, ArticleSearchFilters(author="Tolkien"))
+
+        # Assert
+        sql = str(compiled)
+        assert "EXISTS (SELECT 1" in sql
+        assert "lower(authors.name) LIKE %(lower_1)s::VARCHAR ESCAPE '\\'" in sql
+        assert compiled.params["lower_1"] == "%tolkien%"
+
+    def test_like_wildcards_are_matched_literally(self, article_repository):
+        # Act
+        compiled = compile_filters(article_repository, ArticleSearchFilters(title="100%_Sure\\"))
+
+        # Assert
+        assert compiled.params["lower_1"] == "%100\\%\\_sure\\\\%"
+
+    def test_publication_year_filter_is_a_range_on_the_column(self, article_repository):
+        # Act
+        compiled = compile_filters(article_repository, ArticleSearchFilters(publication_year=2024))
+
+        # Assert
+        sql = str(compiled)
+        assert "articles.publication_date >= %(publication_date_1)s" in sql
+        assert "articles.publication_date < %(publication_date_2)s" in sql
+        assert "EXTRACT" not in sql
+        assert compiled.params["publication_date_1"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert compiled.params["publication_date_2"] == datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class TestArticleRepositoryKeyset:
+    @pytest.mark.parametrize("sort, after, expected", [
+        (
+            ArticleSortOrder.PUBLICATION_DATE,
+            ("2024-05-01T00:00:00+00:00", 7),
+            "(articles.publication_date, articles.id) < (%(param_1)s::TIMESTAMP WITH TIME ZONE, %(param_2)s::INTEGER)",
+        ),
+        (
+            ArticleSortOrder.TITLE,
+            ("python", 7),
+            '(lower(articles.title) COLLATE "C", articles.id) > (%(param_1)s::VARCHAR, %(param_2)s::INTEGER)',
+        ),
+        (ArticleSortOrder.NEWEST, (7,), "articles.id < %(id_1)s::INTEGER"),
+        (ArticleSortOrder.OLDEST, (7,), "articles.id > %(id_1)s::INTEGER"),
+    ])
+    def test_keyset_predicate_follows_the_sort(self, article_repository, sort, after, expected):
+        # Act
+        predicate = article_repository._keyset_predicate(sort, ArticleRepository.parse_keyset(sort, after))
+
+        # Assert
+        assert str(predicate.compile(dialect=postgresql.psycopg.dialect())) == expected
+
+    def test_keyset_values_round_trip(self):
+        # Arrange
+        article = Article(id=7, title="Python", publication_date=datetime(2024, 5, 1, tzinfo=timezone.utc))
+
+        # Act
+        values = ArticleRepository.keyset_values(article, ArticleSortOrder.PUBLICATION_DATE)
+
+        # Assert
+        assert ArticleRepository.parse_keyset(ArticleSortOrder.PUBLICATION_DATE, values) == (
+            datetime(2024, 5, 1, tzinfo=timezone.utc), 7
+        )
+
+    @pytest.mark.parametrize("sort, values", [
+        (ArticleSortOrder.PUBLICATION_DATE, ["not a date", 7]),
+        (ArticleSortOrder.TITLE, [3, 7]),
+        (ArticleSortOrder.NEWEST, [7, 8]),
+        (ArticleSortOrder.OLDEST, None),
+    ])
+    def test_parse_keyset_rejects_values_of_other_sorts(self, sort, values):
+        # Act & Assert
+        with pytest.raises((ValueError, TypeError)):
+            ArticleRepository.parse_keyset(sort, values)
+
+
+@pytest.mark.asyncio
+class TestArticleRepositoryCounts:
+    async def test_exact_count_runs_in_the_page_query(self):
+        # Arrange
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        repository = ArticleRepository(db)
+
+        # Act
+        items, total, has_next = await repository.search_with_filters(
+            search_params=ArticleSearchFilters(title="python"),
+            count_mode=CountMode.EXACT
+        )
+
+        # Assert
+        assert db.execute.await_count == 1
+        assert "count(*) OVER ()" in str(db.execute.call_args.args[0].compile(dialect=postgresql.psycopg.dialect()))
+        assert (items, total, has_next) == ([], 0, False)
+
+    async def test_estimated_count_explains_the_filtered_query(self):
+        # Arrange
+        page = MagicMock(all=MagicMock(return_value=[read_model_row(1), read_model_row(2), read_model_row(3)]))
+        plan = MagicMock(scalar_one=MagicMock(return_value=[{"Plan": {"Plan Rows": 420}}]))
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[page, plan])
+        repository = ArticleRepository(db)
+
+        # Act
+        items, total, has_next = await repository.search_with_filters(
+            search_params=ArticleSearchFilters(title="python"),
+            page_size=2,
+            count_mode=CountMode.ESTIMATE
+        )
+
+        # Assert
+        assert isinstance(db.execute.call_args_list[1].args[0], Explain)
+        assert [item.id for item in items] == [1, 2]
+        assert (total, has_next) == (420, True)
+
+    async def test_no_count_fetches_one_more_row(self):
+        # Arrange
+        page = MagicMock(all=MagicMock(return_value=[read_model_row(1), read_model_row(2)]))
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=page)
+        repository = ArticleRepository(db)
+
+        # Act
+        items, total, has_next = await repository.search_with_filters(
+            search_params=ArticleSearchFilters(),
+            page_size=2,
+            count_mode=CountMode.NONE
+        )
+
+        # Assert
+        assert db.execute.await_count == 1
+        assert 3 in db.execute.call_args.args[0].compile(dialect=postgresql.psycopg.dialect()).params.values()
+        assert [item.id for item in items] == [1, 2]
+        assert (total, has_next) == (None, False)
+
+
+class TestArticleReadModel:
+    def test_read_model_aggregates_authors_and_tags_of_the_limited_page(self, article_repository):
+        # Arrange
+        query = article_repository._apply_sort(article_repository._read_columns(), ArticleSortOrder.TITLE).limit(10)
+
+        # Act
+        sql = str(article_repository._read_model_query(query, ArticleSortOrder.TITLE).compile(
+            dialect=postgresql.psycopg.dialect()
+        ))
+
+        # Assert
+        assert "json_agg(json_build_object('id', authors.id, 'name', authors.name) ORDER BY authors.id)" in sql
+        assert "json_agg(json_build_object('id', tags.id, 'name', tags.name) ORDER BY tags.id)" in sql
+        assert sql.endswith('AS page ORDER BY lower(page.title) COLLATE "C", page.id')
+
+    def test_export_rows_aggregate_the_ids_and_names_in_the_database(self, article_repository):
+        # Arrange
+        captured = {}
+
+        async def stream(query):
+            captured["query"] = query
+            return MagicMock(partitions=MagicMock(return_value=aiter_of([])))
+
+        article_repository.db.stream = stream
+
+        # Act
+        asyncio.run(collect(article_repository.stream_export_rows(search_params=ArticleSearchFilters(title="python"))))
+
+        # Assert
+        sql = str(captured["query"].compile(dialect=postgresql.psycopg.dialect()))
+        assert "coalesce(array_agg(authors.id ORDER BY authors.id), '{}')" in sql
+        assert "coalesce(array_agg(authors.name ORDER BY authors.id), '{}')" in sql
+        assert "coalesce(array_agg(tags.id ORDER BY tags.id), '{}')" in sql
+        assert "coalesce(array_agg(tags.name ORDER BY tags.id), '{}')" in sql
+        assert captured["query"].get_execution_options()["yield_per"] == 1000
+
+    def test_export_rows_of_a_text_search_keep_the_order_of_elasticsearch(self, article_repository):
+        # Arrange
+        captured = {}
+
+        async def stream(query):
+            captured["query"] = query
+            return MagicMock(partitions=MagicMock(return_value=aiter_of([])))
+
+        article_repository.db.stream = stream
+        search_params = ArticleSearchFilters(abstract_search="python", sort=ArticleSortOrder.TITLE)
+
+        # Act
+        asyncio.run(collect(article_repository.stream_export_rows(search_params=search_params, elastic_ids=[3, 1, 2])))
+
+        # Assert
+        sql = str(captured["query"].compile(dialect=postgresql.psycopg.dialect()))
+        assert "ORDER BY array_position(" in sql
+        assert "lower(articles.title)" not in sql.split("ORDER BY")[-1]
+
+    def test_read_model_rows_are_validated_into_schemas(self):
+        # Act
+        articles = ArticleRepository._to_schemas([read_model_row(1)._mapping])
+
+        # Assert
+        assert articles[0].id == 1
+        assert [author.name for author in articles[0].authors] == ["Guido"]
+        assert [tag.name for tag in articles[0].tags] == ["python"]
+
+
+@pytest.mark.asyncio
+class TestArticleRepositoryWrites:
+    async def test_create_inserts_the_article_and_each_association_once(self):
+        # Arrange
+        inserted = MagicMock(mappings=MagicMock(return_value=MagicMock(one=MagicMock(return_value={
+            "id": 7,
+            "title": "Article",
+            "abstract": "Abstract",
+            "publication_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+            "owner_id": 1,
+        }))))
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[inserted, MagicMock(), MagicMock()])
+        repository = ArticleRepository(db)
+
+        # Act
+        article = await repository.create_with_relationships(
+            obj_in_data={
+                "title": "Article",
+                "abstract": "Abstract",
+                "publication_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+                "owner_id": 1,
+            },
+            authors=[Author(id=1, name="Guido"), Author(id=2, name="Barry")],
+            tags=[Tag(id=3, name="python")]
+        )
+
+        # Assert
+        statements = [
+            str(call.args[0].compile(dialect=postgresql.psycopg.dialect())) for call in db.execute.call_args_list
+        ]
+        assert db.execute.await_count == 3
+        assert "RETURNING" in statements[0]
+        assert "INSERT INTO article_authors" in statements[1]
+        assert len(db.execute.call_args_list[1].args[0].compile().params) == 4
+        assert "INSERT INTO article_tags" in statements[2]
+        assert article.id == 7
+        assert [author.name for author in article.authors] == ["Guido", "Barry"]
+
+    async def test_bulk_create_uses_one_statement_per_table(self):
+        # Arrange
+        rows = [
+            {
+                "id": article_id,
+                "title": f"Article {article_id}",
+                "abstract": "Abstract",
+                "publication_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+                "owner_id": 1,
+            }
+            for article_id in (7, 8)
+        ]
+        inserted = MagicMock(mappings=MagicMock(return_value=MagicMock(all=MagicMock(return_value=rows))))
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[inserted, MagicMock(), MagicMock()])
+        repository = ArticleRepository(db)
+        guido, python = Author(id=1, name="Guido"), Tag(id=3, name="python")
+
+        # Act
+        articles = await repository.bulk_create_with_relationships([
+            ({"title": "Article 7", "abstract": "Abstract", "publication_date": rows[0]["publication_date"],
+              "owner_id": 1}, [guido], [python]),
+            ({"title": "Article 8", "abstract": "Abstract", "publication_date": rows[1]["publication_date"],
+              "owner_id": 1}, [guido], []),
+        ])
+
+        # Assert
+        calls = db.execute.call_args_list
+        assert db.execute.await_count == 3
+        assert len(calls[0].args[1]) == 2
+        assert calls[1].args[1] == [{"article_id": 7, "author_id": 1}, {"article_id": 8, "author_id": 1}]
+        assert calls[2].args[1] == [{"article_id": 7, "tag_id": 3}]
+        assert [article.id for article in articles] == [7, 8]
+        assert articles[1].tags == []
+
+    async def test_update_keeps_the_relationships_that_were_not_given(self):
+        # Arrange
+        updated = MagicMock(mappings=MagicMock(return_value=MagicMock(one=MagicMock(return_value={
+            "id": 1,
+            "title": "Updated",
+            "abstract": "Abstract",
+            "publication_date": datetime(2024, 5, 1, tzinfo=timezone.utc),
+            "owner_id": 1,
+        }))))
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=updated)
+        repository = ArticleRepository(db)
+        article = ArticleRepository._to_schemas([read_model_row(1)._mapping])[0]
+
+        # Act
+        result = await repository.update_with_relationships(article=article, obj_in_data={"title": "Updated"})
+
+        # Assert
+        assert db.execute.await_count == 1
+        assert "UPDATE articles SET" in str(db.execute.call_args.args[0].compile(dialect=postgresql.psycopg.dialect()))
+        assert result.title == "Updated"
+        assert [author.name for author in result.authors] == ["Guido"]
@@ -1,15 +1,26 @@
+import json
 from io import BytesIO
 
 import pytest
 import pandas as pd
 from datetime import datetime, timezone
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from fastapi import HTTPException
-
-from src.articles.schemas.article import ArticleCreate, ArticleUpdate, ArticleSearchFilters
+from pydantic import ValidationError
+
+from src.articles.schemas.article import (
+    ArticleBulkCreate,
+    ArticleCreate,
+    ArticleUpdate,
+    ArticleSearchFilters,
+    ArticleSortOrder,
+    ExportFormat,
+)
+from src.articles.schemas.base import CountMode
 from src.articles.schemas.author import AuthorCreate
 from src.articles.schemas.tag import TagCreate
-from src.articles.services.article import ArticleService
+from src.articles.services.article import ArticleService, settings
+from src.articles.utils import article_export
 from tests.mocks import (
     MockArticleRepository,
     MockAuthorRepository,
@@ -34,6 +45,46 @@ def article_service():
     return service
 
 
+async def create_python_articles(service: ArticleService, count: int) -> None:
+    await service.search_repository.create_index()
+    for i in range(count):
+        await service.create(obj=ArticleCreate(
+            title=f"Python {i}",
+            abstract=f"Python abstract number {i}",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        ))
+
+
+async def export_csv(service: ArticleService, search_params: ArticleSearchFilters) -> BytesIO:
+    return BytesIO(b"".join([chunk async for chunk in service.export_search_to_csv(search_params=search_params)]))
+
+
+async def export_chunks(service: ArticleService, export_format: ExportFormat, chunk_size: int = 1000) -> list:
+    return [
+        chunk async for chunk in service.export_search(
+            search_params=ArticleSearchFilters(),
+            encoder=ArticleService.get_export_encoder(export_format),
+            chunk_size=chunk_size
+        )
+    ]
+
+
+async def create_linked_article(service: ArticleService) -> None:
+    author = await service.author_repository.create(AuthorCreate(name="Test Author"))
+    tag = await service.tag_repository.create(TagCreate(name="Test Tag"))
+    await service.create(obj=ArticleCreate(
+        title="Typed Article",
+        abstract="Typed Abstract",
+        publication_date=datetime(2024, 5, 1, tzinfo=timezone.utc),
+        owner_id=1,
+        author_ids=[author.id],
+        tag_ids=[tag.id]
+    ))
+
+
 @pytest.mark.asyncio
 class TestArticleService:
     async def test_create_article(self, article_service):
@@ -102,6 +153,123 @@ class TestArticleService:
         assert updated_article.title == "Updated Article"
         assert updated_article.abstract == "Updated Abstract"
 
+    async def test_create_article_with_missing_author(self, article_service):
+        # Arrange
+        author = await article_service.author_repository.create(AuthorCreate(
+            name="Test Author"
+        ))
+        article_data = ArticleCreate(
+            title="Test Article",
+            abstract="Test Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[author.id, 99],
+            tag_ids=[]
+        )
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.create(obj=article_data)
+        assert exc_info.value.status_code == 404
+        assert article_service.repository.data == {}
+
+    async def test_bulk_create_reports_items_with_missing_references(self, article_service):
+        # Arrange
+        await article_service.search_repository.create_index()
+        author = await article_service.author_repository.create(AuthorCreate(name="Test Author"))
+        tag = await article_service.tag_repository.create(TagCreate(name="Test Tag"))
+        articles = [
+            ArticleCreate(
+                title=f"Article {i}",
+                abstract="Abstract",
+                publication_date=datetime.now(timezone.utc),
+                owner_id=1,
+                author_ids=[author.id] if i != 1 else [author.id, 99],
+                tag_ids=[tag.id]
+            )
+            for i in range(3)
+        ]
+
+        # Act
+        result = await article_service.bulk_create(objs=articles)
+
+        # Assert
+        assert (result.created, result.failed) == (2, 1)
+        assert [item.index for item in result.items] == [0, 1, 2]
+        assert result.items[1].article is None
+        assert "99" in result.items[1].error
+        assert [item.article.title for item in result.items if item.article] == ["Article 0", "Article 2"]
+        assert sorted(article_service.search_repository.documents) == [
+            item.article.id for item in result.items if item.article
+        ]
+
+    async def test_bulk_create_reports_articles_that_were_not_indexed(self, article_service, monkeypatch):
+        # Arrange
+        await article_service.search_repository.create_index()
+        articles = [
+            ArticleCreate(
+                title=f"Article {i}",
+                abstract="Abstract",
+                publication_date=datetime.now(timezone.utc),
+                owner_id=1,
+                author_ids=[],
+                tag_ids=[]
+            )
+            for i in range(2)
+        ]
+
+        async def index_articles(articles, refresh=False, wait=False):
+            return {articles[1].id: "mapper_parsing_exception"}
+
+        monkeypatch.setattr(article_service.search_repository, "index_articles", index_articles)
+
+        # Act
+        result = await article_service.bulk_create(objs=articles)
+
+        # Assert
+        assert (result.created, result.failed, result.not_indexed) == (2, 0, 1)
+        assert result.items[0].error is None
+        assert result.items[1].article.title == "Article 1"
+        assert result.items[1].error == "Article Created But Not Indexed: mapper_parsing_exception"
+
+    async def test_create_with_refresh_commits_before_indexing(self, article_service, monkeypatch):
+        # Arrange
+        calls = []
+        article_service.db.commit = AsyncMock(side_effect=lambda: calls.append("commit"))
+
+        async def index_article(article, refresh=False):
+            calls.append(("index", refresh))
+
+        monkeypatch.setattr(article_service.search_repository, "index_article", index_article)
+        article_data = ArticleCreate(
+            title="Test Article",
+            abstract="Test Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        )
+
+        # Act
+        await article_service.create(obj=article_data, refresh=True)
+
+        # Assert
+        assert calls == ["commit", ("index", True)]
+
+    async def test_bulk_request_rejects_too_many_items(self):
+        # Arrange
+        article = ArticleCreate(
+            title="Article",
+            abstract="Abstract",
+            publication_date=datetime.now(timezone.utc),
+            author_ids=[],
+            tag_ids=[]
+        )
+
+        # Act & Assert
+        with pytest.raises(ValidationError):
+            ArticleBulkCreate(items=[article] * (settings.ARTICLE_BULK_MAX_ITEMS + 1))
+
     async def test_update_article_unauthorized(self, article_service):
         # Arrange
         article_data = ArticleCreate(
@@ -154,150 +322,391 @@ class TestArticleService:
         assert result.total_items >= 0
         assert isinstance(result.items, list)
 
-        async def test_export_search_to_csv_empty_results(self, article_service):
-            # Arrange
-            search_filters = ArticleSearchFilters()
-
-            # Act
-            csv_buffer = await article_service.export_search_to_csv(search_params=search_filters)
-
-            # Assert
-            assert isinstance(csv_buffer, BytesIO)
-            # Read the CSV data
-            csv_buffer.seek(0)
-            df = pd.read_csv(csv_buffer)
-            assert len(df) == 0
-            assert list(df.columns) == ['ID', 'Title', 'Abstract', 'Publication Date', 'Authors', 'Tags', 'Owner ID']
-
-        async def test_export_search_to_csv_with_results(self, article_service):
-            # Arrange
-            # Create test author and tag
-            author = await article_service.author_repository.create(AuthorCreate(
-                name="Test Author"
+    async def test_search_articles_by_abstract_pages_in_search_index(self, article_service):
+        # Arrange
+        await article_service.search_repository.create_index()
+        for title, abstract in [
+            ("First", "Python search engines"),
+            ("Second", "Java build tools"),
+            ("Third", "Python web frameworks"),
+            ("Fourth", "Python packaging"),
+        ]:
+            await article_service.create(obj=ArticleCreate(
+                title=title,
+                abstract=abstract,
+                publication_date=datetime.now(timezone.utc),
+                owner_id=1,
+                author_ids=[],
+                tag_ids=[]
             ))
-            tag = await article_service.tag_repository.create(TagCreate(
-                name="Test Tag"
+
+        search_filters = ArticleSearchFilters(
+            abstract_search="python"
+        )
+
+        # Act
+        result = await article_service.search(
+            search_params=search_filters,
+            page=2,
+            page_size=2
+        )
+
+        # Assert
+        assert result.total_items == 3
+        assert result.total_pages == 2
+        assert [item.title for item in result.items] == ["Fourth"]
+
+    async def test_search_articles_by_abstract_with_cursor(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 5)
+        search_filters = ArticleSearchFilters(
+            abstract_search="python"
+        )
+
+        # Act
+        pages = [await article_service.search(search_params=search_filters, page_size=2, cursor="*")]
+        while pages[-1].next_cursor:
+            pages.append(await article_service.search(
+                search_params=search_filters,
+                page_size=2,
+                cursor=pages[-1].next_cursor
             ))
 
-            # Create test article
-            article_data = ArticleCreate(
-                title="Test Article",
-                abstract="Test Abstract",
-                publication_date=datetime.now(timezone.utc),
-                owner_id=1,
-                author_ids=[author.id],
-                tag_ids=[tag.id]
-            )
-            await article_service.create(obj=article_data)
+        # Assert
+        assert [page.current_page for page in pages] == [1, 2, 3]
+        assert all(page.total_items == 5 for page in pages)
+        assert [item.title for page in pages for item in page.items] == [f"Python {i}" for i in range(5)]
+        assert article_service.search_repository.open_pits == set()
 
-            search_filters = ArticleSearchFilters(
-                title="Test"
-            )
+    async def test_search_articles_with_cursor_of_other_filters(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 3)
+        first_page = await article_service.search(
+            search_params=ArticleSearchFilters(abstract_search="python"),
+            page_size=1,
+            cursor="*"
+        )
 
-            # Act
-            csv_buffer = await article_service.export_search_to_csv(search_params=search_filters)
-
-            # Assert
-            assert isinstance(csv_buffer, BytesIO)
-            # Read the CSV data
-            csv_buffer.seek(0)
-            df = pd.read_csv(csv_buffer)
-            assert len(df) >= 1
-
-            # Check first row content
-            first_row = df.iloc[0]
-            assert first_row['Title'] == "Test Article"
-            assert first_row['Abstract'] == "Test Abstract"
-            assert first_row['Authors'] == "Test Author"
-            assert first_row['Tags'] == "Test Tag"
-            assert first_row['Owner ID'] == 1
-
-        async def test_export_search_to_csv_with_filters(self, article_service):
-            # Arrange
-            # Create multiple articles with different titles
-            article_data1 = ArticleCreate(
-                title="Python Article",
-                abstract="Python Abstract",
-                publication_date=datetime.now(timezone.utc),
-                owner_id=1,
-                author_ids=[],
-                tag_ids=[]
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.search(
+                search_params=ArticleSearchFilters(abstract_search="java"),
+                page_size=1,
+                cursor=first_page.next_cursor
             )
-            article_data2 = ArticleCreate(
-                title="Java Article",
-                abstract="Java Abstract",
-                publication_date=datetime.now(timezone.utc),
-                owner_id=1,
-                author_ids=[],
-                tag_ids=[]
+        assert exc_info.value.status_code == 400
+
+    async def test_search_articles_with_invalid_cursor(self, article_service):
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.search(
+                search_params=ArticleSearchFilters(abstract_search="python"),
+                cursor="not a cursor"
             )
-            await article_service.create(obj=article_data1)
-            await article_service.create(obj=article_data2)
+        assert exc_info.value.status_code == 400
 
-            search_filters = ArticleSearchFilters(
-                title="Python"
+    async def test_search_articles_by_abstract_past_the_result_window(self, article_service):
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.search(
+                search_params=ArticleSearchFilters(abstract_search="python"),
+                page=settings.SEARCH_MAX_RESULT_WINDOW // 10,
+                page_size=10
             )
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == "Page Too Deep, Use Cursor Pagination"
 
-            # Act
-            csv_buffer = await article_service.export_search_to_csv(search_params=search_filters)
+    async def test_search_articles_with_expired_cursor(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 3)
+        search_filters = ArticleSearchFilters(abstract_search="python")
+        first_page = await article_service.search(search_params=search_filters, page_size=1, cursor="*")
+        article_service.search_repository.open_pits.clear()
 
-            # Assert
-            assert isinstance(csv_buffer, BytesIO)
-            csv_buffer.seek(0)
-            df = pd.read_csv(csv_buffer)
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.search(search_params=search_filters, page_size=1, cursor=first_page.next_cursor)
+        assert exc_info.value.status_code == 410
 
-            # Check that only Python article is included
-            assert len(df[df['Title'].str.contains('Python', na=False)]) == 1
-            assert len(df[df['Title'].str.contains('Java', na=False)]) == 0
+    async def test_search_articles_in_database_with_cursor(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 5)
+        search_filters = ArticleSearchFilters(sort=ArticleSortOrder.NEWEST)
 
-        async def test_export_search_to_csv_with_abstract_search(self, article_service):
-            # Arrange
-            article_data = ArticleCreate(
-                title="Test Article",
-                abstract="Specific unique abstract for testing",
-                publication_date=datetime.now(timezone.utc),
-                owner_id=1,
-                author_ids=[],
-                tag_ids=[]
+        # Act
+        pages = [await article_service.search(search_params=search_filters, page_size=2, cursor="*")]
+        while pages[-1].next_cursor:
+            pages.append(await article_service.search(
+                search_params=search_filters,
+                page_size=2,
+                cursor=pages[-1].next_cursor
+            ))
+
+        # Assert
+        assert [page.current_page for page in pages] == [1, 2, 3]
+        assert all(page.total_items == 5 and page.total_pages == 3 for page in pages)
+        assert [item.title for page in pages for item in page.items] == [f"Python {i}" for i in reversed(range(5))]
+
+    async def test_search_articles_without_count(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 3)
+
+        # Act
+        first_page = await article_service.search(
+            search_params=ArticleSearchFilters(), page=1, page_size=2, count_mode=CountMode.NONE
+        )
+        last_page = await article_service.search(
+            search_params=ArticleSearchFilters(), page=2, page_size=2, count_mode=CountMode.NONE
+        )
+
+        # Assert
+        assert first_page.count_mode == CountMode.NONE
+        assert first_page.total_items is None and first_page.total_pages is None
+        assert first_page.has_next is True
+        assert last_page.has_next is False
+
+    async def test_search_articles_by_abstract_with_cursor_without_count(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 3)
+        search_filters = ArticleSearchFilters(abstract_search="python")
+
+        # Act
+        first_page = await article_service.search(
+            search_params=search_filters, page_size=2, cursor="*", count_mode=CountMode.NONE
+        )
+
+        # Assert
+        assert first_page.total_items is None
+        assert first_page.has_next is True
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.search(
+                search_params=search_filters,
+                page_size=2,
+                cursor=first_page.next_cursor,
+                count_mode=CountMode.EXACT
             )
-            await article_service.create(obj=article_data)
+        assert exc_info.value.status_code == 400
+
+    async def test_search_articles_in_database_with_cursor_of_other_sort(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 3)
+        first_page = await article_service.search(
+            search_params=ArticleSearchFilters(sort=ArticleSortOrder.NEWEST),
+            page_size=1,
+            cursor="*"
+        )
 
-            search_filters = ArticleSearchFilters(
-                abstract_search="unique"
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.search(
+                search_params=ArticleSearchFilters(sort=ArticleSortOrder.PUBLICATION_DATE),
+                page_size=1,
+                cursor=first_page.next_cursor
             )
+        assert exc_info.value.status_code == 400
 
-            # Act
-            csv_buffer = await article_service.export_search_to_csv(search_params=search_filters)
-
-            # Assert
-            assert isinstance(csv_buffer, BytesIO)
-            csv_buffer.seek(0)
-            df = pd.read_csv(csv_buffer)
-            assert len(df) >= 1
-            assert "unique" in df.iloc[0]['Abstract'].lower()
-
-        async def test_export_search_to_csv_encoding(self, article_service):
-            # Arrange
-            # Create article with special characters
-            article_data = ArticleCreate(
-                title="Test with üñíçødé",
-                abstract="Abstract with émôjîs 🌟",
-                publication_date=datetime.now(timezone.utc),
-                owner_id=1,
-                author_ids=[],
-                tag_ids=[]
+    async def test_export_search_to_csv_empty_results(self, article_service):
+        # Arrange
+        search_filters = ArticleSearchFilters()
+
+        # Act
+        csv_buffer = await export_csv(article_service, search_filters)
+
+        # Assert
+        df = pd.read_csv(csv_buffer)
+        assert len(df) == 0
+        assert list(df.columns) == ['ID', 'Title', 'Abstract', 'Publication Date', 'Authors', 'Tags', 'Owner ID']
+
+    async def test_export_search_to_csv_with_results(self, article_service):
+        # Arrange
+        # Create test author and tag
+        author = await article_service.author_repository.create(AuthorCreate(
+            name="Test Author"
+        ))
+        tag = await article_service.tag_repository.create(TagCreate(
+            name="Test Tag"
+        ))
+
+        # Create test article
+        article_data = ArticleCreate(
+            title="Test Article",
+            abstract="Test Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[author.id],
+            tag_ids=[tag.id]
+        )
+        await article_service.create(obj=article_data)
+
+        search_filters = ArticleSearchFilters(
+            title="Test"
+        )
+
+        # Act
+        csv_buffer = await export_csv(article_service, search_filters)
+
+        # Assert
+        df = pd.read_csv(csv_buffer)
+        assert len(df) >= 1
+
+        # Check first row content
+        first_row = df.iloc[0]
+        assert first_row['Title'] == "Test Article"
+        assert first_row['Abstract'] == "Test Abstract"
+        assert first_row['Authors'] == "Test Author"
+        assert first_row['Tags'] == "Test Tag"
+        assert first_row['Owner ID'] == 1
+
+    async def test_export_search_to_csv_with_filters(self, article_service):
+        # Arrange
+        # Create multiple articles with different titles
+        article_data1 = ArticleCreate(
+            title="Python Article",
+            abstract="Python Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        )
+        article_data2 = ArticleCreate(
+            title="Java Article",
+            abstract="Java Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        )
+        await article_service.create(obj=article_data1)
+        await article_service.create(obj=article_data2)
+
+        search_filters = ArticleSearchFilters(
+            title="Python"
+        )
+
+        # Act
+        csv_buffer = await export_csv(article_service, search_filters)
+
+        # Assert
+        df = pd.read_csv(csv_buffer)
+
+        # Check that only Python article is included
+        assert len(df[df['Title'].str.contains('Python', na=False)]) == 1
+        assert len(df[df['Title'].str.contains('Java', na=False)]) == 0
+
+    async def test_export_search_to_csv_with_abstract_search(self, article_service):
+        # Arrange
+        await article_service.search_repository.create_index()
+        article_data = ArticleCreate(
+            title="Test Article",
+            abstract="Specific unique abstract for testing",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        )
+        await article_service.create(obj=article_data)
+
+        search_filters = ArticleSearchFilters(
+            abstract_search="unique"
+        )
+
+        # Act
+        csv_buffer = await export_csv(article_service, search_filters)
+
+        # Assert
+        df = pd.read_csv(csv_buffer)
+        assert len(df) >= 1
+        assert "unique" in df.iloc[0]['Abstract'].lower()
+
+    async def test_export_search_to_csv_encoding(self, article_service):
+        # Arrange
+        # Create article with special characters
+        article_data = ArticleCreate(
+            title="Test with üñíçødé",
+            abstract="Abstract with émôjîs 🌟",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        )
+        await article_service.create(obj=article_data)
+
+        search_filters = ArticleSearchFilters()
+
+        # Act
+        csv_buffer = await export_csv(article_service, search_filters)
+
+        # Assert
+        df = pd.read_csv(csv_buffer, encoding='utf-8-sig')
+        assert "üñíçødé" in df.iloc[0]['Title']
+        assert "émôjîs" in df.iloc[0]['Abstract']
+
+    async def test_export_search_to_csv_streams_every_hit_in_chunks(self, article_service):
+        # Arrange
+        await create_python_articles(article_service, 5)
+
+        # Act
+        chunks = [
+            chunk async for chunk in article_service.export_search_to_csv(
+                search_params=ArticleSearchFilters(abstract_search="python"),
+                chunk_size=2
             )
-            await article_service.create(obj=article_data)
+        ]
 
-            search_filters = ArticleSearchFilters()
+        # Assert
+        assert len(chunks) == 4
+        assert chunks[0].startswith("\ufeffID,Title".encode("utf-8"))
+        df = pd.read_csv(BytesIO(b"".join(chunks)), encoding="utf-8-sig")
+        assert list(df["Title"]) == [f"Python {i}" for i in range(5)]
 
-            # Act
-            csv_buffer = await article_service.export_search_to_csv(search_params=search_filters)
+    async def test_export_search_as_ndjson_keeps_the_types(self, article_service):
+        # Arrange
+        await create_linked_article(article_service)
 
-            # Assert
-            assert isinstance(csv_buffer, BytesIO)
-            csv_buffer.seek(0)
-            df = pd.read_csv(csv_buffer, encoding='utf-8-sig')
-            assert "üñíçødé" in df.iloc[0]['Title']
-            assert "émôjîs" in df.iloc[0]['Abstract']
+        # Act
+        chunks = await export_chunks(article_service, ExportFormat.NDJSON)
 
+        # Assert
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        assert len(lines) == 1
+        row = json.loads(lines[0])
+        assert row["publication_date"] == "2024-05-01T00:00:00+00:00"
+        assert (row["author_ids"], row["author_names"]) == ([1], ["Test Author"])
+        assert (row["tag_ids"], row["tag_names"]) == ([1], ["Test Tag"])
+
+    async def test_export_search_as_parquet_writes_a_row_group_per_chunk(self, article_service):
+        # Arrange
+        parquet = pytest.importorskip("pyarrow.parquet")
+        await create_python_articles(article_service, 5)
+
+        # Act
+        chunks = await export_chunks(article_service, ExportFormat.PARQUET, chunk_size=2)
+
+        # Assert
+        parquet_file = parquet.ParquetFile(BytesIO(b"".join(chunks)))
+        assert parquet_file.metadata.num_row_groups == 3
+        table = parquet_file.read()
+        assert table.column("title").to_pylist() == [f"Python {i}" for i in range(5)]
+        assert table.column("author_ids").to_pylist() == [[]] * 5
+
+    async def test_export_search_as_arrow_streams_record_batches(self, article_service):
+        # Arrange
+        ipc = pytest.importorskip("pyarrow.ipc")
+        await create_linked_article(article_service)
+
+        # Act
+        chunks = await export_chunks(article_service, ExportFormat.ARROW)
+
+        # Assert
+        table = ipc.open_stream(b"".join(chunks)).read_all()
+        assert table.to_pylist()[0]["tag_names"] == ["Test Tag"]
+        assert table.to_pylist()[0]["publication_date"].year == 2024
+
+    async def test_columnar_export_without_pyarrow_is_rejected(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(article_export, "pyarrow", None)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            ArticleService.get_export_encoder(ExportFormat.PARQUET)
+        assert exc_info.value.status_code == 400
@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import MagicMock
+
+from fastapi import HTTPException
+
+from src.articles.schemas.comment import Comment, CommentCreate, CommentSortOrder
+from src.articles.services.comment import CommentService
+from src.articles.services.entity_cache import EntityCache
+from tests.mocks import MockCommentRepository
+
+
+@pytest.fixture
+def comment_service():
+    # Create an empty AsyncSession mock since we won't use it
+    db_session = MagicMock()
+
+    # Initialize the service with our mock repository
+    service = CommentService(db_session)
+    service.repository = MockCommentRepository()
+
+    return service
+
+
+async def create_comments(service: CommentService, article_id: int, count: int) -> None:
+    for i in range(count):
+        await service.create(obj=CommentCreate(content=f"Comment {i}", article_id=article_id, user_id=1))
+
+
+async def read_all_pages(service: CommentService, article_id: int, sort: CommentSortOrder, page_size: int) -> list:
+    pages = [await service.get_paginated_by_article(
+        article_id=article_id, page_size=page_size, sort=sort, cursor="*"
+    )]
+    while pages[-1].next_cursor:
+        pages.append(await service.get_paginated_by_article(
+            article_id=article_id, page_size=page_size, sort=sort, cursor=pages[-1].next_cursor
+        ))
+    return pages
+
+
+@pytest.mark.asyncio
+class TestCommentService:
+    @pytest.mark.parametrize("sort, expected", [
+        (CommentSortOrder.NEWEST, [f"Comment {i}" for i in reversed(range(5))]),
+        (CommentSortOrder.OLDEST, [f"Comment {i}" for i in range(5)]),
+    ])
+    async def test_get_comments_with_cursor(self, comment_service, sort, expected):
+        # Arrange
+        await create_comments(comment_service, article_id=1, count=5)
+        await create_comments(comment_service, article_id=2, count=3)
+
+        # Act
+        pages = await read_all_pages(comment_service, article_id=1, sort=sort, page_size=2)
+
+        # Assert
+        assert [page.current_page for page in pages] == [1, 2, 3]
+        assert all(page.total_items == 5 and page.total_pages == 3 for page in pages)
+        assert [comment.content for page in pages for comment in page.items] == expected
+
+    async def test_get_comments_with_cursor_of_other_sort(self, comment_service):
+        # Arrange
+        await create_comments(comment_service, article_id=1, count=3)
+        first_page = await comment_service.get_paginated_by_article(article_id=1, page_size=1, cursor="*")
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await comment_service.get_paginated_by_article(
+                article_id=1,
+                page_size=1,
+                sort=CommentSortOrder.OLDEST,
+                cursor=first_page.next_cursor
+            )
+        assert exc_info.value.status_code == 400
+
+    async def test_get_comments_with_cursor_of_other_article(self, comment_service):
+        # Arrange
+        await create_comments(comment_service, article_id=1, count=3)
+        first_page = await comment_service.get_paginated_by_article(article_id=1, page_size=1, cursor="*")
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await comment_service.get_paginated_by_article(article_id=2, page_size=1, cursor=first_page.next_cursor)
+        assert exc_info.value.status_code == 400
+
+    async def test_get_by_id_returns_the_schema_with_and_without_the_cache(self, comment_service):
+        # Arrange
+        await create_comments(comment_service, article_id=1, count=1)
+
+        # Act
+        uncached = await comment_service.get_by_id(1)
+        comment_service.entity_cache = EntityCache()
+        cached = await comment_service.get_by_id(1)
+
+        # Assert
+        assert type(uncached) is type(cached) is Comment
+        assert uncached == cached
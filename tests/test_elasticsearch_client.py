@@ -0,0 +1,108 @@
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+
+from src.articles.api.router import api_router
+from src.articles.core import dependencies
+from src.articles.core.dependencies import elasticsearch_lifespan, services_lifespan
+from src.articles.db.session import get_db
+
+
+class CountingElasticsearch:
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingElasticsearch.instances += 1
+        self.kwargs = kwargs
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+async def asgi_request(app: FastAPI, method: str, path: str, body: dict | None = None) -> int:
+    """Send a single http request through the asgi app and return the response status code"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+        "app": app,
+        "state": {},
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    status_codes = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status_codes.append(message["status"])
+
+    await app(scope, receive, send)
+    return status_codes[0]
+
+
+@pytest.fixture
+def app(monkeypatch):
+    CountingElasticsearch.instances = 0
+    monkeypatch.setattr(dependencies, "AsyncElasticsearch", CountingElasticsearch)
+
+    async def fake_db():
+        db_session = MagicMock()
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        db_session.execute = AsyncMock(return_value=result)
+        yield db_session
+
+    @asynccontextmanager
+    async def lifespan(application: FastAPI):
+        async with elasticsearch_lifespan(application), services_lifespan(application):
+            yield
+
+    application = FastAPI(lifespan=lifespan)
+    application.include_router(api_router)
+    application.dependency_overrides[get_db] = fake_db
+    return application
+
+
+@pytest.mark.asyncio
+class TestElasticsearchClientLifecycle:
+    async def test_single_client_for_many_requests(self, app):
+        # Arrange
+        request_count = 25
+
+        # Act
+        async with app.router.lifespan_context(app):
+            es_client = app.state.es_client
+            status_codes = [await asgi_request(app, "GET", f"/articles/get/{i}") for i in range(request_count)]
+
+        # Assert
+        assert status_codes == [404] * request_count
+        assert CountingElasticsearch.instances == 1
+        assert es_client.closed is True
+
+    async def test_client_is_pooled_from_settings(self, app):
+        # Act
+        async with app.router.lifespan_context(app):
+            es_client = app.state.es_client
+
+        # Assert
+        settings = dependencies.get_and_cache_settings()
+        assert es_client.kwargs["connections_per_node"] == settings.ELASTICSEARCH_CONNECTIONS_PER_NODE
+        assert es_client.kwargs["http_compress"] == settings.ELASTICSEARCH_HTTP_COMPRESS
+        assert es_client.kwargs["request_timeout"] == settings.ELASTICSEARCH_REQUEST_TIMEOUT
+        assert es_client.kwargs["node_class"] == "aiohttp"
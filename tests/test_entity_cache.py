@@ -0,0 +1,210 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from src.articles.schemas.article import ArticleCreate, ArticleUpdate
+from src.articles.schemas.tag import Tag
+from src.articles.services.article import ArticleService
+from src.articles.services.entity_cache import EntityCache, InMemorySharedEntityCache, SharedEntityCache
+from src.articles.utils.cache import ByteSizeLRUCache
+from tests.mocks import MockArticleRepository, MockArticleSearchRepository, MockAuthorRepository, MockTagRepository
+
+
+class CountingLoader:
+    def __init__(self, value=None, delay: float = 0.0):
+        self.value = value if value is not None else {"id": 1, "name": "python"}
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+class BrokenSharedEntityCache(SharedEntityCache):
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def set(self, key, value, ttl):
+        raise ConnectionError("down")
+
+    async def delete(self, key):
+        raise ConnectionError("down")
+
+    async def clear(self):
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def article_service():
+    service = ArticleService(MagicMock(), MockArticleSearchRepository(), entity_cache=EntityCache())
+    service.repository = MockArticleRepository()
+    service.author_repository = MockAuthorRepository()
+    service.tag_repository = MockTagRepository()
+    return service
+
+
+class TestByteSizeLRUCache:
+    def test_least_recently_used_values_are_evicted_by_size(self):
+        # Arrange
+        cache = ByteSizeLRUCache(max_bytes=10, ttl=60)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.get("a")
+
+        # Act
+        cache.set("c", b"1234")
+
+        # Assert
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == (b"1234", None, b"1234")
+        assert cache.size == 8
+        assert cache.stats.evictions == 1
+
+    def test_values_larger_than_the_cache_are_not_kept(self):
+        # Arrange
+        cache = ByteSizeLRUCache(max_bytes=4, ttl=60)
+
+        # Act
+        cache.set("a", b"12345")
+
+        # Assert
+        assert (cache.get("a"), cache.size) == (None, 0)
+
+
+@pytest.mark.asyncio
+class TestEntityCache:
+    async def test_entities_are_cached_as_schemas(self):
+        # Arrange
+        cache = EntityCache()
+        load = CountingLoader()
+
+        # Act
+        first = await cache.get_or_load("tags", 1, Tag, load)
+        second = await cache.get_or_load("tags", 1, Tag, load)
+
+        # Assert
+        assert first == second == Tag(id=1, name="python")
+        assert load.calls == 1
+        assert cache.local.get("tags:1") == b'{"name":"python","id":1}'
+        assert cache.stats["tags"].hit_ratio == 0.5
+
+    async def test_concurrent_reads_load_once(self):
+        # Arrange
+        cache = EntityCache()
+        load = CountingLoader(delay=0.01)
+
+        # Act
+        results = await asyncio.gather(*(cache.get_or_load("tags", 1, Tag, load) for _ in range(10)))
+
+        # Assert
+        assert load.calls == 1
+        assert all(result == Tag(id=1, name="python") for result in results)
+        assert cache.stats["tags"].coalesced == 9
+
+    async def test_missing_entities_are_not_cached(self):
+        # Arrange
+        cache = EntityCache()
+
+        async def load_nothing():
+            return None
+
+        # Act
+        result = await cache.get_or_load("tags", 1, Tag, load_nothing)
+
+        # Assert
+        assert result is None
+        assert len(cache.local) == 0
+
+    async def test_workers_share_the_second_tier(self):
+        # Arrange
+        shared = InMemorySharedEntityCache()
+        load = CountingLoader()
+        await EntityCache(shared=shared).get_or_load("tags", 1, Tag, load)
+        other_worker = EntityCache(shared=shared)
+
+        # Act
+        result = await other_worker.get_or_load("tags", 1, Tag, load)
+
+        # Assert
+        assert result == Tag(id=1, name="python")
+        assert load.calls == 1
+        assert other_worker.stats["tags"].shared_hits == 1
+
+    async def test_invalidation_during_a_load_is_not_overwritten(self):
+        # Arrange
+        shared = InMemorySharedEntityCache()
+        cache = EntityCache(shared=shared)
+        read = asyncio.create_task(cache.get_or_load("tags", 1, Tag, CountingLoader(delay=0.01)))
+        await asyncio.sleep(0)
+
+        # Act
+        await cache.invalidate("tags", 1)
+        await read
+
+        # Assert
+        assert cache.local.get("tags:1") is None
+        assert await shared.get("tags:1") is None
+        assert cache.stats["tags"].invalidations == 1
+
+    async def test_an_unavailable_shared_tier_falls_through_to_the_database(self):
+        # Arrange
+        cache = EntityCache(shared=BrokenSharedEntityCache())
+        load = CountingLoader()
+
+        # Act
+        result = await cache.get_or_load("tags", 1, Tag, load)
+        await cache.invalidate("tags", 1)
+
+        # Assert
+        assert result == Tag(id=1, name="python")
+        assert load.calls == 1
+
+
+@pytest.mark.asyncio
+class TestCachedArticleService:
+    async def test_updates_invalidate_the_cached_article(self, article_service, monkeypatch):
+        # Arrange
+        created = await article_service.create(obj=ArticleCreate(
+            title="Cached Article",
+            abstract="Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        ))
+        get_read_model = MagicMock(wraps=article_service.repository.get_read_model)
+        monkeypatch.setattr(article_service.repository, "get_read_model", get_read_model)
+        await article_service.get_by_id(created.id)
+        await article_service.get_by_id(created.id)
+
+        # Act
+        await article_service.update(obj_id=created.id, obj=ArticleUpdate(title="Renamed"), user_id=1)
+        article = await article_service.get_by_id(created.id)
+
+        # Assert
+        assert article.title == "Renamed"
+        assert get_read_model.call_count == 3
+
+    async def test_deleted_articles_are_not_served_from_the_cache(self, article_service):
+        # Arrange
+        created = await article_service.create(obj=ArticleCreate(
+            title="Cached Article",
+            abstract="Abstract",
+            publication_date=datetime.now(timezone.utc),
+            owner_id=1,
+            author_ids=[],
+            tag_ids=[]
+        ))
+        await article_service.get_by_id(created.id)
+
+        # Act
+        await article_service.delete(obj_id=created.id, user_id=1)
+
+        # Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await article_service.get_by_id(created.id)
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,216 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from elastic_transport import ConnectionError as TransportConnectionError
+
+from src.articles.models.article import Article
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.services.index_queue import ArticleIndexQueue, _IndexOperation
+from tests.mocks import MockArticleSearchRepository
+
+
+def create_article(article_id: int, title: str = "Article") -> Article:
+    return Article(
+        id=article_id,
+        title=title,
+        abstract=f"Abstract {article_id}",
+        publication_date=datetime.now(timezone.utc),
+        owner_id=1,
+        authors=[],
+        tags=[],
+    )
+
+
+def queue_operations(*articles: Article):
+    return [
+        _IndexOperation(article.id, ArticleSearchRepository.build_document(article), False, None)
+        for article in articles
+    ]
+
+
+@pytest_asyncio.fixture
+async def search_repository():
+    repository = MockArticleSearchRepository()
+    await repository.create_index()
+    return repository
+
+
+@pytest.mark.asyncio
+class TestArticleIndexQueue:
+    async def test_writes_are_sent_in_batches(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=10, flush_interval=5.0)
+        await queue.start()
+
+        # Act
+        for i in range(1, 26):
+            await queue.index_article(create_article(i))
+        await queue.flush()
+
+        # Assert
+        assert search_repository.bulk_sizes[:2] == [10, 10]
+        assert sorted(search_repository.documents) == list(range(1, 26))
+        await queue.stop()
+
+    async def test_indexing_many_articles_with_refresh_waits_for_the_last_batch_only(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=10, flush_interval=5.0)
+        await queue.start()
+
+        # Act
+        await queue.index_articles([create_article(i) for i in range(1, 16)], refresh=True)
+
+        # Assert
+        assert search_repository.bulk_sizes == [10, 5]
+        assert sorted(search_repository.documents) == list(range(1, 16))
+        await queue.stop()
+
+    async def test_partial_batch_is_sent_after_flush_interval(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=100, flush_interval=0.01)
+        await queue.start()
+
+        # Act
+        await queue.index_article(create_article(1))
+        await asyncio.sleep(0.1)
+
+        # Assert
+        assert search_repository.bulk_sizes == [1]
+        await queue.stop()
+
+    async def test_refresh_waits_until_the_write_was_sent(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=100, flush_interval=60.0)
+        await queue.start()
+
+        # Act
+        await queue.index_article(create_article(1), refresh=True)
+
+        # Assert
+        assert 1 in search_repository.documents
+        await queue.stop()
+
+    async def test_flush_requested_while_a_batch_is_written_is_not_lost(self, search_repository, monkeypatch):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=100, flush_interval=60.0)
+        bulk_write = search_repository.bulk_write
+        writing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_bulk_write(actions, refresh=False, index=None):
+            writing.set()
+            await release.wait()
+            return await bulk_write(actions, refresh=refresh, index=index)
+
+        monkeypatch.setattr(search_repository, "bulk_write", slow_bulk_write)
+        await queue.start()
+        await queue.index_article(create_article(1))
+        first_flush = asyncio.create_task(queue.flush())
+        await writing.wait()
+
+        # Act
+        await queue.index_article(create_article(2))
+        second_flush = asyncio.create_task(queue.flush())
+        release.set()
+        await asyncio.wait_for(asyncio.gather(first_flush, second_flush), timeout=1)
+
+        # Assert
+        assert sorted(search_repository.documents) == [1, 2]
+        await queue.stop()
+
+    async def test_only_the_latest_write_of_an_article_is_sent(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=3, flush_interval=5.0)
+        await queue.start()
+
+        # Act
+        await queue.index_article(create_article(1, "First"))
+        await queue.index_article(create_article(1, "Second"))
+        await queue.delete_article(2)
+        await queue.flush()
+
+        # Assert
+        assert search_repository.bulk_sizes == [2]
+        assert search_repository.documents[1]["title"] == "Second"
+        await queue.stop()
+
+    async def test_failed_requests_are_retried_with_backoff(self, search_repository, monkeypatch):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=1, flush_interval=0.01, retry_backoff=0.5)
+        bulk_write = search_repository.bulk_write
+        attempts = []
+        delays = []
+
+        async def flaky_bulk_write(actions, refresh=False, index=None):
+            attempts.append(len(actions))
+            if len(attempts) < 3:
+                raise TransportConnectionError("Elasticsearch is down")
+            return await bulk_write(actions, refresh=refresh, index=index)
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        search_repository.bulk_write = flaky_bulk_write
+        monkeypatch.setattr("src.articles.services.index_queue.asyncio.sleep", fake_sleep)
+
+        # Act
+        await queue._write(queue_operations(create_article(1)))
+
+        # Assert
+        assert len(attempts) == 3
+        assert delays == [0.5, 1.0]
+        assert 1 in search_repository.documents
+
+    async def test_only_retryable_items_are_retried(self, search_repository, monkeypatch):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, retry_backoff=0)
+        calls = []
+
+        async def bulk_write(actions, refresh=False, index=None):
+            calls.append([article_id for article_id, _ in actions])
+            if len(calls) == 1:
+                return [{"_id": "1", "status": 429}, {"_id": "2", "status": 400, "error": "mapper_parsing_exception"}]
+            return []
+
+        search_repository.bulk_write = bulk_write
+
+        # Act
+        await queue._write(queue_operations(create_article(1), create_article(2), create_article(3)))
+
+        # Assert
+        assert calls == [[1, 2, 3], [1]]
+
+    async def test_waiting_for_many_articles_returns_the_rejected_ones(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=2, flush_interval=60.0)
+        bulk_write = search_repository.bulk_write
+
+        async def rejecting_bulk_write(actions, refresh=False, index=None):
+            await bulk_write(actions, refresh=refresh, index=index)
+            return [{"_id": "2", "status": 400, "error": {"type": "mapper_parsing_exception", "reason": "bad date"}}]
+
+        search_repository.bulk_write = rejecting_bulk_write
+        await queue.start()
+
+        # Act
+        errors = await queue.index_articles([create_article(i) for i in range(1, 4)], wait=True)
+
+        # Assert
+        assert errors == {2: "bad date"}
+        assert search_repository.bulk_sizes == [2, 1]
+        await queue.stop()
+
+    async def test_stop_sends_the_queued_writes(self, search_repository):
+        # Arrange
+        queue = ArticleIndexQueue(search_repository, batch_size=100, flush_interval=60.0)
+        await queue.start()
+        await queue.index_article(create_article(1))
+
+        # Act
+        await queue.stop()
+
+        # Assert
+        assert 1 in search_repository.documents
+
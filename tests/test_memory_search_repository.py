@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from elasticsearch import NotFoundError
+
+from src.articles.models.article import Article
+from src.articles.models.author import Author
+from src.articles.repositories import memory_search_repository
+from src.articles.repositories.memory_search_repository import InMemoryArticleSearchRepository
+from src.articles.schemas.article import ArticleSearchFilters, ArticleSortOrder
+from src.articles.utils.text_analysis import analyze
+
+
+def create_article(article_id: int, abstract: str, title: str = "Article", year: int = 2024, authors=None) -> Article:
+    return Article(
+        id=article_id,
+        title=title,
+        abstract=abstract,
+        publication_date=datetime(year, 6, 1, tzinfo=timezone.utc),
+        owner_id=1,
+        authors=authors or [],
+        tags=[],
+    )
+
+
+@pytest_asyncio.fixture
+async def search_repository():
+    repository = InMemoryArticleSearchRepository()
+    await repository.create_index()
+    await repository.bulk_index([
+        create_article(1, "Python programming for data science", title="Python Basics", year=2023,
+                       authors=[Author(id=1, name="Guido")]),
+        create_article(2, "Advanced python programming patterns and python internals", title="Deep Python"),
+        create_article(3, "The history of elvish languages", title="Elvish", year=2020,
+                       authors=[Author(id=2, name="J.R.R. Tolkien")]),
+        create_article(4, "Programming languages compared", title="Languages"),
+        *[create_article(i, "Clinical notes on surgery and recovery", title=f"Notes {i}", year=2010)
+          for i in range(10, 14)],
+    ])
+    return repository
+
+
+@pytest.mark.asyncio
+class TestInMemoryArticleSearchRepository:
+    async def test_analysis_matches_the_custom_analyzer(self):
+        # Act
+        terms = analyze("The Running of the Programs, in Python!")
+
+        # Assert
+        assert terms == ["run", "program", "python"]
+
+    async def test_search_ranks_by_bm25(self, search_repository):
+        # Act
+        article_ids, total, has_next = await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(abstract_search="python")
+        )
+
+        # Assert
+        assert article_ids == [2, 1]
+        assert total == 2
+        assert has_next is False
+
+    async def test_search_is_fuzzy(self, search_repository):
+        # Act
+        article_ids = await search_repository.search_articles("pyhton progamming")
+
+        # Assert
+        assert sorted(article_ids) == [1, 2]
+
+    async def test_search_without_fuzziness(self, search_repository):
+        # Act
+        article_ids = await search_repository.search_articles("pyhton", fuzzy=False)
+
+        # Assert
+        assert article_ids == []
+
+    async def test_search_requires_most_of_the_terms(self, search_repository):
+        # Act
+        article_ids = await search_repository.search_articles("elvish languages python", min_score=0)
+
+        # Assert
+        assert article_ids == [3]
+
+    async def test_search_filters(self, search_repository):
+        # Act
+        article_ids, total, _ = await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(abstract_search="python programming", publication_year=2023, author="guido")
+        )
+
+        # Assert
+        assert article_ids == [1]
+        assert total == 1
+
+    async def test_search_sorts_by_title(self, search_repository):
+        # Act
+        article_ids, _, _ = await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(sort=ArticleSortOrder.TITLE)
+        )
+
+        # Assert
+        assert article_ids == [2, 3, 4, 10, 11, 12, 13, 1]
+
+    async def test_search_after_pages_through_all_hits(self, search_repository):
+        # Arrange
+        search_params = ArticleSearchFilters(sort=ArticleSortOrder.PUBLICATION_DATE)
+        pages = []
+
+        # Act
+        article_ids, total, pit_id, last_sort = await search_repository.search_after_page(
+            search_params=search_params, page_size=3
+        )
+        pages.append(article_ids)
+        while last_sort:
+            article_ids, _, pit_id, last_sort = await search_repository.search_after_page(
+                search_params=search_params, page_size=3, pit_id=pit_id, search_after=last_sort
+            )
+            pages.append(article_ids)
+
+        # Assert
+        assert total == 8
+        assert pages == [[4, 2, 1], [3, 13, 12], [11, 10], []]
+
+    async def test_closed_point_in_time_is_not_found(self, search_repository):
+        # Arrange
+        _, _, pit_id, last_sort = await search_repository.search_after_page(
+            search_params=ArticleSearchFilters(), page_size=1
+        )
+        await search_repository.close_point_in_time(pit_id)
+
+        # Act & Assert
+        with pytest.raises(NotFoundError):
+            await search_repository.search_after_page(
+                search_params=ArticleSearchFilters(), page_size=1, pit_id=pit_id, search_after=last_sort
+            )
+
+    async def test_updates_and_deletes_are_searchable(self, search_repository):
+        # Act
+        await search_repository.index_article(create_article(3, "Python for linguists"))
+        await search_repository.delete_article(2)
+
+        # Assert
+        assert sorted(await search_repository.search_articles("python")) == [1, 3]
+        assert await search_repository.verify_article_indexed(2) is None
+
+    async def test_deleted_documents_are_compacted(self, search_repository, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(memory_search_repository, "COMPACTION_MIN_DELETED", 2)
+        index = search_repository.indices["articles_v1"]
+
+        # Act
+        await search_repository.bulk_delete([1, 2, 3, 10, 11])
+
+        # Assert
+        assert len(index.live) == index.doc_count == 3
+        assert await search_repository.search_articles("programming languages") == [4]
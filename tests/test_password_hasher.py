@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.articles.auth import password_utils
+from src.articles.auth.password_utils import LoginThrottle, PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queued=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+class TestPasswordHasher:
+    async def test_hash_and_verify_run_in_the_pool(self, hasher, monkeypatch):
+        # Arrange
+        threads = []
+        hash_password = password_utils.get_password_hash
+
+        def recording_hash(password):
+            threads.append(threading.current_thread().name)
+            return hash_password(password)
+
+        monkeypatch.setattr(password_utils, "get_password_hash", recording_hash)
+
+        # Act
+        hashed = await hasher.hash("secret")
+        verified = await hasher.verify("secret", hashed)
+
+        # Assert
+        assert verified is True
+        assert threads[0].startswith("password-hash")
+        assert (hasher.stats.hashes, hasher.stats.verifications) == (1, 1)
+        assert hasher.stats.max_hash_seconds > 0
+
+    async def test_calls_beyond_the_queue_are_rejected(self, hasher, monkeypatch):
+        # Arrange
+        release = threading.Event()
+        monkeypatch.setattr(password_utils, "get_password_hash", lambda password: release.wait(5) and password)
+
+        # Act
+        calls = [asyncio.create_task(hasher.hash(str(i))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        # Assert
+        assert results[:2] == ["0", "1"]
+        assert isinstance(results[2], HTTPException) and results[2].status_code == 429
+        assert (hasher.stats.hashes, hasher.stats.rejected) == (2, 1)
+
+    async def test_a_cancelled_call_holds_its_slot_until_the_hash_finished(self, hasher, monkeypatch):
+        # Arrange
+        release = threading.Event()
+        monkeypatch.setattr(password_utils, "get_password_hash", lambda password: release.wait(5) and password)
+        calls = [asyncio.create_task(hasher.hash(str(i))) for i in range(2)]
+        await asyncio.sleep(0.05)
+
+        # Act
+        calls[0].cancel()
+        await asyncio.gather(calls[0], return_exceptions=True)
+
+        # Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.hash("2")
+        assert exc_info.value.status_code == 429
+        release.set()
+        assert await calls[1] == "1"
+
+    async def test_event_loop_keeps_running_while_hashing(self, hasher):
+        # Arrange
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(tick())
+
+        # Act
+        await hasher.hash("secret")
+        ticker.cancel()
+
+        # Assert
+        assert ticks > 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLoginThrottle:
+    def test_other_usernames_do_not_evict_a_lock(self):
+        # Arrange
+        throttle = LoginThrottle(max_attempts=2, window=60.0, max_usernames=3, clock=FakeClock())
+        for _ in range(2):
+            throttle.attempt("victim")
+
+        # Act
+        for i in range(10):
+            throttle.attempt(f"other{i}")
+
+        # Assert
+        with pytest.raises(HTTPException) as exc_info:
+            throttle.attempt("victim")
+        assert exc_info.value.status_code == 429
+
+    def test_a_flood_of_locked_usernames_does_not_block_a_new_username(self):
+        # Arrange
+        throttle = LoginThrottle(max_attempts=1, window=60.0, max_usernames=3, clock=FakeClock())
+        for i in range(10):
+            throttle.attempt(f"fake{i}")
+
+        # Act
+        throttle.attempt("fresh")
+
+        # Assert
+        assert throttle.throttled == 0
+        with pytest.raises(HTTPException):
+            throttle.attempt("fake9")
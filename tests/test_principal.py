@@ -0,0 +1,101 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from src.articles.auth import deps, principal
+from src.articles.auth.deps import get_current_principal, get_token_user_id
+from src.articles.auth.jwt_utils import create_access_token
+from src.articles.auth.principal import Principal, TokenCache, get_principal_cache, get_token_cache
+from src.articles.auth.schemas import TokenPayload
+from src.articles.schemas.user import UserCreate
+from src.articles.services import user
+from src.articles.services.user import UserService
+from tests.mocks import MockSession, MockUserRepository
+
+
+@pytest.fixture
+def user_repository(monkeypatch):
+    repository = MockUserRepository()
+    monkeypatch.setattr(user, "UserRepository", lambda db: repository)
+    monkeypatch.setattr(deps, "AsyncSessionLocal", MockSession)
+    get_token_cache.cache_clear()
+    get_principal_cache.cache_clear()
+    return repository
+
+
+class TestTokenCache:
+    def test_a_token_is_verified_once(self, monkeypatch):
+        # Arrange
+        calls = []
+        verify_token = principal.verify_token
+
+        def counting_verify_token(token):
+            calls.append(token)
+            return verify_token(token)
+
+        monkeypatch.setattr(principal, "verify_token", counting_verify_token)
+        token_cache = TokenCache()
+        token = create_access_token(user_id=7)
+
+        # Act
+        user_ids = [token_cache.verify(token) for _ in range(3)]
+
+        # Assert
+        assert user_ids == [7, 7, 7]
+        assert len(calls) == 1
+        assert token_cache.stats.hits == 2
+
+    def test_tokens_are_not_cached_past_their_expiry(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(principal, "verify_token", lambda token: TokenPayload(sub=7, exp=int(time.time()) - 1))
+        token_cache = TokenCache()
+
+        # Act
+        token_cache.verify("token")
+        token_cache.verify("token")
+
+        # Assert
+        assert token_cache.stats.hits == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_tokens_are_rejected(self):
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await get_token_user_id("not a token")
+        assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+class TestCurrentPrincipal:
+    async def test_the_principal_is_loaded_once(self, user_repository, monkeypatch):
+        # Arrange
+        created = await user_repository.create(UserCreate(username="testuser", password="hashed"))
+        get_by_id = MagicMock(wraps=user_repository.get_by_id)
+        monkeypatch.setattr(user_repository, "get_by_id", get_by_id)
+        session_factory = MagicMock(wraps=MockSession)
+        monkeypatch.setattr(deps, "AsyncSessionLocal", session_factory)
+
+        # Act
+        first = await get_current_principal(created.id)
+        second = await get_current_principal(created.id)
+
+        # Assert
+        assert first == second == Principal(id=created.id, username="testuser")
+        assert get_by_id.call_count == 1
+        # the cached principal is returned without a database session
+        assert session_factory.call_count == 1
+
+    async def test_deleting_a_user_invalidates_its_principal(self, user_repository):
+        # Arrange
+        created = await user_repository.create(UserCreate(username="testuser", password="hashed"))
+        await get_current_principal(created.id)
+
+        # Act
+        await UserService(MagicMock()).delete(obj_id=created.id, user_id=created.id)
+
+        # Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(created.id)
+        assert exc_info.value.status_code == 404
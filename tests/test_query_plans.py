@@ -0,0 +1,164 @@
+"""
+EXPLAIN based checks that the database queries can use their indexes. They need the PostgreSQL of the
+tests environment and are skipped without it. Sequential scans are disabled, so a plan still containing
+one means no index can serve the query.
+"""
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.articles.core.config.factory import get_settings
+from src.articles.db.base import Base
+from src.articles.repositories.article import ArticleRepository
+from src.articles.repositories.comment import CommentRepository
+from src.articles.schemas.article import ArticleSearchFilters, ArticleSortOrder
+from src.articles.schemas.base import CountMode
+from src.articles.schemas.comment import CommentSortOrder
+
+SCHEMA = "query_plans"
+
+
+@pytest_asyncio.fixture
+async def engine():
+    settings = get_settings("tests")
+    engine = create_async_engine(
+        settings.POSTGRES_URI,
+        connect_args={"options": f"-csearch_path={SCHEMA},public -cenable_seqscan=off", "connect_timeout": 2},
+    )
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(text("INSERT INTO users (username, password) VALUES ('plans', 'plans')"))
+            await connection.execute(text("ANALYZE"))
+    except (OperationalError, OSError) as e:
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL is not available: {e}")
+
+    yield engine
+
+    async with engine.begin() as connection:
+        await connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+async def explain_statements(engine: AsyncEngine, call: Callable[[AsyncSession], Awaitable]) -> List[str]:
+    """Run the call and return the plans of all the statements it executed"""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as db:
+            await call(db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as connection:
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            plans.append("\n".join(result.scalars().all()))
+    return plans
+
+
+async def explain(engine: AsyncEngine, statement: str) -> str:
+    async with engine.connect() as connection:
+        result = await connection.execute(text(f"EXPLAIN {statement}"))
+        return "\n".join(result.scalars().all())
+
+
+@pytest.mark.asyncio
+class TestQueryPlans:
+    async def test_publication_year_filter_uses_the_date_index(self, engine):
+        # Act
+        plans = await explain_statements(engine, lambda db: ArticleRepository(db).search_with_filters(
+            search_params=ArticleSearchFilters(publication_year=2024, sort=ArticleSortOrder.PUBLICATION_DATE)
+        ))
+
+        # Assert
+        assert all("Seq Scan on articles" not in plan for plan in plans)
+        assert any("ix_articles_publication_date_id" in plan for plan in plans)
+
+    async def test_title_and_author_filters_use_the_trigram_indexes(self, engine):
+        # Act
+        plans = await explain_statements(engine, lambda db: ArticleRepository(db).search_with_filters(
+            search_params=ArticleSearchFilters(title="python", author="tolkien")
+        ))
+
+        # Assert
+        assert all("Seq Scan" not in plan for plan in plans)
+        assert any("ix_articles_title_lower_trgm" in plan for plan in plans)
+
+    async def test_comment_page_uses_the_covering_index(self, engine):
+        # Act
+        plans = await explain_statements(engine, lambda db: CommentRepository(db).get_paginated_by_article(
+            article_id=1, page=2, page_size=10
+        ))
+
+        # Assert
+        assert len(plans) == 1
+        assert "ix_comments_article_id_id" in plans[0]
+        assert "Sort" not in plans[0]
+
+    async def test_estimated_count_is_planned_not_run(self, engine):
+        # Act
+        async with AsyncSession(engine) as db:
+            comments, total, has_next = await CommentRepository(db).get_paginated_by_article(
+                article_id=1, count_mode=CountMode.ESTIMATE
+            )
+
+        # Assert
+        assert comments == []
+        assert total >= 0
+        assert has_next is False
+
+    @pytest.mark.parametrize("sort, after, index_name", [
+        (ArticleSortOrder.PUBLICATION_DATE, (datetime(2024, 1, 1, tzinfo=timezone.utc), 5000), "ix_articles_publication_date_id"),
+        (ArticleSortOrder.TITLE, ("Python", 5000), "ix_articles_title_id"),
+        (ArticleSortOrder.NEWEST, (5000,), "articles_pkey"),
+    ])
+    async def test_keyset_page_starts_an_index_scan_at_the_cursor(self, engine, sort, after, index_name):
+        # Act
+        plans = await explain_statements(engine, lambda db: ArticleRepository(db).search_after(
+            search_params=ArticleSearchFilters(sort=sort), page_size=10, after=after
+        ))
+
+        # Assert
+        assert index_name in plans[0]
+        assert "Sort" not in plans[0]
+        assert "Seq Scan" not in plans[0]
+
+    async def test_comment_keyset_page_starts_an_index_scan_at_the_cursor(self, engine):
+        # Act
+        plans = await explain_statements(engine, lambda db: CommentRepository(db).get_page_after(
+            article_id=1, page_size=10, sort=CommentSortOrder.OLDEST, after_id=5000
+        ))
+
+        # Assert
+        assert "ix_comments_article_id_id" in plans[0]
+        assert "Sort" not in plans[0]
+
+    @pytest.mark.parametrize("statement, index_name", [
+        ("DELETE FROM comments WHERE article_id = 1", "ix_comments_article_id_id"),
+        ("DELETE FROM comments WHERE user_id = 1", "ix_comments_user_id"),
+        ("DELETE FROM articles WHERE owner_id = 1", "ix_articles_owner_id"),
+        ("DELETE FROM article_authors WHERE author_id = 1", "ix_article_authors_author_id_article_id"),
+        ("DELETE FROM article_tags WHERE tag_id = 1", "ix_article_tags_tag_id_article_id"),
+    ])
+    async def test_cascading_deletes_use_the_foreign_key_indexes(self, engine, statement, index_name):
+        # Act
+        plan = await explain(engine, statement)
+
+        # Assert
+        assert index_name in plan
+        assert "Seq Scan" not in plan
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.articles.schemas.article import ArticleCreate, ArticleSearchFilters, ArticleUpdate
+from src.articles.schemas.base import CountMode
+from src.articles.services.article import ArticleService
+from src.articles.services.search_cache import SearchResultCache
+from src.articles.utils.cache import TTLCache
+from tests.mocks import MockArticleRepository, MockArticleSearchRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def article_service():
+    # Create an empty AsyncSession mock since we won't use it
+    db_session = MagicMock()
+
+    service = ArticleService(db_session, MockArticleSearchRepository(), search_cache=SearchResultCache())
+    service.repository = MockArticleRepository()
+
+    return service
+
+
+async def create_article(service: ArticleService, title: str) -> None:
+    await service.create(obj=ArticleCreate(
+        title=title,
+        abstract=f"Abstract of {title}",
+        publication_date=datetime.now(timezone.utc),
+        owner_id=1,
+        author_ids=[],
+        tag_ids=[]
+    ))
+
+
+class TestTTLCache:
+    def test_least_recently_used_entry_is_evicted(self):
+        # Arrange
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        # Act
+        cache.set("c", 3)
+
+        # Assert
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats.evictions == 1
+
+    def test_entries_expire(self):
+        # Arrange
+        clock = FakeClock()
+        cache = TTLCache(max_size=10, ttl=30, clock=clock)
+        cache.set("a", 1)
+
+        # Act
+        clock.now = 31
+
+        # Assert
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+
+    def test_hits_and_misses_are_counted(self):
+        # Arrange
+        cache = TTLCache(max_size=10, ttl=30)
+        cache.set("a", 1)
+
+        # Act
+        cache.get("a")
+        cache.get("b")
+
+        # Assert
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.hit_ratio) == (1, 1, 0.5)
+
+
+@pytest.mark.asyncio
+class TestSearchResultCache:
+    async def test_repeated_search_is_served_from_cache(self, article_service):
+        # Arrange
+        await create_article(article_service, "Python")
+        search_params = ArticleSearchFilters(title="python")
+        first_page = await article_service.search(search_params=search_params)
+        article_service.repository.search_with_filters = MagicMock(side_effect=AssertionError("not cached"))
+
+        # Act
+        second_page = await article_service.search(search_params=ArticleSearchFilters(title="PYTHON"))
+
+        # Assert
+        assert second_page == first_page
+        assert article_service.search_cache.stats.hits == 1
+
+    async def test_abstract_whitespace_is_normalized(self):
+        # Arrange
+        cache = SearchResultCache()
+
+        # Act
+        first_key = cache._key(0, ArticleSearchFilters(abstract_search=" Python   Basics"), 1, 10, CountMode.EXACT)
+        second_key = cache._key(0, ArticleSearchFilters(abstract_search="python basics "), 1, 10, CountMode.EXACT)
+
+        # Assert
+        assert first_key == second_key
+
+    async def test_title_whitespace_is_kept(self):
+        # Arrange
+        cache = SearchResultCache()
+
+        # Act
+        first_key = cache._key(0, ArticleSearchFilters(title="python "), 1, 10, CountMode.EXACT)
+        second_key = cache._key(0, ArticleSearchFilters(title="python"), 1, 10, CountMode.EXACT)
+
+        # Assert
+        assert first_key != second_key
+
+    async def test_writes_invalidate_cached_pages(self, article_service):
+        # Arrange
+        await create_article(article_service, "Python")
+        search_params = ArticleSearchFilters()
+        await article_service.search(search_params=search_params)
+
+        # Act
+        await create_article(article_service, "Rust")
+        page = await article_service.search(search_params=search_params)
+
+        # Assert
+        assert page.total_items == 2
+        assert article_service.search_cache.stats.hits == 0
+
+    async def test_updates_invalidate_cached_pages(self, article_service):
+        # Arrange
+        await create_article(article_service, "Python")
+        await article_service.search(search_params=ArticleSearchFilters())
+
+        # Act
+        await article_service.update(obj_id=1, obj=ArticleUpdate(title="Rust"), user_id=1)
+        page = await article_service.search(search_params=ArticleSearchFilters())
+
+        # Assert
+        assert page.items[0].title == "Rust"
+
+    async def test_page_searched_during_a_write_is_not_served(self, article_service):
+        # Arrange
+        cache = article_service.search_cache
+        search_params = ArticleSearchFilters()
+        generation = cache.generation
+        page = await article_service.search(search_params=search_params)
+
+        # Act
+        cache.invalidate()
+        cache.set(search_params=search_params, page=1, page_size=10, result=page, generation=generation)
+
+        # Assert
+        assert cache.get(search_params=search_params, page=1, page_size=10) is None
@@ -0,0 +1,132 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from src.articles.services.search_index import SearchIndexService
+from tests.mocks import MockArticleRepository, MockArticleSearchRepository
+
+
+@pytest.fixture
+def search_index_service():
+    # Create an empty AsyncSession mock since we won't use it
+    db_session = MagicMock()
+
+    # Initialize the service with our mock repositories
+    service = SearchIndexService(db_session, MockArticleSearchRepository())
+    service.article_repository = MockArticleRepository()
+
+    return service
+
+
+async def create_articles(service: SearchIndexService, count: int) -> None:
+    for i in range(count):
+        await service.article_repository.create_with_relationships(
+            obj_in_data={
+                "title": f"Article {i}",
+                "abstract": f"Abstract {i}",
+                "publication_date": datetime.now(timezone.utc),
+                "owner_id": 1,
+            },
+            authors=[],
+            tags=[],
+        )
+
+
+@pytest.mark.asyncio
+class TestSearchIndexService:
+    async def test_reindex_loads_every_article_in_chunks(self, search_index_service):
+        # Arrange
+        await create_articles(search_index_service, 25)
+
+        # Act
+        stats = await search_index_service.reindex(chunk_size=10, concurrency=2)
+
+        # Assert
+        assert stats.indexed == 25
+        assert stats.failed == 0
+        assert sorted(search_index_service.search_repository.bulk_sizes) == [5, 10, 10]
+        assert len(search_index_service.search_repository.documents) == 25
+
+    async def test_reindex_restores_refresh_interval(self, search_index_service):
+        # Arrange
+        await create_articles(search_index_service, 3)
+        search_index_service.search_repository.refresh_interval = "5s"
+
+        # Act
+        await search_index_service.reindex(chunk_size=2, concurrency=1)
+
+        # Assert
+        assert search_index_service.search_repository.refresh_intervals == ["-1", "5s"]
+
+    async def test_reindex_restores_refresh_interval_on_failure(self, search_index_service):
+        # Arrange
+        await create_articles(search_index_service, 3)
+
+        async def failing_bulk_index(articles, refresh=False, index=None):
+            raise ConnectionError("Elasticsearch is down")
+
+        search_index_service.search_repository.bulk_index = failing_bulk_index
+
+        # Act & Assert
+        with pytest.raises(ConnectionError):
+            await search_index_service.reindex(chunk_size=2, concurrency=1)
+        assert search_index_service.search_repository.refresh_intervals == ["-1", None]
+
+    async def test_rebuild_swaps_aliases_and_keeps_previous_index(self, search_index_service):
+        # Arrange
+        search_repository = search_index_service.search_repository
+        await create_articles(search_index_service, 5)
+        await search_index_service.reindex(chunk_size=2, concurrency=1)
+
+        # Act
+        stats = await search_index_service.rebuild(chunk_size=2, concurrency=1)
+
+        # Assert
+        assert await search_repository.get_alias_target(search_repository.read_alias) == "articles_v2"
+        assert await search_repository.get_alias_target(search_repository.write_alias) == "articles_v2"
+        assert sorted(search_repository.indices["articles_v1"]) == [1, 2, 3, 4, 5]
+        assert sorted(search_repository.indices["articles_v2"]) == [1, 2, 3, 4, 5]
+        assert stats.failed == 0
+
+    async def test_rebuild_removes_articles_deleted_during_the_build(self, search_index_service):
+        # Arrange
+        search_repository = search_index_service.search_repository
+        await create_articles(search_index_service, 4)
+        bulk_index = search_repository.bulk_index
+
+        async def bulk_index_then_delete(articles, refresh=False, index=None):
+            result = await bulk_index(articles, refresh=refresh, index=index)
+            search_index_service.article_repository.data.pop(1, None)
+            return result
+
+        search_repository.bulk_index = bulk_index_then_delete
+
+        # Act
+        stats = await search_index_service.rebuild(chunk_size=2, concurrency=1)
+
+        # Assert
+        assert sorted(search_repository.indices["articles_v2"]) == [2, 3, 4]
+        assert stats.deleted == 1
+
+    async def test_rollback_points_aliases_to_previous_index(self, search_index_service):
+        # Arrange
+        search_repository = search_index_service.search_repository
+        await create_articles(search_index_service, 2)
+        await search_index_service.rebuild(chunk_size=2, concurrency=1)
+
+        # Act
+        previous_index = await search_index_service.rollback()
+
+        # Assert
+        assert previous_index == "articles_v1"
+        assert await search_repository.get_alias_target(search_repository.read_alias) == "articles_v1"
+
+    async def test_rollback_without_previous_index(self, search_index_service):
+        # Arrange
+        await search_index_service.search_repository.create_index()
+
+        # Act
+        previous_index = await search_index_service.rollback()
+
+        # Assert
+        assert previous_index is None
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from elastic_transport import ConnectionError as TransportConnectionError
+
+from src.articles.models.search_outbox import SearchOutbox
+from src.articles.services import search_outbox
+from src.articles.services.search_outbox import SearchOutboxIndexer, SearchOutboxWorker
+from tests.mocks import MockArticleRepository, MockArticleSearchRepository, MockSearchOutboxRepository, MockSession
+
+
+@pytest.fixture
+def outbox_repository():
+    return MockSearchOutboxRepository()
+
+
+@pytest.fixture
+def article_repository():
+    return MockArticleRepository()
+
+
+@pytest_asyncio.fixture
+async def outbox_worker(monkeypatch, outbox_repository, article_repository):
+    monkeypatch.setattr(search_outbox, "SearchOutboxRepository", lambda db: outbox_repository)
+    monkeypatch.setattr(search_outbox, "ArticleRepository", lambda db: article_repository)
+
+    search_repository = MockArticleSearchRepository()
+    await search_repository.create_index()
+    return SearchOutboxWorker(MockSession, search_repository, batch_size=10)
+
+
+async def create_article(article_repository: MockArticleRepository, title: str):
+    return await article_repository.create_with_relationships(
+        obj_in_data={
+            "title": title,
+            "abstract": f"Abstract of {title}",
+            "publication_date": datetime.now(timezone.utc),
+            "owner_id": 1,
+        },
+        authors=[],
+        tags=[],
+    )
+
+
+@pytest.mark.asyncio
+class TestSearchOutbox:
+    async def test_indexer_records_changes_in_the_outbox(self, outbox_repository, article_repository):
+        # Arrange
+        indexer = SearchOutboxIndexer(MockSession())
+        indexer.outbox_repository = outbox_repository
+        article = await create_article(article_repository, "Outbox")
+
+        # Act
+        await indexer.index_article(article)
+        await indexer.delete_article(article.id)
+
+        # Assert
+        assert [(entry.article_id, entry.operation) for entry in outbox_repository.entries.values()] == [
+            (article.id, SearchOutbox.OPERATION_INDEX),
+            (article.id, SearchOutbox.OPERATION_DELETE),
+        ]
+
+    async def test_worker_sends_the_current_state_and_clears_the_outbox(
+            self, outbox_worker, outbox_repository, article_repository
+    ):
+        # Arrange
+        article = await create_article(article_repository, "Draft")
+        await outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+        article.title = "Published"
+        await outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+
+        # Act
+        processed = await outbox_worker.process_batch()
+
+        # Assert
+        assert processed == 2
+        assert outbox_worker.search_repository.bulk_sizes == [1]
+        assert outbox_worker.search_repository.documents[article.id]["title"] == "Published"
+        assert await outbox_repository.count_pending() == 0
+        assert outbox_worker.stats.sent == 2
+        assert outbox_worker.stats.lag_seconds >= 0
+
+    async def test_worker_removes_articles_deleted_after_they_were_queued(
+            self, outbox_worker, outbox_repository, article_repository
+    ):
+        # Arrange
+        article = await create_article(article_repository, "Gone")
+        outbox_worker.search_repository.documents[article.id] = {"id": article.id}
+        await outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+        await article_repository.delete(article.id)
+
+        # Act
+        await outbox_worker.process_batch()
+
+        # Assert
+        assert article.id not in outbox_worker.search_repository.documents
+
+    async def test_worker_keeps_entries_when_elasticsearch_fails(
+            self, outbox_worker, outbox_repository, article_repository
+    ):
+        # Arrange
+        article = await create_article(article_repository, "Retry")
+        await outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+
+        async def failing_bulk_write(actions, refresh=False, index=None, versions=None):
+            raise TransportConnectionError("Elasticsearch is down")
+
+        outbox_worker.search_repository.bulk_write = failing_bulk_write
+
+        # Act & Assert
+        with pytest.raises(TransportConnectionError):
+            await outbox_worker.process_batch()
+        assert await outbox_repository.count_pending() == 1
+
+    async def test_worker_keeps_entries_of_retryable_item_failures(
+            self, outbox_worker, outbox_repository, article_repository
+    ):
+        # Arrange
+        first = await create_article(article_repository, "Throttled")
+        second = await create_article(article_repository, "Accepted")
+        await outbox_repository.add(article_id=first.id, operation=SearchOutbox.OPERATION_INDEX)
+        await outbox_repository.add(article_id=second.id, operation=SearchOutbox.OPERATION_INDEX)
+
+        async def throttled_bulk_write(actions, refresh=False, index=None, versions=None):
+            return [{"_id": str(first.id), "status": 429, "error": "es_rejected_execution_exception"}]
+
+        outbox_worker.search_repository.bulk_write = throttled_bulk_write
+
+        # Act
+        await outbox_worker.process_batch()
+
+        # Assert
+        assert [entry.article_id for entry in outbox_repository.entries.values()] == [first.id]
+
+    async def test_an_older_batch_does_not_overwrite_a_later_write(
+            self, outbox_worker, outbox_repository, article_repository
+    ):
+        # Arrange
+        article = await create_article(article_repository, "First")
+        await outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+        article.title = "Second"
+        await outbox_repository.add(article_id=article.id, operation=SearchOutbox.OPERATION_INDEX)
+        older, later = list(outbox_repository.entries.values())
+        search_repository = outbox_worker.search_repository
+
+        # Act
+        # another worker claimed the later entry and wrote the latest title, this one still holds the first title
+        await search_repository.bulk_write(
+            [(article.id, {"id": article.id, "title": "Second"})], versions={article.id: later.id}
+        )
+        errors = await search_repository.bulk_write(
+            [(article.id, {"id": article.id, "title": "First"})], versions={article.id: older.id}
+        )
+        outbox_repository.entries.pop(later.id)
+        await outbox_worker.process_batch()
+
+        # Assert
+        assert errors[0]["status"] == 409
+        assert search_repository.documents[article.id]["title"] == "Second"
+        assert await outbox_repository.count_pending() == 0
+        assert outbox_worker.stats.failed == 0
@@ -0,0 +1,151 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.articles.repositories.search_repository import ArticleSearchRepository
+from src.articles.schemas.article import ArticleSearchFilters, ArticleSortOrder
+from src.articles.schemas.base import CountMode
+
+
+@pytest.fixture
+def search_repository():
+    es_client = MagicMock()
+    es_client.search = AsyncMock(return_value={
+        "hits": {
+            "total": {"value": 3},
+            "hits": [{"_id": "7", "sort": [2.5, 7]}, {"_id": "3", "sort": [1.5, 3]}, {"_id": "5", "sort": [1.5, 5]}],
+        }
+    })
+    return ArticleSearchRepository(es_client)
+
+
+@pytest.mark.asyncio
+class TestArticleSearchRepository:
+    async def test_search_keeps_hit_order(self, search_repository):
+        # Act
+        article_ids, total, has_next = await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(abstract_search="python"),
+            page=1,
+            page_size=2
+        )
+
+        # Assert
+        assert article_ids == [7, 3]
+        assert total == 3
+        assert has_next is True
+
+    @pytest.mark.parametrize("count_mode, track_total_hits, expected_total", [
+        (CountMode.EXACT, True, 3),
+        (CountMode.ESTIMATE, 10000, 3),
+        (CountMode.NONE, False, None),
+    ])
+    async def test_search_counts_hits_in_count_mode(self, search_repository, count_mode, track_total_hits, expected_total):
+        # Act
+        _, total, _ = await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(abstract_search="python"),
+            count_mode=count_mode
+        )
+
+        # Assert
+        assert search_repository.es_client.search.call_args.kwargs["track_total_hits"] == track_total_hits
+        assert total == expected_total
+
+    async def test_search_filters_run_in_filter_context(self, search_repository):
+        # Act
+        await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(
+                abstract_search="python",
+                title="Search",
+                publication_year=2024,
+                author="Tolkien"
+            )
+        )
+
+        # Assert
+        query = search_repository.es_client.search.call_args.kwargs["query"]
+        assert [list(clause) for clause in query["bool"]["must"]] == [["match"]]
+        assert query["bool"]["filter"] == [
+            {"wildcard": {"title.keyword": {"value": "*search*"}}},
+            {"range": {"publication_date": {"gte": "2024-01-01", "lt": "2025-01-01"}}},
+            {"wildcard": {"author_names.keyword": {"value": "*tolkien*"}}},
+        ]
+
+    @pytest.mark.parametrize("sort, expected", [
+        (ArticleSortOrder.RELEVANCE, [{"_score": {"order": "desc"}}, {"id": {"order": "asc"}}]),
+        (ArticleSortOrder.PUBLICATION_DATE, [{"publication_date": {"order": "desc"}}, {"id": {"order": "desc"}}]),
+        (ArticleSortOrder.TITLE, [{"title.keyword": {"order": "asc"}}, {"id": {"order": "asc"}}]),
+    ])
+    async def test_search_sort_has_id_tiebreaker(self, search_repository, sort, expected):
+        # Act
+        await search_repository.search_with_filters(
+            search_params=ArticleSearchFilters(abstract_search="python", sort=sort)
+        )
+
+        # Assert
+        assert search_repository.es_client.search.call_args.kwargs["sort"] == expected
+
+    async def test_scan_matching_ids_pages_through_a_point_in_time(self):
+        # Arrange
+        es_client = MagicMock()
+        es_client.open_point_in_time = AsyncMock(return_value={"id": "pit"})
+        es_client.close_point_in_time = AsyncMock()
+        es_client.search = AsyncMock(side_effect=[
+            {"pit_id": "pit", "hits": {"hits": [{"_id": "1", "sort": [2.0, 1]}, {"_id": "2", "sort": [1.0, 2]}]}},
+            {"pit_id": "pit", "hits": {"hits": [{"_id": "3", "sort": [0.5, 3]}]}},
+        ])
+        search_repository = ArticleSearchRepository(es_client)
+
+        # Act
+        batches = [
+            batch async for batch in search_repository.scan_matching_ids(
+                ArticleSearchFilters(abstract_search="python"), batch_size=2
+            )
+        ]
+
+        # Assert
+        assert batches == [[1, 2], [3]]
+        assert es_client.search.call_args_list[1].kwargs["search_after"] == [1.0, 2]
+        es_client.close_point_in_time.assert_awaited_once_with(id="pit")
+
+    async def test_create_index_migrates_the_legacy_index(self):
+        # Arrange
+        es_client = MagicMock()
+        es_client.indices.exists_alias = AsyncMock(return_value=False)
+        es_client.indices.exists = AsyncMock(return_value=True)
+        es_client.indices.get = AsyncMock(return_value={"articles": {}})
+        es_client.indices.create = AsyncMock()
+        es_client.indices.update_aliases = AsyncMock()
+        es_client.reindex = AsyncMock()
+        search_repository = ArticleSearchRepository(es_client)
+
+        # Act
+        await search_repository.create_index()
+
+        # Assert
+        es_client.indices.create.assert_awaited_once()
+        assert es_client.indices.create.call_args.kwargs["index"] == "articles_v1"
+        es_client.reindex.assert_awaited_once_with(
+            source={"index": "articles"}, dest={"index": "articles_v1"}, wait_for_completion=True, refresh=True
+        )
+        assert es_client.indices.update_aliases.call_args.kwargs["actions"] == [
+            {"add": {"index": "articles_v1", "alias": "articles_read"}},
+            {"add": {"index": "articles_v1", "alias": "articles_write", "is_write_index": True}},
+            {"remove_index": {"index": "articles"}},
+        ]
+
+    async def test_create_index_without_a_legacy_index_only_adds_the_aliases(self):
+        # Arrange
+        es_client = MagicMock()
+        es_client.indices.exists_alias = AsyncMock(return_value=False)
+        es_client.indices.exists = AsyncMock(return_value=False)
+        es_client.indices.get = AsyncMock(return_value={})
+        es_client.indices.create = AsyncMock()
+        es_client.indices.update_aliases = AsyncMock()
+        es_client.reindex = AsyncMock()
+        search_repository = ArticleSearchRepository(es_client)
+
+        # Act
+        await search_repository.create_index()
+
+        # Assert
+        es_client.reindex.assert_not_awaited()
+        assert len(es_client.indices.update_aliases.call_args.kwargs["actions"]) == 2
@@ -2,6 +2,7 @@ import pytest
 from fastapi import HTTPException
 from unittest.mock import MagicMock
 
+from src.articles.auth.password_utils import LoginThrottle, PasswordHasher
 from src.articles.schemas.user import UserCreate
 from src.articles.services.user import UserService
 from tests.mocks import MockUserRepository
@@ -13,7 +14,7 @@ def user_service():
     db_session = MagicMock()
 
     # Initialize the service with our mock repository
-    service = UserService(db_session)
+    service = UserService(db_session, PasswordHasher(workers=2), LoginThrottle(max_attempts=3))
     service.repository = MockUserRepository()
 
     return service
@@ -94,4 +95,28 @@ class TestUserService:
         # Assert
         assert authenticated_user is None
 
+    async def test_authenticate_throttles_a_username(self, user_service):
+        # Arrange
+        await user_service.create(obj=UserCreate(username="testuser", password="testpassword123"))
+        for _ in range(3):
+            await user_service.authenticate(username="testuser", password="wrongpassword")
 
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await user_service.authenticate(username="testuser", password="testpassword123")
+        assert exc_info.value.status_code == 429
+        assert await user_service.authenticate(username="otheruser", password="testpassword123") is None
+
+    async def test_successful_login_resets_the_attempts(self, user_service):
+        # Arrange
+        await user_service.create(obj=UserCreate(username="testuser", password="testpassword123"))
+        for _ in range(2):
+            await user_service.authenticate(username="testuser", password="wrongpassword")
+
+        # Act
+        await user_service.authenticate(username="testuser", password="testpassword123")
+        for _ in range(2):
+            await user_service.authenticate(username="testuser", password="wrongpassword")
+
+        # Assert
+        assert await user_service.authenticate(username="testuser", password="testpassword123") is not None